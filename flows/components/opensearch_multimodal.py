@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import base64
 import copy
+import hashlib
 import json
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
@@ -64,6 +68,18 @@ def get_embedding_field_name(model_name: str) -> str:
     return f"chunk_embedding_{normalize_model_name(model_name)}"
 
 
+# Corpus-wide embedding model inventory, cached per (endpoint, index, identity).
+# Aggregating embedding_model over every chunk on each search is as expensive as
+# the search itself, and the answer only changes on ingest/delete. Ingest through
+# this component updates the cache; deletes done elsewhere are picked up when the
+# entry expires.
+MODEL_INVENTORY_TTL_SECONDS = 300
+MODEL_INVENTORY_MAX_ENTRIES = 256
+# Least recently used first
+_model_inventory_cache: OrderedDict[tuple[str, str, str], tuple[float, list[str]]] = OrderedDict()
+_model_inventory_lock = threading.Lock()
+
+
 @vector_store_connection
 class OpenSearchVectorStoreComponentMultimodalMultiEmbedding(LCVectorStoreComponent):
     """OpenSearch Vector Store Component with Multi-Model Hybrid Search Capabilities.
@@ -706,6 +722,7 @@ class OpenSearchVectorStoreComponentMultimodalMultiEmbedding(LCVectorStoreCompon
         if metadatas:
             self.log(f"Sample metadata: {metadatas[0] if metadatas else {}}")
         helpers.bulk(client, requests, max_chunk_bytes=max_chunk_bytes)
+        self._note_indexed_model(embedding_model)
         return return_ids
 
     # ---------- auth / client ----------
@@ -1218,48 +1235,115 @@ class OpenSearchVectorStoreComponentMultimodalMultiEmbedding(LCVectorStoreCompon
                 context_clauses.append({"terms": {field: values}})
         return context_clauses
 
-    def _detect_available_models(self, client: OpenSearch, filter_clauses: list[dict] | None = None) -> list[str]:
+    def _auth_identity(self) -> str:
+        """Stable caller identity for cache keys: JWT subject/roles or basic-auth user, never the raw token."""
+        mode = (self.auth_mode or "basic").strip().lower()
+        if mode != "jwt":
+            return f"basic:{(self.username or '').strip()}"
+        token = (self.jwt_token or "").strip()
+        try:
+            # Claims are only used to key the cache; OpenSearch still verifies the token
+            payload = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            identity = {key: claims.get(key) for key in ("iss", "sub", "roles")}
+        except (IndexError, ValueError, AttributeError):
+            identity = {"token": hashlib.sha256(token.encode()).hexdigest()}
+        return "jwt:" + json.dumps(identity, sort_keys=True, default=str)
+
+    def _model_inventory_key(self) -> tuple[str, str, str]:
+        """Cache key for the model inventory; includes the caller identity since DLS scopes results."""
+        identity = hashlib.sha256(self._auth_identity().encode()).hexdigest()[:16]
+        return (self.opensearch_url, self.index_name, identity)
+
+    @staticmethod
+    def _store_model_inventory(key: tuple[str, str, str], models: list[str]) -> None:
+        """Cache an inventory, dropping expired and least recently used entries. Caller holds the lock."""
+        now = time.monotonic()
+        for stale_key, (cached_at, _) in list(_model_inventory_cache.items()):
+            if now - cached_at >= MODEL_INVENTORY_TTL_SECONDS:
+                del _model_inventory_cache[stale_key]
+        _model_inventory_cache[key] = (now, models)
+        _model_inventory_cache.move_to_end(key)
+        while len(_model_inventory_cache) > MODEL_INVENTORY_MAX_ENTRIES:
+            _model_inventory_cache.popitem(last=False)
+
+    def _note_indexed_model(self, embedding_model: str) -> None:
+        """Add a just-indexed model to every cached inventory for this index."""
+        with _model_inventory_lock:
+            for key, (cached_at, models) in list(_model_inventory_cache.items()):
+                if key[:2] == (self.opensearch_url, self.index_name) and embedding_model not in models:
+                    _model_inventory_cache[key] = (cached_at, [*models, embedding_model])
+
+    def _aggregate_models(self, client: OpenSearch, filter_clauses: list[dict] | None = None) -> list[str]:
+        """Run the embedding_model terms aggregation, optionally scoped by filters."""
+        agg_query = {"size": 0, "aggs": {"embedding_models": {"terms": {"field": "embedding_model", "size": 10}}}}
+
+        # Apply filters to model detection if any exist
+        if filter_clauses:
+            agg_query["query"] = {"bool": {"filter": filter_clauses}}
+
+        logger.debug(f"Model detection query: {agg_query}")
+        result = client.search(
+            index=self.index_name,
+            body=agg_query,
+            params={"terminate_after": 0},
+        )
+        buckets = result.get("aggregations", {}).get("embedding_models", {}).get("buckets", [])
+        models = [b["key"] for b in buckets if b["key"]]
+
+        # Log detailed bucket info for debugging
+        logger.info(
+            f"Detected embedding models in corpus: {models}"
+            + (f" (with {len(filter_clauses)} filters)" if filter_clauses else "")
+        )
+        if not models:
+            total_hits = result.get("hits", {}).get("total", {})
+            total_count = total_hits.get("value", 0) if isinstance(total_hits, dict) else total_hits
+            logger.warning(
+                f"No embedding_model values found in index '{self.index_name}'. "
+                f"Total docs in index: {total_count}. "
+                f"This may indicate documents were indexed without the embedding_model field."
+            )
+        return models
+
+    def _detect_available_models(
+        self,
+        client: OpenSearch,
+        filter_clauses: list[dict] | None = None,
+        *,
+        scoped: bool = False,
+    ) -> list[str]:
         """Detect which embedding models have documents in the index.
 
-        Uses aggregation to find all unique embedding_model values, optionally
-        filtered to only documents matching the user's filter criteria.
+        By default returns the cached corpus-wide inventory (refreshed every
+        MODEL_INVENTORY_TTL_SECONDS). Only when scoped=True are the filter
+        clauses applied, which always runs a fresh aggregation.
 
         Args:
             client: OpenSearch client instance
             filter_clauses: Optional filter clauses to scope model detection
+            scoped: Detect models among filtered documents only
 
         Returns:
             List of embedding model names found in the index
         """
         try:
-            agg_query = {"size": 0, "aggs": {"embedding_models": {"terms": {"field": "embedding_model", "size": 10}}}}
-
-            # Apply filters to model detection if any exist
-            if filter_clauses:
-                agg_query["query"] = {"bool": {"filter": filter_clauses}}
-
-            logger.debug(f"Model detection query: {agg_query}")
-            result = client.search(
-                index=self.index_name,
-                body=agg_query,
-                params={"terminate_after": 0},
-            )
-            buckets = result.get("aggregations", {}).get("embedding_models", {}).get("buckets", [])
-            models = [b["key"] for b in buckets if b["key"]]
-
-            # Log detailed bucket info for debugging
-            logger.info(
-                f"Detected embedding models in corpus: {models}"
-                + (f" (with {len(filter_clauses)} filters)" if filter_clauses else "")
-            )
-            if not models:
-                total_hits = result.get("hits", {}).get("total", {})
-                total_count = total_hits.get("value", 0) if isinstance(total_hits, dict) else total_hits
-                logger.warning(
-                    f"No embedding_model values found in index '{self.index_name}'. "
-                    f"Total docs in index: {total_count}. "
-                    f"This may indicate documents were indexed without the embedding_model field."
-                )
+            if scoped and filter_clauses:
+                return self._aggregate_models(client, filter_clauses)
+
+            key = self._model_inventory_key()
+            with _model_inventory_lock:
+                cached = _model_inventory_cache.get(key)
+                if cached:
+                    _model_inventory_cache.move_to_end(key)
+            if cached and time.monotonic() - cached[0] < MODEL_INVENTORY_TTL_SECONDS and cached[1]:
+                logger.debug(f"Using cached embedding model inventory: {cached[1]}")
+                return list(cached[1])
+
+            models = self._aggregate_models(client)
+            if models:
+                with _model_inventory_lock:
+                    self._store_model_inventory(key, models)
         except (OpenSearchException, KeyError, ValueError) as e:
             logger.warning(f"Failed to detect embedding models: {e}")
             # Fallback to current model
@@ -1380,8 +1464,10 @@ class OpenSearchVectorStoreComponentMultimodalMultiEmbedding(LCVectorStoreCompon
         # Build filter clauses first so we can use them in model detection
         filter_clauses = self._coerce_filter_clauses(filter_obj)
 
-        # Detect available embedding models in the index (scoped by filters)
-        available_models = self._detect_available_models(client, filter_clauses)
+        # Detect available embedding models in the index. Scoping detection to
+        # the filtered documents is opt-in via "scope_model_detection": true.
+        scope_model_detection = isinstance(filter_obj, dict) and filter_obj.get("scope_model_detection") is True
+        available_models = self._detect_available_models(client, filter_clauses, scoped=scope_model_detection)
 
         if not available_models:
             logger.warning("No embedding models found in index, using current model")
@@ -42,9 +42,20 @@ export interface Task {
   created_at: string;
   updated_at: string;
   duration_seconds?: number;
+  priority?: "interactive" | "connector" | "backfill";
+  queue_position?: number | null;
+  eta_seconds?: number | null;
+  files_per_second?: number | null;
+  recent_errors?: {
+    file: string;
+    filename?: string | null;
+    error?: string | null;
+    updated_at: number;
+  }[];
   result?: Record<string, unknown>;
   error?: string;
   files?: Record<string, TaskFileEntry>;
+  files_truncated?: boolean;
 }
 
 export interface TasksResponse {
@@ -240,7 +240,8 @@ WAIT_FOR_TASK_TOOL = Tool(
     name="openrag_wait_for_task",
     description=(
         "Wait for an ingestion task to complete. "
-        "Polls the task status until it completes or fails."
+        "Follows the task's progress stream (or polls the task status on older "
+        "servers) until it completes or fails."
     ),
     inputSchema={
         "type": "object",
@@ -1,14 +1,21 @@
 """OpenRAG SDK documents client."""
 
 import asyncio
+import json
 from pathlib import Path
 from typing import TYPE_CHECKING, BinaryIO
 
+import httpx
+
 from .models import DeleteDocumentResponse, IngestResponse, IngestTaskStatus
 
 if TYPE_CHECKING:
     from .client import OpenRAGClient
 
+_TERMINAL_STATUSES = ("completed", "failed")
+# Status codes meaning the server has no task event stream (older servers)
+_STREAM_UNAVAILABLE_STATUSES = (404, 405, 501)
+
 
 class DocumentsClient:
     """Client for document operations."""
@@ -33,8 +40,8 @@ class DocumentsClient:
             file_path: Path to the file to ingest.
             file: File-like object to ingest (alternative to file_path).
             filename: Filename to use when providing file object.
-            wait: If True, poll until ingestion completes. If False, return immediately.
-            poll_interval: Seconds between status checks when waiting.
+            wait: If True, wait until ingestion completes. If False, return immediately.
+            poll_interval: Initial seconds between status checks if waiting falls back to polling.
             timeout: Maximum seconds to wait for completion.
 
         Returns:
@@ -72,7 +79,7 @@ class DocumentsClient:
         if not wait:
             return ingest_response
 
-        # Poll for completion
+        # Wait for completion
         return await self.wait_for_task(
             ingest_response.task_id,
             poll_interval=poll_interval,
@@ -101,14 +108,21 @@ class DocumentsClient:
         task_id: str,
         poll_interval: float = 1.0,
         timeout: float = 300.0,
+        max_poll_interval: float = 10.0,
     ) -> IngestTaskStatus:
         """
         Wait for an ingestion task to complete.
 
+        Follows the task's progress event stream, so completion is noticed as
+        soon as it happens without re-fetching the task. If the server does
+        not provide the stream or the connection drops, falls back to polling,
+        starting at poll_interval and backing off up to max_poll_interval.
+
         Args:
             task_id: The task ID to wait for.
-            poll_interval: Seconds between status checks.
+            poll_interval: Initial seconds between status checks when polling.
             timeout: Maximum seconds to wait.
+            max_poll_interval: Upper bound for the polling interval.
 
         Returns:
             IngestTaskStatus with final status.
@@ -116,16 +130,67 @@ class DocumentsClient:
         Raises:
             TimeoutError: If task doesn't complete within timeout.
         """
-        elapsed = 0.0
-        while elapsed < timeout:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        try:
+            finished = await asyncio.wait_for(self._wait_for_task_events(task_id), timeout)
+        except (asyncio.TimeoutError, TimeoutError):
+            raise TimeoutError(
+                f"Ingestion task {task_id} did not complete within {timeout}s"
+            ) from None
+        except httpx.HTTPError:
+            finished = False
+
+        if finished:
+            return await self.get_task_status(task_id)
+
+        interval = poll_interval
+        while True:
             status = await self.get_task_status(task_id)
-            if status.status in ("completed", "failed"):
+            if status.status in _TERMINAL_STATUSES:
                 return status
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 1.5, max(max_poll_interval, poll_interval))
 
         raise TimeoutError(f"Ingestion task {task_id} did not complete within {timeout}s")
 
+    async def _wait_for_task_events(self, task_id: str) -> bool:
+        """
+        Follow /api/v1/tasks/{task_id}/events until the task finishes.
+
+        Returns:
+            True once the task reached a terminal status, False if the stream
+            is not available or ended early (the caller then polls).
+        """
+        async with self._client._http.stream(
+            "GET",
+            f"{self._client._base_url}/api/v1/tasks/{task_id}/events",
+            headers={**self._client._headers, "Accept": "text/event-stream"},
+        ) as response:
+            if response.status_code in _STREAM_UNAVAILABLE_STATUSES:
+                return False
+            if response.status_code != 200:
+                await response.aread()
+                self._client._handle_error(response)
+
+            async for line in response.aiter_lines():
+                line = line.strip()
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    event = json.loads(line[5:].strip())
+                except json.JSONDecodeError:
+                    continue
+                # Only snapshot and task events carry the task status
+                if event.get("type") != "file" and event.get("status") in _TERMINAL_STATUSES:
+                    return True
+
+        return False
+
     async def delete(self, filename: str) -> DeleteDocumentResponse:
         """
         Delete a document from the knowledge base.
@@ -7,8 +7,15 @@ logger = get_logger(__name__)
 # Import persistent storage
 from services.conversation_persistence_service import conversation_persistence
 
-# In-memory storage for active conversation threads (preserves function calls)
-active_conversations = {}
+from config.settings import CONVERSATION_CACHE_MAX_ENTRIES, CONVERSATION_CACHE_MAX_MB
+from utils.conversation_cache import ConversationCache, restore_thread_datetimes
+
+# In-memory storage for active conversation threads (preserves function calls).
+# Bounded LRU; evicted threads are spilled to the conversation store.
+active_conversations = ConversationCache(
+    max_entries=CONVERSATION_CACHE_MAX_ENTRIES,
+    max_bytes=CONVERSATION_CACHE_MAX_MB * 1024 * 1024,
+)
 
 
 def get_user_conversations(user_id: str):
@@ -20,16 +27,16 @@ def get_conversation_thread(user_id: str, previous_response_id: str = None):
     """Get or create a specific conversation thread with function call preservation"""
     from datetime import datetime
 
-    # Create user namespace if it doesn't exist
-    if user_id not in active_conversations:
-        active_conversations[user_id] = {}
-
     # If we have a previous_response_id, try to get the existing conversation
-    if previous_response_id and previous_response_id in active_conversations[user_id]:
-        logger.debug(
-            f"Retrieved existing conversation for user {user_id}, response_id {previous_response_id}"
-        )
-        return active_conversations[user_id][previous_response_id]
+    if previous_response_id:
+        conversation = active_conversations.get(user_id, previous_response_id)
+        if conversation is None:
+            conversation = _reload_spilled_thread(user_id, previous_response_id)
+        if conversation is not None:
+            logger.debug(
+                f"Retrieved existing conversation for user {user_id}, response_id {previous_response_id}"
+            )
+            return conversation
 
     # Create new conversation thread
     new_conversation = {
@@ -47,12 +54,42 @@ def get_conversation_thread(user_id: str, previous_response_id: str = None):
     return new_conversation
 
 
+def _reload_spilled_thread(user_id: str, response_id: str):
+    """Load a thread evicted from active_conversations back from the conversation store"""
+    try:
+        conversation = conversation_persistence.load_thread_state(user_id, response_id)
+    except Exception as e:
+        logger.warning(f"Failed to reload conversation {response_id} for user {user_id}: {e}")
+        return None
+    if conversation is None:
+        return None
+    conversation = restore_thread_datetimes(conversation)
+    active_conversations.put(user_id, response_id, conversation)
+    active_conversations.reloads += 1
+    return conversation
+
+
+async def _spill_evicted_threads():
+    """Write threads evicted from active_conversations to the conversation store
+
+    Threads stay in the spill queue (and readable) until written, so a failed
+    write is retried by the next spill.
+    """
+    for user_id, response_id, conversation in active_conversations.pending_spills():
+        try:
+            await conversation_persistence.store_thread_state(user_id, response_id, conversation)
+            active_conversations.spill_done(user_id, response_id, conversation)
+            active_conversations.spilled += 1
+        except Exception as e:
+            active_conversations.spill_failures += 1
+            logger.warning(f"Failed to spill conversation {response_id} for user {user_id}: {e}")
+
+
 async def store_conversation_thread(user_id: str, response_id: str, conversation_state: dict):
     """Store conversation both in memory (with function calls) and persist metadata to disk (async, non-blocking)"""
     # 1. Store full conversation in memory for function call preservation
-    if user_id not in active_conversations:
-        active_conversations[user_id] = {}
-    active_conversations[user_id][response_id] = conversation_state
+    active_conversations.put(user_id, response_id, conversation_state)
+    await _spill_evicted_threads()
 
     # 2. Store only essential metadata to disk (simplified JSON)
     messages = conversation_state.get("messages", [])
@@ -85,12 +122,9 @@ async def store_conversation_thread(user_id: str, response_id: str, conversation
 def get_user_conversation(user_id: str):
     """Get the most recent conversation for a user (for backward compatibility)"""
     # Check in-memory conversations first (with function calls)
-    if user_id in active_conversations and active_conversations[user_id]:
-        latest_response_id = max(
-            active_conversations[user_id].keys(),
-            key=lambda k: active_conversations[user_id][k]["last_activity"],
-        )
-        return active_conversations[user_id][latest_response_id]
+    user_threads = active_conversations.get_user_threads(user_id)
+    if user_threads:
+        return max(user_threads.values(), key=lambda c: c["last_activity"])
 
     # Fallback to metadata-only conversations
     conversations = get_user_conversations(user_id)
@@ -448,15 +482,6 @@ async def async_chat(
         logger.debug(
             "Stored conversation thread", user_id=user_id, response_id=response_id
         )
-
-        # Debug: Check what's in user_conversations now
-        conversations = get_user_conversations(user_id)
-        logger.debug(
-            "User conversations updated",
-            user_id=user_id,
-            conversation_count=len(conversations),
-            conversation_ids=list(conversations.keys()),
-        )
     else:
         logger.warning("No response_id received, conversation not stored")
 
@@ -630,15 +655,6 @@ async def async_langflow_chat(
             user_id=user_id,
             response_id=response_id,
         )
-
-        # Debug: Check what's in user_conversations now
-        conversations = get_user_conversations(user_id)
-        logger.debug(
-            "User conversations updated",
-            user_id=user_id,
-            conversation_count=len(conversations),
-            conversation_ids=list(conversations.keys()),
-        )
     else:
         logger.warning("No response_id received from langflow, conversation not stored")
 
@@ -740,8 +756,7 @@ async def delete_user_conversation(user_id: str, response_id: str) -> bool:
 
     try:
         # Delete from in-memory storage
-        if user_id in active_conversations and response_id in active_conversations[user_id]:
-            del active_conversations[user_id][response_id]
+        if active_conversations.remove(user_id, response_id):
             logger.debug(f"Deleted conversation {response_id} from memory for user {user_id}")
             deleted = True
 
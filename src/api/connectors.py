@@ -1,5 +1,6 @@
 from starlette.requests import Request
 from starlette.responses import JSONResponse, PlainTextResponse
+from connectors.incremental_sync import sync_connection_changes
 from connectors.sharepoint.utils import is_valid_sharepoint_url
 from config.settings import get_index_name
 from utils.logging_config import get_logger
@@ -207,17 +208,28 @@ async def connector_sync(request: Request, connector_service, session_manager):
             # If we have document_ids (connector file IDs), use sync_specific_files
             # Otherwise, use filename filtering with sync_connector_files
             if existing_file_ids:
-                logger.info(
-                    "Syncing specific files by document_id",
-                    connector_type=connector_type,
-                    file_count=len(existing_file_ids),
-                )
-                task_id = await connector_service.sync_specific_files(
+                # Only changes since the last sync, when the connector has a change feed
+                incremental = await sync_connection_changes(
+                    connector_service,
                     working_connection.connection_id,
                     user.user_id,
                     existing_file_ids,
                     jwt_token=jwt_token,
                 )
+                if incremental is not None:
+                    task_id = incremental["task_id"]
+                else:
+                    logger.info(
+                        "Syncing specific files by document_id",
+                        connector_type=connector_type,
+                        file_count=len(existing_file_ids),
+                    )
+                    task_id = await connector_service.sync_specific_files(
+                        working_connection.connection_id,
+                        user.user_id,
+                        existing_file_ids,
+                        jwt_token=jwt_token,
+                    )
             else:
                 # Fallback: use filename filtering (for Langflow-ingested files without document_id)
                 logger.info(
@@ -232,7 +244,7 @@ async def connector_sync(request: Request, connector_service, session_manager):
                     jwt_token=jwt_token,
                     filename_filter=set(existing_filenames),
                 )
-        task_ids = [task_id]
+        task_ids = [task_id] if task_id else []
         await TelemetryClient.send_event(Category.CONNECTOR_OPERATIONS, MessageId.ORB_CONN_SYNC_COMPLETE)
         return JSONResponse(
             {
@@ -657,17 +669,28 @@ async def sync_all_connectors(request: Request, connector_service, session_manag
 
                 # Sync using document_ids if available, else use filename filter
                 if existing_file_ids:
-                    logger.info(
-                        "Syncing specific files by document_id",
-                        connector_type=connector_type,
-                        file_count=len(existing_file_ids),
-                    )
-                    task_id = await connector_service.sync_specific_files(
+                    # Only changes since the last sync, when the connector has a change feed
+                    incremental = await sync_connection_changes(
+                        connector_service,
                         working_connection.connection_id,
                         user.user_id,
                         existing_file_ids,
                         jwt_token=jwt_token,
                     )
+                    if incremental is not None:
+                        task_id = incremental["task_id"]
+                    else:
+                        logger.info(
+                            "Syncing specific files by document_id",
+                            connector_type=connector_type,
+                            file_count=len(existing_file_ids),
+                        )
+                        task_id = await connector_service.sync_specific_files(
+                            working_connection.connection_id,
+                            user.user_id,
+                            existing_file_ids,
+                            jwt_token=jwt_token,
+                        )
                 else:
                     # Fallback: use filename filtering
                     logger.info(
@@ -683,7 +706,8 @@ async def sync_all_connectors(request: Request, connector_service, session_manag
                         filename_filter=set(existing_filenames),
                     )
                     
-                all_task_ids.append(task_id)
+                if task_id:
+                    all_task_ids.append(task_id)
                 synced_connectors.append(connector_type)
                 logger.info(
                     "Started sync for connector type",
@@ -700,7 +724,7 @@ async def sync_all_connectors(request: Request, connector_service, session_manag
                 )
                 errors.append({"connector_type": connector_type, "error": str(e)})
 
-        if not all_task_ids and not errors:
+        if not synced_connectors and not errors:
             if skipped_connectors:
                 return JSONResponse(
                     {
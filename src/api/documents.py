@@ -72,6 +72,7 @@ async def delete_documents_by_filename(request: Request, document_service, sessi
         )
 
         # Delete by query to remove all chunks of this document
+        from utils.document_manifest import delete_manifest_by_filename
         from utils.opensearch_queries import build_filename_delete_body
 
         delete_query = build_filename_delete_body(filename)
@@ -85,6 +86,7 @@ async def delete_documents_by_filename(request: Request, document_service, sessi
         )
 
         deleted_count = result.get("deleted", 0)
+        await delete_manifest_by_filename(opensearch_client, filename)
         logger.info(f"Deleted {deleted_count} chunks for filename {filename}", user_id=user.user_id)
 
         return JSONResponse({
@@ -18,6 +18,8 @@ async def search(request: Request, search_service, session_manager):
         score_threshold = payload.get(
             "scoreThreshold", 0
         )  # Optional score threshold, defaults to 0
+        # Detect embedding models among filtered documents only (slower, opt-in)
+        scoped_model_detection = bool(payload.get("scopedModelDetection", False))
 
         user = request.state.user
         jwt_token = session_manager.get_effective_jwt_token(user.user_id, request.state.jwt_token)
@@ -40,6 +42,7 @@ async def search(request: Request, search_service, session_manager):
             filters=filters,
             limit=limit,
             score_threshold=score_threshold,
+            scoped_model_detection=scoped_model_detection,
         )
         return JSONResponse(result, status_code=200)
     except Exception as e:
@@ -1644,6 +1644,7 @@ async def rollback_onboarding(request, session_manager, task_service):
                                     )
                                     
                                     # Delete documents by filename
+                                    from utils.document_manifest import delete_manifest_by_filename
                                     from utils.opensearch_queries import build_filename_delete_body
                                     from config.settings import get_index_name
                                     
@@ -1656,6 +1657,7 @@ async def rollback_onboarding(request, session_manager, task_service):
                                     )
                                     
                                     deleted_count = result.get("deleted", 0)
+                                    await delete_manifest_by_filename(opensearch_client, filename)
                                     if deleted_count > 0:
                                         deleted_files.append(filename)
                                         logger.info(f"Deleted {deleted_count} chunks for filename {filename}")
@@ -0,0 +1,34 @@
+"""Operational statistics endpoints"""
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+
+async def get_stats(
+    request: Request,
+    document_service,
+    search_service,
+    session_manager,
+    api_key_service,
+    task_service,
+):
+    """Return internal queue and cache statistics for monitoring"""
+    from agent import active_conversations
+    from connectors.graph_client import graph_client
+    from connectors.sync_state import connector_sync_state
+
+    return JSONResponse(
+        {
+            "document_conversion": document_service.get_conversion_stats(),
+            "query_embedding_cache": search_service.get_embedding_cache_stats(),
+            "embedding_model_inventory": search_service.get_model_inventory_stats(),
+            "opensearch_capabilities": search_service.get_capabilities(),
+            "opensearch_user_clients": session_manager.get_client_pool_stats(),
+            "api_key_cache": api_key_service.get_cache_stats(),
+            "ingestion_scheduler": task_service.get_scheduler_stats(),
+            "ingestion_concurrency": task_service.get_concurrency_stats(),
+            "conversation_cache": active_conversations.get_stats(),
+            "microsoft_graph": graph_client.get_stats(),
+            "connector_sync_state": connector_sync_state.get_stats(),
+        }
+    )
@@ -1,20 +1,133 @@
+import asyncio
+import json
+
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
+
+from models.tasks import TaskStatus
 from utils.telemetry import TelemetryClient, Category, MessageId
 
 
+def include_files(query_params) -> bool:
+    return query_params.get("include_files", "true").lower() not in ("false", "0", "no")
+
+
 async def task_status(request: Request, task_service, session_manager):
-    """Get the status of a specific task"""
+    """Get the status of a specific task
+
+    With ?include_files=false only the summary (counters, rate, ETA, recent
+    errors) is returned.
+    """
     task_id = request.path_params.get("task_id")
     user = request.state.user
 
-    task_status_result = task_service.get_task_status(user.user_id, task_id)
+    if include_files(request.query_params):
+        task_status_result = task_service.get_task_status(user.user_id, task_id)
+    else:
+        task_status_result = task_service.get_task_summary(user.user_id, task_id)
     if not task_status_result:
         return JSONResponse({"error": "Task not found"}, status_code=404)
 
     return JSONResponse(task_status_result)
 
 
+MAX_TASK_FILES_PAGE_SIZE = 1000
+
+
+def task_files_response(task_service, user_id: str, task_id: str, query_params):
+    """One page of a task's files; query params: status, cursor, limit"""
+    status = query_params.get("status")
+    try:
+        status = TaskStatus(status) if status else None
+        cursor = int(query_params.get("cursor") or 0)
+        limit = min(max(int(query_params.get("limit") or 100), 1), MAX_TASK_FILES_PAGE_SIZE)
+    except ValueError:
+        return JSONResponse({"error": "Invalid status, cursor or limit"}, status_code=400)
+
+    page = task_service.get_task_files(user_id, task_id, status=status, cursor=cursor, limit=limit)
+    if page is None:
+        return JSONResponse({"error": "Task not found"}, status_code=404)
+    return JSONResponse(page)
+
+
+async def task_files(request: Request, task_service, session_manager):
+    """List the files of a task page by page, optionally filtered by status"""
+    task_id = request.path_params.get("task_id")
+    user = request.state.user
+    return task_files_response(task_service, user.user_id, task_id, request.query_params)
+
+
+# Seconds without progress before a keepalive comment is sent, so proxies keep the stream open
+TASK_EVENTS_KEEPALIVE_SECONDS = 15
+_TERMINAL_STATUSES = ("completed", "failed")
+
+
+def _sse(event: dict) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+async def task_event_stream(task_service, user_id: str, task_id: str):
+    """Server-sent events for one task: a full snapshot, then incremental deltas
+
+    Events are JSON objects with a "type" of "snapshot" (the task status as
+    returned by GET /tasks/{task_id}), "file" (one file's new state plus the
+    task counters) or "task" (a task status change). The stream ends after
+    the task reaches a terminal status.
+
+    The subscription is made when the stream starts, so a response that is
+    never iterated leaves no subscriber behind.
+    """
+    queue = task_service.subscribe_task_events(user_id, task_id)
+    if queue is None:
+        return
+    try:
+        # Subscribed before the snapshot, so no change can fall in between
+        snapshot = task_service.get_task_status(user_id, task_id)
+        if snapshot is None:
+            return
+        yield _sse({"type": "snapshot", **snapshot})
+        if snapshot["status"] in _TERMINAL_STATUSES:
+            return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=TASK_EVENTS_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if event["type"] == "resync":
+                snapshot = task_service.get_task_status(user_id, task_id)
+                if snapshot is None:
+                    return
+                event = {"type": "snapshot", **snapshot}
+            yield _sse(event)
+            if event["type"] != "file" and event["status"] in _TERMINAL_STATUSES:
+                return
+    finally:
+        task_service.unsubscribe_task_events(task_id, queue)
+
+
+def task_events_response(task_service, user_id: str, task_id: str):
+    """SSE response for a task's progress, or 404 if the task does not exist"""
+    if task_service.get_task_summary(user_id, task_id) is None:
+        return JSONResponse({"error": "Task not found"}, status_code=404)
+    return StreamingResponse(
+        task_event_stream(task_service, user_id, task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"},
+    )
+
+
+async def task_events(request: Request, task_service, session_manager):
+    """Stream progress events of a specific task (SSE)"""
+    task_id = request.path_params.get("task_id")
+    user = request.state.user
+    return task_events_response(task_service, user.user_id, task_id)
+
+
 async def all_tasks(request: Request, task_service, session_manager):
     """Get all tasks for the authenticated user"""
     user = request.state.user
@@ -8,6 +8,7 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from api.router import upload_ingest_router
+from api.tasks import include_files, task_events_response, task_files_response
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -67,19 +68,73 @@ async def task_status_endpoint(request: Request, task_service, session_manager):
             "processed_files": 1,
             "successful_files": 1,
             "failed_files": 0,
-            "files": {...}
+            "files_per_second": 0.5,
+            "eta_seconds": null,
+            "recent_errors": [],
+            "files": {...},
+            "files_truncated": false
         }
+
+    Query params:
+        include_files: "false" to return only the summary
+
+    Tasks with more than 1000 files list only the first ones inline; use
+    GET /v1/tasks/{task_id}/files for the rest.
     """
     task_id = request.path_params.get("task_id")
     user = request.state.user
 
-    task_status = task_service.get_task_status(user.user_id, task_id)
+    if include_files(request.query_params):
+        task_status = task_service.get_task_status(user.user_id, task_id)
+    else:
+        task_status = task_service.get_task_summary(user.user_id, task_id)
     if not task_status:
         return JSONResponse({"error": "Task not found"}, status_code=404)
 
     return JSONResponse(task_status)
 
 
+async def task_files_endpoint(request: Request, task_service, session_manager):
+    """
+    List the files of an ingestion task page by page.
+
+    GET /v1/tasks/{task_id}/files?status=failed&cursor=0&limit=100
+
+    Response:
+        {
+            "task_id": "...",
+            "status_filter": "failed",
+            "files": [{"file": "...", "status": "failed", "error": "...", ...}],
+            "next_cursor": 1234
+        }
+
+    Pass next_cursor back as cursor to get the next page; it is null on the
+    last page.
+    """
+    task_id = request.path_params.get("task_id")
+    user = request.state.user
+    return task_files_response(task_service, user.user_id, task_id, request.query_params)
+
+
+async def task_events_endpoint(request: Request, task_service, session_manager):
+    """
+    Stream progress of an ingestion task as server-sent events.
+
+    GET /v1/tasks/{task_id}/events
+
+    Response (text/event-stream):
+        data: {"type": "snapshot", "task_id": "...", "status": "running", ..., "files": {...}}
+        data: {"type": "file", "task_id": "...", "processed_files": 1, ..., "file": "...", "file_status": {...}}
+        data: {"type": "task", "task_id": "...", "status": "completed", ...}
+
+    The first event is the full task status; later events only carry what
+    changed. The stream closes once the task has completed or failed.
+    """
+    task_id = request.path_params.get("task_id")
+    user = request.state.user
+    return task_events_response(task_service, user.user_id, task_id)
+
+
 async def delete_document_endpoint(request: Request, document_service, session_manager):
     """
     Delete a document from the knowledge base.
@@ -116,6 +171,7 @@ async def delete_document_endpoint(request: Request, document_service, session_m
 
     try:
         from config.settings import get_index_name
+        from utils.document_manifest import delete_manifest_by_filename
         from utils.opensearch_queries import build_filename_delete_body
 
         # Get OpenSearch client (API key auth uses internal client)
@@ -133,6 +189,7 @@ async def delete_document_endpoint(request: Request, document_service, session_m
         )
 
         deleted_count = result.get("deleted", 0)
+        await delete_manifest_by_filename(opensearch_client, filename)
         logger.info(f"Deleted {deleted_count} chunks for filename {filename}", user_id=user.user_id)
 
         return JSONResponse({
@@ -25,7 +25,9 @@ async def search_endpoint(request: Request, search_service, session_manager):
                 "document_types": ["application/pdf"]
             },
             "limit": 10,  // optional, default 10
-            "score_threshold": 0.5  // optional, default 0
+            "score_threshold": 0.5,  // optional, default 0
+            "scoped_model_detection": false  // optional, detect embedding
+                                             // models among filtered documents only
         }
 
     Response:
@@ -59,6 +61,7 @@ async def search_endpoint(request: Request, search_service, session_manager):
     filters = data.get("filters", {})
     limit = data.get("limit", 10)
     score_threshold = data.get("score_threshold", 0)
+    scoped_model_detection = bool(data.get("scoped_model_detection", False))
 
     user = request.state.user
     user_id = user.user_id
@@ -83,6 +86,7 @@ async def search_endpoint(request: Request, search_service, session_manager):
             filters=filters,
             limit=limit,
             score_threshold=score_threshold,
+            scoped_model_detection=scoped_model_detection,
         )
 
         # Transform results to public API format
@@ -22,6 +22,9 @@ _current_search_limit: ContextVar[Optional[int]] = ContextVar(
 _current_score_threshold: ContextVar[Optional[float]] = ContextVar(
     "current_score_threshold", default=0
 )
+_current_scoped_model_detection: ContextVar[bool] = ContextVar(
+    "current_scoped_model_detection", default=False
+)
 
 
 def set_auth_context(user_id: str, jwt_token: str):
@@ -73,3 +76,13 @@ def set_score_threshold(threshold: float):
 def get_score_threshold() -> float:
     """Get current score threshold from context"""
     return _current_score_threshold.get()
+
+
+def set_scoped_model_detection(enabled: bool):
+    """Detect embedding models among filtered documents only, for the current async context"""
+    _current_scoped_model_detection.set(enabled)
+
+
+def get_scoped_model_detection() -> bool:
+    """Get whether filter-scoped embedding model detection was requested"""
+    return _current_scoped_model_detection.get()
@@ -11,7 +11,6 @@ from opensearchpy import AsyncOpenSearch
 from opensearchpy._async.http_aiohttp import AIOHttpConnection
 
 from utils.container_utils import get_container_host
-from utils.document_processing import create_document_converter
 from utils.logging_config import get_logger
 
 load_dotenv(override=False)
@@ -73,11 +72,106 @@ UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "25"))
 LANGFLOW_TIMEOUT = float(os.getenv("LANGFLOW_TIMEOUT", "2400"))  # 40 minutes
 LANGFLOW_CONNECT_TIMEOUT = float(os.getenv("LANGFLOW_CONNECT_TIMEOUT", "30"))  # 30 seconds
 
+# Connector downloads are streamed to a temp file in chunks of this many bytes
+CONNECTOR_DOWNLOAD_CHUNK_SIZE = int(os.getenv("CONNECTOR_DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# Threads running the synchronous Google Drive client off the event loop
+GOOGLE_DRIVE_IO_WORKERS = int(os.getenv("GOOGLE_DRIVE_IO_WORKERS", "8"))
+# Folders (and selected file lookups) listed concurrently when expanding a Drive selection
+GOOGLE_DRIVE_FOLDER_FANOUT = int(os.getenv("GOOGLE_DRIVE_FOLDER_FANOUT", "4"))
+# Shared Microsoft Graph client used by the OneDrive and SharePoint connectors.
+# 429/503 responses are retried up to GRAPH_MAX_RETRIES times, waiting for
+# Retry-After (capped at GRAPH_MAX_BACKOFF seconds)
+GRAPH_MAX_CONNECTIONS = int(os.getenv("GRAPH_MAX_CONNECTIONS", "50"))
+GRAPH_MAX_RETRIES = int(os.getenv("GRAPH_MAX_RETRIES", "5"))
+GRAPH_MAX_BACKOFF = float(os.getenv("GRAPH_MAX_BACKOFF", "120"))
+# Concurrent metadata/permission lookups are coalesced into Graph $batch
+# requests of up to this many items (max 20; 1 disables batching), waiting at
+# most GRAPH_BATCH_LINGER_MS for a batch to fill
+GRAPH_BATCH_MAX_REQUESTS = int(os.getenv("GRAPH_BATCH_MAX_REQUESTS", "20"))
+GRAPH_BATCH_LINGER_MS = float(os.getenv("GRAPH_BATCH_LINGER_MS", "10"))
+# SQLite database remembering the remote version, content hash and ACL hash
+# each connection last indexed per file, so unchanged files are not downloaded
+CONNECTOR_SYNC_STATE_PATH = os.getenv("CONNECTOR_SYNC_STATE_PATH", "data/connector_sync_state.db")
+
 # Per-file processing timeout for document ingestion tasks (in seconds)
 # Should be >= LANGFLOW_TIMEOUT to allow long-running ingestion to complete
 # Default: 3600 seconds (60 minutes)
 INGESTION_TIMEOUT = int(os.getenv("INGESTION_TIMEOUT", "3600"))
 
+# Durable task store so ingestion tasks survive a backend restart
+#   "sqlite"     - local SQLite file at TASK_STORE_PATH (default)
+#   "opensearch" - TASK_STORE_INDEX_NAME index, for backends without persistent disk
+#   "memory"     - no persistence (previous behaviour)
+TASK_STORE_BACKEND = os.getenv("TASK_STORE_BACKEND", "sqlite").strip().lower()
+TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "data/tasks.db")
+TASK_STORE_INDEX_NAME = os.getenv("TASK_STORE_INDEX_NAME", "openrag_tasks")
+
+# SQLite database holding chat conversation metadata
+# (an existing data/conversations.json is imported on first use)
+CONVERSATION_STORE_PATH = os.getenv("CONVERSATION_STORE_PATH", "data/conversations.db")
+# Bounds of the in-memory cache of full conversation threads; least recently
+# used threads beyond them are spilled to the conversation store
+CONVERSATION_CACHE_MAX_ENTRIES = int(os.getenv("CONVERSATION_CACHE_MAX_ENTRIES", "1000"))
+CONVERSATION_CACHE_MAX_MB = int(os.getenv("CONVERSATION_CACHE_MAX_MB", "256"))
+
+# SQLite database holding session ownership (imports data/session_ownership.json on first use)
+SESSION_OWNERSHIP_STORE_PATH = os.getenv("SESSION_OWNERSHIP_STORE_PATH", "data/session_ownership.db")
+# Seconds between batched writes of session last_accessed timestamps
+SESSION_OWNERSHIP_FLUSH_INTERVAL = float(os.getenv("SESSION_OWNERSHIP_FLUSH_INTERVAL", "30"))
+
+# Adaptive ingestion concurrency: the number of files processed at once starts
+# at MAX_WORKERS and is adjusted (AIMD) between these bounds based on docling,
+# embedding, OpenSearch bulk and Langflow latency and 429/error rates
+INGESTION_ADAPTIVE_CONCURRENCY = os.getenv("INGESTION_ADAPTIVE_CONCURRENCY", "true").lower() in ("true", "1", "yes")
+INGESTION_MIN_CONCURRENCY = int(os.getenv("INGESTION_MIN_CONCURRENCY", "1"))
+INGESTION_MAX_CONCURRENCY = int(os.getenv("INGESTION_MAX_CONCURRENCY", "16"))
+# Seconds of observations evaluated per adjustment
+INGESTION_CONCURRENCY_WINDOW = float(os.getenv("INGESTION_CONCURRENCY_WINDOW", "15"))
+# Shrink when a stage's average latency exceeds this multiple of its baseline
+INGESTION_LATENCY_TOLERANCE = float(os.getenv("INGESTION_LATENCY_TOLERANCE", "2.0"))
+
+# OpenSearch _bulk indexing limits for chunk ingestion
+# Batches are closed at whichever limit is reached first
+OPENSEARCH_BULK_MAX_DOCS = int(os.getenv("OPENSEARCH_BULK_MAX_DOCS", "500"))
+OPENSEARCH_BULK_MAX_BYTES = int(os.getenv("OPENSEARCH_BULK_MAX_BYTES", str(10 * 1024 * 1024)))
+OPENSEARCH_BULK_MAX_RETRIES = int(os.getenv("OPENSEARCH_BULK_MAX_RETRIES", "3"))
+
+# Maximum embedding requests in flight per provider during ingestion
+# Override per provider with e.g. EMBEDDING_MAX_CONCURRENCY_OLLAMA=1
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+
+
+def get_embedding_concurrency(provider: str) -> int:
+    """Return the in-flight embedding request limit for a provider"""
+    env_name = "EMBEDDING_MAX_CONCURRENCY_" + (provider or "").upper().replace("-", "_")
+    return max(1, int(os.getenv(env_name, EMBEDDING_MAX_CONCURRENCY)))
+
+
+# Query embedding cache used by search (size 0 or TTL 0 disables it)
+# Set QUERY_EMBEDDING_CACHE_PATH (e.g. data/query_embeddings.db) to persist across restarts
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400"))
+QUERY_EMBEDDING_CACHE_PATH = os.getenv("QUERY_EMBEDDING_CACHE_PATH", "")
+QUERY_EMBEDDING_CACHE_DISK_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_DISK_SIZE", "10000"))
+
+# Seconds between refreshes of the cached corpus embedding model list used by search
+EMBEDDING_MODEL_INVENTORY_REFRESH_INTERVAL = int(
+    os.getenv("EMBEDDING_MODEL_INVENTORY_REFRESH_INTERVAL", "300")
+)
+
+# How search combines keyword and vector scores:
+#   "bool"     - bool.should with fixed 0.7/0.3 boosts (default)
+#   "pipeline" - single hybrid query normalized by a search pipeline, when the
+#                cluster supports it (scores are then in [0, 1])
+OPENSEARCH_HYBRID_SEARCH_MODE = os.getenv("OPENSEARCH_HYBRID_SEARCH_MODE", "bool").strip().lower()
+
+# Per-user OpenSearch clients (JWT auth) are cached in a bounded LRU.
+# Idle clients are closed after OPENSEARCH_USER_CLIENT_IDLE_TTL seconds.
+OPENSEARCH_USER_CLIENT_MAX = int(os.getenv("OPENSEARCH_USER_CLIENT_MAX", "256"))
+OPENSEARCH_USER_CLIENT_IDLE_TTL = int(os.getenv("OPENSEARCH_USER_CLIENT_IDLE_TTL", "900"))
+# Connections per user client
+OPENSEARCH_USER_CLIENT_POOL_SIZE = int(os.getenv("OPENSEARCH_USER_CLIENT_POOL_SIZE", "10"))
+
 
 def is_no_auth_mode():
     """Check if we're running in no-auth mode (OAuth credentials missing)"""
@@ -161,6 +255,13 @@ INDEX_BODY = {
 
 # API Keys index for public API authentication
 API_KEYS_INDEX_NAME = "api_keys"
+# Validated API keys are cached in-process for this many seconds (0 disables).
+# Revoke/delete invalidate immediately in the handling process; other workers
+# see the change once their entry expires.
+API_KEY_CACHE_TTL = int(os.getenv("API_KEY_CACHE_TTL", "30"))
+API_KEY_CACHE_MAX = int(os.getenv("API_KEY_CACHE_MAX", "10000"))
+# Seconds between batched last_used_at writes
+API_KEY_LAST_USED_FLUSH_INTERVAL = int(os.getenv("API_KEY_LAST_USED_FLUSH_INTERVAL", "60"))
 API_KEYS_INDEX_BODY = {
     "settings": {
         "number_of_shards": 1,
@@ -310,7 +411,6 @@ class AppClients:
         self.langflow_http_client = None
         self._patched_async_client = None  # Private attribute - single client for all providers
         self._client_init_lock = __import__('threading').Lock()  # Lock for thread-safe initialization
-        self.converter = None
 
     async def initialize(self):
         # Generate Langflow API key first
@@ -358,8 +458,8 @@ class AppClients:
         else:
             logger.info("OpenAI API key not found in environment - will be initialized on first use if needed")
 
-        # Initialize document converter
-        self.converter = create_document_converter(ocr_engine=DOCLING_OCR_ENGINE)
+        # Document conversion runs in the shared process pool, where each worker
+        # caches its own converter (see utils.document_processing.get_worker_converter)
 
         # Initialize Langflow HTTP client with extended timeouts for large documents
         # Use explicit timeout configuration to handle large PDF ingestion (300+ pages)
@@ -737,6 +837,7 @@ class AppClients:
     def create_user_opensearch_client(self, jwt_token: str):
         """Create OpenSearch client with user's JWT token for OIDC auth"""
         headers = {"Authorization": f"Bearer {jwt_token}"}
+        # Sized per client; SessionManager bounds how many of these are cached
 
         return AsyncOpenSearch(
             hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
@@ -750,6 +851,7 @@ class AppClients:
             timeout=30,  # 30 second timeout
             max_retries=3,
             retry_on_timeout=True,
+            maxsize=OPENSEARCH_USER_CLIENT_POOL_SIZE,
         )
 
 
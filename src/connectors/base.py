@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, AsyncGenerator, AsyncIterable, Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
+import hashlib
 import os
+import tempfile
+
+from utils.hash_utils import digest_id
+from utils.file_utils import auto_cleanup_tempfile, safe_unlink
 
 
 @dataclass
@@ -20,24 +26,198 @@ class DocumentACL:
             self.allowed_groups = []
 
 
+def _download_chunk_size() -> int:
+    from config.settings import CONNECTOR_DOWNLOAD_CHUNK_SIZE
+
+    return CONNECTOR_DOWNLOAD_CHUNK_SIZE
+
+
+class ConnectorContent:
+    """File content spooled to a temp file on disk and hashed while it is written.
+
+    Connectors write downloaded chunks here instead of collecting them in
+    memory, so memory use does not depend on file size. The hash matches
+    hash_id() of the same bytes.
+    """
+
+    def __init__(self, suffix: Optional[str] = None):
+        fd, self.path = tempfile.mkstemp(prefix="connector-", suffix=suffix)
+        self._file = os.fdopen(fd, "wb")
+        self._hasher = hashlib.sha256()
+        self.size = 0
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ConnectorContent":
+        content = cls()
+        content.write(data)
+        content.finish()
+        return content
+
+    @classmethod
+    async def from_chunks(cls, chunks: AsyncIterable[bytes]) -> "ConnectorContent":
+        """Spool an async byte stream, removing the temp file if it fails"""
+        content = cls()
+        try:
+            async for chunk in chunks:
+                content.write(chunk)
+            content.finish()
+        except BaseException:
+            content.close()
+            raise
+        return content
+
+    def write(self, chunk: bytes) -> int:
+        """Append a chunk (file-like, so it can be handed to MediaIoBaseDownload)"""
+        self._file.write(chunk)
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+        return len(chunk)
+
+    def finish(self) -> None:
+        """Close the file for writing once the download is complete"""
+        if not self._file.closed:
+            self._file.close()
+
+    @property
+    def hash(self) -> str:
+        return digest_id(self._hasher.digest())
+
+    def with_suffix(self, suffix: str) -> str:
+        """Rename the spooled file so it carries the given extension"""
+        self.finish()
+        if suffix and not self.path.endswith(suffix):
+            new_path = self.path + suffix
+            os.replace(self.path, new_path)
+            self.path = new_path
+        return self.path
+
+    def iter_chunks(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        self.finish()
+        chunk_size = chunk_size or _download_chunk_size()
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                yield chunk
+
+    def read_bytes(self) -> bytes:
+        self.finish()
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self) -> None:
+        """Delete the spooled file"""
+        self.finish()
+        safe_unlink(self.path)
+
+
 @dataclass
 class ConnectorDocument:
-    """Document from a connector with metadata"""
+    """Document from a connector with metadata
+
+    Content is either in memory (``content``) or spooled to disk
+    (``content_file``); use the helpers below rather than either field.
+    """
 
     id: str
     filename: str
     mimetype: str
-    content: bytes
+    content: Optional[bytes]
     source_url: str
     acl: DocumentACL
     modified_time: datetime
     created_time: datetime
     metadata: Dict[str, Any] = None
+    content_file: Optional[ConnectorContent] = None
+    # Remote version the content was downloaded at (see ConnectorFileVersion)
+    version: Optional[str] = None
 
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
 
+    @property
+    def size(self) -> int:
+        if self.content_file is not None:
+            return self.content_file.size
+        return len(self.content) if self.content else 0
+
+    @property
+    def content_hash(self) -> str:
+        """hash_id() of the content, without reading a spooled file again"""
+        if self.content_file is not None:
+            return self.content_file.hash
+        return digest_id(hashlib.sha256(self.content or b"").digest())
+
+    def read_content(self) -> bytes:
+        """Whole content in memory; only for consumers that cannot stream"""
+        if self.content_file is not None:
+            return self.content_file.read_bytes()
+        return self.content or b""
+
+    def iter_content(self, chunk_size: Optional[int] = None) -> Iterable[bytes]:
+        if self.content_file is not None:
+            return self.content_file.iter_chunks(chunk_size)
+        chunk_size = chunk_size or _download_chunk_size()
+        data = self.content or b""
+        return (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+    @contextmanager
+    def content_path(self, suffix: Optional[str] = None):
+        """Yield a temp file path holding the content; the file is deleted afterwards
+
+        Spooled content is used in place, so nothing is copied or buffered.
+        """
+        if self.content_file is not None:
+            try:
+                yield self.content_file.with_suffix(suffix)
+            finally:
+                self.close()
+            return
+
+        with auto_cleanup_tempfile(suffix=suffix) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                f.write(self.content or b"")
+            yield tmp_path
+
+    def close(self) -> None:
+        """Release spooled content"""
+        if self.content_file is not None:
+            self.content_file.close()
+            self.content_file = None
+
+
+@dataclass
+class ConnectorFileVersion:
+    """Remote version of a file and its ACL, fetched without downloading it
+
+    ``version`` changes whenever the content does (an etag/cTag, a checksum,
+    or the modified time and size); ACL changes must not affect it.
+    """
+
+    id: str
+    version: Optional[str]
+    acl: DocumentACL
+
+
+@dataclass
+class ConnectorChanges:
+    """Items changed since a sync cursor, and the cursor to resume from
+
+    ``changed`` holds file infos in the connector's list_files() format and
+    ``deleted`` the IDs of removed files. ``reset`` means the cursor expired
+    and a full sync is needed; ``cursor`` is then None.
+    """
+
+    cursor: Optional[str]
+    changed: List[Dict[str, Any]] = None
+    deleted: List[str] = None
+    reset: bool = False
+
+    def __post_init__(self):
+        if self.changed is None:
+            self.changed = []
+        if self.deleted is None:
+            self.deleted = []
+
 
 class BaseConnector(ABC):
     """Base class for all document connectors"""
@@ -105,6 +285,48 @@ class BaseConnector(ABC):
         """Get file content and metadata"""
         pass
 
+    async def iter_file_content(
+        self, file_id: str, chunk_size: Optional[int] = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream a file's content in chunks.
+
+        The default implementation fetches the document (connectors spool
+        downloads to disk) and reads it back chunk by chunk, so memory use
+        stays constant regardless of file size.
+        """
+        document = await self.get_file_content(file_id)
+        try:
+            for chunk in document.iter_content(chunk_size):
+                yield chunk
+        finally:
+            document.close()
+
+    async def get_file_version(self, file_id: str) -> Optional[ConnectorFileVersion]:
+        """Current version and ACL of a file, from metadata calls only
+
+        Lets re-syncs skip downloading files that did not change. Returns
+        None when unsupported or unknown, in which case the file is
+        downloaded as usual.
+        """
+        return None
+
+    async def get_changes(self, cursor: Optional[str] = None) -> Optional[ConnectorChanges]:
+        """Changes since ``cursor``, from the provider's change feed
+
+        With no cursor, returns a cursor for "now" and no changes. Returns
+        None if the connector has no change feed, in which case callers fall
+        back to a full sync.
+        """
+        return None
+
+    async def filter_to_scope(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the changed files that are in this connection's sync scope
+
+        Used for incremental syncs that are not limited to already indexed
+        files. The default keeps everything.
+        """
+        return files
+
     @abstractmethod
     async def handle_webhook(self, payload: Dict[str, Any]) -> List[str]:
         """Handle webhook notification. Returns list of affected file IDs."""
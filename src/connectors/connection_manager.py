@@ -27,6 +27,8 @@ class ConnectionConfig:
     created_at: datetime = None
     last_sync: Optional[datetime] = None
     is_active: bool = True
+    # Change-feed position for incremental syncs (e.g. a Graph delta link)
+    sync_cursor: Optional[str] = None
 
     def __post_init__(self):
         if self.created_at is None:
@@ -290,6 +292,11 @@ class ConnectionManager:
 
             del self.active_connectors[connection_id]
 
+        # Forget which file versions this connection indexed
+        from .sync_state import connector_sync_state
+
+        await connector_sync_state.delete(connection_id)
+
         del self.connections[connection_id]
         await self.save_connections()
         return True
@@ -396,6 +403,12 @@ class ConnectionManager:
             self.connections[connection_id].last_sync = datetime.now()
             await self.save_connections()
 
+    async def update_sync_cursor(self, connection_id: str, cursor: Optional[str]):
+        """Store the change-feed cursor the next incremental sync resumes from"""
+        if connection_id in self.connections:
+            self.connections[connection_id].sync_cursor = cursor
+            await self.save_connections()
+
     async def activate_connection(self, connection_id: str) -> bool:
         """Activate a connection"""
         if connection_id in self.connections:
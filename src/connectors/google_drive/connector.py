@@ -1,21 +1,49 @@
-import io
+import asyncio
+import functools
 import os
+import threading
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Set
 
+from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload
 
+from config.settings import (
+    CONNECTOR_DOWNLOAD_CHUNK_SIZE,
+    GOOGLE_DRIVE_FOLDER_FANOUT,
+    GOOGLE_DRIVE_IO_WORKERS,
+)
 from utils.logging_config import get_logger
 
-from ..base import BaseConnector, ConnectorDocument, DocumentACL
+from ..base import (
+    BaseConnector, ConnectorChanges, ConnectorContent, ConnectorDocument, ConnectorFileVersion, DocumentACL,
+)
 from .oauth import GoogleDriveOAuth
 
 logger = get_logger(__name__)
 
+# googleapiclient is synchronous; all Drive calls made from async code run on
+# this bounded pool so they never block the event loop
+_drive_io_executor: Optional[ThreadPoolExecutor] = None
+_drive_io_executor_lock = threading.Lock()
+
+
+def _get_drive_io_executor() -> ThreadPoolExecutor:
+    global _drive_io_executor
+    if _drive_io_executor is None:
+        with _drive_io_executor_lock:
+            if _drive_io_executor is None:
+                _drive_io_executor = ThreadPoolExecutor(
+                    max_workers=max(1, GOOGLE_DRIVE_IO_WORKERS),
+                    thread_name_prefix="google-drive-io",
+                )
+    return _drive_io_executor
+
+
 # -------------------------
 # Config model
 # -------------------------
@@ -83,6 +111,7 @@ class GoogleDriveConnector(BaseConnector):
         """
         Emit a ConnectorDocument instance.
         Override this method to integrate with your ingestion pipeline.
+        Spooled content is deleted once this returns.
         """
         # If BaseConnector has an emit method, call super().emit(doc)
         # Otherwise, implement your custom logic here.
@@ -152,7 +181,9 @@ class GoogleDriveConnector(BaseConnector):
         from google.oauth2.credentials import Credentials
 
         self.creds: Optional[Credentials] = None
-        self.service: Any = None
+        self._service: Any = None
+        self._service_owner: Optional[int] = None
+        self._thread_local = threading.local()
 
         # cache of resolved shortcutId -> target file metadata
         self._shortcut_cache: Dict[str, Dict[str, Any]] = {}
@@ -163,6 +194,33 @@ class GoogleDriveConnector(BaseConnector):
     # -------------------------
     # Helpers
     # -------------------------
+    @property
+    def service(self) -> Any:
+        """
+        Drive service for the calling thread.
+        A googleapiclient service shares one httplib2 connection, which is not
+        thread-safe, so each I/O pool thread builds its own from the same credentials.
+        """
+        if self._service is None or threading.get_ident() == self._service_owner:
+            return self._service
+        local = self._thread_local
+        if getattr(local, "base", None) is not self._service:
+            local.service = build("drive", "v3", credentials=self.creds)
+            local.base = self._service
+        return local.service
+
+    @service.setter
+    def service(self, value: Any) -> None:
+        self._service = value
+        self._service_owner = threading.get_ident()
+
+    async def _run_io(self, fn, *args, **kwargs):
+        """Run a blocking Drive call on the Drive I/O pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_drive_io_executor(), functools.partial(fn, *args, **kwargs)
+        )
+
     def _clear_shortcut_cache(self) -> None:
         """Clear the shortcut resolution cache to prevent stale data."""
         self._shortcut_cache.clear()
@@ -219,7 +277,7 @@ class GoogleDriveConnector(BaseConnector):
                 .get(
                     fileId=target_id,
                     fields=(
-                        "id, name, mimeType, modifiedTime, createdTime, size, "
+                        "id, name, mimeType, modifiedTime, createdTime, size, md5Checksum, "
                         "webViewLink, parents, owners, driveId"
                     ),
                     **self._drives_get_flags,
@@ -270,26 +328,60 @@ class GoogleDriveConnector(BaseConnector):
 
         return results
 
-    def _bfs_expand_folders(self, folder_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    def _list_children_and_subfolders(self, folder_id: str):
+        """
+        List a folder's children and the IDs of its subfolders (shortcuts resolved).
+        Runs on the Drive I/O pool.
+        """
+        children = self._list_children(folder_id)
+        subfolders: List[str] = []
+        if self.cfg.recursive:
+            for c in children:
+                c = self._resolve_shortcut(c)
+                if c.get("mimeType") == "application/vnd.google-apps.folder":
+                    subfolders.append(c["id"])
+        return children, subfolders
+
+    async def _bfs_expand_folders(self, folder_ids: Iterable[str]) -> List[Dict[str, Any]]:
         """
         Breadth-first traversal to expand folders to all descendant files (if recursive),
         or just immediate children (if not recursive). Folders themselves are returned
         as items too, but filtered later.
+
+        Up to GOOGLE_DRIVE_FOLDER_FANOUT folders are listed at once; each folder
+        is listed only once even if it is reachable through several parents.
         """
         out: List[Dict[str, Any]] = []
-        queue = deque(folder_ids)
-
-        while queue:
-            fid = queue.popleft()
-            children = self._list_children(fid)
-            out.extend(children)
-
-            if self.cfg.recursive:
-                # Enqueue subfolders
-                for c in children:
-                    c = self._resolve_shortcut(c)
-                    if c.get("mimeType") == "application/vnd.google-apps.folder":
-                        queue.append(c["id"])
+        fanout = max(1, GOOGLE_DRIVE_FOLDER_FANOUT)
+        visited: Set[str] = set()
+        queue: List[str] = []
+        for fid in folder_ids:
+            if fid not in visited:
+                visited.add(fid)
+                queue.append(fid)
+
+        in_flight: Set[asyncio.Future] = set()
+        try:
+            while queue or in_flight:
+                while queue and len(in_flight) < fanout:
+                    in_flight.add(
+                        asyncio.ensure_future(
+                            self._run_io(self._list_children_and_subfolders, queue.pop(0))
+                        )
+                    )
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for fut in done:
+                    children, subfolders = fut.result()
+                    out.extend(children)
+                    for sub_id in subfolders:
+                        if sub_id not in visited:
+                            visited.add(sub_id)
+                            queue.append(sub_id)
+        finally:
+            for fut in in_flight:
+                fut.cancel()
 
         return out
 
@@ -307,7 +399,7 @@ class GoogleDriveConnector(BaseConnector):
                 .get(
                     fileId=file_id,
                     fields=(
-                        "id, name, mimeType, modifiedTime, createdTime, size, "
+                        "id, name, mimeType, modifiedTime, createdTime, size, md5Checksum, "
                         "webViewLink, parents, shortcutDetails, driveId"
                     ),
                     **self._drives_get_flags,
@@ -335,12 +427,13 @@ class GoogleDriveConnector(BaseConnector):
 
         return [m for m in items if keep(m)]
 
-    def _iter_selected_items(self) -> List[Dict[str, Any]]:
+    async def _iter_selected_items(self) -> List[Dict[str, Any]]:
         """
         Return a de-duplicated list of file metadata for the selected scope:
           - explicit file_ids (automatically expands folders to their contents)
           - items inside folder_ids (with optional recursion)
         Shortcuts are resolved to their targets automatically.
+        Drive calls run on the I/O pool, with lookups and folder listings fanned out.
         """
         # Clear shortcut cache to ensure fresh data
         self._clear_shortcut_cache()
@@ -351,8 +444,14 @@ class GoogleDriveConnector(BaseConnector):
 
         # Process file_ids: separate actual files from folders
         if self.cfg.file_ids:
-            for fid in self.cfg.file_ids:
-                meta = self._get_file_meta_by_id(fid)
+            fanout = asyncio.Semaphore(max(1, GOOGLE_DRIVE_FOLDER_FANOUT))
+
+            async def lookup(fid: str) -> Optional[Dict[str, Any]]:
+                async with fanout:
+                    return await self._run_io(self._get_file_meta_by_id, fid)
+
+            metas = await asyncio.gather(*(lookup(fid) for fid in self.cfg.file_ids))
+            for fid, meta in zip(self.cfg.file_ids, metas):
                 if not meta:
                     continue
 
@@ -374,9 +473,10 @@ class GoogleDriveConnector(BaseConnector):
 
         # Expand all folders to their contents
         if folders_to_expand:
-            folder_children = self._bfs_expand_folders(folders_to_expand)
+            folder_children = await self._bfs_expand_folders(folders_to_expand)
             for meta in folder_children:
-                meta = self._resolve_shortcut(meta)
+                if meta.get("mimeType") == "application/vnd.google-apps.shortcut":
+                    meta = await self._run_io(self._resolve_shortcut, meta)
                 if meta.get("id") in seen:
                     continue
                 seen.add(meta["id"])
@@ -438,9 +538,10 @@ class GoogleDriveConnector(BaseConnector):
         # Return None for non-Google-native or unsupported types
         return overrides.get(source_mime)
 
-    def _download_file_bytes(self, file_meta: Dict[str, Any]) -> bytes:
+    def _download_file_content(self, file_meta: Dict[str, Any]) -> ConnectorContent:
         """
-        Download bytes for a given file (exporting if Google-native).
+        Download a file (exporting if Google-native) chunk by chunk into a
+        spooled temp file, so memory use does not depend on file size.
         Raises ValueError if the item is a folder (folders cannot be downloaded).
         """
         if self.service is None:
@@ -497,15 +598,25 @@ class GoogleDriveConnector(BaseConnector):
             # Binary download (get_media also doesn't accept the Drive flags)
             request = self.service.files().get_media(fileId=file_id)
 
-        # Download the file with error handling for misclassified Google Docs
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request, chunksize=1024 * 1024)
-        done = False
+        def download(request) -> ConnectorContent:
+            content = ConnectorContent()
+            try:
+                downloader = MediaIoBaseDownload(
+                    content, request, chunksize=CONNECTOR_DOWNLOAD_CHUNK_SIZE
+                )
+                done = False
+                while not done:
+                    status, done = downloader.next_chunk()
+                    # Optional: you can log progress via status.progress()
+            except BaseException:
+                content.close()
+                raise
+            content.finish()
+            return content
 
+        # Download the file with error handling for misclassified Google Docs
         try:
-            while not done:
-                status, done = downloader.next_chunk()
-                # Optional: you can log progress via status.progress()
+            return download(request)
         except HttpError as e:
             # If download fails with "fileNotDownloadable", it's a Docs Editor file
             # that wasn't properly detected. Retry with export_media.
@@ -518,15 +629,8 @@ class GoogleDriveConnector(BaseConnector):
                 request = self.service.files().export_media(
                     fileId=file_id, mimeType=export_mime
                 )
-                fh = io.BytesIO()
-                downloader = MediaIoBaseDownload(fh, request, chunksize=1024 * 1024)
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
-            else:
-                raise
-
-        return fh.getvalue()
+                return download(request)
+            raise
 
     # -------------------------
     # Public sync surface
@@ -552,7 +656,9 @@ class GoogleDriveConnector(BaseConnector):
             self.service = self.oauth.get_service()
 
             # Optional sanity check (small, fast request)
-            _ = self.service.files().get(fileId="root", fields="id").execute()
+            await self._run_io(
+                lambda: self.service.files().get(fileId="root", fields="id").execute()
+            )
             self._authenticated = True
             return True
 
@@ -582,7 +688,7 @@ class GoogleDriveConnector(BaseConnector):
             )
 
         try:
-            items = self._iter_selected_items()
+            items = await self._iter_selected_items()
 
             # Optionally honor a request-scoped max_files (e.g., from your API payload)
             if isinstance(max_files, int) and max_files > 0:
@@ -671,12 +777,32 @@ class GoogleDriveConnector(BaseConnector):
                 allowed_groups=[],
             )
 
+    @staticmethod
+    def _file_version(meta: Dict[str, Any]) -> Optional[str]:
+        """md5Checksum for binary files; Google-native files only have the modified time
+
+        (Drive's ``version`` field is not used, it also changes on sharing changes)
+        """
+        if meta.get("md5Checksum"):
+            return meta["md5Checksum"]
+        if meta.get("modifiedTime"):
+            return f"{meta['modifiedTime']}|{meta.get('size', '')}"
+        return None
+
+    async def get_file_version(self, file_id: str) -> Optional[ConnectorFileVersion]:
+        """Version and ACL of a file from its metadata and permissions, without downloading"""
+        meta = await self._run_io(self._get_file_meta_by_id, file_id)
+        if not meta or meta.get("mimeType") == "application/vnd.google-apps.folder":
+            return None
+        acl = await self._run_io(self._extract_google_drive_acl, meta)
+        return ConnectorFileVersion(id=file_id, version=self._file_version(meta), acl=acl)
+
     async def get_file_content(self, file_id: str) -> ConnectorDocument:
         """
         Fetch a file's metadata and content from Google Drive and wrap it in a ConnectorDocument.
         Raises FileNotFoundError if the ID is a folder (folders cannot be downloaded).
         """
-        meta = self._get_file_meta_by_id(file_id)
+        meta = await self._run_io(self._get_file_meta_by_id, file_id)
         if not meta:
             raise FileNotFoundError(f"Google Drive file not found: {file_id}")
 
@@ -688,9 +814,14 @@ class GoogleDriveConnector(BaseConnector):
                 f"This ID should not have been passed to get_file_content()."
             )
 
+        # Fetch permissions while the content downloads
+        acl_future = asyncio.ensure_future(
+            self._run_io(self._extract_google_drive_acl, meta)
+        )
         try:
-            blob = self._download_file_bytes(meta)
+            content_file = await self._run_io(self._download_file_content, meta)
         except Exception as e:
+            acl_future.cancel()
             try:
                 logger.error(f"Download failed for {file_id}: {e}")
             except Exception:
@@ -711,8 +842,8 @@ class GoogleDriveConnector(BaseConnector):
                 except ValueError:
                     return None
 
-        # Extract ACL from file metadata
-        acl = self._extract_google_drive_acl(meta)
+        # ACL extraction never raises; it falls back to the file owners
+        acl = await acl_future
 
         doc = ConnectorDocument(
             id=meta["id"],
@@ -722,7 +853,9 @@ class GoogleDriveConnector(BaseConnector):
             modified_time=parse_datetime(meta.get("modifiedTime")),
             mimetype=str(meta.get("mimeType", "")),
             acl=acl,
-            content=blob,
+            content=None,
+            content_file=content_file,
+            version=self._file_version(meta),
             metadata={
                 "parents": meta.get("parents"),
                 "driveId": meta.get("driveId"),
@@ -764,7 +897,7 @@ class GoogleDriveConnector(BaseConnector):
         # 3) Ensure we have a starting page token (checkpoint)
         try:
             if not self.cfg.changes_page_token:
-                self.cfg.changes_page_token = self.get_start_page_token()
+                self.cfg.changes_page_token = await self._run_io(self.get_start_page_token)
         except Exception as e:
             try:
                 logger.error(f"Failed to get start page token: {e}")
@@ -784,8 +917,8 @@ class GoogleDriveConnector(BaseConnector):
             # Shared Drives flags so we see everything we’re scoped to
             flags = dict(supportsAllDrives=True)
 
-            result = (
-                self.service.changes()
+            result = await self._run_io(
+                lambda: self.service.changes()
                 .watch(pageToken=self.cfg.changes_page_token, body=body, **flags)
                 .execute()
             )
@@ -872,9 +1005,11 @@ class GoogleDriveConnector(BaseConnector):
             return False
 
         try:
-            self.service.channels().stop(
-                body={"id": subscription_id, "resourceId": resource_id}
-            ).execute()
+            await self._run_io(
+                lambda: self.service.channels().stop(
+                    body={"id": subscription_id, "resourceId": resource_id}
+                ).execute()
+            )
 
             # 4) Clear local bookkeeping
             if (
@@ -925,13 +1060,13 @@ class GoogleDriveConnector(BaseConnector):
             page_token = self.cfg.changes_page_token
             if not page_token:
                 # First time / missing state: initialize
-                page_token = self.get_start_page_token()
+                page_token = await self._run_io(self.get_start_page_token)
                 self.cfg.changes_page_token = page_token
 
             # 3) Build current selected scope to filter changes
             #    (file_ids + expanded folder descendants)
             try:
-                selected_items = self._iter_selected_items()
+                selected_items = await self._iter_selected_items()
                 selected_ids = {m["id"] for m in selected_items}
             except Exception as e:
                 selected_ids = set()
@@ -944,8 +1079,8 @@ class GoogleDriveConnector(BaseConnector):
 
             # 4) Pull changes until nextPageToken is exhausted, then advance to newStartPageToken
             while True:
-                resp = (
-                    self.service.changes()
+                resp = await self._run_io(
+                    lambda: self.service.changes()
                     .list(
                         pageToken=page_token,
                         fields=(
@@ -969,7 +1104,7 @@ class GoogleDriveConnector(BaseConnector):
                         continue
 
                     # Resolve shortcuts to target
-                    resolved = self._resolve_shortcut(fobj)
+                    resolved = await self._run_io(self._resolve_shortcut, fobj)
                     rid = resolved.get("id", fid)
 
                     # Filter to our selected scope if we have one; otherwise accept all
@@ -1022,10 +1157,10 @@ class GoogleDriveConnector(BaseConnector):
 
         Emits ConnectorDocument instances
         """
-        items = self._iter_selected_items()
+        items = asyncio.run(self._iter_selected_items())
         for meta in items:
             try:
-                blob = self._download_file_bytes(meta)
+                content_file = self._download_file_content(meta)
             except HttpError as e:
                 # Skip/record failures
                 logger.error(
@@ -1067,9 +1202,13 @@ class GoogleDriveConnector(BaseConnector):
                     if str(meta.get("size", "")).isdigit()
                     else None,
                 },
-                content=blob,
+                content=None,
+                content_file=content_file,
             )
-            self.emit(doc)
+            try:
+                self.emit(doc)
+            finally:
+                doc.close()
 
     # -------------------------
     # Changes API (polling or webhook-backed)
@@ -1081,6 +1220,128 @@ class GoogleDriveConnector(BaseConnector):
         )
         return resp["startPageToken"]
 
+    def _list_changes_page(self, page_token: str) -> Dict[str, Any]:
+        return (
+            self.service.changes()
+            .list(
+                pageToken=page_token,
+                pageSize=1000,
+                fields=(
+                    "nextPageToken, newStartPageToken, "
+                    "changes(fileId, removed, file(id, name, mimeType, trashed, parents, "
+                    "shortcutDetails, driveId, size, createdTime, modifiedTime, webViewLink))"
+                ),
+                **self._drives_list_flags,
+            )
+            .execute()
+        )
+
+    def _get_parents(self, file_id: str) -> List[str]:
+        try:
+            meta = (
+                self.service.files()
+                .get(fileId=file_id, fields="parents", **self._drives_get_flags)
+                .execute()
+            )
+        except HttpError:
+            return []
+        return meta.get("parents") or []
+
+    async def get_changes(self, cursor: Optional[str] = None) -> ConnectorChanges:
+        """
+        Changes since a changes-feed page token; see BaseConnector.get_changes.
+
+        Trashed and removed files are reported as deletions, shortcuts are
+        resolved to their targets and the mime filters are applied. Changes are
+        not limited to the selected scope; see filter_to_scope().
+        """
+        if not await self.authenticate():
+            raise RuntimeError("Google Drive authentication failed during changes sync")
+
+        if not cursor:
+            return ConnectorChanges(cursor=await self._run_io(self.get_start_page_token))
+
+        self._clear_shortcut_cache()
+        changed: Dict[str, Dict[str, Any]] = {}
+        deleted: Dict[str, None] = {}
+        page_token = cursor
+        while True:
+            try:
+                resp = await self._run_io(self._list_changes_page, page_token)
+            except HttpError as e:
+                # An unknown or invalid page token cannot be resumed from
+                if getattr(e.resp, "status", None) in (400, 404, 410):
+                    logger.info(f"Google Drive changes token rejected ({e.resp.status}), full sync required")
+                    return ConnectorChanges(cursor=None, reset=True)
+                raise
+
+            # Changes are in feed order, so a later entry for a file wins
+            for ch in resp.get("changes", []):
+                fid = ch.get("fileId")
+                file_obj = ch.get("file") or {}
+                if not fid:
+                    continue
+                if ch.get("removed") or file_obj.get("trashed"):
+                    changed.pop(fid, None)
+                    deleted[fid] = None
+                    continue
+                if file_obj.get("mimeType") == "application/vnd.google-apps.folder":
+                    continue
+                meta = await self._run_io(self._resolve_shortcut, file_obj)
+                rid = meta.get("id", fid)
+                deleted.pop(rid, None)
+                changed[rid] = meta
+
+            next_token = resp.get("nextPageToken")
+            if next_token:
+                page_token = next_token
+                continue
+            new_start = resp.get("newStartPageToken") or page_token
+            break
+
+        return ConnectorChanges(
+            cursor=new_start,
+            changed=self._filter_by_mime(changed.values()),
+            deleted=list(deleted),
+        )
+
+    async def filter_to_scope(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep changed files that fall under the selected file_ids/folder_ids.
+
+        Walks up each file's parents (one files.get per unseen folder) rather
+        than re-expanding the selected folders, so the cost follows the number
+        of changes, not the size of the selection.
+        """
+        roots = set(self.cfg.file_ids or []) | set(self.cfg.folder_ids or [])
+        if not roots:
+            return []
+
+        parents_of: Dict[str, List[str]] = {}
+
+        async def in_scope(meta: Dict[str, Any]) -> bool:
+            if meta.get("id") in roots:
+                return True
+            frontier = list(meta.get("parents") or [])
+            seen: Set[str] = set()
+            while frontier:
+                if roots.intersection(frontier):
+                    return True
+                if not self.cfg.recursive:
+                    return False
+                next_frontier: List[str] = []
+                for folder_id in frontier:
+                    if folder_id in seen:
+                        continue
+                    seen.add(folder_id)
+                    if folder_id not in parents_of:
+                        parents_of[folder_id] = await self._run_io(self._get_parents, folder_id)
+                    next_frontier.extend(parents_of[folder_id])
+                frontier = next_frontier
+            return False
+
+        return [meta for meta in files if await in_scope(meta)]
+
     def poll_changes_and_sync(self) -> Optional[str]:
         """
         Incrementally process changes since the last page token in cfg.changes_page_token.
@@ -1107,7 +1368,7 @@ class GoogleDriveConnector(BaseConnector):
             changes = resp.get("changes", [])
 
             # Filter to our selected scope (files and folder descendants):
-            selected_ids = {m["id"] for m in self._iter_selected_items()}
+            selected_ids = {m["id"] for m in asyncio.run(self._iter_selected_items())}
             for ch in changes:
                 fid = ch.get("fileId")
                 file_obj = ch.get("file") or {}
@@ -1130,7 +1391,7 @@ class GoogleDriveConnector(BaseConnector):
                 # Download and emit the updated file
                 resolved = self._resolve_shortcut(file_obj)
                 try:
-                    blob = self._download_file_bytes(resolved)
+                    content_file = self._download_file_content(resolved)
                 except HttpError:
                     continue
 
@@ -1162,9 +1423,13 @@ class GoogleDriveConnector(BaseConnector):
                         "parents": resolved.get("parents"),
                         "driveId": resolved.get("driveId"),
                     },
-                    content=blob,
+                    content=None,
+                    content_file=content_file,
                 )
-                self.emit(doc)
+                try:
+                    self.emit(doc)
+                finally:
+                    doc.close()
 
             new_page_token = resp.get("nextPageToken")
             if new_page_token:
@@ -0,0 +1,440 @@
+"""
+Shared Microsoft Graph HTTP client for the OneDrive and SharePoint connectors.
+
+The connectors used to open a new httpx.AsyncClient, and so a new TLS
+connection, for every Graph call (each listing page, metadata lookup, ACL
+lookup and download) and gave up on the first throttling response. They now
+share one long-lived pooled client, multiplexed over HTTP/2 (h2 is pulled in
+by the httpx[http2] dependency; without it the client falls back to HTTP/1.1).
+
+429 and 503 responses are retried centrally: the client waits for the
+server's Retry-After (or an exponential backoff with jitter when there is
+none) and holds back every other request to the same tenant until then, so
+one throttled sync does not keep hammering Graph. Request rates and throttle
+counts are kept per tenant for /stats.
+
+Metadata and permission lookups can go through batch_get(), which coalesces
+concurrent GETs that share a tenant and access token into JSON $batch
+requests of up to GRAPH_BATCH_MAX_REQUESTS. Each caller still gets its own
+httpx.Response (or exception); throttled sub-requests are retried in a later
+batch once the tenant's backoff has passed.
+"""
+
+import asyncio
+import email.utils
+import json
+import random
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+RETRY_STATUSES = (429, 503)
+RATE_WINDOW_SECONDS = 60.0
+# Graph rejects $batch payloads with more than 20 requests
+GRAPH_BATCH_LIMIT = 20
+
+# "https://graph.microsoft.com/v1.0" + "/me/drive/items/..." ($batch URLs are version-relative)
+_GRAPH_URL_RE = re.compile(r"^(https://[^/]+/(?:v1\.0|beta))(/.*)$")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class _TenantStats:
+    __slots__ = (
+        "requests", "throttled", "unavailable", "retries", "errors",
+        "last_throttled_at", "last_retry_after", "blocked_until", "recent",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0  # 429 responses
+        self.unavailable = 0  # 503 responses
+        self.retries = 0
+        self.errors = 0  # transport errors
+        self.last_throttled_at: Optional[float] = None
+        self.last_retry_after: Optional[float] = None
+        self.blocked_until = 0.0
+        self.recent: Deque[float] = deque()  # request timestamps in the rate window
+
+    def record_request(self, now: float) -> None:
+        self.requests += 1
+        self.recent.append(now)
+        cutoff = now - RATE_WINDOW_SECONDS
+        while self.recent and self.recent[0] < cutoff:
+            self.recent.popleft()
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        cutoff = now - RATE_WINDOW_SECONDS
+        recent = sum(1 for t in self.recent if t >= cutoff)
+        return {
+            "requests": self.requests,
+            "requests_per_minute": recent,
+            "throttled": self.throttled,
+            "unavailable": self.unavailable,
+            "retries": self.retries,
+            "errors": self.errors,
+            "last_throttled_at": self.last_throttled_at,
+            "last_retry_after": self.last_retry_after,
+            "backoff_remaining": round(max(0.0, self.blocked_until - now), 3),
+        }
+
+
+class _BatchItem:
+    __slots__ = ("url", "future", "attempts")
+
+    def __init__(self, url: str, future: asyncio.Future):
+        self.url = url  # version-relative URL with query string
+        self.future = future
+        self.attempts = 0
+
+
+BatchKey = Tuple[str, str, Optional[str]]  # (version base URL, Authorization header, tenant)
+
+
+class GraphClient:
+    """Pooled Microsoft Graph client with Retry-After aware retries"""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        max_backoff: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        batch_max_requests: Optional[int] = None,
+        batch_linger: Optional[float] = None,
+    ):
+        from config.settings import (
+            GRAPH_BATCH_LINGER_MS,
+            GRAPH_BATCH_MAX_REQUESTS,
+            GRAPH_MAX_BACKOFF,
+            GRAPH_MAX_CONNECTIONS,
+            GRAPH_MAX_RETRIES,
+        )
+
+        self.max_retries = GRAPH_MAX_RETRIES if max_retries is None else max_retries
+        self.max_connections = max_connections or GRAPH_MAX_CONNECTIONS
+        self.max_backoff = GRAPH_MAX_BACKOFF if max_backoff is None else max_backoff
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tenants: Dict[str, _TenantStats] = {}
+
+        self.batch_max_requests = min(
+            GRAPH_BATCH_LIMIT, max(1, batch_max_requests or GRAPH_BATCH_MAX_REQUESTS)
+        )
+        self.batch_linger = (
+            GRAPH_BATCH_LINGER_MS / 1000 if batch_linger is None else batch_linger
+        )
+        self._batch_queues: Dict[BatchKey, List[_BatchItem]] = {}
+        self._batch_timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self._batch_tasks: set = set()
+        self._batch_stats = {"batches": 0, "batched_requests": 0, "direct_requests": 0, "sub_retries": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE and self._transport is None,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    def _tenant(self, tenant: Optional[str]) -> _TenantStats:
+        key = tenant or "common"
+        stats = self._tenants.get(key)
+        if stats is None:
+            stats = self._tenants[key] = _TenantStats()
+        return stats
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            delay = (2 ** attempt) * (0.5 + random.random() / 2)
+        return min(delay, self.max_backoff)
+
+    async def _wait_for_tenant(self, stats: _TenantStats) -> None:
+        delay = stats.blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _record_retryable(self, stats: _TenantStats, response: httpx.Response, attempt: int) -> float:
+        if response.status_code == 429:
+            stats.throttled += 1
+            stats.last_throttled_at = time.time()
+        else:
+            stats.unavailable += 1
+        delay = self._retry_delay(response, attempt)
+        stats.last_retry_after = delay
+        # Hold back every request to this tenant, not just the one that was throttled
+        stats.blocked_until = max(stats.blocked_until, time.monotonic() + delay)
+        return delay
+
+    async def _send(self, method: str, url: str, tenant: Optional[str], stream: bool, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        stats = self._tenant(tenant)
+        attempt = 0
+        while True:
+            await self._wait_for_tenant(stats)
+            stats.record_request(time.monotonic())
+            try:
+                request = client.build_request(method, url, **{
+                    k: v for k, v in kwargs.items() if k != "follow_redirects"
+                })
+                response = await client.send(
+                    request,
+                    stream=stream,
+                    follow_redirects=kwargs.get("follow_redirects", False),
+                )
+            except httpx.TransportError:
+                stats.errors += 1
+                raise
+
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            delay = self._record_retryable(stats, response, attempt)
+            if attempt >= self.max_retries:
+                return response
+
+            await response.aclose()
+            stats.retries += 1
+            attempt += 1
+            logger.warning(
+                "Microsoft Graph request throttled, retrying",
+                tenant=tenant or "common",
+                status_code=response.status_code,
+                retry_in=round(delay, 2),
+                attempt=attempt,
+            )
+
+    async def request(self, method: str, url: str, *, tenant: Optional[str] = None, **kwargs) -> httpx.Response:
+        """Send a request, retrying 429/503 responses; other statuses are returned as-is"""
+        return await self._send(method, url, tenant, stream=False, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, *, tenant: Optional[str] = None, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Like request(), but the body is streamed and closed when the block exits"""
+        response = await self._send(method, url, tenant, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    # -------------------------
+    # $batch coalescing
+    # -------------------------
+    async def batch_get(
+        self,
+        url: str,
+        *,
+        tenant: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 30,
+    ) -> httpx.Response:
+        """GET that is sent inside a JSON $batch together with concurrent lookups
+
+        Returns the item's own response, whatever its status; URLs outside the
+        Graph API (e.g. pre-authenticated download URLs) are sent directly.
+        """
+        match = _GRAPH_URL_RE.match(url)
+        authorization = (headers or {}).get("Authorization")
+        if match is None or not authorization or self.batch_max_requests < 2:
+            self._batch_stats["direct_requests"] += 1
+            return await self.request("GET", url, tenant=tenant, headers=headers, params=params, timeout=timeout)
+
+        relative_url = match.group(2)
+        if params:
+            separator = "&" if "?" in relative_url else "?"
+            relative_url += separator + urlencode(params, safe="$,@.'")
+
+        key: BatchKey = (match.group(1), authorization, tenant)
+        item = _BatchItem(relative_url, asyncio.get_running_loop().create_future())
+        self._enqueue(key, [item])
+        return await item.future
+
+    def _enqueue(self, key: BatchKey, items: List[_BatchItem]) -> None:
+        queue = self._batch_queues.setdefault(key, [])
+        queue.extend(items)
+        if len(queue) >= self.batch_max_requests:
+            self._flush_batch(key)
+        elif key not in self._batch_timers:
+            loop = asyncio.get_running_loop()
+            self._batch_timers[key] = loop.call_later(self.batch_linger, self._flush_batch, key)
+
+    def _flush_batch(self, key: BatchKey) -> None:
+        timer = self._batch_timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._batch_queues.pop(key, [])
+        while queue:
+            chunk, queue = queue[:self.batch_max_requests], queue[self.batch_max_requests:]
+            task = asyncio.ensure_future(self._send_batch(key, chunk))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, key: BatchKey, items: List[_BatchItem]) -> None:
+        base_url, authorization, tenant = key
+        try:
+            if len(items) == 1:
+                self._batch_stats["direct_requests"] += 1
+                response = await self.request(
+                    "GET", base_url + items[0].url, tenant=tenant,
+                    headers={"Authorization": authorization}, timeout=30,
+                )
+                if not items[0].future.done():
+                    items[0].future.set_result(response)
+                return
+
+            self._batch_stats["batches"] += 1
+            self._batch_stats["batched_requests"] += len(items)
+            response = await self.request(
+                "POST",
+                f"{base_url}/$batch",
+                tenant=tenant,
+                headers={"Authorization": authorization, "Content-Type": "application/json"},
+                json={
+                    "requests": [
+                        {"id": str(i), "method": "GET", "url": item.url}
+                        for i, item in enumerate(items)
+                    ]
+                },
+                timeout=60,
+            )
+            if response.status_code != 200:
+                # The whole batch failed; every caller sees the batch status
+                for item in items:
+                    if not item.future.done():
+                        item.future.set_result(httpx.Response(
+                            response.status_code,
+                            content=response.content,
+                            headers=response.headers,
+                            request=httpx.Request("GET", base_url + item.url),
+                        ))
+                return
+            self._demultiplex(key, items, response.json().get("responses", []))
+        except Exception as e:
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+    def _demultiplex(self, key: BatchKey, items: List[_BatchItem], responses: List[Dict[str, Any]]) -> None:
+        base_url, _, tenant = key
+        stats = self._tenant(tenant)
+        retry: List[_BatchItem] = []
+        answered = set()
+        for sub in responses:
+            try:
+                item = items[int(sub.get("id"))]
+            except (TypeError, ValueError, IndexError):
+                continue
+            answered.add(id(item))
+            status = int(sub.get("status", 500))
+            headers = sub.get("headers") or {}
+            body = sub.get("body")
+            response = httpx.Response(
+                status,
+                headers=headers,
+                content=json.dumps(body).encode() if isinstance(body, (dict, list)) else (body or "").encode(),
+                request=httpx.Request("GET", base_url + item.url),
+            )
+            if status in RETRY_STATUSES:
+                # Sets the tenant backoff, so the retried batch waits for it
+                self._record_retryable(stats, response, item.attempts)
+                if item.attempts < self.max_retries:
+                    item.attempts += 1
+                    self._batch_stats["sub_retries"] += 1
+                    retry.append(item)
+                    continue
+            if not item.future.done():
+                item.future.set_result(response)
+
+        for item in items:
+            if id(item) not in answered and not item.future.done():
+                item.future.set_exception(
+                    httpx.HTTPError(f"No response for {item.url} in Graph $batch")
+                )
+        if retry:
+            self._enqueue(key, retry)
+
+    def for_tenant(self, tenant: Optional[str]) -> "GraphTenantClient":
+        return GraphTenantClient(self, tenant)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "max_connections": self.max_connections,
+            "batching": dict(self._batch_stats),
+            "tenants": {
+                tenant: stats.as_dict(now) for tenant, stats in self._tenants.items()
+            },
+        }
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class GraphTenantClient:
+    """httpx-style view of the shared client that attributes requests to one tenant"""
+
+    def __init__(self, client: GraphClient, tenant: Optional[str]):
+        self._client = client
+        self.tenant = tenant
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self._client.request(method, url, tenant=self.tenant, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs):
+        return self._client.stream(method, url, tenant=self.tenant, **kwargs)
+
+    async def batch_get(self, url: str, **kwargs) -> httpx.Response:
+        return await self._client.batch_get(url, tenant=self.tenant, **kwargs)
+
+
+# Global instance shared by the Graph connectors
+graph_client = GraphClient()
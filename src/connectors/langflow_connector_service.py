@@ -52,19 +52,13 @@ class LangflowConnectorService:
             filename=document.filename,
         )
 
-        from utils.file_utils import auto_cleanup_tempfile
-
         suffix = get_file_extension(document.mimetype)
 
-        # Create temporary file from document content
-        with auto_cleanup_tempfile(suffix=suffix) as tmp_path:
-            # Write document content to temp file
-            with open(tmp_path, "wb") as f:
-                f.write(document.content)
-
+        # Temp file holding the document content (spooled content is used in
+        # place); it is uploaded from an open handle so httpx streams it
+        with document.content_path(suffix=suffix) as tmp_path, open(tmp_path, "rb") as content:
             # Step 1: Upload file to Langflow
             logger.debug("Uploading file to Langflow", filename=document.filename)
-            content = document.content
             
             # Clean filename and ensure we don't add a double extension
             processed_filename = clean_connector_filename(document.filename, document.mimetype)
@@ -80,10 +74,12 @@ class LangflowConnectorService:
             if self.session_manager:
                 try:
                     from config.settings import get_index_name
+                    from utils.document_manifest import delete_manifest_by_filename
                     opensearch_client = self.session_manager.get_user_opensearch_client(owner_user_id, jwt_token)
                     delete_body = {"query": {"term": {"filename": processed_filename}}}
                     delete_result = await opensearch_client.delete_by_query(index=get_index_name(), body=delete_body)
                     deleted_count = delete_result.get("deleted", 0)
+                    await delete_manifest_by_filename(opensearch_client, processed_filename)
                     logger.info("Deleted existing chunks before re-ingestion", filename=processed_filename, deleted_count=deleted_count)
                 except Exception as delete_err:
                     logger.warning("Failed to delete existing chunks before re-ingestion", filename=processed_filename, error=str(delete_err))
@@ -182,8 +178,14 @@ class LangflowConnectorService:
         user_id: str,
         max_files: int = None,
         jwt_token: str = None,
-    ) -> str:
-        """Sync files from a connector connection using Langflow processing"""
+        filename_filter: set = None,
+    ) -> Optional[str]:
+        """Sync files from a connector connection using Langflow processing
+
+        Connectors with a change feed sync only what changed since the last
+        sync (see connectors.incremental_sync); the task ID is None when
+        nothing did. filename_filter works as in ConnectorService.
+        """
         if not self.task_service:
             raise ValueError(
                 "TaskService not available - connector sync requires task service dependency"
@@ -206,39 +208,25 @@ class LangflowConnectorService:
         if not connector.is_authenticated:
             raise ValueError(f"Connection '{connection_id}' not authenticated")
 
-        # Collect files to process (limited by max_files)
-        files_to_process = []
-        page_token = None
-
-        # Calculate page size to minimize API calls
-        page_size = min(max_files or 100, 1000) if max_files else 100
-
-        while True:
-            # List files from connector with limit
-            logger.debug(
-                "Calling list_files", page_size=page_size, page_token=page_token
+        # Changes since the last sync instead of a full listing, when the
+        # connector has a change feed and the connection a stored cursor
+        if not max_files:
+            from .incremental_sync import sync_connection_changes
+
+            incremental = await sync_connection_changes(
+                self,
+                connection_id,
+                user_id,
+                jwt_token=jwt_token,
+                filename_filter=filename_filter,
             )
-            file_list = await connector.list_files(page_token, limit=page_size)
-            logger.debug(
-                "Got files from connector", file_count=len(file_list.get("files", []))
-            )
-            files = file_list["files"]
-
-            if not files:
-                break
+            if incremental is not None:
+                return incremental["task_id"]
 
-            for file_info in files:
-                if max_files and len(files_to_process) >= max_files:
-                    break
-                files_to_process.append(file_info)
+        # Files are queued page by page while the listing continues
+        from .listing import stream_connector_listing
 
-            # Stop if we have enough files or no more pages
-            if (max_files and len(files_to_process) >= max_files) or not file_list.get(
-                "nextPageToken"
-            ):
-                break
-
-            page_token = file_list.get("nextPageToken")
+        file_batches = await stream_connector_listing(connector, max_files, filename_filter)
 
         # Get user information
         user = self.session_manager.get_user(user_id) if self.session_manager else None
@@ -248,26 +236,15 @@ class LangflowConnectorService:
         processor = LangflowConnectorFileProcessor(
             self,
             connection_id,
-            files_to_process,
+            [],  # files arrive with the listing
             user_id,
             jwt_token=jwt_token,
             owner_name=owner_name,
             owner_email=owner_email,
         )
 
-        # Use file IDs as items
-        file_ids = [file_info["id"] for file_info in files_to_process]
-        original_filenames = {
-            file_info["id"]: clean_connector_filename(
-                file_info["name"], file_info.get("mimeType") or file_info.get("mimetype")
-            )
-            for file_info in files_to_process
-            if "name" in file_info
-        }
-
-        # Create custom task using TaskService
-        task_id = await self.task_service.create_custom_task(
-            user_id, file_ids, processor, original_filenames=original_filenames
+        task_id = await self.task_service.create_streaming_task(
+            user_id, file_batches, processor
         )
 
         return task_id
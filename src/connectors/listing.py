@@ -0,0 +1,80 @@
+"""
+Streaming connector listings into sync tasks.
+
+A full sync used to page through the whole listing, keeping every file in
+memory, before it created its task, so nothing was downloaded until the
+last page had arrived. stream_connector_listing() hands the pages to
+TaskService.create_streaming_task() instead: files are queued as each page
+arrives and the task's total_files grows until the listing is complete.
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from utils.file_utils import clean_connector_filename
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _next_page_token(file_list: Dict[str, Any]) -> Optional[str]:
+    # Connectors return next_page_token; nextPageToken is the Drive API's own name
+    return file_list.get("next_page_token") or file_list.get("nextPageToken")
+
+
+def _task_items(files: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, str]]:
+    """File IDs as task items, with their cleaned display names"""
+    file_ids = [file_info["id"] for file_info in files]
+    original_filenames = {
+        file_info["id"]: clean_connector_filename(
+            file_info["name"], file_info.get("mimeType") or file_info.get("mimetype")
+        )
+        for file_info in files
+        if "name" in file_info
+    }
+    return file_ids, original_filenames
+
+
+async def stream_connector_listing(
+    connector,
+    max_files: Optional[int] = None,
+    filename_filter: Optional[set] = None,
+) -> AsyncIterator[Tuple[List[str], Dict[str, str]]]:
+    """
+    List a connector's files page by page as ``(file_ids, original_filenames)``.
+
+    The first page is fetched before returning, so authentication and
+    listing errors still reach the caller instead of the background task.
+    At most ``max_files`` files are listed; with ``filename_filter`` only
+    files whose name is in the set.
+    """
+    page_size = min(max_files, 1000) if max_files else 100
+    first_page = await connector.list_files(None, limit=page_size)
+    return _listing_batches(connector, first_page, page_size, max_files, filename_filter)
+
+
+async def _listing_batches(connector, file_list, page_size, max_files, filename_filter):
+    listed = 0
+    while True:
+        files = file_list.get("files") or []
+        logger.debug("Got files from connector", file_count=len(files))
+        if not files:
+            break
+
+        batch = []
+        for file_info in files:
+            if max_files and listed >= max_files:
+                break
+            if filename_filter is not None and file_info.get("name", "") not in filename_filter:
+                logger.debug("Skipping file not in filter", filename=file_info.get("name", ""))
+                continue
+            batch.append(file_info)
+            listed += 1
+        if batch:
+            yield _task_items(batch)
+
+        page_token = _next_page_token(file_list)
+        # Stop if we have enough files or no more pages
+        if (max_files and listed >= max_files) or not page_token:
+            break
+        logger.debug("Calling list_files", page_size=page_size, page_token=page_token)
+        file_list = await connector.list_files(page_token, limit=page_size)
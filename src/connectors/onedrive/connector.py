@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -5,7 +6,12 @@ from datetime import datetime
 from urllib.parse import urlparse
 import httpx
 
-from ..base import BaseConnector, ConnectorDocument, DocumentACL
+from config.settings import CONNECTOR_DOWNLOAD_CHUNK_SIZE
+
+from ..base import (
+    BaseConnector, ConnectorChanges, ConnectorContent, ConnectorDocument, ConnectorFileVersion, DocumentACL,
+)
+from ..graph_client import graph_client
 from .oauth import OneDriveOAuth
 
 logger = logging.getLogger(__name__)
@@ -95,7 +101,7 @@ class OneDriveConnector(BaseConnector):
         # Graph API defaults
         self._graph_api_version = "v1.0"
         self._default_params = {
-            "$select": "id,name,size,lastModifiedDateTime,createdDateTime,webUrl,file,folder,@microsoft.graph.downloadUrl"
+            "$select": "id,name,size,lastModifiedDateTime,createdDateTime,cTag,webUrl,file,folder,@microsoft.graph.downloadUrl"
         }
         
         # Selective sync support (similar to Google Drive)
@@ -113,6 +119,11 @@ class OneDriveConnector(BaseConnector):
         """Base URL for Microsoft Graph API calls."""
         return f"https://graph.microsoft.com/{self._graph_api_version}"
 
+    @property
+    def _graph_tenant(self) -> str:
+        """Tenant that Graph requests are attributed to in the shared client's stats."""
+        return (self.oauth and self.oauth.get_tenant_id()) or "common"
+
     @property
     def base_url(self) -> Optional[str]:
         """Generic base URL property (OneDrive/SharePoint domain)"""
@@ -214,30 +225,30 @@ class OneDriveConnector(BaseConnector):
                 "Content-Type": "application/json",
             }
             
-            async with httpx.AsyncClient() as client:
-                # Get user's default drive to extract OneDrive URL
-                url = f"{self._graph_base_url}/me/drive"
-                logger.info(f"_detect_onedrive_url: Calling Graph API: {url}")
-                
-                response = await client.get(url, headers=headers, timeout=30.0)
-                logger.info(f"_detect_onedrive_url: Graph API response status: {response.status_code}")
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    web_url = data.get("webUrl", "")
-                    logger.info(f"_detect_onedrive_url: webUrl from response: {web_url}")
-                    
-                    # Extract the domain from the webUrl
-                    # e.g., "https://onedrive.live.com/..." or "https://company-my.sharepoint.com/..."
-                    if web_url:
-                        parsed = urlparse(web_url)
-                        onedrive_url = f"{parsed.scheme}://{parsed.netloc}"
-                        logger.info(f"_detect_onedrive_url: Detected OneDrive URL: {onedrive_url}")
-                        return onedrive_url
-                    else:
-                        logger.warning("_detect_onedrive_url: webUrl is empty in response")
+            client = graph_client.for_tenant(self._graph_tenant)
+            # Get user's default drive to extract OneDrive URL
+            url = f"{self._graph_base_url}/me/drive"
+            logger.info(f"_detect_onedrive_url: Calling Graph API: {url}")
+
+            response = await client.get(url, headers=headers, timeout=30.0)
+            logger.info(f"_detect_onedrive_url: Graph API response status: {response.status_code}")
+
+            if response.status_code == 200:
+                data = response.json()
+                web_url = data.get("webUrl", "")
+                logger.info(f"_detect_onedrive_url: webUrl from response: {web_url}")
+
+                # Extract the domain from the webUrl
+                # e.g., "https://onedrive.live.com/..." or "https://company-my.sharepoint.com/..."
+                if web_url:
+                    parsed = urlparse(web_url)
+                    onedrive_url = f"{parsed.scheme}://{parsed.netloc}"
+                    logger.info(f"_detect_onedrive_url: Detected OneDrive URL: {onedrive_url}")
+                    return onedrive_url
                 else:
-                    logger.warning(f"_detect_onedrive_url: Failed to get drive info: {response.status_code}, response: {response.text[:500]}")
+                    logger.warning("_detect_onedrive_url: webUrl is empty in response")
+            else:
+                logger.warning(f"_detect_onedrive_url: Failed to get drive info: {response.status_code}, response: {response.text[:500]}")
                     
         except Exception as e:
             logger.error(f"_detect_onedrive_url: Exception during detection: {e}")
@@ -262,7 +273,10 @@ class OneDriveConnector(BaseConnector):
                         if not file_id:
                             continue
                         doc = await self.get_file_content(file_id)
-                        self.emit(doc)
+                        try:
+                            self.emit(doc)
+                        finally:
+                            doc.close()
                     except Exception as e:
                         logger.error(f"Failed to sync OneDrive file {file_info.get('name', 'unknown')}: {e}")
                         continue
@@ -310,19 +324,19 @@ class OneDriveConnector(BaseConnector):
 
             url = f"{self._graph_base_url}/subscriptions"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=subscription_data, headers=headers, timeout=30)
-                response.raise_for_status()
+            client = graph_client.for_tenant(self._graph_tenant)
+            response = await client.post(url, json=subscription_data, headers=headers, timeout=30)
+            response.raise_for_status()
 
-                result = response.json()
-                subscription_id = result.get("id")
+            result = response.json()
+            subscription_id = result.get("id")
 
-                if subscription_id:
-                    self._subscription_id = subscription_id
-                    logger.info(f"OneDrive subscription created: {subscription_id}")
-                    return subscription_id
-                else:
-                    raise ValueError("No subscription ID returned from Microsoft Graph")
+            if subscription_id:
+                self._subscription_id = subscription_id
+                logger.info(f"OneDrive subscription created: {subscription_id}")
+                return subscription_id
+            else:
+                raise ValueError("No subscription ID returned from Microsoft Graph")
 
         except Exception as e:
             logger.error(f"Failed to setup OneDrive subscription: {e}")
@@ -366,17 +380,7 @@ class OneDriveConnector(BaseConnector):
             items = data.get("value", [])
             for item in items:
                 if item.get("file"):  # include files only
-                    files.append({
-                        "id": item.get("id", ""),
-                        "name": item.get("name", ""),
-                        "path": f"/drive/items/{item.get('id')}",
-                        "size": int(item.get("size", 0)),
-                        "modified": item.get("lastModifiedDateTime"),
-                        "created": item.get("createdDateTime"),
-                        "mime_type": item.get("file", {}).get("mimeType", self._get_mime_type(item.get("name", ""))),
-                        "url": item.get("webUrl", ""),
-                        "download_url": item.get("@microsoft.graph.downloadUrl"),
-                    })
+                    files.append(self._file_info(item))
 
             # Next page
             next_page_token = None
@@ -394,6 +398,122 @@ class OneDriveConnector(BaseConnector):
             logger.error(f"Failed to list OneDrive files: {e}")
             return {"files": [], "next_page_token": None}
 
+    def _file_info(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """File info in list_files() format from a Graph driveItem"""
+        return {
+            "id": item.get("id", ""),
+            "name": item.get("name", ""),
+            "path": f"/drive/items/{item.get('id')}",
+            "size": int(item.get("size", 0)),
+            "modified": item.get("lastModifiedDateTime"),
+            "created": item.get("createdDateTime"),
+            "mime_type": item.get("file", {}).get("mimeType", self._get_mime_type(item.get("name", ""))),
+            "url": item.get("webUrl", ""),
+            "download_url": item.get("@microsoft.graph.downloadUrl"),
+        }
+
+    def _drive_url(self) -> str:
+        return f"{self._graph_base_url}/me/drive"
+
+    async def get_changes(self, cursor: Optional[str] = None) -> ConnectorChanges:
+        """Changes since a Graph delta link; see BaseConnector.get_changes"""
+        if not await self.authenticate():
+            raise RuntimeError("OneDrive authentication failed during delta query")
+
+        if cursor:
+            url, params = cursor, None
+        else:
+            # token=latest returns a delta link for "now" without enumerating the drive
+            url, params = f"{self._drive_url()}/root/delta", {"token": "latest"}
+
+        changed: Dict[str, Dict[str, Any]] = {}
+        deleted: Dict[str, None] = {}
+        delta_link = None
+        while url:
+            try:
+                response = await self._make_graph_request(url, params=params)
+            except httpx.HTTPStatusError as e:
+                # 410 Gone (resyncRequired): the delta link expired
+                if e.response.status_code == 410:
+                    logger.info("OneDrive delta link expired, full sync required")
+                    return ConnectorChanges(cursor=None, reset=True)
+                raise
+            data = response.json()
+            # Pages are in change order, so a later entry for an item wins
+            for item in data.get("value", []):
+                item_id = item.get("id")
+                if not item_id:
+                    continue
+                if "deleted" in item:
+                    changed.pop(item_id, None)
+                    deleted[item_id] = None
+                elif "file" in item:
+                    deleted.pop(item_id, None)
+                    changed[item_id] = {
+                        **self._file_info(item),
+                        # Used by filter_to_scope() to place the file in the drive
+                        "parent_id": item.get("parentReference", {}).get("id"),
+                    }
+            url, params = data.get("@odata.nextLink"), None
+            delta_link = data.get("@odata.deltaLink", delta_link)
+
+        return ConnectorChanges(
+            cursor=delta_link or cursor,
+            changed=list(changed.values()),
+            deleted=list(deleted),
+        )
+
+    async def filter_to_scope(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep changed files that list_files() would return.
+
+        The delta query covers the whole drive. Without a selection only files
+        directly under the drive root are in scope; with file_ids/folder_ids,
+        the selected files and anything below the selected folders. Folders
+        are placed by walking up parentReference, one item lookup per unseen
+        folder, so the cost follows the number of changes.
+        """
+        roots = set(self.cfg.file_ids or []) | set(self.cfg.folder_ids or [])
+        if not roots:
+            response = await self._make_graph_request(
+                f"{self._drive_url()}/root", params={"$select": "id"}
+            )
+            root_id = response.json().get("id")
+            return [meta for meta in files if root_id and meta.get("parent_id") == root_id]
+
+        parent_lookups: Dict[str, asyncio.Future] = {}
+
+        async def fetch_parent(folder_id: str) -> Optional[str]:
+            try:
+                response = await self._make_graph_request(
+                    f"{self._drive_url()}/items/{folder_id}",
+                    params={"$select": "id,parentReference"},
+                    batched=True,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to look up parent of folder {folder_id}: {e}")
+                return None
+            return response.json().get("parentReference", {}).get("id")
+
+        async def in_scope(meta: Dict[str, Any]) -> bool:
+            if meta.get("id") in roots:
+                return True
+            folder_id = meta.get("parent_id")
+            seen = set()
+            while folder_id and folder_id not in seen:
+                if folder_id in roots:
+                    return True
+                seen.add(folder_id)
+                # Shared between files so each folder is looked up once
+                if folder_id not in parent_lookups:
+                    parent_lookups[folder_id] = asyncio.ensure_future(fetch_parent(folder_id))
+                folder_id = await parent_lookups[folder_id]
+            return False
+
+        # Concurrent lookups share Graph $batch requests
+        keep = await asyncio.gather(*(in_scope(meta) for meta in files))
+        return [meta for meta, kept in zip(files, keep) if kept]
+
     async def _extract_onedrive_acl(self, file_id: str, file_metadata: Dict) -> DocumentACL:
         """
         Extract ACL from OneDrive item.
@@ -420,11 +540,11 @@ class OneDriveConnector(BaseConnector):
             permissions_url = f"{self._graph_base_url}/me/drive/items/{file_id}/permissions"
 
             # Fetch permissions
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    permissions_url,
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
+            client = graph_client.for_tenant(self._graph_tenant)
+            response = await client.batch_get(
+                permissions_url,
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
 
             if response.status_code != 200:
                 logger.warning(f"Failed to fetch permissions for {file_id}: {response.status_code}")
@@ -489,28 +609,27 @@ class OneDriveConnector(BaseConnector):
             cached_info = self.get_cached_file_info(file_id)
             if cached_info and cached_info.get("downloadUrl"):
                 logger.info(f"Using cached download URL for file {file_id}")
-                content = await self._download_file_from_url(cached_info["downloadUrl"])
-                
-                acl = DocumentACL(
-                    owner="",
-                    user_permissions={},
-                    group_permissions={},
-                )
-                
-                return ConnectorDocument(
-                    id=file_id,
-                    filename=cached_info.get("name", "Unknown"),
-                    mimetype=cached_info.get("mimeType", "application/octet-stream"),
-                    content=content,
-                    source_url=cached_info.get("webUrl", ""),
-                    acl=acl,
-                    modified_time=datetime.now(),
-                    created_time=datetime.now(),
-                    metadata={
-                        "onedrive_path": "",
-                        "size": cached_info.get("size", 0),
-                    },
-                )
+                acl = DocumentACL(owner="")
+                content_file = await self._download_file_from_url(cached_info["downloadUrl"])
+                try:
+                    return ConnectorDocument(
+                        id=file_id,
+                        filename=cached_info.get("name", "Unknown"),
+                        mimetype=cached_info.get("mimeType", "application/octet-stream"),
+                        content=None,
+                        content_file=content_file,
+                        source_url=cached_info.get("webUrl", ""),
+                        acl=acl,
+                        modified_time=datetime.now(),
+                        created_time=datetime.now(),
+                        metadata={
+                            "onedrive_path": "",
+                            "size": cached_info.get("size", 0),
+                        },
+                    )
+                except Exception:
+                    content_file.close()
+                    raise
 
             # Fall back to Graph API for regular file IDs
             file_metadata = await self._get_file_metadata_by_id(file_id)
@@ -520,30 +639,36 @@ class OneDriveConnector(BaseConnector):
                     logger.info(f"No metadata for sharing ID {file_id}, attempting direct shares download")
                     token = self.oauth.get_access_token()
                     headers = {"Authorization": f"Bearer {token}"}
+                    acl = DocumentACL(owner="")
                     shares_content = await self._download_via_shares_endpoint(file_id, headers)
                     if shares_content is not None:
-                        acl = DocumentACL(owner="", user_permissions={}, group_permissions={})
-                        return ConnectorDocument(
-                            id=file_id,
-                            filename="Unknown",
-                            mimetype="application/octet-stream",
-                            content=shares_content,
-                            source_url="",
-                            acl=acl,
-                            modified_time=datetime.now(),
-                            created_time=datetime.now(),
-                            metadata={"onedrive_path": "", "size": 0},
-                        )
+                        try:
+                            return ConnectorDocument(
+                                id=file_id,
+                                filename="Unknown",
+                                mimetype="application/octet-stream",
+                                content=None,
+                                content_file=shares_content,
+                                source_url="",
+                                acl=acl,
+                                modified_time=datetime.now(),
+                                created_time=datetime.now(),
+                                metadata={"onedrive_path": "", "size": 0},
+                            )
+                        except Exception:
+                            shares_content.close()
+                            raise
                 raise ValueError(f"File not found: {file_id}")
 
+            # Extract ACL from OneDrive item (before downloading, so a failure
+            # here does not leave a spooled file behind)
+            acl = await self._extract_onedrive_acl(file_id, file_metadata)
+
             download_url = file_metadata.get("download_url")
             if download_url:
-                content = await self._download_file_from_url(download_url)
+                content_file = await self._download_file_from_url(download_url)
             else:
-                content = await self._download_file_content(file_id)
-
-            # Extract ACL from OneDrive item
-            acl = await self._extract_onedrive_acl(file_id, file_metadata)
+                content_file = await self._download_file_content(file_id)
 
             modified_time = self._parse_graph_date(file_metadata.get("modified"))
             created_time = self._parse_graph_date(file_metadata.get("created"))
@@ -552,11 +677,13 @@ class OneDriveConnector(BaseConnector):
                 id=file_id,
                 filename=file_metadata.get("name", ""),
                 mimetype=file_metadata.get("mime_type", "application/octet-stream"),
-                content=content,
+                content=None,
+                content_file=content_file,
                 source_url=file_metadata.get("url", ""),
                 acl=acl,
                 modified_time=modified_time,
                 created_time=created_time,
+                version=self._file_version(file_metadata),
                 metadata={
                     "onedrive_path": file_metadata.get("path", ""),
                     "size": file_metadata.get("size", 0),
@@ -567,6 +694,28 @@ class OneDriveConnector(BaseConnector):
             logger.error(f"Failed to get OneDrive file content {file_id}: {e}")
             raise
 
+    @staticmethod
+    def _file_version(file_metadata: Dict[str, Any]) -> Optional[str]:
+        """cTag changes with the content only; modified time and size otherwise"""
+        if file_metadata.get("ctag"):
+            return file_metadata["ctag"]
+        if file_metadata.get("modified"):
+            return f"{file_metadata['modified']}|{file_metadata.get('size', 0)}"
+        return None
+
+    async def get_file_version(self, file_id: str) -> Optional[ConnectorFileVersion]:
+        """Version and ACL of a file from its metadata and permissions, without downloading"""
+        # Sharing IDs resolved from cached download URLs have no Graph metadata
+        if self.get_cached_file_info(file_id) or not await self.authenticate():
+            return None
+        file_metadata = await self._get_file_metadata_by_id(file_id)
+        if not file_metadata or file_metadata.get("isFolder"):
+            return None
+        acl = await self._extract_onedrive_acl(file_id, file_metadata)
+        return ConnectorFileVersion(
+            id=file_id, version=self._file_version(file_metadata), acl=acl
+        )
+
     async def _get_file_metadata_by_id(self, file_id: str) -> Optional[Dict[str, Any]]:
         """Get file metadata by ID using Graph API.
         
@@ -601,6 +750,7 @@ class OneDriveConnector(BaseConnector):
                     "mime_type": item.get("file", {}).get("mimeType", self._get_mime_type(item.get("name", ""))),
                     "url": item.get("webUrl", ""),
                     "download_url": item.get("@microsoft.graph.downloadUrl"),
+                    "ctag": item.get("cTag"),
                     "isFolder": False,
                 }
 
@@ -642,7 +792,7 @@ class OneDriveConnector(BaseConnector):
                         try:
                             url = f"{self._graph_base_url}/shares/{encoded}/driveItem"
                             logger.debug(f"Trying shares endpoint approach {i+1}: {url}")
-                            response = await self._make_graph_request(url, params=params)
+                            response = await self._make_graph_request(url, params=params, batched=True)
                             if response.status_code == 200:
                                 logger.info(f"Shares endpoint approach {i+1} succeeded")
                                 return response.json()
@@ -655,7 +805,7 @@ class OneDriveConnector(BaseConnector):
                 logger.info(f"Trying drives endpoint: /drives/{drive_id}/items/{item_id}")
                 try:
                     url = f"{self._graph_base_url}/drives/{drive_id}/items/{item_id}"
-                    response = await self._make_graph_request(url, params=params)
+                    response = await self._make_graph_request(url, params=params, batched=True)
                     if response.status_code == 200:
                         return response.json()
                 except Exception as e:
@@ -667,7 +817,7 @@ class OneDriveConnector(BaseConnector):
                     logger.info(f"Trying drives endpoint without 's' prefix: /drives/{drive_id}/items/{clean_item_id}")
                     try:
                         url = f"{self._graph_base_url}/drives/{drive_id}/items/{clean_item_id}"
-                        response = await self._make_graph_request(url, params=params)
+                        response = await self._make_graph_request(url, params=params, batched=True)
                         if response.status_code == 200:
                             return response.json()
                     except Exception as e:
@@ -677,7 +827,7 @@ class OneDriveConnector(BaseConnector):
                 logger.info(f"Trying standard endpoint: /me/drive/items/{file_id}")
                 try:
                     url = f"{self._graph_base_url}/me/drive/items/{file_id}"
-                    response = await self._make_graph_request(url, params=params)
+                    response = await self._make_graph_request(url, params=params, batched=True)
                     if response.status_code == 200:
                         return response.json()
                 except Exception as e:
@@ -685,14 +835,14 @@ class OneDriveConnector(BaseConnector):
         else:
             # Standard item ID without '!'
             url = f"{self._graph_base_url}/me/drive/items/{file_id}"
-            response = await self._make_graph_request(url, params=params)
+            response = await self._make_graph_request(url, params=params, batched=True)
             if response.status_code == 200:
                 return response.json()
         
         logger.error(f"All endpoints failed for file_id: {file_id}")
         return None
 
-    async def _download_file_content(self, file_id: str) -> bytes:
+    async def _download_file_content(self, file_id: str) -> ConnectorContent:
         """Download file content by file ID using Graph API.
         
         Handles multiple ID formats like _get_file_metadata_by_id.
@@ -722,16 +872,13 @@ class OneDriveConnector(BaseConnector):
             else:
                 url = f"{self._graph_base_url}/me/drive/items/{file_id}/content"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, timeout=60, follow_redirects=True)
-                response.raise_for_status()
-                return response.content
+            return await self._stream_download(url, headers=headers)
 
         except Exception as e:
             logger.error(f"Failed to download file content for {file_id}: {e}")
             raise
 
-    async def _download_via_shares_endpoint(self, file_id: str, headers: Dict[str, str]) -> Optional[bytes]:
+    async def _download_via_shares_endpoint(self, file_id: str, headers: Dict[str, str]) -> Optional[ConnectorContent]:
         """
         Attempt to download content using the Graph /shares endpoint for sharing IDs.
         """
@@ -748,24 +895,25 @@ class OneDriveConnector(BaseConnector):
             try:
                 url = f"{self._graph_base_url}/shares/{encoded}/driveItem/content"
                 logger.info(f"Attempting shares download (approach {i+1}): {url}")
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(url, headers=headers, timeout=60, follow_redirects=True)
-                    if response.status_code == 200:
-                        return response.content
-                    else:
-                        logger.debug(f"Shares download approach {i+1} failed with status {response.status_code}")
+                return await self._stream_download(url, headers=headers)
             except Exception as e:
                 logger.debug(f"Shares download approach {i+1} failed: {e}")
 
         return None
 
-    async def _download_file_from_url(self, download_url: str) -> bytes:
+    async def _stream_download(self, url: str, headers: Optional[Dict[str, str]] = None) -> ConnectorContent:
+        """Stream a download into a spooled temp file instead of holding it in memory."""
+        client = graph_client.for_tenant(self._graph_tenant)
+        async with client.stream("GET", url, headers=headers, timeout=60, follow_redirects=True) as response:
+            response.raise_for_status()
+            return await ConnectorContent.from_chunks(
+                response.aiter_bytes(CONNECTOR_DOWNLOAD_CHUNK_SIZE)
+            )
+
+    async def _download_file_from_url(self, download_url: str) -> ConnectorContent:
         """Download file content from direct download URL."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(download_url, timeout=60, follow_redirects=True)
-                response.raise_for_status()
-                return response.content
+            return await self._stream_download(download_url)
         except Exception as e:
             logger.error(f"Failed to download from URL {download_url}: {e}")
             raise
@@ -783,7 +931,7 @@ class OneDriveConnector(BaseConnector):
             return datetime.now()
 
     async def _make_graph_request(self, url: str, method: str = "GET",
-                                  data: Optional[Dict] = None, params: Optional[Dict] = None) -> httpx.Response:
+                                  data: Optional[Dict] = None, params: Optional[Dict] = None, batched: bool = False) -> httpx.Response:
         """Make authenticated API request to Microsoft Graph."""
         token = self.oauth.get_access_token()
         headers = {
@@ -791,47 +939,52 @@ class OneDriveConnector(BaseConnector):
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient() as client:
-            if method.upper() == "GET":
-                response = await client.get(url, headers=headers, params=params, timeout=30)
-            elif method.upper() == "POST":
-                response = await client.post(url, headers=headers, json=data, timeout=30)
-            elif method.upper() == "DELETE":
-                response = await client.delete(url, headers=headers, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        client = graph_client.for_tenant(self._graph_tenant)
+        if method.upper() == "GET" and batched:
+            # Coalesced with concurrent lookups into a Graph $batch request
+            response = await client.batch_get(url, headers=headers, params=params, timeout=30)
+        elif method.upper() == "GET":
+            response = await client.get(url, headers=headers, params=params, timeout=30)
+        elif method.upper() == "POST":
+            response = await client.post(url, headers=headers, json=data, timeout=30)
+        elif method.upper() == "DELETE":
+            response = await client.delete(url, headers=headers, timeout=30)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
-            response.raise_for_status()
-            return response
+        response.raise_for_status()
+        return response
 
     async def _list_selected_files(self) -> Dict[str, Any]:
         """List only selected files/folders (selective sync)."""
         files: List[Dict[str, Any]] = []
         
-        # Process selected file IDs
-        if self.cfg.file_ids:
-            for file_id in self.cfg.file_ids:
-                try:
-                    file_meta = await self._get_file_metadata_by_id(file_id)
-                    if file_meta and not file_meta.get('isFolder', False):
-                        files.append(file_meta)
-                    elif file_meta and file_meta.get('isFolder', False):
-                        # If it's a folder, expand its contents
-                        folder_files = await self._list_folder_contents(file_id)
-                        files.extend(folder_files)
-                except Exception as e:
-                    logger.warning(f"Failed to get file {file_id}: {e}")
-                    continue
-        
-        # Process selected folder IDs
-        if self.cfg.folder_ids:
-            for folder_id in self.cfg.folder_ids:
-                try:
-                    folder_files = await self._list_folder_contents(folder_id)
-                    files.extend(folder_files)
-                except Exception as e:
-                    logger.warning(f"Failed to list folder {folder_id}: {e}")
-                    continue
+        async def expand_file_id(file_id: str) -> List[Dict[str, Any]]:
+            try:
+                file_meta = await self._get_file_metadata_by_id(file_id)
+                if file_meta and not file_meta.get('isFolder', False):
+                    return [file_meta]
+                elif file_meta and file_meta.get('isFolder', False):
+                    # If it's a folder, expand its contents
+                    return await self._list_folder_contents(file_id)
+            except Exception as e:
+                logger.warning(f"Failed to get file {file_id}: {e}")
+            return []
+
+        async def expand_folder_id(folder_id: str) -> List[Dict[str, Any]]:
+            try:
+                return await self._list_folder_contents(folder_id)
+            except Exception as e:
+                logger.warning(f"Failed to list folder {folder_id}: {e}")
+                return []
+
+        # Lookups run concurrently so their metadata GETs share $batch requests
+        results = await asyncio.gather(
+            *(expand_file_id(file_id) for file_id in self.cfg.file_ids or []),
+            *(expand_folder_id(folder_id) for folder_id in self.cfg.folder_ids or []),
+        )
+        for result in results:
+            files.extend(result)
         
         return {"files": files, "next_page_token": None}
     
@@ -847,14 +1000,18 @@ class OneDriveConnector(BaseConnector):
             data = response.json()
             
             items = data.get("value", [])
+            lookups = []
             for item in items:
                 if item.get("file"):  # It's a file
-                    file_meta = await self._get_file_metadata_by_id(item.get("id"))
-                    if file_meta:
-                        files.append(file_meta)
+                    lookups.append(self._get_file_metadata_by_id(item.get("id")))
                 elif item.get("folder"):  # It's a subfolder, recurse
-                    subfolder_files = await self._list_folder_contents(item.get("id"))
-                    files.extend(subfolder_files)
+                    lookups.append(self._list_folder_contents(item.get("id")))
+            # Per-file metadata lookups go out together as $batch requests
+            for result in await asyncio.gather(*lookups):
+                if isinstance(result, list):
+                    files.extend(result)
+                elif result:
+                    files.append(result)
         except Exception as e:
             logger.error(f"Failed to list folder contents for {folder_id}: {e}")
         
@@ -910,15 +1067,15 @@ class OneDriveConnector(BaseConnector):
 
             url = f"{self._graph_base_url}/subscriptions/{subscription_id}"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(url, headers=headers, timeout=30)
+            client = graph_client.for_tenant(self._graph_tenant)
+            response = await client.delete(url, headers=headers, timeout=30)
 
-                if response.status_code in [200, 204, 404]:
-                    logger.info(f"OneDrive subscription {subscription_id} cleaned up successfully")
-                    return True
-                else:
-                    logger.warning(f"Unexpected response cleaning up subscription: {response.status_code}")
-                    return False
+            if response.status_code in [200, 204, 404]:
+                logger.info(f"OneDrive subscription {subscription_id} cleaned up successfully")
+                return True
+            else:
+                logger.warning(f"Unexpected response cleaning up subscription: {response.status_code}")
+                return False
 
         except Exception as e:
             logger.error(f"Failed to cleanup OneDrive subscription {subscription_id}: {e}")
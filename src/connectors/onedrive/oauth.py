@@ -301,6 +301,13 @@ class OneDriveOAuth:
             traceback.print_exc()
             return False
 
+    def get_tenant_id(self) -> Optional[str]:
+        """Tenant (directory) ID of the signed-in account, if known."""
+        home_account_id = (self._current_account or {}).get("home_account_id") or ""
+        # MSAL home account IDs are "<object id>.<tenant id>"
+        _, _, tenant_id = home_account_id.partition(".")
+        return tenant_id or None
+
     def get_access_token(self) -> str:
         """Get an access token for Microsoft Graph."""
         logger.info(f"OneDrive get_access_token: Starting, current_account={self._current_account is not None}")
@@ -49,16 +49,10 @@ class ConnectorService:
     ) -> Dict[str, Any]:
         """Process a document from a connector using existing processing pipeline"""
 
-        # Create temporary file from document content
-        from utils.file_utils import auto_cleanup_tempfile
-
-        with auto_cleanup_tempfile(
+        # Temp file holding the document content (spooled content is used in place)
+        with document.content_path(
             suffix=get_file_extension(document.mimetype)
         ) as tmp_path:
-            # Write document content to temp file
-            with open(tmp_path, "wb") as f:
-                f.write(document.content)
-
             # Use existing process_file_common function with connector document metadata
             # We'll use the document service's process_file_common method
             from services.document_service import DocumentService
@@ -79,7 +73,7 @@ class ConnectorService:
                 jwt_token=jwt_token,
                 owner_name=owner_name,
                 owner_email=owner_email,
-                file_size=len(document.content) if document.content else 0,
+                file_size=document.size,
                 connector_type=connector_type,
                 acl=document.acl,
             )
@@ -186,9 +180,13 @@ class ConnectorService:
         max_files: int = None,
         jwt_token: str = None,
         filename_filter: set = None,
-    ) -> str:
+    ) -> Optional[str]:
         """
         Sync files from a connector connection using existing task tracking system.
+
+        Connectors with a change feed sync only what changed since the last
+        sync (see connectors.incremental_sync); the task ID is None when
+        nothing did.
         
         Args:
             connection_id: The connection ID
@@ -221,48 +219,25 @@ class ConnectorService:
         if not connector.is_authenticated:
             raise ValueError(f"Connection '{connection_id}' not authenticated")
 
-        # Collect files to process (limited by max_files)
-        files_to_process = []
-        page_token = None
+        # Changes since the last sync instead of a full listing, when the
+        # connector has a change feed and the connection a stored cursor
+        if not max_files:
+            from .incremental_sync import sync_connection_changes
 
-        # Calculate page size to minimize API calls
-        page_size = min(max_files or 100, 1000) if max_files else 100
-
-        while True:
-            # List files from connector with limit
-            logger.debug(
-                "Calling list_files", page_size=page_size, page_token=page_token
-            )
-            file_list = await connector.list_files(page_token, limit=page_size)
-            logger.debug(
-                "Got files from connector", file_count=len(file_list.get("files", []))
+            incremental = await sync_connection_changes(
+                self,
+                connection_id,
+                user_id,
+                jwt_token=jwt_token,
+                filename_filter=filename_filter,
             )
-            files = file_list["files"]
-
-            if not files:
-                break
-
-            for file_info in files:
-                if max_files and len(files_to_process) >= max_files:
-                    break
-                # Filter by filename if filter is provided
-                if filename_filter is not None:
-                    file_name = file_info.get("name", "")
-                    if file_name not in filename_filter:
-                        logger.debug(
-                            "Skipping file not in filter",
-                            filename=file_name,
-                        )
-                        continue
-                files_to_process.append(file_info)
-
-            # Stop if we have enough files or no more pages
-            if (max_files and len(files_to_process) >= max_files) or not file_list.get(
-                "nextPageToken"
-            ):
-                break
-
-            page_token = file_list.get("nextPageToken")
+            if incremental is not None:
+                return incremental["task_id"]
+
+        # Files are queued page by page while the listing continues
+        from .listing import stream_connector_listing
+
+        file_batches = await stream_connector_listing(connector, max_files, filename_filter)
 
         # Get user information
         user = self.session_manager.get_user(user_id) if self.session_manager else None
@@ -276,7 +251,7 @@ class ConnectorService:
         processor = ConnectorFileProcessor(
             self,
             connection_id,
-            files_to_process,
+            [],  # files arrive with the listing
             user_id,
             jwt_token=jwt_token,
             owner_name=owner_name,
@@ -288,19 +263,8 @@ class ConnectorService:
             ),
         )
 
-        # Use file IDs as items (no more fake file paths!)
-        file_ids = [file_info["id"] for file_info in files_to_process]
-        original_filenames = {
-            file_info["id"]: clean_connector_filename(
-                file_info["name"], file_info.get("mimeType") or file_info.get("mimetype")
-            )
-            for file_info in files_to_process
-            if "name" in file_info
-        }
-
-        # Create custom task using TaskService
-        task_id = await self.task_service.create_custom_task(
-            user_id, file_ids, processor, original_filenames=original_filenames
+        task_id = await self.task_service.create_streaming_task(
+            user_id, file_batches, processor
         )
 
         return task_id
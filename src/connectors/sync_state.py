@@ -0,0 +1,176 @@
+"""
+Per-connection sync state of connector files.
+
+ConnectorFileProcessor used to download every file, spool it to disk and
+hash it before finding out that the document was already indexed. This
+store remembers, per connection and remote file ID, the remote version
+(etag/cTag, md5 or modifiedTime+size) that was last indexed, the content
+hash the chunks were stored under and the hash of the ACL applied to them.
+
+On a re-sync the connector's get_file_version() is compared with the
+record: a matching version skips the download, and if only the ACL hash
+differs the indexed chunks get an ACL update instead of a re-ingest.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class FileSyncState:
+    """What a connection last indexed for one remote file"""
+
+    version: Optional[str]
+    content_hash: str
+    acl_hash: Optional[str]
+    updated_at: float = 0.0
+
+
+class ConnectorSyncStateStore:
+    """SQLite table of FileSyncState keyed by (connection ID, remote file ID)"""
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            from config.settings import CONNECTOR_SYNC_STATE_PATH
+
+            path = CONNECTOR_SYNC_STATE_PATH
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        # One worker thread keeps writes ordered and the connection single-threaded
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="connector-sync-state")
+        self._stats = {"skipped_downloads": 0, "acl_only_updates": 0, "downloads": 0}
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS connector_sync_state (
+                connection_id TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                version TEXT,
+                content_hash TEXT NOT NULL,
+                acl_hash TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (connection_id, file_id)
+            )
+            """
+        )
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def _get_sync(self, connection_id: str, file_id: str) -> Optional[FileSyncState]:
+        row = self._connect().execute(
+            "SELECT version, content_hash, acl_hash, updated_at FROM connector_sync_state "
+            "WHERE connection_id = ? AND file_id = ?",
+            (connection_id, file_id),
+        ).fetchone()
+        return FileSyncState(*row) if row else None
+
+    def _put_sync(self, connection_id: str, file_id: str, state: FileSyncState) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO connector_sync_state
+                    (connection_id, file_id, version, content_hash, acl_hash, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(connection_id, file_id) DO UPDATE SET
+                    version = excluded.version,
+                    content_hash = excluded.content_hash,
+                    acl_hash = excluded.acl_hash,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    connection_id, file_id, state.version, state.content_hash,
+                    state.acl_hash, time.time(),
+                ),
+            )
+
+    def _content_hashes_sync(self, connection_id: str, file_ids: list) -> Dict[str, str]:
+        conn = self._connect()
+        hashes = {}
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(file_ids), 500):
+            chunk = file_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            hashes.update(conn.execute(
+                f"SELECT file_id, content_hash FROM connector_sync_state "
+                f"WHERE connection_id = ? AND file_id IN ({placeholders})",
+                (connection_id, *chunk),
+            ).fetchall())
+        return hashes
+
+    def _delete_sync(self, connection_id: str, file_ids: Optional[list]) -> int:
+        conn = self._connect()
+        with conn:
+            if file_ids is None:
+                return conn.execute(
+                    "DELETE FROM connector_sync_state WHERE connection_id = ?", (connection_id,)
+                ).rowcount
+            return conn.executemany(
+                "DELETE FROM connector_sync_state WHERE connection_id = ? AND file_id = ?",
+                [(connection_id, file_id) for file_id in file_ids],
+            ).rowcount
+
+    async def get(self, connection_id: str, file_id: str) -> Optional[FileSyncState]:
+        try:
+            return await self._run(self._get_sync, connection_id, file_id)
+        except sqlite3.Error as e:
+            logger.warning("Failed to read connector sync state", file_id=file_id, error=str(e))
+            return None
+
+    async def put(self, connection_id: str, file_id: str, state: FileSyncState) -> None:
+        """Record what was indexed; failures only cost a download next time"""
+        try:
+            await self._run(self._put_sync, connection_id, file_id, state)
+        except sqlite3.Error as e:
+            logger.warning("Failed to write connector sync state", file_id=file_id, error=str(e))
+
+    async def get_content_hashes(self, connection_id: str, file_ids: Iterable[str]) -> Dict[str, str]:
+        """Content hashes the given remote files were indexed under"""
+        try:
+            return await self._run(self._content_hashes_sync, connection_id, list(file_ids))
+        except sqlite3.Error as e:
+            logger.warning("Failed to read connector sync state", connection_id=connection_id, error=str(e))
+            return {}
+
+    async def delete(self, connection_id: str, file_ids: Optional[Iterable[str]] = None) -> int:
+        """Forget some files of a connection, or all of them"""
+        try:
+            return await self._run(
+                self._delete_sync, connection_id, None if file_ids is None else list(file_ids)
+            )
+        except sqlite3.Error as e:
+            logger.warning("Failed to delete connector sync state", connection_id=connection_id, error=str(e))
+            return 0
+
+    def record_outcome(self, outcome: str) -> None:
+        self._stats[outcome] += 1
+
+    def get_stats(self) -> dict:
+        return dict(self._stats)
+
+
+# Global instance shared by the connector processors
+connector_sync_state = ConnectorSyncStateStore()
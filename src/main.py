@@ -5,6 +5,7 @@ from connectors.langflow_connector_service import LangflowConnectorService
 from connectors.service import ConnectorService
 from services.flows_service import FlowsService
 from utils.container_utils import detect_container_environment
+from utils.document_manifest import ensure_manifest_index
 from utils.embeddings import create_dynamic_index_body
 from utils.logging_config import configure_from_env, get_logger
 from utils.telemetry import TelemetryClient, Category, MessageId
@@ -49,6 +50,7 @@ from api import (
     router,
     search,
     settings,
+    stats,
     tasks,
     upload,
 )
@@ -92,6 +94,7 @@ from services.models_service import ModelsService
 from services.monitor_service import MonitorService
 from services.search_service import SearchService
 from services.task_service import TaskService
+from services.task_store import create_task_store
 from session_manager import SessionManager
 
 logger.info(
@@ -156,6 +159,9 @@ async def _ensure_opensearch_index():
     """Ensure OpenSearch index exists when using traditional connector service."""
     try:
         index_name = get_index_name()
+        # Document manifest index backs the dedup check on ingest
+        await ensure_manifest_index(clients.opensearch)
+
         # Check if index already exists
         if await clients.opensearch.indices.exists(index=index_name):
             logger.debug("OpenSearch index already exists", index_name=index_name)
@@ -221,6 +227,9 @@ async def init_index():
         )
         await TelemetryClient.send_event(Category.OPENSEARCH_INDEX, MessageId.ORB_OS_INDEX_EXISTS)
 
+    # Create document manifest index used for dedup checks
+    await ensure_manifest_index(clients.opensearch)
+
     # Create knowledge filters index
     knowledge_filter_index_name = "knowledge_filters"
     knowledge_filter_index_body = {
@@ -569,6 +578,22 @@ async def startup_tasks(services):
     if DISABLE_INGEST_WITH_LANGFLOW:
         await _ensure_opensearch_index()
 
+    # Detect search capabilities once instead of probing on every query
+    try:
+        await services["search_service"].initialize(clients.opensearch)
+    except Exception as e:
+        logger.warning("Failed to detect OpenSearch search capabilities", error=str(e))
+
+    # Resume ingestion tasks interrupted by the previous shutdown
+    try:
+        from models.processors import restore_processor
+
+        task_service = services["task_service"]
+        await task_service.persistent_store.initialize()
+        await task_service.resume_unfinished_tasks(partial(restore_processor, services=services))
+    except Exception as e:
+        logger.error("Failed to resume unfinished tasks", error=str(e))
+
     # Configure alerting security
     await configure_alerting_security()
 
@@ -622,7 +647,12 @@ async def initialize_services():
     # Initialize services
     document_service = DocumentService(session_manager=session_manager)
     search_service = SearchService(session_manager)
-    task_service = TaskService(document_service, process_pool, ingestion_timeout=INGESTION_TIMEOUT)
+    task_service = TaskService(
+        document_service,
+        process_pool,
+        ingestion_timeout=INGESTION_TIMEOUT,
+        persistent_store=create_task_store(),
+    )
     chat_service = ChatService()
     flows_service = FlowsService()
     knowledge_filter_service = KnowledgeFilterService(session_manager)
@@ -811,6 +841,28 @@ async def create_app():
             ),
             methods=["GET"],
         ),
+        Route(
+            "/tasks/{task_id}/files",
+            require_auth(services["session_manager"])(
+                partial(
+                    tasks.task_files,
+                    task_service=services["task_service"],
+                    session_manager=services["session_manager"],
+                )
+            ),
+            methods=["GET"],
+        ),
+        Route(
+            "/tasks/{task_id}/events",
+            require_auth(services["session_manager"])(
+                partial(
+                    tasks.task_events,
+                    task_service=services["task_service"],
+                    session_manager=services["session_manager"],
+                )
+            ),
+            methods=["GET"],
+        ),
         Route(
             "/tasks",
             require_auth(services["session_manager"])(
@@ -1211,6 +1263,21 @@ async def create_app():
             opensearch_health_ready,
             methods=["GET"],
         ),
+        # Internal queue / cache statistics
+        Route(
+            "/stats",
+            require_auth(services["session_manager"])(
+                partial(
+                    stats.get_stats,
+                    document_service=services["document_service"],
+                    search_service=services["search_service"],
+                    session_manager=services["session_manager"],
+                    api_key_service=services["api_key_service"],
+                    task_service=services["task_service"],
+                )
+            ),
+            methods=["GET"],
+        ),
         # Models endpoints
         Route(
             "/models/openai",
@@ -1456,6 +1523,28 @@ async def create_app():
             ),
             methods=["GET"],
         ),
+        Route(
+            "/v1/tasks/{task_id}/files",
+            require_api_key(services["api_key_service"])(
+                partial(
+                    v1_documents.task_files_endpoint,
+                    task_service=services["task_service"],
+                    session_manager=services["session_manager"],
+                )
+            ),
+            methods=["GET"],
+        ),
+        Route(
+            "/v1/tasks/{task_id}/events",
+            require_api_key(services["api_key_service"])(
+                partial(
+                    v1_documents.task_events_endpoint,
+                    task_service=services["task_service"],
+                    session_manager=services["session_manager"],
+                )
+            ),
+            methods=["GET"],
+        ),
         Route(
             "/v1/documents",
             require_api_key(services["api_key_service"])(
@@ -1569,6 +1658,13 @@ async def create_app():
         # Start periodic task cleanup scheduler
         services["task_service"].start_cleanup_scheduler()
 
+        # Start batched API key last_used_at writes
+        services["api_key_service"].start_last_used_flusher()
+
+        # Start write-behind flushing of session ownership
+        from services.session_ownership_service import session_ownership_service
+        session_ownership_service.start_flusher()
+
         # Start periodic flow backup task (every 5 minutes)
         async def periodic_backup():
             """Periodic backup task that runs every 15 minutes"""
@@ -1615,6 +1711,20 @@ async def create_app():
         await cleanup_subscriptions_proper(services)
         # Cleanup task service (cancels background tasks and process pool)
         await services["task_service"].shutdown()
+        # Flush pending API key last_used_at updates
+        await services["api_key_service"].shutdown()
+        # Close cached per-user OpenSearch clients
+        await services["session_manager"].close_user_opensearch_clients()
+        # Close the conversation store and flush session ownership
+        from services.conversation_persistence_service import conversation_persistence
+        conversation_persistence.close()
+        from services.session_ownership_service import session_ownership_service
+        await session_ownership_service.shutdown()
+        # Close the query embedding cache's disk layer
+        services["search_service"].embedding_cache.close()
+        # Close the shared Microsoft Graph client used by OneDrive/SharePoint
+        from connectors.graph_client import graph_client
+        await graph_client.close()
         # Cleanup async clients
         await clients.cleanup()
         # Cleanup telemetry client
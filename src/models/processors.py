@@ -1,5 +1,5 @@
 from typing import Any
-from .tasks import UploadTask, FileTask
+from .tasks import UploadTask, FileTask, TaskPriority
 from utils.logging_config import get_logger
 from utils.file_utils import get_file_extension, clean_connector_filename
 
@@ -9,9 +9,20 @@ logger = get_logger(__name__)
 class TaskProcessor:
     """Base class for task processors with shared processing logic"""
 
+    # Scheduling class for tasks using this processor
+    priority = TaskPriority.INTERACTIVE
+
     def __init__(self, document_service=None):
         self.document_service = document_service
 
+    def resume_spec(self) -> dict | None:
+        """
+        JSON-serializable description used to rebuild this processor after a
+        restart (see restore_processor). None means tasks using it cannot be
+        resumed. JWTs are deliberately left out and re-minted on resume.
+        """
+        return None
+
     async def check_document_exists(
         self,
         file_hash: str,
@@ -20,8 +31,10 @@ class TaskProcessor:
         """
         Check if a document with the given hash already exists in OpenSearch.
         Consolidated hash checking for all processors.
+
+        Uses the document manifest index, so this is a single GET by ID.
         """
-        from config.settings import get_index_name
+        from utils.document_manifest import document_exists
         import asyncio
 
         max_retries = 3
@@ -29,7 +42,7 @@ class TaskProcessor:
 
         for attempt in range(max_retries):
             try:
-                exists = await opensearch_client.exists(index=get_index_name(), id=file_hash)
+                exists = await document_exists(opensearch_client, file_hash)
                 return exists
             except (asyncio.TimeoutError, Exception) as e:
                 if attempt == max_retries - 1:
@@ -56,6 +69,29 @@ class TaskProcessor:
                     await asyncio.sleep(retry_delay)
                     retry_delay *= 2  # Exponential backoff
 
+    async def check_documents_exist(
+        self,
+        file_hashes: list,
+        opensearch_client,
+    ) -> set:
+        """
+        Return the subset of file_hashes that are already indexed.
+        Uses a single mget against the document manifest index, so connector
+        and bucket syncs can dedup a whole batch in one round trip.
+        """
+        from utils.document_manifest import existing_hashes
+
+        try:
+            return await existing_hashes(opensearch_client, file_hashes)
+        except Exception as e:
+            # Safer to reprocess than skip
+            logger.warning(
+                "OpenSearch manifest mget failed, assuming no documents exist",
+                hash_count=len(file_hashes),
+                error=str(e),
+            )
+            return set()
+
     async def check_filename_exists(
         self,
         filename: str,
@@ -120,6 +156,7 @@ class TaskProcessor:
         Delete all chunks of a document with the given filename from OpenSearch.
         """
         from config.settings import get_index_name
+        from utils.document_manifest import delete_manifest_by_filename
         from utils.opensearch_queries import build_filename_delete_body
 
         try:
@@ -132,6 +169,7 @@ class TaskProcessor:
             )
 
             deleted_count = response.get("deleted", 0)
+            await delete_manifest_by_filename(opensearch_client, filename)
             logger.info(
                 "Deleted existing document chunks",
                 filename=filename,
@@ -146,6 +184,23 @@ class TaskProcessor:
             )
             raise
 
+    async def _delete_partial_chunks(self, opensearch_client, file_hash: str) -> None:
+        """Delete the chunks of a document whose indexing failed part-way"""
+        from config.settings import get_index_name
+
+        try:
+            await opensearch_client.delete_by_query(
+                index=get_index_name(),
+                body={"query": {"term": {"document_id": file_hash}}},
+                conflicts="proceed",
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to remove partially indexed chunks",
+                file_hash=file_hash,
+                error=str(e),
+            )
+
     async def process_document_standard(
         self,
         file_path: str,
@@ -170,11 +225,26 @@ class TaskProcessor:
                 embedding model from settings)
             acl: DocumentACL instance with access control information
         """
+        import asyncio
         import datetime
-        from config.settings import clients, get_embedding_model, get_index_name
-        from services.document_service import chunk_texts_for_embeddings
-        from utils.document_processing import extract_relevant
+        import time
+        from config.settings import (
+            OPENSEARCH_BULK_MAX_BYTES,
+            OPENSEARCH_BULK_MAX_DOCS,
+            OPENSEARCH_BULK_MAX_RETRIES,
+            clients,
+            get_embedding_model,
+            get_index_name,
+            get_openrag_config,
+        )
+        from services.document_service import (
+            batch_chunks_for_embeddings,
+            get_embedding_semaphore,
+        )
+        from utils.adaptive_concurrency import OUTCOME_OK, OUTCOME_OVERLOADED, ingestion_limiter
         from utils.embedding_fields import get_embedding_field_name, ensure_embedding_field_exists
+        from utils.document_manifest import write_manifest
+        from utils.opensearch_bulk import BulkIndexError, bulk_index_documents
 
         # Use provided embedding model or fall back to default
         embedding_model = embedding_model or get_embedding_model()
@@ -217,25 +287,23 @@ class TaskProcessor:
             if original_filename:
                 slim_doc["filename"] = original_filename
         else:
-            # Convert and extract using docling for other file types
-            result = clients.converter.convert(file_path)
-            full_doc = result.document.export_to_dict()
-            slim_doc = extract_relevant(full_doc)
+            # Convert and extract using docling in the shared process pool
+            # so large documents don't block the event loop
+            slim_doc = await self.document_service.convert_document(file_path, file_hash)
+            # Override filename with original_filename if provided
+            if original_filename:
+                slim_doc["filename"] = original_filename
 
         texts = [c["text"] for c in slim_doc["chunks"]]
 
         # Split into batches to avoid token limits (8191 limit, use 8000 with buffer)
-        text_batches = chunk_texts_for_embeddings(texts, max_tokens=8000)
-        embeddings = []
-
-        for batch in text_batches:
-            resp = await clients.patched_embedding_client.embeddings.create(
-                model=embedding_model, input=batch
-            )
-            embeddings.extend([d.embedding for d in resp.data])
+        embedding_batches = batch_chunks_for_embeddings(
+            texts, max_tokens=8000, model=embedding_model
+        )
+        indexed_time = datetime.datetime.now().isoformat()
 
-        # Index each chunk as a separate document
-        for i, (chunk, vect) in enumerate(zip(slim_doc["chunks"], embeddings)):
+        def build_chunk_doc(i: int, vect: list) -> dict:
+            chunk = slim_doc["chunks"][i]
             chunk_doc = {
                 "document_id": file_hash,
                 "filename": original_filename
@@ -251,7 +319,9 @@ class TaskProcessor:
                 "embedding_dimensions": len(vect),
                 "file_size": file_size,
                 "connector_type": connector_type,
-                "indexed_time": datetime.datetime.now().isoformat(),
+                "indexed_time": indexed_time,
+                # Tells document_exists() this is not a pre-manifest document
+                "in_manifest": True,
             }
 
             # Set owner and ACL fields
@@ -276,19 +346,120 @@ class TaskProcessor:
             # Mark as sample data if specified
             if is_sample_data:
                 chunk_doc["is_sample_data"] = "true"
-            chunk_id = f"{file_hash}_{i}"
-            try:
-                await opensearch_client.index(
-                    index=get_index_name(), id=chunk_id, body=chunk_doc
-                )
-            except Exception as e:
-                logger.error(
-                    "OpenSearch indexing failed for chunk",
-                    chunk_id=chunk_id,
-                    error=str(e),
+
+            return chunk_doc
+
+        # Embed batches concurrently (bounded per provider) and bulk index each
+        # batch as soon as its embeddings arrive, instead of waiting for all of them
+        embedding_semaphore = get_embedding_semaphore(
+            get_openrag_config().knowledge.embedding_provider
+        )
+
+        async def embed_batch(batch):
+            async with embedding_semaphore:
+                started = time.monotonic()
+                try:
+                    resp = await clients.patched_embedding_client.embeddings.create(
+                        model=embedding_model, input=[text for _, text in batch]
+                    )
+                except Exception as e:
+                    ingestion_limiter.observe_exception("embedding", time.monotonic() - started, e)
+                    raise
+                ingestion_limiter.observe("embedding", time.monotonic() - started)
+            return [(i, d.embedding) for (i, _), d in zip(batch, resp.data)]
+
+        embed_tasks = [asyncio.create_task(embed_batch(batch)) for batch in embedding_batches]
+        indexed_chunks = 0
+        embedding_dimensions = None
+        bulk_attempted = False
+        try:
+            for next_batch in asyncio.as_completed(embed_tasks):
+                embedded = await next_batch
+                if embedded and embedding_dimensions is None:
+                    embedding_dimensions = len(embedded[0][1])
+
+                # Deterministic chunk IDs keep re-ingestion idempotent
+                bulk_started = time.monotonic()
+                bulk_attempted = True
+                try:
+                    bulk_result = await bulk_index_documents(
+                        opensearch_client,
+                        get_index_name(),
+                        ((f"{file_hash}_{i}", build_chunk_doc(i, vect)) for i, vect in embedded),
+                        max_docs=OPENSEARCH_BULK_MAX_DOCS,
+                        max_bytes=OPENSEARCH_BULK_MAX_BYTES,
+                        max_retries=OPENSEARCH_BULK_MAX_RETRIES,
+                    )
+                except BulkIndexError as e:
+                    ingestion_limiter.observe_exception(
+                        "opensearch_bulk", time.monotonic() - bulk_started, e
+                    )
+                    logger.error(
+                        "OpenSearch bulk indexing failed for document",
+                        file_hash=file_hash,
+                        failed_chunks=len(e.errors),
+                        errors=e.errors[:5],
+                    )
+                    raise
+                # Retried items mean the bulk queue pushed back (429) or timed out
+                ingestion_limiter.observe(
+                    "opensearch_bulk",
+                    time.monotonic() - bulk_started,
+                    OUTCOME_OVERLOADED if bulk_result.retries else OUTCOME_OK,
                 )
-                logger.error("Chunk document details", chunk_doc=chunk_doc)
-                raise
+                indexed_chunks += bulk_result.indexed
+        except BaseException:
+            # Remove the batches indexed so far; otherwise the partial
+            # document would be found by its first chunk and never redone
+            if bulk_attempted:
+                await self._delete_partial_chunks(opensearch_client, file_hash)
+            raise
+        finally:
+            # On failure, stop embedding the remaining batches
+            for task in embed_tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*embed_tasks, return_exceptions=True)
+
+        logger.debug(
+            "Indexed document chunks",
+            file_hash=file_hash,
+            chunks=indexed_chunks,
+            embedding_batches=len(embedding_batches),
+        )
+
+        # Record the document in the manifest index only after all chunks are
+        # indexed, so a partially indexed document is never treated as a duplicate
+        if acl:
+            manifest_owner = acl.owner if acl.owner else owner_user_id
+            manifest_users = acl.allowed_users
+            manifest_groups = acl.allowed_groups
+        else:
+            manifest_owner = owner_user_id
+            manifest_users = []
+            manifest_groups = []
+        try:
+            await write_manifest(
+                opensearch_client,
+                file_hash,
+                filename=original_filename or slim_doc["filename"],
+                chunk_count=indexed_chunks,
+                embedding_model=embedding_model,
+                mimetype=slim_doc["mimetype"],
+                embedding_dimensions=embedding_dimensions,
+                file_size=file_size,
+                connector_type=connector_type,
+                owner=manifest_owner,
+                allowed_users=manifest_users,
+                allowed_groups=manifest_groups,
+            )
+        except Exception as e:
+            # Chunks are indexed; a missing manifest only costs a re-embed later
+            logger.warning(
+                "Failed to write document manifest",
+                file_hash=file_hash,
+                error=str(e),
+            )
         return {"status": "indexed", "id": file_hash}
 
     async def process_item(
@@ -330,6 +501,17 @@ class DocumentFileProcessor(TaskProcessor):
         self.owner_name = owner_name
         self.owner_email = owner_email
         self.is_sample_data = is_sample_data
+        if is_sample_data:
+            self.priority = TaskPriority.BACKFILL
+
+    def resume_spec(self) -> dict:
+        return {
+            "type": "document",
+            "owner_user_id": self.owner_user_id,
+            "owner_name": self.owner_name,
+            "owner_email": self.owner_email,
+            "is_sample_data": self.is_sample_data,
+        }
 
     async def process_item(
         self, upload_task: UploadTask, item: str, file_task: FileTask
@@ -386,6 +568,8 @@ class DocumentFileProcessor(TaskProcessor):
 class ConnectorFileProcessor(TaskProcessor):
     """Processor for connector file uploads"""
 
+    priority = TaskPriority.CONNECTOR
+
     def __init__(
         self,
         connector_service,
@@ -406,15 +590,65 @@ class ConnectorFileProcessor(TaskProcessor):
         self.owner_name = owner_name
         self.owner_email = owner_email
 
+    def resume_spec(self) -> dict:
+        return {
+            "type": "connector",
+            "connection_id": self.connection_id,
+            "user_id": self.user_id,
+            "owner_name": self.owner_name,
+            "owner_email": self.owner_email,
+        }
+
+    async def _sync_unchanged_file(self, connector, file_id: str) -> dict | None:
+        """Result for a file already indexed at its remote version, else None
+
+        Compares the connector's get_file_version() with the connection's
+        sync state. If only the ACL changed, the indexed chunks get the new
+        ACL; the content is never downloaded.
+        """
+        from connectors.sync_state import connector_sync_state
+        from utils.acl_utils import compute_acl_hash, update_document_acl
+
+        state = await connector_sync_state.get(self.connection_id, file_id)
+        if state is None or state.version is None:
+            return None
+        remote = await connector.get_file_version(file_id)
+        if remote is None or remote.version != state.version:
+            return None
+
+        opensearch_client = self.document_service.session_manager.get_user_opensearch_client(
+            self.user_id, self.jwt_token
+        )
+        # The document may have been deleted from the index since
+        if not await self.check_document_exists(state.content_hash, opensearch_client):
+            return None
+
+        result = {"status": "unchanged", "id": state.content_hash, "document_id": file_id}
+        acl_hash = compute_acl_hash(remote.acl)
+        if acl_hash != state.acl_hash:
+            acl_result = await update_document_acl(
+                document_id=state.content_hash,
+                acl=remote.acl,
+                opensearch_client=opensearch_client,
+            )
+            if acl_result["status"] == "error":
+                raise RuntimeError(f"ACL update failed: {acl_result.get('error')}")
+            state.acl_hash = acl_hash
+            await connector_sync_state.put(self.connection_id, file_id, state)
+            connector_sync_state.record_outcome("acl_only_updates")
+            result.update(status="acl_updated", chunks_updated=acl_result["chunks_updated"])
+        else:
+            connector_sync_state.record_outcome("skipped_downloads")
+        return result
+
     async def process_item(
         self, upload_task: UploadTask, item: str, file_task: FileTask
     ) -> None:
         """Process a connector file using consolidated methods"""
+        from connectors.sync_state import FileSyncState, connector_sync_state
         from models.tasks import TaskStatus
-        from utils.hash_utils import hash_id
-        import tempfile
+        from utils.acl_utils import compute_acl_hash
         import time
-        import os
 
         file_task.status = TaskStatus.RUNNING
         file_task.updated_at = time.time()
@@ -430,37 +664,38 @@ class ConnectorFileProcessor(TaskProcessor):
             if not connector or not connection:
                 raise ValueError(f"Connection '{self.connection_id}' not found")
 
-            # Get file content from connector
+            if not self.user_id:
+                raise ValueError("user_id not provided to ConnectorFileProcessor")
+
+            # Files indexed at their current remote version are not downloaded again
+            result = await self._sync_unchanged_file(connector, file_id)
+            if result is not None:
+                file_task.status = TaskStatus.COMPLETED
+                file_task.result = result
+                file_task.updated_at = time.time()
+                upload_task.successful_files += 1
+                return
+
+            # Get file content from connector (spooled to a temp file and
+            # hashed while downloading)
             document = await connector.get_file_content(file_id)
+            connector_sync_state.record_outcome("downloads")
             
             # Update filename in task once we have it from the connector
             file_task.filename = clean_connector_filename(document.filename, document.mimetype)
 
-            if not self.user_id:
-                raise ValueError("user_id not provided to ConnectorFileProcessor")
-
-            # Create temporary file from document content
-            from utils.file_utils import auto_cleanup_tempfile
-
             suffix = get_file_extension(document.mimetype)
-            with auto_cleanup_tempfile(suffix=suffix) as tmp_path:
-                # Write content to temp file
-                with open(tmp_path, 'wb') as f:
-                    f.write(document.content)
-
-                # Compute hash
-                file_hash = hash_id(tmp_path)
-
+            with document.content_path(suffix=suffix) as tmp_path:
                 # Use consolidated standard processing
                 result = await self.process_document_standard(
                     file_path=tmp_path,
-                    file_hash=file_hash,
+                    file_hash=document.content_hash,
                     owner_user_id=self.user_id,
                     original_filename=document.filename,
                     jwt_token=self.jwt_token,
                     owner_name=self.owner_name,
                     owner_email=self.owner_email,
-                    file_size=len(document.content),
+                    file_size=document.size,
                     connector_type=connection.connector_type,
                     acl=document.acl,
                 )
@@ -471,6 +706,22 @@ class ConnectorFileProcessor(TaskProcessor):
                     "document_id": document.id,
                 })
 
+            # Content that was already indexed kept its old ACL; without an
+            # ACL hash the next sync brings it up to date
+            await connector_sync_state.put(
+                self.connection_id,
+                file_id,
+                FileSyncState(
+                    version=document.version,
+                    content_hash=document.content_hash,
+                    acl_hash=(
+                        compute_acl_hash(document.acl)
+                        if document.acl and result.get("status") == "indexed"
+                        else None
+                    ),
+                ),
+            )
+
             file_task.status = TaskStatus.COMPLETED
             file_task.result = result
             file_task.updated_at = time.time()
@@ -487,6 +738,8 @@ class ConnectorFileProcessor(TaskProcessor):
 class LangflowConnectorFileProcessor(TaskProcessor):
     """Processor for connector file uploads using Langflow"""
 
+    priority = TaskPriority.CONNECTOR
+
     def __init__(
         self,
         langflow_connector_service,
@@ -506,15 +759,21 @@ class LangflowConnectorFileProcessor(TaskProcessor):
         self.owner_name = owner_name
         self.owner_email = owner_email
 
+    def resume_spec(self) -> dict:
+        return {
+            "type": "langflow_connector",
+            "connection_id": self.connection_id,
+            "user_id": self.user_id,
+            "owner_name": self.owner_name,
+            "owner_email": self.owner_email,
+        }
+
     async def process_item(
         self, upload_task: UploadTask, item: str, file_task: FileTask
     ) -> None:
         """Process a connector file using LangflowConnectorService"""
         from models.tasks import TaskStatus
-        from utils.hash_utils import hash_id
-        import tempfile
         import time
-        import os
 
         file_task.status = TaskStatus.RUNNING
         file_task.updated_at = time.time()
@@ -534,28 +793,19 @@ class LangflowConnectorFileProcessor(TaskProcessor):
             if not connector or not connection:
                 raise ValueError(f"Connection '{self.connection_id}' not found")
 
-            # Get file content from connector
-            document = await connector.get_file_content(file_id)
-
-            # Update filename in task once we have it from the connector
-            file_task.filename = clean_connector_filename(document.filename, document.mimetype)
-
             if not self.user_id:
                 raise ValueError("user_id not provided to LangflowConnectorFileProcessor")
 
-            # Create temporary file and compute hash to check for duplicates
-            from utils.file_utils import auto_cleanup_tempfile
-
-            suffix = get_file_extension(document.mimetype)
-            with auto_cleanup_tempfile(suffix=suffix) as tmp_path:
-                # Write content to temp file
-                with open(tmp_path, 'wb') as f:
-                    f.write(document.content)
+            # Get file content from connector (spooled to a temp file and
+            # hashed while downloading)
+            document = await connector.get_file_content(file_id)
 
-                # Compute hash and check if already exists
-                file_hash = hash_id(tmp_path)
+            try:
+                # Update filename in task once we have it from the connector
+                file_task.filename = clean_connector_filename(document.filename, document.mimetype)
 
                 # Check if document already exists
+                file_hash = document.content_hash
                 opensearch_client = self.langflow_connector_service.session_manager.get_user_opensearch_client(
                     self.user_id, self.jwt_token
                 )
@@ -575,6 +825,8 @@ class LangflowConnectorFileProcessor(TaskProcessor):
                     owner_name=self.owner_name,
                     owner_email=self.owner_email,
                 )
+            finally:
+                document.close()
 
             file_task.status = TaskStatus.COMPLETED
             file_task.result = result
@@ -592,6 +844,8 @@ class LangflowConnectorFileProcessor(TaskProcessor):
 class S3FileProcessor(TaskProcessor):
     """Processor for files stored in S3 buckets"""
 
+    priority = TaskPriority.CONNECTOR
+
     def __init__(
         self,
         document_service,
@@ -612,6 +866,15 @@ class S3FileProcessor(TaskProcessor):
         self.owner_name = owner_name
         self.owner_email = owner_email
 
+    def resume_spec(self) -> dict:
+        return {
+            "type": "s3",
+            "bucket": self.bucket,
+            "owner_user_id": self.owner_user_id,
+            "owner_name": self.owner_name,
+            "owner_email": self.owner_email,
+        }
+
     async def process_item(
         self, upload_task: UploadTask, item: str, file_task: FileTask
     ) -> None:
@@ -704,6 +967,19 @@ class LangflowFileProcessor(TaskProcessor):
         self.delete_after_ingest = delete_after_ingest
         self.replace_duplicates = replace_duplicates
 
+    def resume_spec(self) -> dict:
+        return {
+            "type": "langflow_file",
+            "owner_user_id": self.owner_user_id,
+            "owner_name": self.owner_name,
+            "owner_email": self.owner_email,
+            "session_id": self.session_id,
+            "tweaks": self.tweaks,
+            "settings": self.settings,
+            "delete_after_ingest": self.delete_after_ingest,
+            "replace_duplicates": self.replace_duplicates,
+        }
+
     async def process_item(
         self, upload_task: UploadTask, item: str, file_task: FileTask
     ) -> None:
@@ -817,7 +1093,61 @@ class LangflowFileProcessor(TaskProcessor):
         except Exception as e:
             # Update task with failure
             file_task.status = TaskStatus.FAILED
-            file_task.error_message = str(e)
+            file_task.error = str(e)
             file_task.updated_at = time.time()
             upload_task.failed_files += 1
             raise
+
+
+def _resume_jwt_token(session_manager, user_id: str, name: str, email: str) -> str | None:
+    """Mint a fresh JWT for the owner of a resumed task"""
+    from config.settings import is_no_auth_mode
+    from session_manager import AnonymousUser, User
+
+    # Anonymous and no-auth tasks get their JWT from get_effective_jwt_token
+    if not user_id or user_id == AnonymousUser().user_id or is_no_auth_mode():
+        return None
+    return session_manager.create_jwt_token(User(user_id=user_id, email=email, name=name))
+
+
+def restore_processor(spec: dict, services: dict) -> TaskProcessor | None:
+    """Rebuild a processor from its resume_spec() when resuming a task after a restart"""
+    spec = dict(spec)
+    processor_type = spec.pop("type", None)
+    session_manager = services["session_manager"]
+    owner_id = spec.get("owner_user_id") or spec.get("user_id")
+    jwt_token = _resume_jwt_token(
+        session_manager, owner_id, spec.get("owner_name"), spec.get("owner_email")
+    )
+
+    if processor_type == "document":
+        return DocumentFileProcessor(services["document_service"], jwt_token=jwt_token, **spec)
+    if processor_type == "s3":
+        return S3FileProcessor(services["document_service"], jwt_token=jwt_token, **spec)
+    if processor_type == "langflow_file":
+        return LangflowFileProcessor(
+            langflow_file_service=services["langflow_file_service"],
+            session_manager=session_manager,
+            jwt_token=jwt_token,
+            **spec,
+        )
+
+    connector_router = services["connector_service"]
+    if processor_type == "connector":
+        return ConnectorFileProcessor(
+            connector_router.openrag_connector_service,
+            files_to_process=[],
+            jwt_token=jwt_token,
+            document_service=services["document_service"],
+            **spec,
+        )
+    if processor_type == "langflow_connector":
+        return LangflowConnectorFileProcessor(
+            connector_router.langflow_connector_service,
+            files_to_process=[],
+            jwt_token=jwt_token,
+            **spec,
+        )
+
+    logger.warning("Cannot restore unknown task processor type", processor_type=processor_type)
+    return None
@@ -1,8 +1,11 @@
 import itertools
 import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from enum import Enum
-from typing import ClassVar, Dict, Optional
+from enum import Enum, IntEnum
+from typing import ClassVar, Dict, Iterator, List, Optional, Tuple
 
 
 class TaskStatus(Enum):
@@ -12,22 +15,280 @@ class TaskStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+class TaskPriority(IntEnum):
+    """Scheduling class of a task; lower values get a larger share of workers"""
+
+    INTERACTIVE = 0  # user uploads
+    CONNECTOR = 1  # connector and bucket syncs
+    BACKFILL = 2  # sample data and other bulk loads
+
+
+_STATUSES = tuple(TaskStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+
 class FileTask:
-    file_path: str
-    status: TaskStatus = TaskStatus.PENDING
-    result: Optional[dict] = None
-    error: Optional[str] = None
-    retry_count: int = 0
-    created_at: float = field(default_factory=time.time)
-    updated_at: float = field(default_factory=time.time)
-    filename: Optional[str] = None  # Original filename for display
+    """State of one file of a task
+
+    A view of one row of a FileTaskTable, so a task keeps no per-file
+    objects. Standalone instances own a single-row table; adding them to a
+    task copies their state into the task's table.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(
+        self,
+        file_path: str,
+        status: TaskStatus = TaskStatus.PENDING,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+        retry_count: int = 0,
+        created_at: Optional[float] = None,
+        updated_at: Optional[float] = None,
+        filename: Optional[str] = None,  # Original filename for display
+    ):
+        self._table = FileTaskTable()
+        self._row = self._table._append(
+            file_path, file_path, status, result, error, retry_count, created_at, updated_at, filename
+        )
+
+    @classmethod
+    def _view(cls, table: "FileTaskTable", row: int) -> "FileTask":
+        view = cls.__new__(cls)
+        view._table = table
+        view._row = row
+        return view
+
+    @property
+    def file_path(self) -> str:
+        return self._table._file_path(self._row)
+
+    @property
+    def status(self) -> TaskStatus:
+        return _STATUSES[self._table._status[self._row]]
+
+    @status.setter
+    def status(self, status: TaskStatus) -> None:
+        self._table._set_status(self._row, status)
+
+    @property
+    def result(self) -> Optional[dict]:
+        return self._table._results.get(self._row)
+
+    @result.setter
+    def result(self, result: Optional[dict]) -> None:
+        _set_sparse(self._table._results, self._row, result)
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._table._errors.get(self._row)
+
+    @error.setter
+    def error(self, error: Optional[str]) -> None:
+        self._table._set_error(self._row, error)
+
+    @property
+    def retry_count(self) -> int:
+        return self._table._retry_count[self._row]
+
+    @retry_count.setter
+    def retry_count(self, retry_count: int) -> None:
+        self._table._retry_count[self._row] = retry_count
+
+    @property
+    def created_at(self) -> float:
+        return self._table._created_at[self._row]
+
+    @created_at.setter
+    def created_at(self, created_at: float) -> None:
+        self._table._created_at[self._row] = created_at
+
+    @property
+    def updated_at(self) -> float:
+        return self._table._updated_at[self._row]
+
+    @updated_at.setter
+    def updated_at(self, updated_at: float) -> None:
+        self._table._updated_at[self._row] = updated_at
+
+    @property
+    def filename(self) -> Optional[str]:
+        return self._table._filenames.get(self._row)
+
+    @filename.setter
+    def filename(self, filename: Optional[str]) -> None:
+        _set_sparse(self._table._filenames, self._row, filename)
 
     @property
     def duration_seconds(self) -> float:
         """Duration in seconds from creation to last update"""
         return self.updated_at - self.created_at
 
+    def __repr__(self) -> str:
+        return (
+            f"FileTask(file_path={self.file_path!r}, status={self.status}, "
+            f"error={self.error!r}, filename={self.filename!r})"
+        )
+
+
+def _set_sparse(values: dict, row: int, value) -> None:
+    if value is None:
+        values.pop(row, None)
+    else:
+        values[row] = value
+
+
+class FileTaskTable(Mapping):
+    """Per-file state of a task, stored column-wise and keyed by file key
+
+    Statuses, timestamps and retry counts live in compact arrays; results,
+    errors and display names are stored only for the files that have one.
+    Per-status counts and the most recent failures are maintained on every
+    change, so task summaries never walk the files. Rows keep insertion
+    order and are never removed, which makes a row index a stable cursor.
+    """
+
+    __slots__ = (
+        "_rows",
+        "_keys",
+        "_paths",
+        "_status",
+        "_retry_count",
+        "_created_at",
+        "_updated_at",
+        "_results",
+        "_errors",
+        "_filenames",
+        "_status_counts",
+        "_recent_failures",
+    )
+
+    # Number of most recent failures kept for task summaries
+    RECENT_FAILURES = 10
+
+    def __init__(self, file_tasks: Optional[Mapping[str, FileTask]] = None):
+        self._rows: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._paths: Dict[int, str] = {}  # only when the path differs from the key
+        self._status = bytearray()
+        self._retry_count = array("I")
+        self._created_at = array("d")
+        self._updated_at = array("d")
+        self._results: Dict[int, dict] = {}
+        self._errors: Dict[int, str] = {}
+        self._filenames: Dict[int, str] = {}
+        self._status_counts = [0] * len(_STATUSES)
+        self._recent_failures: "OrderedDict[int, None]" = OrderedDict()
+        if file_tasks:
+            for key, file_task in file_tasks.items():
+                self.add(key, file_task)
+
+    def add(self, key: str, file_task: FileTask) -> FileTask:
+        """Copy a file's state into the table and return its view"""
+        self._append(
+            key,
+            file_task.file_path,
+            file_task.status,
+            file_task.result,
+            file_task.error,
+            file_task.retry_count,
+            file_task.created_at,
+            file_task.updated_at,
+            file_task.filename,
+        )
+        return self[key]
+
+    def _append(
+        self,
+        key: str,
+        file_path: str,
+        status: TaskStatus,
+        result: Optional[dict],
+        error: Optional[str],
+        retry_count: int,
+        created_at: Optional[float],
+        updated_at: Optional[float],
+        filename: Optional[str],
+    ) -> int:
+        if key in self._rows:
+            raise KeyError(f"Duplicate file key: {key}")
+        now = time.time()
+        row = len(self._keys)
+        self._rows[key] = row
+        self._keys.append(key)
+        if file_path != key:
+            self._paths[row] = file_path
+        code = _STATUS_CODES[status]
+        self._status.append(code)
+        self._status_counts[code] += 1
+        self._retry_count.append(retry_count)
+        self._created_at.append(now if created_at is None else created_at)
+        self._updated_at.append(now if updated_at is None else updated_at)
+        _set_sparse(self._results, row, result)
+        _set_sparse(self._filenames, row, filename)
+        self._set_error(row, error)
+        if status == TaskStatus.FAILED:
+            self._note_failure(row)
+        return row
+
+    def _file_path(self, row: int) -> str:
+        return self._paths.get(row) or self._keys[row]
+
+    def _set_status(self, row: int, status: TaskStatus) -> None:
+        code = _STATUS_CODES[status]
+        old_code = self._status[row]
+        if code == old_code:
+            return
+        self._status[row] = code
+        self._status_counts[old_code] -= 1
+        self._status_counts[code] += 1
+        if status == TaskStatus.FAILED:
+            self._note_failure(row)
+
+    def _set_error(self, row: int, error: Optional[str]) -> None:
+        _set_sparse(self._errors, row, error)
+        if error and self._status[row] == _STATUS_CODES[TaskStatus.FAILED]:
+            self._note_failure(row)
+
+    def _note_failure(self, row: int) -> None:
+        self._recent_failures[row] = None
+        self._recent_failures.move_to_end(row)
+        while len(self._recent_failures) > self.RECENT_FAILURES:
+            self._recent_failures.popitem(last=False)
+
+    def __getitem__(self, key: str) -> FileTask:
+        return FileTask._view(self, self._rows[key])
+
+    def __contains__(self, key) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def count(self, status: TaskStatus) -> int:
+        """Number of files in a status, O(1)"""
+        return self._status_counts[_STATUS_CODES[status]]
+
+    def row(self, row: int) -> Tuple[str, FileTask]:
+        """File key and state at a row index"""
+        return self._keys[row], FileTask._view(self, row)
+
+    def find(self, status: Optional[TaskStatus] = None, start: int = 0) -> int:
+        """Index of the first row at or after start with the status, or -1"""
+        if start >= len(self._keys):
+            return -1
+        if status is None:
+            return start
+        return self._status.find(_STATUS_CODES[status], start)
+
+    def recent_failures(self) -> List[Tuple[str, FileTask]]:
+        """Most recently failed files, newest first"""
+        return [self.row(row) for row in reversed(self._recent_failures)]
+
 
 @dataclass
 class UploadTask:
@@ -38,13 +299,20 @@ class UploadTask:
     processed_files: int = 0
     successful_files: int = 0
     failed_files: int = 0
-    file_tasks: Dict[str, FileTask] = field(default_factory=dict)
+    file_tasks: FileTaskTable = field(default_factory=FileTaskTable)
     status: TaskStatus = TaskStatus.PENDING
     created_at: float = field(default_factory=time.time)
     updated_at: float = field(default_factory=time.time)
+    priority: TaskPriority = TaskPriority.INTERACTIVE
+    # Task-level failure not tied to one file (e.g. listing a connector failed)
+    error: Optional[str] = None
+    # Items are still being listed into this (streaming) task
+    listing: bool = False
     _sequence_number: int = field(init=False, repr=False)
 
     def __post_init__(self):
+        if not isinstance(self.file_tasks, FileTaskTable):
+            self.file_tasks = FileTaskTable(self.file_tasks)
         self._sequence_number = next(UploadTask._id_counter)
 
     @property
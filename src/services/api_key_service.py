@@ -1,22 +1,153 @@
 """
 API Key Service for managing user API keys for public API authentication.
 """
+import asyncio
 import hashlib
+import json
 import secrets
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from config.settings import API_KEYS_INDEX_NAME
+from config.settings import (
+    API_KEY_CACHE_MAX,
+    API_KEY_CACHE_TTL,
+    API_KEY_LAST_USED_FLUSH_INTERVAL,
+    API_KEYS_INDEX_NAME,
+)
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# How long a revoked or deleted key is refused even if a lookup still finds it
+_REVOKED_KEY_GRACE_SECONDS = 60
+
 
 class APIKeyService:
     """Service for managing user API keys for public API authentication."""
 
     def __init__(self, session_manager=None):
         self.session_manager = session_manager
+        # key_hash -> (cached_at, key info), least recently used first
+        self._validated_keys: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # key_id -> last_used_at waiting for the next batched flush
+        self._pending_last_used: Dict[str, str] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # key_id -> monotonic expiry; revoked or deleted keys that lookups
+        # already in flight must neither return nor cache
+        self._revoked_key_ids: Dict[str, float] = {}
+        self._cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "flushed": 0}
+
+    def start_last_used_flusher(self) -> None:
+        """Start the periodic last_used_at flush task.
+
+        Should be called once after the event loop is running (e.g., during app startup).
+        """
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._periodic_flush())
+            logger.info(
+                "Started API key last_used_at flusher",
+                interval_seconds=API_KEY_LAST_USED_FLUSH_INTERVAL,
+            )
+
+    async def _periodic_flush(self) -> None:
+        """Periodically write coalesced last_used_at timestamps."""
+        while True:
+            try:
+                await asyncio.sleep(API_KEY_LAST_USED_FLUSH_INTERVAL)
+                await self.flush_last_used()
+            except asyncio.CancelledError:
+                logger.debug("API key last_used_at flusher cancelled")
+                raise
+            except Exception as e:
+                logger.warning("Error flushing API key last_used_at", error=str(e))
+
+    async def flush_last_used(self) -> int:
+        """Write pending last_used_at values in a single bulk request"""
+        if not self._pending_last_used:
+            return 0
+
+        pending, self._pending_last_used = self._pending_last_used, {}
+        lines = []
+        for key_id, last_used_at in pending.items():
+            lines.append(json.dumps({"update": {"_index": API_KEYS_INDEX_NAME, "_id": key_id}}))
+            lines.append(json.dumps({"doc": {"last_used_at": last_used_at}}))
+
+        from config.settings import clients
+
+        try:
+            await clients.opensearch.bulk(body="\n".join(lines) + "\n")
+        except Exception as e:
+            # Keep the timestamps for the next attempt unless newer ones arrived
+            for key_id, last_used_at in pending.items():
+                self._pending_last_used.setdefault(key_id, last_used_at)
+            logger.warning("Failed to flush API key last_used_at", error=str(e))
+            return 0
+
+        # Items for keys deleted meanwhile fail with 404 and are simply dropped
+        self._cache_stats["flushed"] += len(pending)
+        return len(pending)
+
+    async def shutdown(self) -> None:
+        """Stop the flusher and write any pending last_used_at values"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush_last_used()
+
+    def _get_cached_key(self, key_hash: str) -> Optional[Dict[str, Any]]:
+        entry = self._validated_keys.get(key_hash)
+        if entry is None:
+            return None
+        cached_at, key_info = entry
+        if time.monotonic() - cached_at > API_KEY_CACHE_TTL:
+            del self._validated_keys[key_hash]
+            return None
+        self._validated_keys.move_to_end(key_hash)
+        return key_info
+
+    def _cache_key(self, key_hash: str, key_info: Dict[str, Any]) -> None:
+        if API_KEY_CACHE_TTL <= 0 or self._is_revoked(key_info["key_id"]):
+            return
+        self._validated_keys[key_hash] = (time.monotonic(), key_info)
+        self._validated_keys.move_to_end(key_hash)
+        while len(self._validated_keys) > API_KEY_CACHE_MAX:
+            self._validated_keys.popitem(last=False)
+
+    def _is_revoked(self, key_id: str) -> bool:
+        expires_at = self._revoked_key_ids.get(key_id)
+        return expires_at is not None and time.monotonic() < expires_at
+
+    def invalidate_key(self, key_id: str) -> None:
+        """Drop a key from the validation cache so revocation applies immediately
+
+        The key is also refused for a short grace period, so a lookup that
+        read it before the revocation was written neither returns nor caches it.
+        """
+        now = time.monotonic()
+        self._revoked_key_ids = {
+            revoked_id: expires_at
+            for revoked_id, expires_at in self._revoked_key_ids.items()
+            if expires_at > now
+        }
+        self._revoked_key_ids[key_id] = now + _REVOKED_KEY_GRACE_SECONDS
+        for key_hash, (_, key_info) in list(self._validated_keys.items()):
+            if key_info["key_id"] == key_id:
+                del self._validated_keys[key_hash]
+                self._cache_stats["invalidations"] += 1
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Validation cache and last_used_at flush counters"""
+        return {
+            "cached_keys": len(self._validated_keys),
+            "ttl_seconds": API_KEY_CACHE_TTL,
+            "pending_last_used": len(self._pending_last_used),
+            **self._cache_stats,
+        }
 
     def _generate_api_key(self) -> tuple[str, str, str]:
         """
@@ -139,6 +270,13 @@ class APIKeyService:
             # Hash the incoming key
             key_hash = self._hash_key(api_key)
 
+            key_info = self._get_cached_key(key_hash)
+            if key_info is not None:
+                self._cache_stats["hits"] += 1
+                self._pending_last_used[key_info["key_id"]] = datetime.utcnow().isoformat()
+                return dict(key_info)
+            self._cache_stats["misses"] += 1
+
             # Get OpenSearch client
             from config.settings import clients
             opensearch_client = clients.opensearch
@@ -166,27 +304,21 @@ class APIKeyService:
                 return None
 
             key_doc = hits[0]["_source"]
+            # Revoked while this search was in flight
+            if self._is_revoked(key_doc["key_id"]):
+                return None
 
-            # Update last_used_at (fire and forget)
-            try:
-                await opensearch_client.update(
-                    index=API_KEYS_INDEX_NAME,
-                    id=key_doc["key_id"],
-                    body={
-                        "doc": {
-                            "last_used_at": datetime.utcnow().isoformat()
-                        }
-                    },
-                )
-            except Exception:
-                pass  # Don't fail validation if update fails
+            # Record last_used_at; written by the periodic batched flush
+            self._pending_last_used[key_doc["key_id"]] = datetime.utcnow().isoformat()
 
-            return {
+            key_info = {
                 "key_id": key_doc["key_id"],
                 "user_id": key_doc["user_id"],
                 "user_email": key_doc["user_email"],
                 "name": key_doc["name"],
             }
+            self._cache_key(key_hash, key_info)
+            return dict(key_info)
 
         except Exception as e:
             logger.error("Failed to validate API key", error=str(e))
@@ -279,6 +411,9 @@ class APIKeyService:
             except Exception:
                 return {"success": False, "error": "Key not found"}
 
+            # Stop accepting the key from the cache before the update lands
+            self.invalidate_key(key_id)
+
             # Update the key to mark as revoked
             result = await opensearch_client.update(
                 index=API_KEYS_INDEX_NAME,
@@ -345,6 +480,9 @@ class APIKeyService:
             except Exception:
                 return {"success": False, "error": "Key not found"}
 
+            self.invalidate_key(key_id)
+            self._pending_last_used.pop(key_id, None)
+
             # Delete the key
             result = await opensearch_client.delete(
                 index=API_KEYS_INDEX_NAME,
@@ -358,9 +358,65 @@ class ChatService:
 
         return response_text, response_id
 
+    def _chat_history_entry(self, response_id: str, conversation_state: dict, source: str):
+        """History entry of a conversation thread, or None if it has no messages yet"""
+        # Filter out system messages
+        messages = []
+        for msg in conversation_state.get("messages", []):
+            if msg.get("role") in ["user", "assistant"]:
+                message_data = {
+                    "role": msg["role"],
+                    "content": msg["content"],
+                    "timestamp": msg.get("timestamp").isoformat()
+                    if msg.get("timestamp")
+                    else None,
+                }
+                if msg.get("response_id"):
+                    message_data["response_id"] = msg["response_id"]
+
+                # Include function call data if present
+                if msg.get("chunks"):
+                    message_data["chunks"] = msg["chunks"]
+                if msg.get("response_data"):
+                    message_data["response_data"] = msg["response_data"]
+
+                messages.append(message_data)
+
+        if not messages:  # Only include conversations with actual messages
+            return None
+
+        # Generate title from first user message
+        first_user_msg = next((msg for msg in messages if msg["role"] == "user"), None)
+        title = (
+            first_user_msg["content"][:50] + "..."
+            if first_user_msg and len(first_user_msg["content"]) > 50
+            else first_user_msg["content"]
+            if first_user_msg
+            else "New chat"
+        )
+
+        return {
+            "response_id": response_id,
+            "title": title,
+            "endpoint": "chat",
+            "messages": messages,
+            "created_at": conversation_state.get("created_at").isoformat()
+            if conversation_state.get("created_at")
+            else None,
+            "last_activity": conversation_state.get("last_activity").isoformat()
+            if conversation_state.get("last_activity")
+            else None,
+            "previous_response_id": conversation_state.get("previous_response_id"),
+            "filter_id": conversation_state.get("filter_id"),
+            "total_messages": len(messages),
+            "source": source,
+        }
+
     async def get_chat_history(self, user_id: str):
         """Get chat conversation history for a user"""
         from agent import active_conversations, get_user_conversations
+        from services.conversation_persistence_service import conversation_persistence
+        from utils.conversation_cache import restore_thread_datetimes
 
         if not user_id:
             return {"error": "User ID is required", "conversations": []}
@@ -369,7 +425,7 @@ class ChatService:
         conversations_dict = get_user_conversations(user_id)
 
         # Get in-memory conversations (with function calls)
-        in_memory_conversations = active_conversations.get(user_id, {})
+        in_memory_conversations = active_conversations.get_user_threads(user_id)
 
         logger.debug(
             "Getting chat history for user",
@@ -383,82 +439,52 @@ class ChatService:
 
         # First, process in-memory conversations (they have function calls)
         for response_id, conversation_state in in_memory_conversations.items():
-            # Filter out system messages
-            messages = []
-            for msg in conversation_state.get("messages", []):
-                if msg.get("role") in ["user", "assistant"]:
-                    message_data = {
-                        "role": msg["role"],
-                        "content": msg["content"],
-                        "timestamp": msg.get("timestamp").isoformat()
-                        if msg.get("timestamp")
-                        else None,
-                    }
-                    if msg.get("response_id"):
-                        message_data["response_id"] = msg["response_id"]
-
-                    # Include function call data if present
-                    if msg.get("chunks"):
-                        message_data["chunks"] = msg["chunks"]
-                    if msg.get("response_data"):
-                        message_data["response_data"] = msg["response_data"]
-
-                    messages.append(message_data)
-
-            if messages:  # Only include conversations with actual messages
-                # Generate title from first user message
-                first_user_msg = next(
-                    (msg for msg in messages if msg["role"] == "user"), None
-                )
-                title = (
-                    first_user_msg["content"][:50] + "..."
-                    if first_user_msg and len(first_user_msg["content"]) > 50
-                    else first_user_msg["content"]
-                    if first_user_msg
-                    else "New chat"
+            entry = self._chat_history_entry(response_id, conversation_state, "in_memory")
+            if entry:
+                conversations.append(entry)
+
+        # Threads evicted from the conversation cache were spilled with their messages
+        spilled_states = {}
+        if any(response_id not in in_memory_conversations for response_id in conversations_dict):
+            try:
+                spilled_states = await conversation_persistence.load_user_thread_states(
+                    user_id, exclude=in_memory_conversations
                 )
-
-                conversations.append(
-                    {
-                        "response_id": response_id,
-                        "title": title,
-                        "endpoint": "chat",
-                        "messages": messages,
-                        "created_at": conversation_state.get("created_at").isoformat()
-                        if conversation_state.get("created_at")
-                        else None,
-                        "last_activity": conversation_state.get(
-                            "last_activity"
-                        ).isoformat()
-                        if conversation_state.get("last_activity")
-                        else None,
-                        "previous_response_id": conversation_state.get(
-                            "previous_response_id"
-                        ),
-                        "filter_id": conversation_state.get("filter_id"),
-                        "total_messages": len(messages),
-                        "source": "in_memory",
-                    }
+            except Exception as e:
+                logger.warning(
+                    "Failed to load spilled conversations",
+                    user_id=user_id,
+                    error=str(e),
                 )
 
         # Then, add any persistent metadata that doesn't have in-memory data
         for response_id, metadata in conversations_dict.items():
-            if response_id not in in_memory_conversations:
-                # This is metadata-only conversation (no function calls)
-                conversations.append(
-                    {
-                        "response_id": response_id,
-                        "title": metadata.get("title", "New Chat"),
-                        "endpoint": "chat",
-                        "messages": [],  # No messages in metadata-only
-                        "created_at": metadata.get("created_at"),
-                        "last_activity": metadata.get("last_activity"),
-                        "previous_response_id": metadata.get("previous_response_id"),
-                        "filter_id": metadata.get("filter_id"),
-                        "total_messages": metadata.get("total_messages", 0),
-                        "source": "metadata_only",
-                    }
+            if response_id in in_memory_conversations:
+                continue
+            spilled_state = spilled_states.get(response_id)
+            if spilled_state is not None:
+                entry = self._chat_history_entry(
+                    response_id, restore_thread_datetimes(spilled_state), "spilled"
                 )
+                if entry:
+                    conversations.append(entry)
+                continue
+
+            # This is metadata-only conversation (no function calls)
+            conversations.append(
+                {
+                    "response_id": response_id,
+                    "title": metadata.get("title", "New Chat"),
+                    "endpoint": "chat",
+                    "messages": [],  # No messages in metadata-only
+                    "created_at": metadata.get("created_at"),
+                    "last_activity": metadata.get("last_activity"),
+                    "previous_response_id": metadata.get("previous_response_id"),
+                    "filter_id": metadata.get("filter_id"),
+                    "total_messages": metadata.get("total_messages", 0),
+                    "source": "metadata_only",
+                }
+            )
 
         # Sort by last activity (most recent first)
         conversations.sort(key=lambda c: c.get("last_activity", ""), reverse=True)
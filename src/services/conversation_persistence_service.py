@@ -1,71 +1,153 @@
 """
 Conversation Persistence Service
-Simple service to persist chat conversations to disk so they survive server restarts
+Persists chat conversation metadata so it survives server restarts.
+
+Conversations used to live in one JSON file that was rewritten in full on
+every message, so write cost grew with the total history of every user.
+They are now rows of a WAL-mode SQLite database keyed by (user_id,
+response_id): storing a message upserts one row and listing a user's
+conversations is an indexed range read. An existing conversations.json is
+imported once on first use and renamed to conversations.json.migrated.
+
+Full thread state (messages and function-call data) evicted from the
+in-memory conversation cache is spilled to a second table and read back
+when the conversation continues.
 """
 
 import json
 import os
 import asyncio
-from typing import Dict, Any
-from datetime import datetime
+import sqlite3
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Optional, Tuple
+from datetime import datetime
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+
 class ConversationPersistenceService:
-    """Simple service to persist conversations to disk"""
+    """Persists conversations in a local SQLite database"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        legacy_json_file: str = "data/conversations.json",
+    ):
+        if db_path is None:
+            from config.settings import CONVERSATION_STORE_PATH
 
-    def __init__(self, storage_file: str = "data/conversations.json"):
-        self.storage_file = storage_file
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(self.storage_file), exist_ok=True)
+            db_path = CONVERSATION_STORE_PATH
+        self.db_path = db_path
+        self.legacy_json_file = legacy_json_file
         self.lock = threading.Lock()
-        self._conversations = self._load_conversations()
-    
-    def _load_conversations(self) -> Dict[str, Dict[str, Any]]:
-        """Load conversations from disk"""
-        if os.path.exists(self.storage_file):
-            try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    logger.debug(f"Loaded {self._count_total_conversations(data)} conversations from {self.storage_file}")
-                    return data
-            except Exception as e:
-                logger.error(f"Error loading conversations from {self.storage_file}: {e}")
-                return {}
-        return {}
-    
-    def _save_conversations_sync(self):
-        """Synchronous save conversations to disk (runs in executor)"""
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        # Writes go through one thread so they stay ordered and off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-store")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _ensure_initialized(self):
+        """Open the database on first use and import the legacy JSON file once"""
+        if self._read_conn is not None:
+            return
+        with self.lock:
+            if self._read_conn is not None:
+                return
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            write_conn = self._connect()
+            write_conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS conversations (
+                    user_id TEXT NOT NULL,
+                    response_id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    last_activity TEXT,
+                    PRIMARY KEY (user_id, response_id)
+                )
+                """
+            )
+            write_conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS conversation_threads (
+                    user_id TEXT NOT NULL,
+                    response_id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (user_id, response_id)
+                )
+                """
+            )
+            write_conn.commit()
+            self._migrate_legacy_json(write_conn)
+            self._write_conn = write_conn
+            self._read_conn = self._connect()
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection):
+        if not self.legacy_json_file or not os.path.exists(self.legacy_json_file):
+            return
         try:
-            with self.lock:
-                with open(self.storage_file, 'w', encoding='utf-8') as f:
-                    json.dump(self._conversations, f, indent=2, ensure_ascii=False, default=str)
-                logger.debug(f"Saved {self._count_total_conversations(self._conversations)} conversations to {self.storage_file}")
+            with open(self.legacy_json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rows = [
+                (user_id, response_id, json.dumps(conversation, default=str), conversation.get('last_activity'))
+                for user_id, user_conversations in data.items()
+                if isinstance(user_conversations, dict)
+                for response_id, conversation in user_conversations.items()
+                if isinstance(conversation, dict)
+            ]
+            with conn:
+                # INSERT OR IGNORE keeps anything written after an interrupted migration
+                conn.executemany(
+                    "INSERT OR IGNORE INTO conversations (user_id, response_id, data, last_activity) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            os.replace(self.legacy_json_file, self.legacy_json_file + ".migrated")
+            logger.info(f"Migrated {len(rows)} conversations from {self.legacy_json_file} to {self.db_path}")
         except Exception as e:
-            logger.error(f"Error saving conversations to {self.storage_file}: {e}")
-    
-    async def _save_conversations(self):
-        """Async save conversations to disk (non-blocking)"""
-        # Run the synchronous file I/O in a thread pool to avoid blocking the event loop
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._save_conversations_sync)
-    
-    def _count_total_conversations(self, data: Dict[str, Any]) -> int:
-        """Count total conversations across all users"""
-        total = 0
-        for user_conversations in data.values():
-            if isinstance(user_conversations, dict):
-                total += len(user_conversations)
-        return total
-    
+            logger.error(f"Error migrating conversations from {self.legacy_json_file}: {e}")
+
+    async def _write(self, sql: str, params: tuple, *more: Tuple[str, tuple]) -> int:
+        """Run write statements in one transaction on the writer thread
+
+        Returns the row count affected by the first statement.
+        """
+        self._ensure_initialized()
+
+        def write_sync():
+            with self._write_conn:
+                rowcount = self._write_conn.execute(sql, params).rowcount
+                for extra_sql, extra_params in more:
+                    self._write_conn.execute(extra_sql, extra_params)
+                return rowcount
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, write_sync)
+
+    def _read(self, sql: str, params: tuple = ()) -> list:
+        self._ensure_initialized()
+        with self.lock:
+            return self._read_conn.execute(sql, params).fetchall()
+
     def get_user_conversations(self, user_id: str) -> Dict[str, Any]:
         """Get all conversations for a user"""
-        if user_id not in self._conversations:
-            self._conversations[user_id] = {}
-        return self._conversations[user_id]
-    
+        try:
+            rows = self._read(
+                "SELECT response_id, data FROM conversations WHERE user_id = ?", (user_id,)
+            )
+        except Exception as e:
+            logger.error(f"Error loading conversations for user {user_id}: {e}")
+            return {}
+        return {response_id: json.loads(data) for response_id, data in rows}
+
     def _serialize_datetime(self, obj: Any) -> Any:
         """Recursively convert datetime objects to ISO strings for JSON serialization"""
         if isinstance(obj, datetime):
@@ -76,64 +158,133 @@ class ConversationPersistenceService:
             return [self._serialize_datetime(item) for item in obj]
         else:
             return obj
-    
+
     async def store_conversation_thread(self, user_id: str, response_id: str, conversation_state: Dict[str, Any]):
         """Store a conversation thread and persist to disk (async, non-blocking)"""
-        if user_id not in self._conversations:
-            self._conversations[user_id] = {}
-        
         # Recursively convert datetime objects to strings for JSON serialization
         serialized_conversation = self._serialize_datetime(conversation_state)
-        
-        self._conversations[user_id][response_id] = serialized_conversation
-        
-        # Save to disk asynchronously (non-blocking)
-        await self._save_conversations()
-    
+
+        try:
+            await self._write(
+                "INSERT OR REPLACE INTO conversations (user_id, response_id, data, last_activity) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    user_id,
+                    response_id,
+                    json.dumps(serialized_conversation, ensure_ascii=False, default=str),
+                    serialized_conversation.get('last_activity'),
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Error saving conversation {response_id} for user {user_id}: {e}")
+
     def get_conversation_thread(self, user_id: str, response_id: str) -> Dict[str, Any]:
         """Get a specific conversation thread"""
-        user_conversations = self.get_user_conversations(user_id)
-        return user_conversations.get(response_id, {})
-    
+        try:
+            rows = self._read(
+                "SELECT data FROM conversations WHERE user_id = ? AND response_id = ?",
+                (user_id, response_id),
+            )
+        except Exception as e:
+            logger.error(f"Error loading conversation {response_id} for user {user_id}: {e}")
+            return {}
+        return json.loads(rows[0][0]) if rows else {}
+
+    async def store_thread_state(self, user_id: str, response_id: str, thread_state: Dict[str, Any]):
+        """Spill the full state of a thread evicted from the conversation cache"""
+        await self._write(
+            "INSERT OR REPLACE INTO conversation_threads (user_id, response_id, data) VALUES (?, ?, ?)",
+            (
+                user_id,
+                response_id,
+                json.dumps(self._serialize_datetime(thread_state), ensure_ascii=False, default=str),
+            ),
+        )
+
+    def load_thread_state(self, user_id: str, response_id: str) -> Optional[Dict[str, Any]]:
+        """Read back a spilled thread state, or None if it was never spilled"""
+        rows = self._read(
+            "SELECT data FROM conversation_threads WHERE user_id = ? AND response_id = ?",
+            (user_id, response_id),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    async def load_user_thread_states(
+        self, user_id: str, exclude: Iterable[str] = ()
+    ) -> Dict[str, Dict[str, Any]]:
+        """Read back all spilled thread states of a user in one query, off the event loop
+
+        Threads whose response_id is in exclude are skipped without decoding.
+        """
+        skip = set(exclude)
+
+        def load_sync():
+            rows = self._read(
+                "SELECT response_id, data FROM conversation_threads WHERE user_id = ?",
+                (user_id,),
+            )
+            return {
+                response_id: json.loads(data)
+                for response_id, data in rows
+                if response_id not in skip
+            }
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, load_sync)
+
     async def delete_conversation_thread(self, user_id: str, response_id: str) -> bool:
         """Delete a specific conversation thread (async, non-blocking)"""
-        if user_id in self._conversations and response_id in self._conversations[user_id]:
-            del self._conversations[user_id][response_id]
-            await self._save_conversations()
+        deleted = await self._write(
+            "DELETE FROM conversations WHERE user_id = ? AND response_id = ?",
+            (user_id, response_id),
+            (
+                "DELETE FROM conversation_threads WHERE user_id = ? AND response_id = ?",
+                (user_id, response_id),
+            ),
+        )
+        if deleted:
             logger.debug(f"Deleted conversation {response_id} for user {user_id}")
             return True
         return False
-    
+
     async def clear_user_conversations(self, user_id: str):
         """Clear all conversations for a user (async, non-blocking)"""
-        if user_id in self._conversations:
-            del self._conversations[user_id]
-            await self._save_conversations()
+        deleted = await self._write(
+            "DELETE FROM conversations WHERE user_id = ?",
+            (user_id,),
+            ("DELETE FROM conversation_threads WHERE user_id = ?", (user_id,)),
+        )
+        if deleted:
             logger.debug(f"Cleared all conversations for user {user_id}")
-    
+
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get statistics about stored conversations"""
-        total_users = len(self._conversations)
-        total_conversations = self._count_total_conversations(self._conversations)
-        
-        user_stats = {}
-        for user_id, conversations in self._conversations.items():
-            user_stats[user_id] = {
-                'conversation_count': len(conversations),
-                'latest_activity': max(
-                    (conv.get('last_activity', '') for conv in conversations.values()),
-                    default=''
-                )
-            }
-        
+        rows = self._read(
+            "SELECT user_id, COUNT(*), MAX(COALESCE(last_activity, '')) "
+            "FROM conversations GROUP BY user_id"
+        )
+        user_stats = {
+            user_id: {'conversation_count': count, 'latest_activity': latest_activity}
+            for user_id, count, latest_activity in rows
+        }
+
         return {
-            'total_users': total_users,
-            'total_conversations': total_conversations,
-            'storage_file': self.storage_file,
-            'file_exists': os.path.exists(self.storage_file),
+            'total_users': len(user_stats),
+            'total_conversations': sum(stats['conversation_count'] for stats in user_stats.values()),
+            'storage_file': self.db_path,
+            'file_exists': os.path.exists(self.db_path),
             'user_stats': user_stats
         }
 
+    def close(self):
+        """Close the database connections"""
+        self._executor.shutdown(wait=True)
+        with self.lock:
+            for conn in (self._write_conn, self._read_conn):
+                if conn is not None:
+                    conn.close()
+            self._write_conn = self._read_conn = None
+
 
 # Global instance
-conversation_persistence = ConversationPersistenceService()
\ No newline at end of file
+conversation_persistence = ConversationPersistenceService()
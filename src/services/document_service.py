@@ -1,11 +1,13 @@
+import asyncio
 import datetime
 import hashlib
 import tempfile
+import time
 import os
 import aiofiles
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
-from docling_core.types.io import DocumentStream
-from typing import List
+from typing import Dict, List, Tuple
 import openai
 import tiktoken
 from utils.logging_config import get_logger
@@ -13,7 +15,7 @@ from utils.logging_config import get_logger
 logger = get_logger(__name__)
 
 from config.settings import clients, get_embedding_model, get_index_name
-from utils.document_processing import extract_relevant, process_document_sync
+from utils.document_processing import process_document_sync
 from utils.telemetry import TelemetryClient, Category, MessageId
 
 
@@ -88,12 +90,80 @@ def chunk_texts_for_embeddings(
     return batches
 
 
+def batch_chunks_for_embeddings(
+    texts: List[str], max_tokens: int, model: str = None
+) -> List[List[Tuple[int, str]]]:
+    """
+    Split texts into token-bounded batches that keep each text's index.
+
+    Unlike chunk_texts_for_embeddings, a single text is never split across
+    several inputs, so every chunk gets exactly one embedding. A text that
+    exceeds max_tokens on its own is truncated for embedding purposes and sent
+    in its own batch.
+    """
+    model = model or get_embedding_model()
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+
+    batches = []
+    current_batch = []
+    current_tokens = 0
+
+    for index, text in enumerate(texts):
+        tokens = encoding.encode(text)
+
+        if len(tokens) > max_tokens:
+            if current_batch:
+                batches.append(current_batch)
+                current_batch = []
+                current_tokens = 0
+            batches.append([(index, encoding.decode(tokens[:max_tokens]))])
+            continue
+
+        if current_tokens + len(tokens) > max_tokens and current_batch:
+            batches.append(current_batch)
+            current_batch = []
+            current_tokens = 0
+
+        current_batch.append((index, text))
+        current_tokens += len(tokens)
+
+    if current_batch:
+        batches.append(current_batch)
+
+    return batches
+
+
+# Per-provider limits on concurrent embedding requests, shared by all ingest tasks
+_embedding_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_embedding_semaphore(provider: str) -> asyncio.Semaphore:
+    """Return the shared semaphore bounding in-flight embedding calls for a provider"""
+    from config.settings import get_embedding_concurrency
+
+    key = (provider or "default").lower()
+    semaphore = _embedding_semaphores.get(key)
+    if semaphore is None:
+        limit = get_embedding_concurrency(key)
+        semaphore = asyncio.Semaphore(limit)
+        _embedding_semaphores[key] = semaphore
+        logger.info("Embedding concurrency limit configured", provider=key, limit=limit)
+    return semaphore
+
+
 class DocumentService:
     def __init__(self, process_pool=None, session_manager=None):
         self.process_pool = process_pool
         self.session_manager = session_manager
         self._mapping_ensured = False
         self._process_pool_broken = False
+        # Conversion queue accounting for the shared process pool
+        self._conversions_in_flight = 0
+        self._conversions_completed = 0
+        self._conversions_failed = 0
 
     def _recreate_process_pool(self):
         """Recreate the process pool if it's broken"""
@@ -118,6 +188,71 @@ class DocumentService:
         return False
 
 
+    async def convert_document(self, file_path: str, file_hash: str = None) -> dict:
+        """
+        Convert a document with docling in the shared process pool.
+
+        Conversion is CPU-bound and can take minutes for large PDFs, so it must
+        never run on the event loop. Each pool worker keeps its own cached
+        converter (see get_worker_converter). If the pool breaks (e.g. a worker
+        was OOM-killed) it is recreated and the conversion is retried once.
+        Pass file_hash when it is already known so the worker does not hash
+        the file again.
+
+        Returns:
+            Slim document dict with keys: id, filename, mimetype, chunks
+        """
+        if self.process_pool is None:
+            raise RuntimeError("DocumentService requires a process pool for conversion")
+
+        from utils.adaptive_concurrency import ingestion_limiter
+
+        loop = asyncio.get_running_loop()
+        self._conversions_in_flight += 1
+        started = time.monotonic()
+        logger.debug(
+            "Submitting document conversion to process pool",
+            file_path=file_path,
+            **self.get_conversion_stats(),
+        )
+        try:
+            try:
+                result = await loop.run_in_executor(
+                    self.process_pool, process_document_sync, file_path, file_hash
+                )
+            except BrokenProcessPool:
+                logger.error("Process pool broken during conversion", file_path=file_path)
+                self._process_pool_broken = True
+                if not self._recreate_process_pool():
+                    raise
+                result = await loop.run_in_executor(
+                    self.process_pool, process_document_sync, file_path, file_hash
+                )
+            self._conversions_completed += 1
+            # Includes time queued for a pool worker, so a saturated pool reads as slow
+            ingestion_limiter.observe("docling", time.monotonic() - started)
+            return result
+        except Exception as e:
+            self._conversions_failed += 1
+            # Unconvertible documents say nothing about capacity; a broken pool does
+            if isinstance(e, BrokenProcessPool):
+                ingestion_limiter.observe_exception("docling", time.monotonic() - started, e)
+            raise
+        finally:
+            self._conversions_in_flight -= 1
+
+    def get_conversion_stats(self) -> dict:
+        """Queue-depth metrics for docling conversions in the process pool"""
+        from utils.process_pool import MAX_WORKERS
+
+        return {
+            "conversion_workers": MAX_WORKERS,
+            "conversions_in_flight": self._conversions_in_flight,
+            "conversions_queued": max(0, self._conversions_in_flight - MAX_WORKERS),
+            "conversions_completed": self._conversions_completed,
+            "conversions_failed": self._conversions_failed,
+        }
+
     async def process_upload_file(
         self,
         upload_file,
@@ -147,22 +282,8 @@ class DocumentService:
                     file_size += len(chunk)
 
             file_hash = hash_id(tmp_path)
-            # Get user's OpenSearch client with JWT for OIDC auth
-            opensearch_client = self.session_manager.get_user_opensearch_client(
-                owner_user_id, jwt_token
-            )
 
-            try:
-                exists = await opensearch_client.exists(index=get_index_name(), id=file_hash)
-            except Exception as e:
-                logger.error(
-                    "OpenSearch exists check failed", file_hash=file_hash, error=str(e)
-                )
-                raise
-            if exists:
-                return {"status": "unchanged", "id": file_hash}
-
-            # Use consolidated standard processing
+            # Use consolidated standard processing (includes the manifest dedup check)
             from models.processors import TaskProcessor
             processor = TaskProcessor(document_service=self)
             result = await processor.process_document_standard(
@@ -186,22 +307,21 @@ class DocumentService:
         if not filename:
             filename = upload_file.filename or "uploaded_document"
 
-        # Stream file content into BytesIO
-        content = io.BytesIO()
-        while True:
-            chunk = await upload_file.read(1 << 20)  # 1MB chunks
-            if not chunk:
-                break
-            content.write(chunk)
-        content.seek(0)  # Reset to beginning for reading
-
         # Check if this is a .txt file - use simple processing
         file_ext = os.path.splitext(filename)[1].lower()
-        
+
         if file_ext == '.txt':
+            # Stream file content into BytesIO
+            content = io.BytesIO()
+            while True:
+                chunk = await upload_file.read(1 << 20)  # 1MB chunks
+                if not chunk:
+                    break
+                content.write(chunk)
+
             # Simple text file processing for chat context
-            text_content = content.read().decode('utf-8', errors='replace')
-            
+            text_content = content.getvalue().decode('utf-8', errors='replace')
+
             # For context, we don't need to chunk - just return the full content
             return {
                 "filename": filename,
@@ -210,11 +330,19 @@ class DocumentService:
                 "content_length": len(text_content),
             }
         else:
-            # Create DocumentStream and process with docling
-            doc_stream = DocumentStream(name=filename, stream=content)
-            result = clients.converter.convert(doc_stream)
-            full_doc = result.document.export_to_dict()
-            slim_doc = extract_relevant(full_doc)
+            from utils.file_utils import auto_cleanup_tempfile
+
+            # Preserve file extension for docling format detection
+            with auto_cleanup_tempfile(suffix=file_ext) as tmp_path:
+                with open(tmp_path, 'wb') as tmp_file:
+                    while True:
+                        chunk = await upload_file.read(1 << 20)  # 1MB chunks
+                        if not chunk:
+                            break
+                        tmp_file.write(chunk)
+
+                # Convert with docling in the process pool
+                slim_doc = await self.convert_document(tmp_path)
 
             # Extract all text content
             all_text = []
@@ -1,7 +1,9 @@
 from typing import Any, Dict, List, Optional
 import json
+import time
 
-from config.settings import LANGFLOW_INGEST_FLOW_ID, clients
+from config.settings import LANGFLOW_INGEST_FLOW_ID, clients, get_embedding_model
+from utils.adaptive_concurrency import classify_status_code, ingestion_limiter
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -181,11 +183,21 @@ class LangflowFileService:
         add_provider_credentials_to_headers(headers, config)
         logger.info(f"[LF] Headers {headers}")
         logger.info(f"[LF] Payload {payload}")
-        resp = await clients.langflow_request(
-            "POST",
-            f"/api/v1/run/{self.flow_id_ingest}",
-            json=payload,
-            headers=headers,
+        started = time.monotonic()
+        try:
+            resp = await clients.langflow_request(
+                "POST",
+                f"/api/v1/run/{self.flow_id_ingest}",
+                json=payload,
+                headers=headers,
+            )
+        except Exception as e:
+            ingestion_limiter.observe_exception("langflow", time.monotonic() - started, e)
+            raise
+        ingestion_limiter.observe(
+            "langflow",
+            time.monotonic() - started,
+            classify_status_code(resp.status_code),
         )
         logger.debug(
             "[LF] Run response", status_code=resp.status_code, reason=resp.reason_phrase
@@ -224,6 +236,11 @@ class LangflowFileService:
             )
 
             raise
+
+        # The ingestion flow embeds with the configured model
+        from utils.embedding_model_inventory import embedding_model_inventory
+
+        embedding_model_inventory.note_model(get_embedding_model())
         return resp_json
 
     async def upload_and_ingest_file(
@@ -1,10 +1,28 @@
-import copy
 import json
 from typing import Any, Dict
 from agentd.tool_decorator import tool
-from config.settings import EMBED_MODEL, clients, get_embedding_model, get_index_name, WATSONX_EMBEDDING_DIMENSIONS
+from config.settings import (
+    EMBED_MODEL,
+    OPENSEARCH_HYBRID_SEARCH_MODE,
+    QUERY_EMBEDDING_CACHE_DISK_SIZE,
+    QUERY_EMBEDDING_CACHE_PATH,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+    WATSONX_EMBEDDING_DIMENSIONS,
+    clients,
+    get_embedding_model,
+    get_index_name,
+)
 from auth_context import get_auth_context
+from utils.embedding_cache import QueryEmbeddingCache
+from utils.embedding_model_inventory import embedding_model_inventory
 from utils.logging_config import get_logger
+from utils.opensearch_capabilities import (
+    HYBRID_SEARCH_PIPELINE_ID,
+    ClusterCapabilities,
+    detect_cluster_capabilities,
+    ensure_hybrid_search_pipeline,
+)
 
 logger = get_logger(__name__)
 
@@ -14,8 +32,47 @@ EMBED_RETRY_MAX_DELAY = 8.0
 
 
 class SearchService:
-    def __init__(self, session_manager=None):
+    def __init__(self, session_manager=None, embedding_cache: QueryEmbeddingCache = None):
         self.session_manager = session_manager
+        self.embedding_cache = embedding_cache or QueryEmbeddingCache(
+            max_entries=QUERY_EMBEDDING_CACHE_SIZE,
+            ttl_seconds=QUERY_EMBEDDING_CACHE_TTL,
+            path=QUERY_EMBEDDING_CACHE_PATH or None,
+            disk_max_entries=QUERY_EMBEDDING_CACHE_DISK_SIZE,
+        )
+        self.capabilities = ClusterCapabilities()
+
+    async def initialize(self, opensearch_client):
+        """Detect cluster capabilities once and prepare the hybrid search pipeline"""
+        self.capabilities = await detect_cluster_capabilities(
+            opensearch_client, get_index_name()
+        )
+        if OPENSEARCH_HYBRID_SEARCH_MODE == "pipeline":
+            if self.capabilities.supports_hybrid_query:
+                self.capabilities.hybrid_pipeline_ready = await ensure_hybrid_search_pipeline(
+                    opensearch_client
+                )
+            else:
+                logger.warning(
+                    "Hybrid search pipeline mode requested but not supported by the cluster, "
+                    "using bool query scoring",
+                    version=self.capabilities.version,
+                )
+
+    def get_capabilities(self) -> Dict[str, Any]:
+        """Detected OpenSearch capabilities and the active hybrid scoring mode"""
+        return {
+            **self.capabilities.to_dict(),
+            "hybrid_mode": "pipeline" if self.capabilities.hybrid_pipeline_ready else "bool",
+        }
+
+    def get_embedding_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the query embedding cache"""
+        return self.embedding_cache.get_stats()
+
+    def get_model_inventory_stats(self) -> Dict[str, Any]:
+        """Freshness and refresh counters for the corpus embedding model inventory"""
+        return embedding_model_inventory.get_stats()
 
     @tool
     async def search_tool(self, query: str, embedding_model: str = None) -> Dict[str, Any]:
@@ -50,6 +107,7 @@ class SearchService:
         user_id, jwt_token = get_auth_context()
         # Get search filters, limit, and score threshold from context
         from auth_context import (
+            get_scoped_model_detection,
             get_search_filters,
             get_search_limit,
             get_score_threshold,
@@ -58,6 +116,7 @@ class SearchService:
         filters = get_search_filters() or {}
         limit = get_search_limit()
         score_threshold = get_score_threshold()
+        scoped_model_detection = get_scoped_model_detection()
         # Detect wildcard request ("*") to return global facets/stats without semantic search
         is_wildcard_match_all = isinstance(query, str) and query.strip() == "*"
 
@@ -99,32 +158,16 @@ class SearchService:
                             filter_clauses.append({"terms": {field_name: values}})
 
             try:
-                # Build aggregation query with filters applied
-                agg_query = {
-                    "size": 0,
-                    "aggs": {
-                        "embedding_models": {
-                            "terms": {
-                                "field": "embedding_model",
-                                "size": 10
-                            }
-                        }
-                    }
-                }
-
-                # Apply filters to model detection if any exist
-                if filter_clauses:
-                    agg_query["query"] = {
-                        "bool": {
-                            "filter": filter_clauses
-                        }
-                    }
-
-                agg_result = await opensearch_client.search(
-                    index=get_index_name(), body=agg_query, params={"terminate_after": 0}
-                )
-                buckets = agg_result.get("aggregations", {}).get("embedding_models", {}).get("buckets", [])
-                available_models = [b["key"] for b in buckets if b["key"]]
+                if scoped_model_detection and filter_clauses:
+                    # Explicitly requested: only models among the filtered documents
+                    available_models = await embedding_model_inventory.get_scoped_models(
+                        opensearch_client, get_index_name(), filter_clauses
+                    )
+                else:
+                    # Corpus-wide inventory, cached and read with the internal client
+                    available_models = await embedding_model_inventory.get_models(
+                        clients.opensearch or opensearch_client, get_index_name()
+                    )
 
                 if not available_models:
                     # Fallback to configured model if no documents indexed yet
@@ -133,8 +176,7 @@ class SearchService:
                 logger.info(
                     "Detected embedding models in corpus",
                     available_models=available_models,
-                    model_counts={b["key"]: b["doc_count"] for b in buckets},
-                    with_filters=len(filter_clauses) > 0
+                    with_filters=bool(scoped_model_detection and filter_clauses),
                 )
             except Exception as e:
                 logger.warning("Failed to detect embedding models, using configured model", error=str(e))
@@ -144,6 +186,10 @@ class SearchService:
             import asyncio
 
             async def embed_with_model(model_name):
+                cached = await self.embedding_cache.aget(model_name, query)
+                if cached is not None:
+                    return model_name, cached
+
                 delay = EMBED_RETRY_INITIAL_DELAY
                 attempts = 0
                 last_exception = None
@@ -179,6 +225,7 @@ class SearchService:
                         embedding = getattr(resp.data[0], 'embedding', None)
                         if embedding is None:
                             embedding = resp.data[0]['embedding']
+                        await self.embedding_cache.aput(model_name, query, embedding)
                         return model_name, embedding
                     except Exception as e:
                         last_exception = e
@@ -257,6 +304,11 @@ class SearchService:
                             # Multiple values filter
                             filter_clauses.append({"terms": {field_name: values}})
 
+        # Single-request hybrid scoring via the search pipeline, when available
+        use_hybrid_pipeline = (
+            not is_wildcard_match_all and self.capabilities.hybrid_pipeline_ready
+        )
+
         # Build query body
         if is_wildcard_match_all:
             # Match all documents; still allow filters to narrow scope
@@ -265,6 +317,9 @@ class SearchService:
             else:
                 query_block = {"match_all": {}}
         else:
+            # Skip num_candidates once the cluster is known not to accept it
+            use_num_candidates = self.capabilities.supports_num_candidates is not False
+
             # Build multi-model KNN queries
             knn_queries = []
             embedding_fields_to_check = []
@@ -272,15 +327,10 @@ class SearchService:
             for model_name, embedding_vector in query_embeddings.items():
                 field_name = get_embedding_field_name(model_name)
                 embedding_fields_to_check.append(field_name)
-                knn_queries.append({
-                    "knn": {
-                        field_name: {
-                            "vector": embedding_vector,
-                            "k": 50,
-                            "num_candidates": 1000,
-                        }
-                    }
-                })
+                knn_params = {"vector": embedding_vector, "k": 50}
+                if use_num_candidates:
+                    knn_params["num_candidates"] = 1000
+                knn_queries.append({"knn": {field_name: knn_params}})
 
             # Build exists filter - doc must have at least one embedding field
             exists_any_embedding = {
@@ -300,33 +350,48 @@ class SearchService:
                 filter_types=[type(f).__name__ for f in all_filters]
             )
 
-            # Hybrid search query structure (semantic + keyword)
-            # Use dis_max to pick best score across multiple embedding fields
-            query_block = {
-                "bool": {
-                    "should": [
-                        {
-                            "dis_max": {
-                                "tie_breaker": 0.0,  # Take only the best match, no blending
-                                "boost": 0.7,         # 70% weight for semantic search
-                                "queries": knn_queries
-                            }
-                        },
-                        {
-                            "multi_match": {
-                                "query": query,
-                                "fields": ["text^2", "filename^1.5"],
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                                "boost": 0.3,  # 30% weight for keyword search
-                            }
-                        },
-                    ],
-                    "minimum_should_match": 1,
-                    "filter": all_filters,
+            semantic_query = {
+                "dis_max": {
+                    "tie_breaker": 0.0,  # Take only the best match, no blending
+                    "queries": knn_queries
+                }
+            }
+            keyword_query = {
+                "multi_match": {
+                    "query": query,
+                    "fields": ["text^2", "filename^1.5"],
+                    "type": "best_fields",
+                    "fuzziness": "AUTO",
                 }
             }
 
+            if use_hybrid_pipeline:
+                # Single hybrid query; the search pipeline normalizes each
+                # sub-query's scores and combines them 70/30
+                query_block = {
+                    "hybrid": {
+                        "queries": [
+                            {"bool": {"must": [semantic_query], "filter": all_filters}},
+                            {"bool": {"must": [keyword_query], "filter": all_filters}},
+                        ]
+                    }
+                }
+            else:
+                # Hybrid search query structure (semantic + keyword)
+                # Use dis_max to pick best score across multiple embedding fields
+                query_block = {
+                    "bool": {
+                        "should": [
+                            # 70% weight for semantic search
+                            {"dis_max": {**semantic_query["dis_max"], "boost": 0.7}},
+                            # 30% weight for keyword search
+                            {"multi_match": {**keyword_query["multi_match"], "boost": 0.3}},
+                        ],
+                        "minimum_should_match": 1,
+                        "filter": all_filters,
+                    }
+                }
+
         search_body = {
             "query": query_block,
             "aggs": {
@@ -355,27 +420,12 @@ class SearchService:
             "size": limit,
         }
 
-        # Add score threshold only for hybrid (not meaningful for match_all)
-        if not is_wildcard_match_all and score_threshold > 0:
+        # Add score threshold only for hybrid (not meaningful for match_all).
+        # With the search pipeline scores are normalized, so the threshold is
+        # applied to the combined score after the search instead.
+        if not is_wildcard_match_all and score_threshold > 0 and not use_hybrid_pipeline:
             search_body["min_score"] = score_threshold
 
-        # Prepare fallback search body without num_candidates for clusters that don't support it
-        fallback_search_body = None
-        if not is_wildcard_match_all:
-            try:
-                fallback_search_body = copy.deepcopy(search_body)
-                knn_query_blocks = (
-                    fallback_search_body["query"]["bool"]["should"][0]["dis_max"]["queries"]
-                )
-                for query_candidate in knn_query_blocks:
-                    knn_section = query_candidate.get("knn")
-                    if isinstance(knn_section, dict):
-                        for params in knn_section.values():
-                            if isinstance(params, dict):
-                                params.pop("num_candidates", None)
-            except (KeyError, IndexError, AttributeError, TypeError):
-                fallback_search_body = None
-
         # Authentication required - DLS will handle document filtering automatically
         logger.debug(
             "search_service authentication info",
@@ -394,6 +444,15 @@ class SearchService:
         from opensearchpy.exceptions import RequestError
 
         search_params = {"terminate_after": 0}
+        if use_hybrid_pipeline:
+            search_params["search_pipeline"] = HYBRID_SEARCH_PIPELINE_ID
+
+        # Until the cluster has answered once, be ready to retry without num_candidates
+        probing_num_candidates = (
+            not is_wildcard_match_all
+            and use_num_candidates
+            and self.capabilities.supports_num_candidates is None
+        )
 
         try:
             index_name = get_index_name()
@@ -401,26 +460,33 @@ class SearchService:
             results = await opensearch_client.search(
                 index=index_name, body=search_body, params=search_params
             )
+            if probing_num_candidates:
+                self.capabilities.supports_num_candidates = True
         except RequestError as e:
             error_message = str(e)
             if (
-                fallback_search_body is not None
+                probing_num_candidates
                 and "unknown field [num_candidates]" in error_message.lower()
             ):
                 logger.warning(
                     "OpenSearch cluster does not support num_candidates; retrying without it"
                 )
+                # Remember so later searches don't pay for the failed request
+                self.capabilities.supports_num_candidates = False
+                for knn_query in knn_queries:
+                    for params in knn_query["knn"].values():
+                        params.pop("num_candidates", None)
                 try:
                     results = await opensearch_client.search(
                         index=get_index_name(),
-                        body=fallback_search_body,
+                        body=search_body,
                         params=search_params,
                     )
                 except RequestError as retry_error:
                     logger.error(
                         "OpenSearch retry without num_candidates failed",
                         error=str(retry_error),
-                        search_body=fallback_search_body,
+                        search_body=search_body,
                     )
                     raise
             else:
@@ -435,9 +501,13 @@ class SearchService:
             # Re-raise the exception so the API returns the error to frontend
             raise
 
+        hits = results["hits"]["hits"]
+        if use_hybrid_pipeline and score_threshold > 0:
+            hits = [hit for hit in hits if (hit.get("_score") or 0) >= score_threshold]
+
         # Transform results (keep for backward compatibility)
         chunks = []
-        for hit in results["hits"]["hits"]:
+        for hit in hits:
             source = hit.get("_source", {})
             chunks.append(
                 {
@@ -480,12 +550,15 @@ class SearchService:
         limit: int = 10,
         score_threshold: float = 0,
         embedding_model: str = None,
+        scoped_model_detection: bool = False,
     ) -> Dict[str, Any]:
         """Public search method for API endpoints
 
         Args:
             embedding_model: Embedding model to use for search (defaults to the
                 currently configured embedding model)
+            scoped_model_detection: Detect embedding models among the filtered
+                documents only, instead of using the cached corpus inventory
         """
         # Set auth context if provided (for direct API calls)
         from config.settings import is_no_auth_mode
@@ -501,9 +574,14 @@ class SearchService:
 
             set_search_filters(filters)
 
-        from auth_context import set_search_limit, set_score_threshold
+        from auth_context import (
+            set_scoped_model_detection,
+            set_search_limit,
+            set_score_threshold,
+        )
 
         set_search_limit(limit)
         set_score_threshold(score_threshold)
+        set_scoped_model_detection(scoped_model_detection)
 
         return await self.search_tool(query, embedding_model=embedding_model)
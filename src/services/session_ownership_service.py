@@ -1,111 +1,298 @@
 """
 Session Ownership Service
-Simple service that tracks which user owns which session
+Tracks which user owns which session
+
+Ownership is indexed in memory both by session and by user, so lookups are
+O(1) and listing a user's sessions is O(that user's sessions). Records are
+persisted to a SQLite table with write-behind: new claims and releases are
+flushed right away in the background, while last_accessed bumps are only
+marked dirty and written in batches by the periodic flusher. An existing
+session_ownership.json is imported once and renamed to *.migrated.
 """
 
+import asyncio
 import json
 import os
-from typing import Dict, List, Optional
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
 from datetime import datetime
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 class SessionOwnershipService:
-    """Simple service to track which user owns which session"""
-
-    def __init__(self):
-        self.ownership_file = "data/session_ownership.json"
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(self.ownership_file), exist_ok=True)
-        self.ownership_data = self._load_ownership_data()
-    
-    def _load_ownership_data(self) -> Dict[str, Dict[str, any]]:
-        """Load session ownership data from JSON file"""
-        if os.path.exists(self.ownership_file):
-            try:
-                with open(self.ownership_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading session ownership data: {e}")
-                return {}
-        return {}
-    
-    def _save_ownership_data(self):
-        """Save session ownership data to JSON file"""
+    """Tracks which user owns which session"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        legacy_json_file: str = "data/session_ownership.json",
+    ):
+        if db_path is None:
+            from config.settings import SESSION_OWNERSHIP_STORE_PATH
+
+            db_path = SESSION_OWNERSHIP_STORE_PATH
+        self.db_path = db_path
+        self.legacy_json_file = legacy_json_file
+        self.ownership_data: Dict[str, Dict[str, str]] = {}  # session_id -> record
+        self._user_sessions: Dict[str, Set[str]] = {}  # user_id -> session_ids
+        self._dirty: Set[str] = set()  # sessions to upsert on the next flush
+        self._released: Set[str] = set()  # sessions to delete on the next flush
+        self._conn: Optional[sqlite3.Connection] = None
+        # One writer thread keeps flushes ordered and off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-ownership")
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending_flush: Optional[asyncio.Task] = None
+        # Set when a claim or release arrives while the pending flush is running
+        self._flush_requested = False
+        self._stats = {"flushes": 0, "rows_written": 0, "rows_deleted": 0}
+
+    def _ensure_loaded(self):
+        """Open the database and load the index on first use"""
+        if self._conn is not None:
+            return
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS session_ownership (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                created_at TEXT,
+                last_accessed TEXT
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_session_ownership_user ON session_ownership (user_id)"
+        )
+        conn.commit()
+        self._migrate_legacy_json(conn)
+
+        for session_id, user_id, created_at, last_accessed in conn.execute(
+            "SELECT session_id, user_id, created_at, last_accessed FROM session_ownership"
+        ):
+            self._index(session_id, {
+                "user_id": user_id,
+                "created_at": created_at,
+                "last_accessed": last_accessed,
+            })
+        self._conn = conn
+        logger.debug(f"Loaded {len(self.ownership_data)} session ownership records from {self.db_path}")
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection):
+        if not self.legacy_json_file or not os.path.exists(self.legacy_json_file):
+            return
         try:
-            with open(self.ownership_file, 'w') as f:
-                json.dump(self.ownership_data, f, indent=2)
-            logger.debug(f"Saved session ownership data to {self.ownership_file}")
+            with open(self.legacy_json_file, 'r') as f:
+                data = json.load(f)
+            rows = [
+                (session_id, record["user_id"], record.get("created_at"), record.get("last_accessed"))
+                for session_id, record in data.items()
+                if isinstance(record, dict) and record.get("user_id")
+            ]
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO session_ownership (session_id, user_id, created_at, last_accessed) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            os.replace(self.legacy_json_file, self.legacy_json_file + ".migrated")
+            logger.info(f"Migrated {len(rows)} session ownership records from {self.legacy_json_file}")
         except Exception as e:
-            logger.error(f"Error saving session ownership data: {e}")
-    
+            logger.error(f"Error migrating session ownership data: {e}")
+
+    def _index(self, session_id: str, record: Dict[str, str]):
+        self.ownership_data[session_id] = record
+        self._user_sessions.setdefault(record["user_id"], set()).add(session_id)
+
+    def _unindex(self, session_id: str):
+        record = self.ownership_data.pop(session_id, None)
+        if record is None:
+            return
+        user_sessions = self._user_sessions.get(record["user_id"])
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._user_sessions[record["user_id"]]
+
     def claim_session(self, user_id: str, session_id: str):
         """Claim a session for a user"""
+        self._ensure_loaded()
+        now = datetime.now().isoformat()
         if session_id not in self.ownership_data:
-            self.ownership_data[session_id] = {
+            self._index(session_id, {
                 "user_id": user_id,
-                "created_at": datetime.now().isoformat(),
-                "last_accessed": datetime.now().isoformat()
-            }
-            self._save_ownership_data()
+                "created_at": now,
+                "last_accessed": now
+            })
+            self._released.discard(session_id)
+            self._dirty.add(session_id)
+            self._schedule_flush()
             logger.debug(f"Claimed session {session_id} for user {user_id}")
         else:
-            # Update last accessed time
-            self.ownership_data[session_id]["last_accessed"] = datetime.now().isoformat()
-            self._save_ownership_data()
-    
+            # Update last accessed time; written by the next periodic flush
+            self.ownership_data[session_id]["last_accessed"] = now
+            self._dirty.add(session_id)
+
     def get_session_owner(self, session_id: str) -> Optional[str]:
         """Get the user ID that owns a session"""
+        self._ensure_loaded()
         session_data = self.ownership_data.get(session_id)
         return session_data.get("user_id") if session_data else None
-    
+
     def get_user_sessions(self, user_id: str) -> List[str]:
         """Get all sessions owned by a user"""
-        return [
-            session_id 
-            for session_id, session_data in self.ownership_data.items()
-            if session_data.get("user_id") == user_id
-        ]
-    
+        self._ensure_loaded()
+        return list(self._user_sessions.get(user_id, ()))
+
     def is_session_owned_by_user(self, session_id: str, user_id: str) -> bool:
         """Check if a session is owned by a specific user"""
         return self.get_session_owner(session_id) == user_id
-    
+
     def filter_sessions_for_user(self, session_ids: List[str], user_id: str) -> List[str]:
         """Filter a list of sessions to only include those owned by the user"""
-        user_sessions = self.get_user_sessions(user_id)
+        self._ensure_loaded()
+        user_sessions = self._user_sessions.get(user_id, set())
         return [session for session in session_ids if session in user_sessions]
 
     def release_session(self, user_id: str, session_id: str) -> bool:
         """Release a session from a user (delete ownership record)"""
+        self._ensure_loaded()
         if session_id in self.ownership_data:
             # Verify the user owns this session before deleting
             if self.ownership_data[session_id].get("user_id") == user_id:
-                del self.ownership_data[session_id]
-                self._save_ownership_data()
+                self._unindex(session_id)
+                self._dirty.discard(session_id)
+                self._released.add(session_id)
+                self._schedule_flush()
                 logger.debug(f"Released session {session_id} from user {user_id}")
                 return True
             else:
                 logger.warning(f"User {user_id} tried to release session {session_id} they don't own")
                 return False
         return False
-    
+
+    def _schedule_flush(self):
+        """Flush soon in the background; without a running loop the periodic flush picks it up"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._pending_flush is None or self._pending_flush.done():
+            self._pending_flush = loop.create_task(self._flush_until_settled())
+        else:
+            self._flush_requested = True
+
+    async def _flush_until_settled(self):
+        """Flush, then flush again for claims and releases made during the write"""
+        while True:
+            self._flush_requested = False
+            await self.flush()
+            if not self._flush_requested:
+                return
+
+    def _flush_sync(self, rows: list, released: list):
+        with self._conn:
+            if rows:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO session_ownership (session_id, user_id, created_at, last_accessed) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            if released:
+                self._conn.executemany(
+                    "DELETE FROM session_ownership WHERE session_id = ?",
+                    [(session_id,) for session_id in released],
+                )
+
+    async def flush(self) -> int:
+        """Write dirty and released sessions in one transaction"""
+        if not self._dirty and not self._released:
+            return 0
+        dirty, self._dirty = self._dirty, set()
+        released, self._released = self._released, set()
+        rows = [
+            (session_id, record["user_id"], record["created_at"], record["last_accessed"])
+            for session_id in dirty
+            if (record := self.ownership_data.get(session_id)) is not None
+        ]
+
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._flush_sync, rows, list(released))
+        except Exception as e:
+            # Retry on the next flush unless the session changed state meanwhile
+            self._dirty.update(s for s in dirty if s in self.ownership_data)
+            self._released.update(s for s in released if s not in self.ownership_data)
+            logger.error(f"Error saving session ownership data: {e}")
+            return 0
+
+        self._stats["flushes"] += 1
+        self._stats["rows_written"] += len(rows)
+        self._stats["rows_deleted"] += len(released)
+        return len(rows) + len(released)
+
+    def start_flusher(self) -> None:
+        """Start the periodic write-behind flush task.
+
+        Should be called once after the event loop is running (e.g., during app startup).
+        """
+        from config.settings import SESSION_OWNERSHIP_FLUSH_INTERVAL
+
+        self._ensure_loaded()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(
+                self._periodic_flush(SESSION_OWNERSHIP_FLUSH_INTERVAL)
+            )
+            logger.info(f"Started session ownership flusher (every {SESSION_OWNERSHIP_FLUSH_INTERVAL}s)")
+
+    async def _periodic_flush(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error flushing session ownership data: {e}")
+
+    async def shutdown(self) -> None:
+        """Stop the flusher, write pending changes and close the database"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        if self._pending_flush is not None:
+            await asyncio.gather(self._pending_flush, return_exceptions=True)
+        if self._conn is None:
+            return
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+        self._conn = None
+
     def get_ownership_stats(self) -> Dict[str, any]:
         """Get statistics about session ownership"""
-        users = set()
-        for session_data in self.ownership_data.values():
-            users.add(session_data.get("user_id"))
-        
+        self._ensure_loaded()
         return {
             "total_tracked_sessions": len(self.ownership_data),
-            "unique_users": len(users),
+            "unique_users": len(self._user_sessions),
             "sessions_per_user": {
-                user: len(self.get_user_sessions(user))
-                for user in users if user
-            }
+                user: len(sessions)
+                for user, sessions in self._user_sessions.items() if user
+            },
+            "pending_writes": len(self._dirty) + len(self._released),
+            **self._stats,
         }
 
 
 # Global instance
-session_ownership_service = SessionOwnershipService()
\ No newline at end of file
+session_ownership_service = SessionOwnershipService()
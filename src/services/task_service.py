@@ -3,11 +3,13 @@ import os
 import random
 import time
 import uuid
-from typing import Any, Coroutine, TypeVar
+from typing import Any, AsyncIterator, Coroutine, TypeVar
 
-from models.tasks import FileTask, TaskStatus, UploadTask
+from models.tasks import FileTask, TaskPriority, TaskStatus, UploadTask
+from services.ingestion_scheduler import IngestionScheduler
+from services.task_store import TaskStore
 from session_manager import AnonymousUser
-from utils.gpu_detection import get_worker_count
+from utils.adaptive_concurrency import AdaptiveConcurrencyLimiter, ingestion_limiter
 from utils.logging_config import get_logger
 from utils.telemetry import TelemetryClient, Category, MessageId
 
@@ -24,10 +26,24 @@ class IngestionTimeoutError(Exception):
 class TaskService:
     # Cleanup interval in seconds (2 hours)
     CLEANUP_INTERVAL_SECONDS = 2 * 60 * 60
+    # Files listed inline by get_task_status/get_all_tasks; use get_task_files beyond that
+    TASK_STATUS_MAX_FILES = 1000
+    # Pending progress events per SSE subscriber before it has to resync
+    TASK_EVENT_QUEUE_SIZE = 1000
 
-    def __init__(self, document_service=None, process_pool=None, ingestion_timeout=3600):
+    def __init__(
+        self,
+        document_service=None,
+        process_pool=None,
+        ingestion_timeout=3600,
+        persistent_store: TaskStore | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+    ):
         self.document_service = document_service
         self.process_pool = process_pool
+        # Durable copy of task_store so tasks can be resumed after a restart
+        self.persistent_store = persistent_store or TaskStore()
+        self._persistence_enabled = True
         self.task_store: dict[
             str, dict[str, UploadTask]
         ] = {}  # user_id -> {task_id -> UploadTask}
@@ -37,10 +53,18 @@ class TaskService:
         # Locks for task counter updates, keyed by task_id
         # Kept separate from UploadTask to maintain serialization compatibility
         self._task_locks: dict[str, asyncio.Lock] = {}
-        # Global semaphore to limit concurrent file processing across all tasks.
+        # Shared scheduler limiting concurrent file processing across all tasks.
         # TaskService is a singleton, so this limits concurrency system-wide.
-        self._worker_count = get_worker_count()
-        self._processing_semaphore = asyncio.Semaphore(self._worker_count)
+        # The limit starts at the worker count and adapts to downstream latency.
+        self.concurrency_limiter = concurrency_limiter or ingestion_limiter
+        self.scheduler = IngestionScheduler(self.concurrency_limiter.limit)
+        self.concurrency_limiter.add_listener(self.scheduler.set_max_in_flight)
+        # Progress event queues of SSE subscribers, keyed by task_id
+        self._task_subscribers: dict[str, set[asyncio.Queue]] = {}
+        # Streaming tasks that may still get items, and items that arrived
+        # before their task reached the scheduler
+        self._open_tasks: set[str] = set()
+        self._task_backlogs: dict[str, list] = {}
 
         if self.process_pool is None:
             raise ValueError("TaskService requires a process_pool parameter")
@@ -51,6 +75,129 @@ class TaskService:
             self._task_locks[task_id] = asyncio.Lock()
         return self._task_locks[task_id]
 
+    def _find_task(self, user_id: str, task_id: str) -> UploadTask | None:
+        """Look up a task of the user, falling back to shared anonymous tasks"""
+        if not task_id:
+            return None
+        for candidate_user_id in (user_id, AnonymousUser().user_id):
+            user_tasks = self.task_store.get(candidate_user_id)
+            if user_tasks and task_id in user_tasks:
+                return user_tasks[task_id]
+        return None
+
+    async def _persist_task(
+        self, user_id: str, upload_task: UploadTask, include_files: bool = False
+    ) -> None:
+        """Write task state to the persistent store; failures never fail the task
+
+        With include_files, every file record and the processor's resume spec
+        are written as well (on creation and on bulk status changes).
+        """
+        if not self._persistence_enabled:
+            return
+        processor_spec = None
+        if include_files and hasattr(getattr(upload_task, "processor", None), "resume_spec"):
+            processor_spec = upload_task.processor.resume_spec()
+        try:
+            await self.persistent_store.save_task(
+                user_id,
+                upload_task,
+                processor_spec=processor_spec,
+                include_files=include_files,
+            )
+        except Exception as e:
+            logger.warning("Failed to persist task state", task_id=upload_task.task_id, error=str(e))
+
+    async def _persist_file(self, user_id: str, upload_task: UploadTask, file_key: str) -> None:
+        """Write one file state transition to the persistent store"""
+        if not self._persistence_enabled:
+            return
+        try:
+            await self.persistent_store.save_file(user_id, upload_task, file_key)
+        except Exception as e:
+            logger.warning(
+                "Failed to persist file task state",
+                task_id=upload_task.task_id,
+                file_key=file_key,
+                error=str(e),
+            )
+
+    def subscribe_task_events(self, user_id: str, task_id: str) -> asyncio.Queue | None:
+        """Register for progress events of a task visible to the user
+
+        The queue receives a "file" event for every file state change and a
+        "task" event for every task status change. A subscriber that falls
+        more than TASK_EVENT_QUEUE_SIZE events behind gets a single "resync"
+        event instead and should re-read the full task status.
+
+        Returns:
+            The event queue, or None if the task does not exist
+        """
+        if self._find_task(user_id, task_id) is None:
+            return None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.TASK_EVENT_QUEUE_SIZE)
+        self._task_subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe_task_events(self, task_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._task_subscribers.get(task_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._task_subscribers[task_id]
+
+    def _publish_event(self, task_id: str, event: dict) -> None:
+        for queue in self._task_subscribers.get(task_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: replace the backlog with a resync marker
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "task_id": task_id})
+
+    def _publish_file_event(self, upload_task: UploadTask, file_key: str) -> None:
+        """Publish one file state delta together with the task counters"""
+        if upload_task.task_id not in self._task_subscribers:
+            return
+        file_task = upload_task.file_tasks[file_key]
+        self._publish_event(
+            upload_task.task_id,
+            {
+                "type": "file",
+                **self._get_task_counters(upload_task),
+                "file": file_key,
+                "file_status": self._get_file_status(file_task),
+            },
+        )
+
+    def _publish_task_event(self, upload_task: UploadTask) -> None:
+        """Publish a task status change; terminal statuses end the event stream"""
+        if upload_task.task_id not in self._task_subscribers:
+            return
+        self._publish_event(
+            upload_task.task_id,
+            {
+                "type": "task",
+                **self._get_task_counters(upload_task),
+                "duration_seconds": upload_task.duration_seconds,
+            },
+        )
+
+    def _get_task_counters(self, upload_task: UploadTask) -> dict:
+        return {
+            "task_id": upload_task.task_id,
+            "status": upload_task.status.value,
+            "total_files": upload_task.total_files,
+            "processed_files": upload_task.processed_files,
+            "successful_files": upload_task.successful_files,
+            "failed_files": upload_task.failed_files,
+            "error": upload_task.error,
+            "listing": upload_task.listing,
+            "updated_at": upload_task.updated_at,
+        }
+
     def start_cleanup_scheduler(self) -> None:
         """Start the periodic cleanup background task.
 
@@ -161,8 +308,21 @@ class TaskService:
         )
         return await self.create_custom_task(user_id, file_paths, processor, original_filenames)
 
-    async def create_custom_task(self, user_id: str, items: list, processor, original_filenames: dict | None = None) -> str:
-        """Create a new task with custom processor for any type of items"""
+    async def create_custom_task(
+        self,
+        user_id: str,
+        items: list,
+        processor,
+        original_filenames: dict | None = None,
+        priority: TaskPriority | None = None,
+        open_ended: bool = False,
+    ) -> str:
+        """Create a new task with custom processor for any type of items
+
+        The scheduling priority defaults to the processor's ``priority``.
+        An ``open_ended`` task keeps running until _close_task_items(), taking
+        more items through _add_task_items().
+        """
         import os
         # Store anonymous tasks under a stable key so they can be retrieved later
         store_user_id = user_id or AnonymousUser().user_id
@@ -186,24 +346,27 @@ class TaskService:
             task_id=task_id,
             total_files=len(items),
             file_tasks=file_tasks,
+            priority=(
+                priority
+                if priority is not None
+                else getattr(processor, "priority", TaskPriority.INTERACTIVE)
+            ),
         )
 
         # Attach the custom processor to the task
         upload_task.processor = processor
+        # Persisted, so a restart can tell that the item list is incomplete
+        upload_task.listing = open_ended
 
         if store_user_id not in self.task_store:
             self.task_store[store_user_id] = {}
         self.task_store[store_user_id][task_id] = upload_task
 
-        # Start background processing
-        background_task = asyncio.create_task(
-            self.background_custom_processor(store_user_id, task_id, items)
-        )
-        self.background_tasks.add(background_task)
-        background_task.add_done_callback(self.background_tasks.discard)
+        await self._persist_task(store_user_id, upload_task, include_files=True)
 
-        # Store reference to background task for cancellation
-        upload_task.background_task = background_task
+        if open_ended:
+            self._open_tasks.add(task_id)
+        self._start_background_processing(store_user_id, upload_task, items)
 
         # Send telemetry event for task creation with metadata
         asyncio.create_task(
@@ -219,6 +382,229 @@ class TaskService:
 
         return task_id
 
+    async def create_streaming_task(
+        self,
+        user_id: str,
+        item_batches: AsyncIterator[tuple[list, dict]],
+        processor,
+        priority: TaskPriority | None = None,
+    ) -> str:
+        """Create a task whose items arrive in batches while it already runs
+
+        ``item_batches`` yields ``(items, original_filenames)`` pairs, e.g. one
+        per listing page of a connector. Items are processed as they arrive
+        and the task's total_files grows until the iterator is exhausted.
+        If the iterator raises, the items listed so far are still processed
+        and the task then fails with the listing error.
+        """
+        store_user_id = user_id or AnonymousUser().user_id
+        task_id = await self.create_custom_task(
+            user_id, [], processor, priority=priority, open_ended=True
+        )
+        upload_task = self.task_store[store_user_id][task_id]
+
+        async def feed_items():
+            try:
+                async for items, original_filenames in item_batches:
+                    if not await self._add_task_items(
+                        store_user_id, task_id, items, original_filenames
+                    ):
+                        break
+            except Exception as e:
+                logger.error(
+                    "Listing items of streaming task failed",
+                    task_id=task_id,
+                    total_files=upload_task.total_files,
+                    error=str(e),
+                )
+                upload_task.error = f"Listing items failed after {upload_task.total_files} files: {e}"
+            finally:
+                upload_task.listing = False
+                upload_task.updated_at = time.time()
+                self._close_task_items(task_id)
+                self._publish_task_event(upload_task)
+                await self._persist_task(store_user_id, upload_task)
+
+        listing_task = asyncio.create_task(feed_items())
+        self.background_tasks.add(listing_task)
+        listing_task.add_done_callback(self.background_tasks.discard)
+        upload_task.listing_task = listing_task
+        return task_id
+
+    async def _add_task_items(
+        self,
+        store_user_id: str,
+        task_id: str,
+        items: list,
+        original_filenames: dict | None = None,
+    ) -> bool:
+        """Append items to an open-ended task; False once it is closed or cancelled"""
+        upload_task = self.task_store.get(store_user_id, {}).get(task_id)
+        if (
+            upload_task is None
+            or task_id not in self._open_tasks
+            or upload_task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]
+        ):
+            return False
+
+        normalized_originals = (
+            {str(k): v for k, v in original_filenames.items()} if original_filenames else {}
+        )
+        new_items = [
+            item for item in dict.fromkeys(items) if str(item) not in upload_task.file_tasks
+        ]
+        if not new_items:
+            return True
+        for item in new_items:
+            upload_task.file_tasks.add(
+                str(item),
+                FileTask(
+                    file_path=str(item),
+                    filename=normalized_originals.get(str(item), os.path.basename(str(item))),
+                ),
+            )
+        async with self._get_task_lock(task_id):
+            upload_task.total_files += len(new_items)
+        upload_task.updated_at = time.time()
+        self._publish_task_event(upload_task)
+
+        if not self.scheduler.add_items(task_id, new_items):
+            # The background processor has not reached the scheduler yet
+            self._task_backlogs.setdefault(task_id, []).extend(new_items)
+
+        if self._persistence_enabled:
+            try:
+                await self.persistent_store.save_files(
+                    store_user_id, upload_task, [str(item) for item in new_items]
+                )
+            except Exception as e:
+                logger.warning("Failed to persist task state", task_id=task_id, error=str(e))
+        return True
+
+    def _close_task_items(self, task_id: str) -> None:
+        """No more items for an open-ended task; it completes once they are processed"""
+        self._open_tasks.discard(task_id)
+        self.scheduler.close_task(task_id)
+
+    def _start_background_processing(
+        self, store_user_id: str, upload_task: UploadTask, items: list
+    ) -> None:
+        background_task = asyncio.create_task(
+            self.background_custom_processor(store_user_id, upload_task.task_id, items)
+        )
+        self.background_tasks.add(background_task)
+        background_task.add_done_callback(self.background_tasks.discard)
+
+        # Store reference to background task for cancellation
+        upload_task.background_task = background_task
+
+    async def resume_unfinished_tasks(self, restore_processor) -> int:
+        """Reload tasks that were pending or running at shutdown and resume them
+
+        Files that already completed or failed are kept as they are; files that
+        were running when the backend stopped are processed again.
+
+        Args:
+            restore_processor: Callable building a processor from its resume_spec(),
+                returning None if the task cannot be resumed
+
+        Returns:
+            Number of tasks resumed
+        """
+        try:
+            stored_tasks = await self.persistent_store.load_unfinished_tasks()
+        except Exception as e:
+            logger.error("Failed to load unfinished tasks from task store", error=str(e))
+            return 0
+
+        resumed = 0
+        for stored in stored_tasks:
+            upload_task = stored.task
+            store_user_id = stored.user_id
+
+            for file_task in upload_task.file_tasks.values():
+                if file_task.status == TaskStatus.RUNNING:
+                    file_task.status = TaskStatus.PENDING
+            # Processors update counters themselves, so rebuild them from file states
+            upload_task.successful_files = sum(
+                1 for f in upload_task.file_tasks.values() if f.status == TaskStatus.COMPLETED
+            )
+            upload_task.failed_files = sum(
+                1 for f in upload_task.file_tasks.values() if f.status == TaskStatus.FAILED
+            )
+            upload_task.processed_files = upload_task.successful_files + upload_task.failed_files
+            upload_task.status = TaskStatus.PENDING
+            if upload_task.listing:
+                # The listing that fed this task died with the backend and is not
+                # restarted; finish the files already listed, then fail the task
+                upload_task.listing = False
+                upload_task.error = (
+                    f"Listing items was interrupted by a backend restart after "
+                    f"{upload_task.total_files} files; run the sync again for the rest"
+                )
+
+            processor = None
+            if stored.processor_spec:
+                try:
+                    processor = restore_processor(stored.processor_spec)
+                except Exception as e:
+                    logger.error(
+                        "Failed to restore task processor",
+                        task_id=upload_task.task_id,
+                        error=str(e),
+                    )
+
+            self.task_store.setdefault(store_user_id, {})[upload_task.task_id] = upload_task
+
+            if processor is None:
+                await self._fail_interrupted_task(store_user_id, upload_task)
+                continue
+
+            upload_task.processor = processor
+            upload_task.priority = getattr(processor, "priority", TaskPriority.INTERACTIVE)
+            pending_items = [
+                key
+                for key, file_task in upload_task.file_tasks.items()
+                if file_task.status == TaskStatus.PENDING
+            ]
+            logger.info(
+                "Resuming task after restart",
+                task_id=upload_task.task_id,
+                user_id=store_user_id,
+                pending_files=len(pending_items),
+                processed_files=upload_task.processed_files,
+                processor_type=processor.__class__.__name__,
+            )
+            self._start_background_processing(store_user_id, upload_task, pending_items)
+            resumed += 1
+
+        if stored_tasks:
+            logger.info(
+                "Finished resuming unfinished tasks",
+                resumed=resumed,
+                failed=len(stored_tasks) - resumed,
+            )
+        return resumed
+
+    async def _fail_interrupted_task(self, store_user_id: str, upload_task: UploadTask) -> None:
+        """Mark a stored task that cannot be resumed as failed"""
+        now = time.time()
+        for file_task in upload_task.file_tasks.values():
+            if file_task.status == TaskStatus.PENDING:
+                file_task.status = TaskStatus.FAILED
+                file_task.error = "Task interrupted by backend restart"
+                file_task.updated_at = now
+                upload_task.failed_files += 1
+                upload_task.processed_files += 1
+        upload_task.status = TaskStatus.FAILED
+        upload_task.updated_at = now
+        logger.warning(
+            "Task could not be resumed after restart",
+            task_id=upload_task.task_id,
+            user_id=store_user_id,
+        )
+        await self._persist_task(store_user_id, upload_task, include_files=True)
+
     def _get_display_filenames(self, upload_task: UploadTask) -> list[str]:
         filenames: list[str] = [
             task.filename or os.path.basename(task.file_path)
@@ -261,6 +647,8 @@ class TaskService:
             upload_task: UploadTask = self.task_store[user_id][task_id]
             upload_task.status = TaskStatus.RUNNING
             upload_task.updated_at = time.time()
+            self._publish_task_event(upload_task)
+            await self._persist_task(user_id, upload_task)
 
             processor = upload_task.processor
 
@@ -272,110 +660,128 @@ class TaskService:
                 filenames=self._get_display_filenames(upload_task),
                 processor_type=processor.__class__.__name__,
                 user_id=user_id,
-                worker_count=self._worker_count,
+                worker_count=self.scheduler.max_in_flight,
             )
 
-            # Process items with limited concurrency using the global semaphore
-            # - Limits concurrency across all tasks, not just within this one
+            # Files are queued in the shared scheduler, which limits concurrency
+            # across all tasks and shares workers fairly between users and
+            # priority classes. Only dispatched files get a coroutine.
             # - Potential bottlenecks related to downstream Langflow / Docling capacity rather than backend I/O
-            async def process_with_semaphore(item, item_key: str):
-                async with self._processing_semaphore:
-                    file_task = upload_task.file_tasks[item_key]
-                    file_task.status = TaskStatus.RUNNING
-                    file_task.updated_at = time.time()
+            async def process_scheduled_item(item):
+                item_key = str(item)
+                self.concurrency_limiter.note_in_flight(self.scheduler.in_flight)
+                file_task = upload_task.file_tasks[item_key]
+                file_task.status = TaskStatus.RUNNING
+                file_task.updated_at = time.time()
+                self._publish_file_event(upload_task, item_key)
+                await self._persist_file(user_id, upload_task, item_key)
+
+                logger.info(
+                    "File processing task running",
+                    task_number=upload_task.sequence_number,
+                    task_id=task_id,
+                    file_path=file_task.file_path,
+                )
+
+                try:
+                    # Add timeout protection to prevent indefinite hangs
+                    await self._process_with_timeout(
+                        processor.process_item(upload_task, item, file_task),
+                        timeout_seconds=self.ingestion_timeout
+                    )
 
                     logger.info(
-                        "File processing task running",
+                        "File processing task succeeded",
+                        status="PASSED",
+                        task_number=upload_task.sequence_number,
+                        task_id=task_id,
+                        file_path=file_task.file_path,
+                    )
+
+                except asyncio.CancelledError:
+                    # Handle cancellation explicitly
+
+                    if file_task.status == TaskStatus.RUNNING:
+                        file_task.status = TaskStatus.FAILED
+                        file_task.error = "File processing task cancelled."
+                        async with self._get_task_lock(task_id):
+                            upload_task.failed_files += 1
+
+                    logger.warning(
+                        "File processing task cancelled",
+                        status="FAILED",
+                        task_number=upload_task.sequence_number,
+                        task_id=task_id,
+                        file_path=file_task.file_path,
+                    )
+
+                    raise  # Re-raise to propagate cancellation
+                except IngestionTimeoutError as e:
+                    # Handle timeout explicitly
+                    if file_task.status == TaskStatus.RUNNING:
+                        file_task.status = TaskStatus.FAILED
+                        file_task.error = str(e)
+                        async with self._get_task_lock(task_id):
+                            upload_task.failed_files += 1
+                    # Don't re-raise - treat as normal failure, not cancellation
+
+                    logger.error(
+                        "File processing task timed out",
+                        status="FAILED",
+                        task_number=upload_task.sequence_number,
+                        task_id=task_id,
+                        file_path=file_task.file_path,
+                        exception=str(e),
+                    )
+
+                except Exception as e:
+                    # Note: Processors already handle incrementing failed_files and
+                    # setting file_task status/error, so we don't duplicate that here.
+                    # Only update timestamp if processor didn't already set it
+                    if file_task.status == TaskStatus.RUNNING:
+                        file_task.status = TaskStatus.FAILED
+                    if not file_task.error:
+                        file_task.error = str(e)
+
+                    logger.error(
+                        "File processing task exception encountered",
+                        status="FAILED",
                         task_number=upload_task.sequence_number,
                         task_id=task_id,
                         file_path=file_task.file_path,
+                        exception=str(e),
                     )
 
-                    try:
-                        # Add timeout protection to prevent indefinite hangs
-                        await self._process_with_timeout(
-                            processor.process_item(upload_task, item, file_task),
-                            timeout_seconds=self.ingestion_timeout
-                        )
-
-                        logger.info(
-                            "File processing task succeeded",
-                            status="PASSED",
-                            task_number=upload_task.sequence_number,
-                            task_id=task_id,
-                            file_path=file_task.file_path,
-                        )
-
-                    except asyncio.CancelledError:
-                        # Handle cancellation explicitly
-
-                        if file_task.status == TaskStatus.RUNNING:
-                            file_task.status = TaskStatus.FAILED
-                            file_task.error = "File processing task cancelled."
-                            async with self._get_task_lock(task_id):
-                                upload_task.failed_files += 1
-
-                        logger.warning(
-                            "File processing task cancelled",
-                            status="FAILED",
-                            task_number=upload_task.sequence_number,
-                            task_id=task_id,
-                            file_path=file_task.file_path,
-                        )
-
-                        raise  # Re-raise to propagate cancellation
-                    except IngestionTimeoutError as e:
-                        # Handle timeout explicitly
-                        if file_task.status == TaskStatus.RUNNING:
-                            file_task.status = TaskStatus.FAILED
-                            file_task.error = str(e)
-                            async with self._get_task_lock(task_id):
-                                upload_task.failed_files += 1
-                        # Don't re-raise - treat as normal failure, not cancellation
-
-                        logger.error(
-                            "File processing task timed out",
-                            status="FAILED",
-                            task_number=upload_task.sequence_number,
-                            task_id=task_id,
-                            file_path=file_task.file_path,
-                            exception=str(e),
-                        )
-
-                    except Exception as e:
-                        # Note: Processors already handle incrementing failed_files and
-                        # setting file_task status/error, so we don't duplicate that here.
-                        # Only update timestamp if processor didn't already set it
-                        if file_task.status == TaskStatus.RUNNING:
-                            file_task.status = TaskStatus.FAILED
-                        if not file_task.error:
-                            file_task.error = str(e)
-
-                        logger.error(
-                            "File processing task exception encountered",
-                            status="FAILED",
-                            task_number=upload_task.sequence_number,
-                            task_id=task_id,
-                            file_path=file_task.file_path,
-                            exception=str(e),
-                        )
-
-                    finally:
-                        file_task.updated_at = time.time()
-                        # Only increment processed_files if the file reached a terminal state
-                        # This prevents counter inconsistency on cancellation
-                        if file_task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
-                            async with self._get_task_lock(task_id):
-                                upload_task.processed_files += 1
-                        upload_task.updated_at = time.time()
-
-            tasks = [process_with_semaphore(item, str(item)) for item in items]
-
-            await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Mark task as completed
-            upload_task.status = TaskStatus.COMPLETED
+                finally:
+                    file_task.updated_at = time.time()
+                    # Only increment processed_files if the file reached a terminal state
+                    # This prevents counter inconsistency on cancellation
+                    if file_task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
+                        async with self._get_task_lock(task_id):
+                            upload_task.processed_files += 1
+                    upload_task.updated_at = time.time()
+                    self._publish_file_event(upload_task, item_key)
+                    await self._persist_file(user_id, upload_task, item_key)
+
+            # No await between taking the backlog and registering with the
+            # scheduler, so items streamed in meanwhile are never lost
+            items = list(items) + self._task_backlogs.pop(task_id, [])
+            await self.scheduler.run(
+                user_id,
+                task_id,
+                items,
+                process_scheduled_item,
+                upload_task.priority,
+                open_ended=task_id in self._open_tasks,
+            )
+
+            # Mark task as completed, or failed if its item list is incomplete
+            upload_task.status = (
+                TaskStatus.FAILED if upload_task.error else TaskStatus.COMPLETED
+            )
             upload_task.updated_at = time.time()
+            self._publish_task_event(upload_task)
+            await self._persist_task(user_id, upload_task)
 
             status: str = "FAILED"
 
@@ -397,7 +803,7 @@ class TaskService:
                 filenames=self._get_display_filenames(upload_task),
                 processor_type=processor.__class__.__name__,
                 user_id=user_id,
-                worker_count=self._worker_count,
+                worker_count=self.scheduler.max_in_flight,
             )
 
             # Send telemetry for task completion
@@ -431,7 +837,7 @@ class TaskService:
                     filenames=self._get_display_filenames(upload_task),
                     processor_type=upload_task.processor.__class__.__name__,
                     user_id=user_id,
-                    worker_count=self._worker_count,
+                    worker_count=self.scheduler.max_in_flight,
                 )
             else:
                 logger.warning(
@@ -439,7 +845,7 @@ class TaskService:
                     status="FAILED",
                     task_id=task_id,
                     user_id=user_id,
-                    worker_count=self._worker_count,
+                    worker_count=self.scheduler.max_in_flight,
                 )
 
             raise  # Re-raise to properly handle cancellation
@@ -448,6 +854,8 @@ class TaskService:
                 upload_task = self.task_store[user_id][task_id]
                 upload_task.status = TaskStatus.FAILED
                 upload_task.updated_at = time.time()
+                self._publish_task_event(upload_task)
+                await self._persist_task(user_id, upload_task)
 
                 logger.error(
                     "Upload / ingestion task exception encountered",
@@ -462,7 +870,7 @@ class TaskService:
                     filenames=self._get_display_filenames(upload_task),
                     processor_type=upload_task.processor.__class__.__name__,
                     user_id=user_id,
-                    worker_count=self._worker_count,
+                    worker_count=self.scheduler.max_in_flight,
                     exception=str(e),
                 )
 
@@ -485,7 +893,7 @@ class TaskService:
                     status="FAILED",
                     task_id=task_id,
                     user_id=user_id,
-                    worker_count=self._worker_count,
+                    worker_count=self.scheduler.max_in_flight,
                     exception=str(e),
                 )
 
@@ -494,46 +902,100 @@ class TaskService:
 
         Includes fallback to shared tasks stored under the "anonymous" user key
         so default system tasks are visible to all users.
+
+        At most TASK_STATUS_MAX_FILES files are included inline; larger tasks
+        set "files_truncated" and are listed page by page with get_task_files().
         """
-        if not task_id:
+        # Prefer the caller's user_id; otherwise check shared/anonymous tasks
+        upload_task = self._find_task(user_id, task_id)
+        if upload_task is None:
             return None
 
-        # Prefer the caller's user_id; otherwise check shared/anonymous tasks
-        candidate_user_ids = [user_id, AnonymousUser().user_id]
+        file_tasks = upload_task.file_tasks
+        file_statuses = {}
+        for row in range(min(len(file_tasks), self.TASK_STATUS_MAX_FILES)):
+            file_path, file_task = file_tasks.row(row)
+            file_statuses[file_path] = self._get_file_status(file_task)
 
-        upload_task = None
-        for candidate_user_id in candidate_user_ids:
-            if (
-                candidate_user_id in self.task_store
-                and task_id in self.task_store[candidate_user_id]
-            ):
-                upload_task = self.task_store[candidate_user_id][task_id]
-                break
+        return {
+            **self._get_task_summary(upload_task),
+            "files": file_statuses,
+            "files_truncated": len(file_statuses) < len(file_tasks),
+        }
 
+    def get_task_summary(self, user_id: str, task_id: str) -> dict | None:
+        """Counters, progress rate, ETA and recent errors of a task, without files"""
+        upload_task = self._find_task(user_id, task_id)
         if upload_task is None:
             return None
+        return self._get_task_summary(upload_task)
 
-        file_statuses = {}
-        running_files_count = 0
-        pending_files_count = 0
-
-        for file_path, file_task in upload_task.file_tasks.items():
-            file_statuses[file_path] = {
-                "status": file_task.status.value,
-                "result": file_task.result,
-                "error": file_task.error,
-                "retry_count": file_task.retry_count,
-                "created_at": file_task.created_at,
-                "updated_at": file_task.updated_at,
-                "duration_seconds": file_task.duration_seconds,
-                "filename": file_task.filename,
-            }
-
-            # Count running and pending files
-            if file_task.status.value == "running":
-                running_files_count += 1
-            elif file_task.status.value == "pending":
-                pending_files_count += 1
+    def get_task_files(
+        self,
+        user_id: str,
+        task_id: str,
+        status: TaskStatus | None = None,
+        cursor: int = 0,
+        limit: int = 100,
+    ) -> dict | None:
+        """Page through the files of a task, optionally only those in one status
+
+        Args:
+            cursor: Position to continue from, as returned in "next_cursor"
+            limit: Maximum number of files to return
+
+        Returns:
+            {"task_id", "files": [...], "next_cursor"}, where next_cursor is
+            None on the last page; None if the task does not exist
+        """
+        upload_task = self._find_task(user_id, task_id)
+        if upload_task is None:
+            return None
+
+        file_tasks = upload_task.file_tasks
+        files = []
+        row = file_tasks.find(status, max(cursor, 0))
+        while row >= 0 and len(files) < limit:
+            file_path, file_task = file_tasks.row(row)
+            files.append({"file": file_path, **self._get_file_status(file_task)})
+            row = file_tasks.find(status, row + 1)
+
+        return {
+            "task_id": upload_task.task_id,
+            "status_filter": status.value if status else None,
+            "files": files,
+            "next_cursor": row if row >= 0 else None,
+        }
+
+    def _get_file_status(self, file_task: FileTask) -> dict:
+        return {
+            "status": file_task.status.value,
+            "result": file_task.result,
+            "error": file_task.error,
+            "retry_count": file_task.retry_count,
+            "created_at": file_task.created_at,
+            "updated_at": file_task.updated_at,
+            "duration_seconds": file_task.duration_seconds,
+            "filename": file_task.filename,
+        }
+
+    def _get_task_summary(self, upload_task: UploadTask) -> dict:
+        """O(1) task summary; file counts come from the task's status counters"""
+        file_tasks = upload_task.file_tasks
+        queue_fields = self._get_queue_fields(upload_task)
+
+        files_per_second = None
+        elapsed = upload_task.duration_seconds
+        if upload_task.processed_files and elapsed > 0:
+            files_per_second = upload_task.processed_files / elapsed
+        # Without a scheduler estimate (e.g. the last files are in flight) use the task's own rate
+        if (
+            queue_fields["eta_seconds"] is None
+            and upload_task.status == TaskStatus.RUNNING
+            and files_per_second
+        ):
+            remaining = max(upload_task.total_files - upload_task.processed_files, 0)
+            queue_fields["eta_seconds"] = round(remaining / files_per_second, 1)
 
         return {
             "task_id": upload_task.task_id,
@@ -542,20 +1004,50 @@ class TaskService:
             "processed_files": upload_task.processed_files,
             "successful_files": upload_task.successful_files,
             "failed_files": upload_task.failed_files,
-            "running_files": running_files_count,
-            "pending_files": pending_files_count,
+            "error": upload_task.error,
+            "listing": upload_task.listing,
+            "running_files": file_tasks.count(TaskStatus.RUNNING),
+            "pending_files": file_tasks.count(TaskStatus.PENDING),
             "created_at": upload_task.created_at,
             "updated_at": upload_task.updated_at,
             "duration_seconds": upload_task.duration_seconds,
-            "files": file_statuses,
+            "files_per_second": round(files_per_second, 3) if files_per_second else None,
+            **queue_fields,
+            "recent_errors": [
+                {
+                    "file": file_path,
+                    "filename": file_task.filename,
+                    "error": file_task.error,
+                    "updated_at": file_task.updated_at,
+                }
+                for file_path, file_task in file_tasks.recent_failures()
+            ],
+        }
+
+    def _get_queue_fields(self, upload_task: UploadTask) -> dict:
+        """Scheduling priority plus queue position and ETA while the task has work"""
+        queue_info = self.scheduler.get_queue_info(upload_task.task_id) or {}
+        return {
+            "priority": upload_task.priority.name.lower(),
+            "queue_position": queue_info.get("queue_position"),
+            "eta_seconds": queue_info.get("eta_seconds"),
         }
 
+    def get_scheduler_stats(self) -> dict:
+        return self.scheduler.get_stats()
+
+    def get_concurrency_stats(self) -> dict:
+        return self.concurrency_limiter.get_stats()
+
     def get_all_tasks(self, user_id: str) -> list:
         """Get all tasks for a user
 
         Returns the union of the user's own tasks and shared default tasks stored
         under the "anonymous" user key. User-owned tasks take precedence
         if a task_id overlaps.
+
+        At most TASK_STATUS_MAX_FILES files are included per task, unfinished
+        files first; larger tasks set "files_truncated" like get_task_status().
         """
         tasks_by_id = {}
 
@@ -566,42 +1058,24 @@ class TaskService:
                 if task_id in tasks_by_id:
                     continue
 
-                # Calculate running and pending counts and build file statuses
-                running_files_count = 0
-                pending_files_count = 0
+                file_tasks = upload_task.file_tasks
                 file_statuses = {}
-
-                for file_path, file_task in upload_task.file_tasks.items():
-                    if file_task.status.value != "completed":
-                        file_statuses[file_path] = {
-                            "status": file_task.status.value,
-                            "result": file_task.result,
-                            "error": file_task.error,
-                            "retry_count": file_task.retry_count,
-                            "created_at": file_task.created_at,
-                            "updated_at": file_task.updated_at,
-                            "duration_seconds": file_task.duration_seconds,
-                            "filename": file_task.filename,
-                        }
-
-                    if file_task.status.value == "running":
-                        running_files_count += 1
-                    elif file_task.status.value == "pending":
-                        pending_files_count += 1
+                for status in (
+                    TaskStatus.FAILED,
+                    TaskStatus.RUNNING,
+                    TaskStatus.PENDING,
+                    TaskStatus.COMPLETED,
+                ):
+                    row = file_tasks.find(status)
+                    while row >= 0 and len(file_statuses) < self.TASK_STATUS_MAX_FILES:
+                        file_path, file_task = file_tasks.row(row)
+                        file_statuses[file_path] = self._get_file_status(file_task)
+                        row = file_tasks.find(status, row + 1)
 
                 tasks_by_id[task_id] = {
-                    "task_id": upload_task.task_id,
-                    "status": upload_task.status.value,
-                    "total_files": upload_task.total_files,
-                    "processed_files": upload_task.processed_files,
-                    "successful_files": upload_task.successful_files,
-                    "failed_files": upload_task.failed_files,
-                    "running_files": running_files_count,
-                    "pending_files": pending_files_count,
-                    "created_at": upload_task.created_at,
-                    "updated_at": upload_task.updated_at,
-                    "duration_seconds": upload_task.duration_seconds,
+                    **self._get_task_summary(upload_task),
                     "files": file_statuses,
+                    "files_truncated": len(file_statuses) < len(file_tasks),
                 }
 
         # First, add user-owned tasks; then shared anonymous;
@@ -636,6 +1110,7 @@ class TaskService:
                     del self.task_store[user_id][task_id]
                     # Clean up the associated lock
                     self._task_locks.pop(task_id, None)
+                    self._task_backlogs.pop(task_id, None)
                     cleaned_count += 1
                     logger.debug(
                         "Cleaned up old task",
@@ -648,6 +1123,12 @@ class TaskService:
             if not self.task_store[user_id]:
                 del self.task_store[user_id]
 
+        try:
+            # Also drops finished tasks from before a restart that were never loaded
+            await self.persistent_store.purge_finished(current_time - max_age_seconds)
+        except Exception as e:
+            logger.warning("Failed to purge old tasks from task store", error=str(e))
+
         if cleaned_count > 0:
             logger.info("Task cleanup completed", cleaned_count=cleaned_count)
 
@@ -679,7 +1160,11 @@ class TaskService:
         if upload_task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
             return False
 
-        # Cancel the background task to stop scheduling new work
+        # Stop listing new items, then the background task scheduling work
+        listing_task = getattr(upload_task, "listing_task", None)
+        if listing_task is not None and not listing_task.done():
+            listing_task.cancel()
+        self._close_task_items(task_id)
         if (
             hasattr(upload_task, "background_task")
             and not upload_task.background_task.done()
@@ -709,6 +1194,9 @@ class TaskService:
                     file_task.error = "Task cancelled by user"
                     file_task.updated_at = time.time()
 
+        self._publish_task_event(upload_task)
+        await self._persist_task(store_user_id, upload_task, include_files=True)
+
         return True
 
     async def shutdown(self):
@@ -722,6 +1210,9 @@ class TaskService:
         """
         logger.info("Shutting down TaskService", background_tasks_count=len(self.background_tasks))
 
+        # Stop persisting first so tasks cancelled by shutdown stay resumable
+        self._persistence_enabled = False
+
         # Cancel the periodic cleanup task
         if self._cleanup_task is not None and not self._cleanup_task.done():
             self._cleanup_task.cancel()
@@ -743,6 +1234,11 @@ class TaskService:
                 if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
                     logger.warning("Background task raised exception during shutdown", error=str(result))
 
+        try:
+            await self.persistent_store.close()
+        except Exception as e:
+            logger.warning("Failed to close task store", error=str(e))
+
         # Shutdown the process pool
         if hasattr(self, "process_pool"):
             self.process_pool.shutdown(wait=True)
@@ -0,0 +1,539 @@
+"""
+Persistent backing store for TaskService.
+
+``TaskService.task_store`` is an in-memory dict, so a restart used to lose
+every queued and running ingestion task. Task and file state transitions are
+now also written to a durable store as they happen, and on startup tasks that
+were still PENDING or RUNNING are loaded back so their unfinished files can be
+resumed.
+
+Two backends are provided:
+
+- ``SQLiteTaskStore`` (default): a local WAL-mode SQLite file. All access goes
+  through a single worker thread, so writes are applied in the order they
+  were issued and never block the event loop.
+- ``OpenSearchTaskStore``: one index holding task and file records, for
+  deployments where the backend's local disk is not persistent.
+
+Processors are stored as a ``resume_spec()`` (processor type plus JSON
+parameters). JWTs are never persisted; they are re-minted when a task is
+resumed.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from models.tasks import FileTask, TaskStatus, UploadTask
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+UNFINISHED_STATUSES = (TaskStatus.PENDING.value, TaskStatus.RUNNING.value)
+FINISHED_STATUSES = (TaskStatus.COMPLETED.value, TaskStatus.FAILED.value)
+
+
+@dataclass
+class StoredTask:
+    """An unfinished task loaded back from the store"""
+
+    user_id: str
+    task: UploadTask
+    processor_spec: Optional[dict]
+
+
+def _task_record(user_id: str, upload_task: UploadTask) -> dict:
+    return {
+        "task_id": upload_task.task_id,
+        "user_id": user_id,
+        "status": upload_task.status.value,
+        "total_files": upload_task.total_files,
+        "processed_files": upload_task.processed_files,
+        "successful_files": upload_task.successful_files,
+        "failed_files": upload_task.failed_files,
+        "error": upload_task.error,
+        "listing": upload_task.listing,
+        "created_at": upload_task.created_at,
+        "updated_at": upload_task.updated_at,
+    }
+
+
+def _file_record(task_id: str, file_key: str, file_task: FileTask) -> dict:
+    return {
+        "task_id": task_id,
+        "file_key": file_key,
+        "file_path": file_task.file_path,
+        "filename": file_task.filename,
+        "status": file_task.status.value,
+        "result": file_task.result,
+        "error": file_task.error,
+        "retry_count": file_task.retry_count,
+        "created_at": file_task.created_at,
+        "updated_at": file_task.updated_at,
+    }
+
+
+def _file_task_from_record(record: dict) -> FileTask:
+    return FileTask(
+        file_path=record["file_path"],
+        status=TaskStatus(record["status"]),
+        result=record.get("result"),
+        error=record.get("error"),
+        retry_count=record.get("retry_count") or 0,
+        created_at=record["created_at"],
+        updated_at=record["updated_at"],
+        filename=record.get("filename"),
+    )
+
+
+def _upload_task_from_record(record: dict, file_records: Iterable[dict]) -> UploadTask:
+    return UploadTask(
+        task_id=record["task_id"],
+        total_files=record["total_files"],
+        processed_files=record.get("processed_files") or 0,
+        successful_files=record.get("successful_files") or 0,
+        failed_files=record.get("failed_files") or 0,
+        file_tasks={r["file_key"]: _file_task_from_record(r) for r in file_records},
+        status=TaskStatus(record["status"]),
+        created_at=record["created_at"],
+        updated_at=record["updated_at"],
+        error=record.get("error"),
+        listing=bool(record.get("listing")),
+    )
+
+
+class TaskStore:
+    """Interface for durable task storage; the base class stores nothing"""
+
+    name = "memory"
+
+    async def initialize(self) -> None:
+        pass
+
+    async def save_task(
+        self,
+        user_id: str,
+        upload_task: UploadTask,
+        processor_spec: Optional[dict] = None,
+        include_files: bool = False,
+    ) -> None:
+        """Upsert the task record (and optionally every file record)"""
+
+    async def save_file(self, user_id: str, upload_task: UploadTask, file_key: str) -> None:
+        """Upsert one file record together with the task's counters"""
+
+    async def save_files(
+        self, user_id: str, upload_task: UploadTask, file_keys: Iterable[str]
+    ) -> None:
+        """Upsert some file records together with the task's counters"""
+
+    async def load_unfinished_tasks(self) -> List[StoredTask]:
+        """Return tasks that were PENDING or RUNNING when last written"""
+        return []
+
+    async def purge_finished(self, older_than: float) -> int:
+        """Delete finished tasks last updated before the given timestamp"""
+        return 0
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteTaskStore(TaskStore):
+    """Task store backed by a local SQLite file"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = "data/tasks.db"):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        # One worker thread keeps writes ordered and the connection single-threaded
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _init_sync(self):
+        if self._conn is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                total_files INTEGER NOT NULL,
+                processed_files INTEGER NOT NULL,
+                successful_files INTEGER NOT NULL,
+                failed_files INTEGER NOT NULL,
+                processor TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                error TEXT,
+                listing INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Databases created before task-level errors and streaming listings
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+        if "error" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN error TEXT")
+        if "listing" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN listing INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_files (
+                task_id TEXT NOT NULL,
+                file_key TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                filename TEXT,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                retry_count INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (task_id, file_key)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
+        conn.commit()
+        self._conn = conn
+
+    async def initialize(self) -> None:
+        await self._run(self._init_sync)
+        logger.info("Task store ready", backend=self.name, path=self.path)
+
+    def _upsert_task(self, record: dict, processor_spec: Optional[dict]):
+        self._conn.execute(
+            """
+            INSERT INTO tasks (task_id, user_id, status, total_files, processed_files,
+                               successful_files, failed_files, processor, created_at, updated_at,
+                               error, listing)
+            VALUES (:task_id, :user_id, :status, :total_files, :processed_files,
+                    :successful_files, :failed_files, :processor, :created_at, :updated_at,
+                    :error, :listing)
+            ON CONFLICT(task_id) DO UPDATE SET
+                status = excluded.status,
+                total_files = excluded.total_files,
+                processed_files = excluded.processed_files,
+                successful_files = excluded.successful_files,
+                failed_files = excluded.failed_files,
+                processor = COALESCE(excluded.processor, tasks.processor),
+                updated_at = excluded.updated_at,
+                error = excluded.error,
+                listing = excluded.listing
+            """,
+            {
+                **record,
+                "listing": int(record["listing"]),
+                "processor": json.dumps(processor_spec) if processor_spec else None,
+            },
+        )
+
+    def _upsert_files(self, records: List[dict]):
+        self._conn.executemany(
+            """
+            INSERT OR REPLACE INTO task_files (task_id, file_key, file_path, filename, status,
+                                               result, error, retry_count, created_at, updated_at)
+            VALUES (:task_id, :file_key, :file_path, :filename, :status,
+                    :result, :error, :retry_count, :created_at, :updated_at)
+            """,
+            [
+                {**r, "result": json.dumps(r["result"], default=str) if r["result"] is not None else None}
+                for r in records
+            ],
+        )
+
+    def _save_sync(self, task_record: dict, processor_spec, file_records: List[dict]):
+        # Tasks may be created before startup initialized the store
+        self._init_sync()
+        with self._conn:
+            self._upsert_task(task_record, processor_spec)
+            if file_records:
+                self._upsert_files(file_records)
+
+    async def save_task(self, user_id, upload_task, processor_spec=None, include_files=False):
+        file_records = (
+            [_file_record(upload_task.task_id, k, f) for k, f in upload_task.file_tasks.items()]
+            if include_files
+            else []
+        )
+        await self._run(
+            self._save_sync, _task_record(user_id, upload_task), processor_spec, file_records
+        )
+
+    async def save_file(self, user_id, upload_task, file_key):
+        await self.save_files(user_id, upload_task, [file_key])
+
+    async def save_files(self, user_id, upload_task, file_keys):
+        await self._run(
+            self._save_sync,
+            _task_record(user_id, upload_task),
+            None,
+            [
+                _file_record(upload_task.task_id, key, upload_task.file_tasks[key])
+                for key in file_keys
+            ],
+        )
+
+    def _load_unfinished_sync(self) -> List[StoredTask]:
+        self._init_sync()
+        self._conn.row_factory = sqlite3.Row
+        try:
+            task_rows = self._conn.execute(
+                "SELECT * FROM tasks WHERE status IN (?, ?) ORDER BY created_at",
+                UNFINISHED_STATUSES,
+            ).fetchall()
+            stored = []
+            for row in task_rows:
+                file_rows = self._conn.execute(
+                    "SELECT * FROM task_files WHERE task_id = ?", (row["task_id"],)
+                ).fetchall()
+                file_records = []
+                for file_row in file_rows:
+                    record = dict(file_row)
+                    record["result"] = json.loads(record["result"]) if record["result"] else None
+                    file_records.append(record)
+                stored.append(
+                    StoredTask(
+                        user_id=row["user_id"],
+                        task=_upload_task_from_record(dict(row), file_records),
+                        processor_spec=json.loads(row["processor"]) if row["processor"] else None,
+                    )
+                )
+            return stored
+        finally:
+            self._conn.row_factory = None
+
+    async def load_unfinished_tasks(self) -> List[StoredTask]:
+        return await self._run(self._load_unfinished_sync)
+
+    def _purge_sync(self, older_than: float) -> int:
+        self._init_sync()
+        with self._conn:
+            task_ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT task_id FROM tasks WHERE status IN (?, ?) AND updated_at < ?",
+                    (*FINISHED_STATUSES, older_than),
+                )
+            ]
+            self._conn.executemany(
+                "DELETE FROM task_files WHERE task_id = ?", [(t,) for t in task_ids]
+            )
+            self._conn.executemany("DELETE FROM tasks WHERE task_id = ?", [(t,) for t in task_ids])
+        return len(task_ids)
+
+    async def purge_finished(self, older_than: float) -> int:
+        return await self._run(self._purge_sync, older_than)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+
+TASK_STORE_INDEX_BODY = {
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 0,
+    },
+    "mappings": {
+        "properties": {
+            "record_type": {"type": "keyword"},
+            "task_id": {"type": "keyword"},
+            "user_id": {"type": "keyword"},
+            "file_key": {"type": "keyword"},
+            "file_path": {"type": "keyword", "index": False},
+            "filename": {"type": "keyword", "index": False},
+            "status": {"type": "keyword"},
+            "listing": {"type": "boolean"},
+            "processor": {"type": "object", "enabled": False},
+            "result": {"type": "object", "enabled": False},
+            "error": {"type": "text", "index": False},
+            "created_at": {"type": "double"},
+            "updated_at": {"type": "double"},
+        }
+    },
+}
+
+
+class OpenSearchTaskStore(TaskStore):
+    """Task store backed by an OpenSearch index (written with the internal client)"""
+
+    name = "opensearch"
+
+    # Page size when reading file records back on startup
+    _PAGE_SIZE = 1000
+
+    def __init__(self, opensearch_client, index_name: str = "openrag_tasks"):
+        self.opensearch_client = opensearch_client
+        self.index_name = index_name
+
+    async def initialize(self) -> None:
+        if not await self.opensearch_client.indices.exists(index=self.index_name):
+            await self.opensearch_client.indices.create(
+                index=self.index_name, body=TASK_STORE_INDEX_BODY
+            )
+            logger.info("Created task store index", index_name=self.index_name)
+        logger.info("Task store ready", backend=self.name, index_name=self.index_name)
+
+    @staticmethod
+    def _file_doc_id(task_id: str, file_key: str) -> str:
+        # File keys are paths or provider IDs of arbitrary length
+        return f"{task_id}:{hashlib.sha1(file_key.encode('utf-8')).hexdigest()}"
+
+    def _task_doc(self, user_id, upload_task, processor_spec) -> dict:
+        doc = {"record_type": "task", **_task_record(user_id, upload_task)}
+        if processor_spec:
+            doc["processor"] = processor_spec
+        return doc
+
+    async def _bulk(self, docs: List[tuple]):
+        """Upsert (doc_id, partial doc) pairs so the stored processor spec is kept"""
+        for start in range(0, len(docs), self._PAGE_SIZE):
+            lines = []
+            for doc_id, doc in docs[start:start + self._PAGE_SIZE]:
+                lines.append(json.dumps({"update": {"_index": self.index_name, "_id": doc_id}}))
+                lines.append(json.dumps({"doc": doc, "doc_as_upsert": True}, default=str))
+            response = await self.opensearch_client.bulk(body="\n".join(lines) + "\n")
+            if response.get("errors"):
+                failed = [
+                    item for item in response.get("items", [])
+                    if next(iter(item.values())).get("error")
+                ]
+                logger.warning("Task store bulk write had failures", failed=len(failed))
+
+    async def save_task(self, user_id, upload_task, processor_spec=None, include_files=False):
+        docs = [(upload_task.task_id, self._task_doc(user_id, upload_task, processor_spec))]
+        if include_files:
+            docs.extend(
+                (
+                    self._file_doc_id(upload_task.task_id, key),
+                    {"record_type": "file", **_file_record(upload_task.task_id, key, f)},
+                )
+                for key, f in upload_task.file_tasks.items()
+            )
+        await self._bulk(docs)
+
+    async def save_file(self, user_id, upload_task, file_key):
+        await self.save_files(user_id, upload_task, [file_key])
+
+    async def save_files(self, user_id, upload_task, file_keys):
+        docs = [(upload_task.task_id, self._task_doc(user_id, upload_task, None))]
+        docs.extend(
+            (
+                self._file_doc_id(upload_task.task_id, key),
+                {
+                    "record_type": "file",
+                    **_file_record(upload_task.task_id, key, upload_task.file_tasks[key]),
+                },
+            )
+            for key in file_keys
+        )
+        await self._bulk(docs)
+
+    async def _search_all(self, query: dict, sort: list) -> List[dict]:
+        """Page through every match with search_after"""
+        sources = []
+        search_after = None
+        while True:
+            body = {"query": query, "size": self._PAGE_SIZE, "sort": sort}
+            if search_after:
+                body["search_after"] = search_after
+            response = await self.opensearch_client.search(index=self.index_name, body=body)
+            hits = response.get("hits", {}).get("hits", [])
+            sources.extend(hit["_source"] for hit in hits)
+            if len(hits) < self._PAGE_SIZE:
+                return sources
+            search_after = hits[-1]["sort"]
+
+    async def load_unfinished_tasks(self) -> List[StoredTask]:
+        await self.opensearch_client.indices.refresh(index=self.index_name)
+        task_docs = await self._search_all(
+            {
+                "bool": {
+                    "filter": [
+                        {"term": {"record_type": "task"}},
+                        {"terms": {"status": list(UNFINISHED_STATUSES)}},
+                    ]
+                }
+            },
+            sort=[{"task_id": "asc"}],
+        )
+        stored = []
+        for doc in task_docs:
+            file_docs = await self._search_all(
+                {
+                    "bool": {
+                        "filter": [
+                            {"term": {"record_type": "file"}},
+                            {"term": {"task_id": doc["task_id"]}},
+                        ]
+                    }
+                },
+                sort=[{"file_key": "asc"}],
+            )
+            stored.append(
+                StoredTask(
+                    user_id=doc["user_id"],
+                    task=_upload_task_from_record(doc, file_docs),
+                    processor_spec=doc.get("processor"),
+                )
+            )
+        stored.sort(key=lambda s: s.task.created_at)
+        return stored
+
+    async def purge_finished(self, older_than: float) -> int:
+        task_docs = await self._search_all(
+            {
+                "bool": {
+                    "filter": [
+                        {"term": {"record_type": "task"}},
+                        {"terms": {"status": list(FINISHED_STATUSES)}},
+                        {"range": {"updated_at": {"lt": older_than}}},
+                    ]
+                }
+            },
+            sort=[{"task_id": "asc"}],
+        )
+        task_ids = [doc["task_id"] for doc in task_docs]
+        if task_ids:
+            await self.opensearch_client.delete_by_query(
+                index=self.index_name,
+                body={"query": {"terms": {"task_id": task_ids}}},
+                params={"conflicts": "proceed"},
+            )
+        return len(task_ids)
+
+
+def create_task_store() -> TaskStore:
+    """Build the task store selected by TASK_STORE_BACKEND"""
+    from config.settings import TASK_STORE_BACKEND, TASK_STORE_PATH, clients
+
+    if TASK_STORE_BACKEND == "opensearch":
+        from config.settings import TASK_STORE_INDEX_NAME
+
+        return OpenSearchTaskStore(clients.opensearch, index_name=TASK_STORE_INDEX_NAME)
+    if TASK_STORE_BACKEND == "memory":
+        return TaskStore()
+    if TASK_STORE_BACKEND != "sqlite":
+        logger.warning(
+            "Unknown TASK_STORE_BACKEND, using sqlite", backend=TASK_STORE_BACKEND
+        )
+    return SQLiteTaskStore(TASK_STORE_PATH)
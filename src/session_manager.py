@@ -1,6 +1,10 @@
+import asyncio
+import inspect
 import json
+import time
 import jwt
 import httpx
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 from dataclasses import dataclass, asdict
@@ -47,6 +51,61 @@ class AnonymousUser(User):
 
 
 
+@dataclass(eq=False)
+class UserOpenSearchClient:
+    """Cached per-user OpenSearch client and the JWT it was created with
+
+    ``leases`` counts requests in flight on the client. A retired client (evicted
+    or replaced) is closed once no request holds it any more.
+    """
+
+    client: Any
+    jwt_token: str
+    last_used: float
+    leases: int = 0
+    retired: bool = False
+    closed: bool = False
+    handle: Any = None
+
+
+# Attribute values handed out as they are instead of being wrapped in a lease proxy
+_PLAIN_VALUES = (str, bytes, int, float, bool, type(None), dict, list, tuple, set)
+
+
+class LeasedOpenSearchClient:
+    """Proxy for a cached client that holds a lease for every request it makes
+
+    Callers keep using the handle like an AsyncOpenSearch client, including
+    namespaced APIs such as ``handle.indices.create(...)``. Each awaited request
+    takes a lease on the cache entry, so an evicted client is only closed once
+    its last request has finished. A request made on a closed client reopens
+    its connection pool and closes it again when done (AIOHttpConnection
+    recreates its session lazily), so holding a handle never leaks a pool.
+    """
+
+    __slots__ = ("_target", "_entry", "_manager")
+
+    def __init__(self, target, entry: UserOpenSearchClient, manager: "SessionManager"):
+        self._target = target
+        self._entry = entry
+        self._manager = manager
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if isinstance(value, _PLAIN_VALUES):
+            return value
+        return LeasedOpenSearchClient(value, self._entry, self._manager)
+
+    def __call__(self, *args, **kwargs):
+        result = self._target(*args, **kwargs)
+        if inspect.isawaitable(result):
+            return self._manager._run_leased(self._entry, result)
+        return result
+
+    def __repr__(self):
+        return f"LeasedOpenSearchClient({self._target!r})"
+
+
 class SessionManager:
     """Manages user sessions and JWT tokens"""
 
@@ -58,9 +117,19 @@ class SessionManager:
     ):
         self.secret_key = secret_key  # Keep for backward compatibility
         self.users: Dict[str, User] = {}  # user_id -> User
-        self.user_opensearch_clients: Dict[
-            str, Any
-        ] = {}  # user_id -> OpenSearch client
+        # user_id -> UserOpenSearchClient, least recently used first
+        self.user_opensearch_clients: "OrderedDict[str, UserOpenSearchClient]" = OrderedDict()
+        self._client_pool_stats = {
+            "created": 0,
+            "reused": 0,
+            "rotated": 0,
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+            "closed": 0,
+        }
+        # Evicted or replaced clients that still have requests in flight
+        self._retired_clients: set = set()
+        self._closing_clients: set = set()
 
         self.private_key_path = private_key_path
         self.public_key_path = public_key_path
@@ -245,19 +314,134 @@ class SessionManager:
         return None
 
     def get_user_opensearch_client(self, user_id: str, jwt_token: str):
-        """Get or create OpenSearch client for user with their JWT"""
+        """Get or create OpenSearch client for user with their JWT
+
+        Clients are cached in a bounded LRU keyed by user. A client is replaced
+        when the user's JWT changes, and idle or least recently used clients are
+        closed so their connection pools don't accumulate. The returned handle
+        leases the client for each request, so it is never closed under a
+        request that is still running.
+        """
+        from config.settings import OPENSEARCH_USER_CLIENT_MAX
+
         # Get the effective JWT token (handles anonymous JWT creation)
         jwt_token = self.get_effective_jwt_token(user_id, jwt_token)
+        now = time.monotonic()
 
-        # Check if we have a cached client for this user
-        if user_id not in self.user_opensearch_clients:
-            from config.settings import clients
+        self._evict_idle_opensearch_clients(now)
 
-            self.user_opensearch_clients[user_id] = (
-                clients.create_user_opensearch_client(jwt_token)
-            )
+        entry = self.user_opensearch_clients.get(user_id)
+        if entry is not None and entry.jwt_token == jwt_token:
+            entry.last_used = now
+            self.user_opensearch_clients.move_to_end(user_id)
+            self._client_pool_stats["reused"] += 1
+            return entry.handle
+
+        if entry is not None:
+            # Token rotated - don't keep sending the stale JWT
+            self._client_pool_stats["rotated"] += 1
+            self._retire_opensearch_client(self.user_opensearch_clients.pop(user_id))
+
+        from config.settings import clients
+
+        entry = UserOpenSearchClient(
+            client=clients.create_user_opensearch_client(jwt_token),
+            jwt_token=jwt_token,
+            last_used=now,
+        )
+        entry.handle = LeasedOpenSearchClient(entry.client, entry, self)
+        self.user_opensearch_clients[user_id] = entry
+        self._client_pool_stats["created"] += 1
+
+        while len(self.user_opensearch_clients) > max(1, OPENSEARCH_USER_CLIENT_MAX):
+            _, evicted = self.user_opensearch_clients.popitem(last=False)
+            self._client_pool_stats["evicted_lru"] += 1
+            self._retire_opensearch_client(evicted)
+
+        return entry.handle
+
+    def _evict_idle_opensearch_clients(self, now: float):
+        """Close clients that have not been used within the idle TTL"""
+        from config.settings import OPENSEARCH_USER_CLIENT_IDLE_TTL
+
+        # Oldest entries come first, so stop at the first one still in use
+        while self.user_opensearch_clients:
+            user_id, entry = next(iter(self.user_opensearch_clients.items()))
+            if now - entry.last_used < OPENSEARCH_USER_CLIENT_IDLE_TTL:
+                break
+            del self.user_opensearch_clients[user_id]
+            self._client_pool_stats["evicted_idle"] += 1
+            self._retire_opensearch_client(entry)
+
+    async def _run_leased(self, entry: UserOpenSearchClient, request):
+        """Await a request on a cached client while holding a lease on it"""
+        entry.leases += 1
+        try:
+            return await request
+        finally:
+            entry.leases -= 1
+            if entry.retired and entry.leases == 0:
+                self._schedule_close(entry)
+
+    def _retire_opensearch_client(self, entry: UserOpenSearchClient):
+        """Close a client that left the cache once no request holds it"""
+        entry.retired = True
+        if entry.leases:
+            self._retired_clients.add(entry)
+        else:
+            self._schedule_close(entry)
 
-        return self.user_opensearch_clients[user_id]
+    def _schedule_close(self, entry: UserOpenSearchClient):
+        self._retired_clients.discard(entry)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._close_opensearch_client(entry))
+        self._closing_clients.add(task)
+        task.add_done_callback(self._closing_clients.discard)
+
+    async def _close_opensearch_client(self, entry: UserOpenSearchClient):
+        try:
+            await entry.client.close()
+        except Exception as e:
+            logger.warning("Failed to close user OpenSearch client", error=str(e))
+            return
+        # Later closes only release a pool reopened by a request on a stale handle
+        if not entry.closed:
+            entry.closed = True
+            self._client_pool_stats["closed"] += 1
+
+    async def close_user_opensearch_clients(self):
+        """Close every cached and retired user client (application shutdown)"""
+        entries = list(self.user_opensearch_clients.values()) + list(self._retired_clients)
+        self.user_opensearch_clients.clear()
+        self._retired_clients.clear()
+        for entry in entries:
+            entry.retired = True
+        await asyncio.gather(
+            *self._closing_clients,
+            *(self._close_opensearch_client(entry) for entry in entries),
+            return_exceptions=True,
+        )
+
+    def get_client_pool_stats(self) -> Dict[str, Any]:
+        """Size and churn counters for the per-user OpenSearch client cache"""
+        from config.settings import (
+            OPENSEARCH_USER_CLIENT_IDLE_TTL,
+            OPENSEARCH_USER_CLIENT_MAX,
+            OPENSEARCH_USER_CLIENT_POOL_SIZE,
+        )
+
+        return {
+            "cached_clients": len(self.user_opensearch_clients),
+            "max_clients": OPENSEARCH_USER_CLIENT_MAX,
+            "idle_ttl_seconds": OPENSEARCH_USER_CLIENT_IDLE_TTL,
+            "connections_per_client": OPENSEARCH_USER_CLIENT_POOL_SIZE,
+            "retired_clients_in_use": len(self._retired_clients),
+            "closing_clients": len(self._closing_clients),
+            **self._client_pool_stats,
+        }
 
     def get_effective_jwt_token(self, user_id: str, jwt_token: str) -> str:
         """Get the effective JWT token, creating anonymous JWT if needed in no-auth mode"""
@@ -9,7 +9,7 @@ import hashlib
 import json
 import asyncio
 from typing import Dict, List, Tuple, Optional
-from src.connectors.base import DocumentACL
+from connectors.base import DocumentACL
 
 
 def compute_acl_hash(acl: DocumentACL) -> str:
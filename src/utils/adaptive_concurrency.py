@@ -0,0 +1,272 @@
+"""
+Adaptive (AIMD) limit on the number of files ingested concurrently.
+
+Ingestion throughput is bounded by downstream services - docling conversion,
+the embedding provider, the OpenSearch bulk queue and Langflow - whose
+capacity changes with load, model and provider quotas. A fixed worker count
+is either too low for an idle cluster or too high for a throttled provider.
+
+Each stage reports how long a call took and whether it succeeded, was
+throttled or overloaded (429/503/timeouts), or failed. Observations are
+evaluated in windows of ``window_seconds``:
+
+- any overload signal, an error rate above ``error_rate_threshold`` or a
+  stage latency above ``latency_tolerance`` times its baseline decreases the
+  limit multiplicatively;
+- stages whose call time grows with the document (conversion, Langflow
+  ingest, per-document bulk indexing) are judged on overload signals and
+  errors only, so a large PDF after small ones is not read as congestion;
+- a healthy window in which the limit was actually reached increases it by one.
+
+The limit always stays within ``[min_limit, max_limit]``. Every change is
+logged and kept (with its reason) for the /stats endpoint.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+OUTCOME_OK = "ok"
+OUTCOME_OVERLOADED = "overloaded"
+OUTCOME_ERROR = "error"
+
+# Same statuses the bulk helper treats as transient cluster pressure
+_OVERLOAD_STATUSES = {429, 502, 503, 504}
+# Windows with fewer samples for a stage are not used for its error rate or latency
+_MIN_STAGE_SAMPLES = 3
+# How fast a stage's latency baseline drifts up towards slower observations
+_BASELINE_DRIFT = 0.05
+# Stages timed per document; their latency reflects document size, not load
+SIZE_DEPENDENT_STAGES = frozenset({"docling", "langflow", "opensearch_bulk"})
+
+
+def classify_status_code(status_code: int) -> str:
+    """Map an HTTP status to an outcome; client errors are not a capacity signal"""
+    if status_code in _OVERLOAD_STATUSES:
+        return OUTCOME_OVERLOADED
+    if status_code >= 500:
+        return OUTCOME_ERROR
+    return OUTCOME_OK
+
+
+def classify_exception(exc: BaseException) -> str:
+    """Map a downstream exception to an outcome (overloaded vs plain error)"""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return OUTCOME_OVERLOADED
+    if "timeout" in type(exc).__name__.lower():
+        return OUTCOME_OVERLOADED
+
+    status = getattr(exc, "status_code", None)
+    if not isinstance(status, int):
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return classify_status_code(status)
+
+    message = str(exc).lower()
+    if "rate limit" in message or "too many requests" in message:
+        return OUTCOME_OVERLOADED
+    return OUTCOME_ERROR
+
+
+class _StageWindow:
+    __slots__ = ("count", "errors", "overloaded", "latency_sum")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.overloaded = 0
+        self.latency_sum = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.latency_sum / self.count if self.count else 0.0
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD controller for the number of in-flight ingestion files"""
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        enabled: bool = True,
+        window_seconds: float = 15.0,
+        latency_tolerance: float = 2.0,
+        error_rate_threshold: float = 0.2,
+        decrease_factor: float = 0.7,
+        size_dependent_stages=SIZE_DEPENDENT_STAGES,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.latency_tolerance = latency_tolerance
+        self.error_rate_threshold = error_rate_threshold
+        self.decrease_factor = decrease_factor
+        self.size_dependent_stages = frozenset(size_dependent_stages)
+
+        # A disabled limiter keeps the configured worker count as is
+        self._limit = (
+            min(max(initial_limit, self.min_limit), self.max_limit) if enabled else max(1, initial_limit)
+        )
+        self._listeners: List[Callable[[int], None]] = []
+        self._window: Dict[str, _StageWindow] = {}
+        self._window_started = time.monotonic()
+        self._peak_in_flight = 0
+        self._baselines: Dict[str, float] = {}
+        self._last_window: Dict[str, dict] = {}
+        self.changes: deque = deque(maxlen=20)
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        """Call listener(new_limit) whenever the limit changes"""
+        self._listeners.append(listener)
+
+    def note_in_flight(self, in_flight: int) -> None:
+        """Record current in-flight files; the limit only grows if it was reached"""
+        self._peak_in_flight = max(self._peak_in_flight, in_flight)
+
+    def observe(self, stage: str, seconds: float, outcome: str = OUTCOME_OK) -> None:
+        """Record one downstream call of an ingestion stage"""
+        window = self._window.get(stage)
+        if window is None:
+            window = self._window[stage] = _StageWindow()
+        window.count += 1
+        window.latency_sum += seconds
+        if outcome == OUTCOME_OVERLOADED:
+            window.overloaded += 1
+        elif outcome == OUTCOME_ERROR:
+            window.errors += 1
+        self._maybe_adjust()
+
+    def observe_exception(self, stage: str, seconds: float, exc: BaseException) -> None:
+        self.observe(stage, seconds, classify_exception(exc))
+
+    def _maybe_adjust(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if now - self._window_started < self.window_seconds:
+            return
+
+        window, self._window = self._window, {}
+        peak_in_flight, self._peak_in_flight = self._peak_in_flight, 0
+        self._window_started = now
+        self._last_window = {}
+
+        decrease_reason = None
+        for stage, stats in window.items():
+            baseline = self._baselines.get(stage)
+            avg = stats.avg_latency
+            self._last_window[stage] = {
+                "calls": stats.count,
+                "errors": stats.errors,
+                "overloaded": stats.overloaded,
+                "avg_latency_seconds": round(avg, 3),
+                "baseline_latency_seconds": round(baseline, 3) if baseline else None,
+            }
+
+            if stats.overloaded:
+                decrease_reason = decrease_reason or (
+                    f"{stage} overloaded ({stats.overloaded} of {stats.count} calls throttled or timed out)"
+                )
+                continue
+            if stats.count < _MIN_STAGE_SAMPLES:
+                continue
+            error_rate = stats.errors / stats.count
+            if error_rate > self.error_rate_threshold:
+                decrease_reason = decrease_reason or (
+                    f"{stage} error rate {error_rate:.0%} above {self.error_rate_threshold:.0%}"
+                )
+                continue
+
+            successful = stats.count - stats.errors
+            if not successful or stage in self.size_dependent_stages:
+                continue
+            if baseline is None:
+                self._baselines[stage] = avg
+            elif avg > baseline * self.latency_tolerance:
+                decrease_reason = decrease_reason or (
+                    f"{stage} latency {avg:.2f}s above {self.latency_tolerance:g}x baseline {baseline:.2f}s"
+                )
+            elif avg < baseline:
+                self._baselines[stage] = avg
+            else:
+                self._baselines[stage] = baseline + _BASELINE_DRIFT * (avg - baseline)
+
+        if not self.enabled:
+            return
+        if decrease_reason:
+            self._set_limit(int(self._limit * self.decrease_factor), decrease_reason)
+        elif window and peak_in_flight >= self._limit:
+            self._set_limit(self._limit + 1, "healthy window at the current limit")
+
+    def _set_limit(self, new_limit: int, reason: str) -> None:
+        new_limit = min(max(new_limit, self.min_limit), self.max_limit)
+        if new_limit == self._limit:
+            return
+        old_limit, self._limit = self._limit, new_limit
+        if new_limit > old_limit:
+            self.increases += 1
+        else:
+            self.decreases += 1
+        self.changes.append(
+            {"at": time.time(), "from": old_limit, "to": new_limit, "reason": reason}
+        )
+        logger.info(
+            "Ingestion concurrency limit changed",
+            old_limit=old_limit,
+            new_limit=new_limit,
+            reason=reason,
+        )
+        for listener in self._listeners:
+            try:
+                listener(new_limit)
+            except Exception as e:
+                logger.warning("Concurrency limit listener failed", error=str(e))
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "limit": self._limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "last_window": self._last_window,
+            "recent_changes": list(self.changes),
+        }
+
+
+def _create_limiter() -> AdaptiveConcurrencyLimiter:
+    from config.settings import (
+        INGESTION_ADAPTIVE_CONCURRENCY,
+        INGESTION_CONCURRENCY_WINDOW,
+        INGESTION_LATENCY_TOLERANCE,
+        INGESTION_MAX_CONCURRENCY,
+        INGESTION_MIN_CONCURRENCY,
+    )
+    from utils.gpu_detection import get_worker_count
+
+    return AdaptiveConcurrencyLimiter(
+        initial_limit=get_worker_count(),
+        min_limit=INGESTION_MIN_CONCURRENCY,
+        max_limit=INGESTION_MAX_CONCURRENCY,
+        enabled=INGESTION_ADAPTIVE_CONCURRENCY,
+        window_seconds=INGESTION_CONCURRENCY_WINDOW,
+        latency_tolerance=INGESTION_LATENCY_TOLERANCE,
+    )
+
+
+# Global instance fed by the ingestion stages and applied by TaskService
+ingestion_limiter = _create_limiter()
@@ -0,0 +1,161 @@
+"""
+Bounded cache of active conversation threads.
+
+Threads carry the full message list, including function-call chunks and raw
+response objects, and used to be kept for every user forever. They are now
+held in an LRU bounded by entry count and by an approximate memory budget
+(the JSON size of each thread when it was stored). Evicted threads are
+handed to the caller to spill to the conversation store and are reloaded
+from there when a later turn continues them.
+
+Threads that share a message list (a turn continues its parent's state) are
+counted once per entry, so the memory figure is an upper bound.
+"""
+
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ThreadKey = Tuple[str, str]  # (user_id, response_id)
+
+
+def estimate_thread_bytes(state: Dict[str, Any]) -> int:
+    try:
+        return len(json.dumps(state, default=str))
+    except (TypeError, ValueError):
+        return len(str(state))
+
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def restore_thread_datetimes(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the ISO timestamps of a thread loaded from JSON back into datetimes"""
+    for key in ("created_at", "last_activity"):
+        if key in state:
+            state[key] = _parse_datetime(state[key])
+    for message in state.get("messages", []):
+        if isinstance(message, dict) and "timestamp" in message:
+            message["timestamp"] = _parse_datetime(message["timestamp"])
+    return state
+
+
+class ConversationCache:
+    """LRU of conversation threads bounded by entries and approximate bytes"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[ThreadKey, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._by_user: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Evicted threads waiting to be written to the conversation store
+        self._spilling: Dict[ThreadKey, Dict[str, Any]] = {}
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.spilled = 0
+        self.spill_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str, response_id: str) -> Optional[Dict[str, Any]]:
+        """Return a cached thread (or one still waiting to be spilled)"""
+        key = (user_id, response_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        state = self._spilling.pop(key, None)
+        if state is not None:
+            self.hits += 1
+            self.put(user_id, response_id, state)
+            return state
+
+        self.misses += 1
+        return None
+
+    def put(self, user_id: str, response_id: str, state: Dict[str, Any]) -> None:
+        """Cache a thread; threads pushed out go to the spill queue"""
+        key = (user_id, response_id)
+        self._spilling.pop(key, None)
+        self._remove_entry(key)
+
+        size = estimate_thread_bytes(state)
+        self._entries[key] = (state, size)
+        self._by_user.setdefault(user_id, {})[response_id] = state
+        self.bytes += size
+
+        # Always keep the newest thread, even if it alone exceeds the budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            evicted_key, (evicted_state, _) = next(iter(self._entries.items()))
+            self._remove_entry(evicted_key)
+            self._spilling[evicted_key] = evicted_state
+            self.evictions += 1
+
+    def _remove_entry(self, key: ThreadKey) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[1]
+        user_id, response_id = key
+        user_threads = self._by_user.get(user_id)
+        if user_threads is not None:
+            user_threads.pop(response_id, None)
+            if not user_threads:
+                del self._by_user[user_id]
+        return True
+
+    def remove(self, user_id: str, response_id: str) -> bool:
+        """Drop a thread from the cache and the spill queue"""
+        key = (user_id, response_id)
+        spilling = self._spilling.pop(key, None) is not None
+        return self._remove_entry(key) or spilling
+
+    def pending_spills(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Evicted threads to write to the store; they stay queued until spill_done()"""
+        return [(user_id, response_id, state) for (user_id, response_id), state in self._spilling.items()]
+
+    def spill_done(self, user_id: str, response_id: str, state: Dict[str, Any]) -> None:
+        """Drop a written thread from the spill queue unless it was re-queued meanwhile"""
+        key = (user_id, response_id)
+        if self._spilling.get(key) is state:
+            del self._spilling[key]
+
+    def get_user_threads(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Cached threads of one user, keyed by response_id"""
+        return dict(self._by_user.get(user_id, {}))
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "approx_bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "users": len(self._by_user),
+            "pending_spill": len(self._spilling),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "evictions": self.evictions,
+            "spilled": self.spilled,
+            "spill_failures": self.spill_failures,
+        }
@@ -0,0 +1,207 @@
+"""
+Document-level manifest index used for deduplication.
+
+Chunks are stored in the documents index as ``{file_hash}_{i}``, so there is
+no single document to look up by content hash. The manifest index stores one
+small record per ingested document, keyed by the content hash, so that
+"is this file already indexed?" is a single GET and "which of these N files
+are already indexed?" is a single mget.
+
+Manifest records carry the same owner/ACL fields as chunks, so the
+document-level security rules that apply to ``documents*`` indices apply here
+as well.
+"""
+
+import datetime
+from typing import Iterable, Optional, Set
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_INDEX_BODY = {
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 0,
+    },
+    "mappings": {
+        "properties": {
+            "document_id": {"type": "keyword"},
+            "filename": {"type": "keyword"},
+            "mimetype": {"type": "keyword"},
+            "chunk_count": {"type": "integer"},
+            "embedding_model": {"type": "keyword"},
+            "embedding_dimensions": {"type": "integer"},
+            "file_size": {"type": "long"},
+            "connector_type": {"type": "keyword"},
+            "owner": {"type": "keyword"},
+            "allowed_users": {"type": "keyword"},
+            "allowed_groups": {"type": "keyword"},
+            "indexed_time": {"type": "date"},
+        }
+    },
+}
+
+
+def get_manifest_index_name() -> str:
+    """Return the manifest index name for the configured documents index"""
+    from config.settings import get_index_name
+
+    return f"{get_index_name()}_manifest"
+
+
+async def ensure_manifest_index(opensearch_client) -> None:
+    """Create the manifest index if it does not exist yet"""
+    index_name = get_manifest_index_name()
+    if await opensearch_client.indices.exists(index=index_name):
+        logger.debug("Document manifest index already exists", index_name=index_name)
+        return
+
+    await opensearch_client.indices.create(index=index_name, body=MANIFEST_INDEX_BODY)
+    logger.info("Created document manifest index", index_name=index_name)
+
+
+async def write_manifest(
+    opensearch_client,
+    file_hash: str,
+    filename: str,
+    chunk_count: int,
+    embedding_model: str,
+    mimetype: str = None,
+    embedding_dimensions: int = None,
+    file_size: int = None,
+    connector_type: str = None,
+    owner: str = None,
+    allowed_users: list = None,
+    allowed_groups: list = None,
+) -> None:
+    """Record that a document has been fully indexed"""
+    manifest_doc = {
+        "document_id": file_hash,
+        "filename": filename,
+        "mimetype": mimetype,
+        "chunk_count": chunk_count,
+        "embedding_model": embedding_model,
+        "embedding_dimensions": embedding_dimensions,
+        "file_size": file_size,
+        "connector_type": connector_type,
+        "indexed_time": datetime.datetime.now().isoformat(),
+    }
+    if owner is not None:
+        manifest_doc["owner"] = owner
+        manifest_doc["allowed_users"] = allowed_users or []
+        manifest_doc["allowed_groups"] = allowed_groups or []
+
+    await opensearch_client.index(
+        index=get_manifest_index_name(), id=file_hash, body=manifest_doc
+    )
+
+    from utils.embedding_model_inventory import embedding_model_inventory
+
+    embedding_model_inventory.note_model(embedding_model)
+
+
+async def get_manifest(opensearch_client, file_hash: str) -> Optional[dict]:
+    """Return the manifest record for a content hash, or None"""
+    response = await opensearch_client.get(
+        index=get_manifest_index_name(), id=file_hash, ignore=[404]
+    )
+    if not response or not response.get("found"):
+        return None
+    return response.get("_source")
+
+
+async def document_exists(opensearch_client, file_hash: str) -> bool:
+    """
+    Check whether a document with this content hash has been indexed.
+
+    Falls back to the first chunk for documents indexed before the manifest
+    index existed. Chunks written since carry ``in_manifest``, so a document
+    whose indexing failed part-way (no manifest record) is not reported.
+    """
+    from config.settings import get_index_name
+
+    if await opensearch_client.exists(index=get_manifest_index_name(), id=file_hash):
+        return True
+    response = await opensearch_client.get(
+        index=get_index_name(),
+        id=f"{file_hash}_0",
+        _source_includes=["in_manifest"],
+        ignore=[404],
+    )
+    if not response or not response.get("found"):
+        return False
+    return not (response.get("_source") or {}).get("in_manifest")
+
+
+async def existing_hashes(opensearch_client, file_hashes: Iterable[str]) -> Set[str]:
+    """Return the subset of file_hashes that already have a manifest record"""
+    ids = list(dict.fromkeys(file_hashes))
+    if not ids:
+        return set()
+
+    response = await opensearch_client.mget(
+        index=get_manifest_index_name(),
+        body={"ids": ids},
+        _source=False,
+        ignore=[404],
+    )
+    return {doc["_id"] for doc in response.get("docs", []) if doc.get("found")}
+
+
+async def delete_manifest_by_filename(opensearch_client, filename: str) -> int:
+    """
+    Remove manifest records for a filename.
+
+    Must accompany any delete of a document's chunks, otherwise a later
+    re-upload of the same content would be skipped as unchanged. Also marks
+    the cached embedding model inventory stale.
+    """
+    from utils.embedding_model_inventory import embedding_model_inventory
+    from utils.opensearch_queries import build_filename_delete_body
+
+    # The deleted chunks may have been the last ones for an embedding model
+    embedding_model_inventory.invalidate()
+
+    try:
+        response = await opensearch_client.delete_by_query(
+            index=get_manifest_index_name(),
+            body=build_filename_delete_body(filename),
+            conflicts="proceed",
+            ignore=[404],
+        )
+        return response.get("deleted", 0) if response else 0
+    except Exception as e:
+        logger.warning(
+            "Failed to delete document manifest records",
+            filename=filename,
+            error=str(e),
+        )
+        return 0
+
+
+async def delete_manifest_by_document_ids(opensearch_client, document_ids: Iterable[str]) -> int:
+    """Remove manifest records for documents deleted by ID (see delete_manifest_by_filename)"""
+    from utils.embedding_model_inventory import embedding_model_inventory
+    from utils.opensearch_queries import build_document_ids_delete_body
+
+    ids = list(dict.fromkeys(document_ids))
+    if not ids:
+        return 0
+    embedding_model_inventory.invalidate()
+
+    try:
+        response = await opensearch_client.delete_by_query(
+            index=get_manifest_index_name(),
+            body=build_document_ids_delete_body(ids),
+            conflicts="proceed",
+            ignore=[404],
+        )
+        return response.get("deleted", 0) if response else 0
+    except Exception as e:
+        logger.warning(
+            "Failed to delete document manifest records",
+            document_count=len(ids),
+            error=str(e),
+        )
+        return 0
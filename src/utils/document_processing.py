@@ -256,12 +256,15 @@ def extract_relevant(doc_dict: dict) -> dict:
     }
 
 
-def process_document_sync(file_path: str):
-    """Synchronous document processing function for multiprocessing"""
+def process_document_sync(file_path: str, file_hash: str = None):
+    """Synchronous document processing function for multiprocessing
+
+    Callers that already hashed the file pass file_hash so large files are not
+    read a second time in the worker.
+    """
     import traceback
     import psutil
     import sys
-    from collections import defaultdict
 
     process = psutil.Process()
     start_memory = process.memory_info().rss / 1024 / 1024  # MB
@@ -303,11 +306,12 @@ def process_document_sync(file_path: str):
             traceback.print_exc()
             raise
 
-        # Compute file hash
+        # Compute file hash unless the caller already did
         try:
             from utils.hash_utils import hash_id
-            logger.info("Computing file hash", worker_pid=os.getpid())
-            file_hash = hash_id(file_path)
+            if file_hash is None:
+                logger.info("Computing file hash", worker_pid=os.getpid())
+                file_hash = hash_id(file_path)
             logger.info(
                 "File hash computed",
                 worker_pid=os.getpid(),
@@ -359,34 +363,14 @@ def process_document_sync(file_path: str):
             traceback.print_exc()
             raise
 
-        # Extract relevant content (same logic as extract_relevant)
+        # Extract relevant content (page text and flattened tables)
         try:
             logger.info("Extracting relevant content", worker_pid=os.getpid())
-            origin = full_doc.get("origin", {})
-            texts = full_doc.get("texts", [])
-            logger.info(
-                "Found text fragments",
-                worker_pid=os.getpid(),
-                fragment_count=len(texts),
-            )
-
-            page_texts = defaultdict(list)
-            for txt in texts:
-                prov = txt.get("prov", [])
-                page_no = prov[0].get("page_no") if prov else None
-                if page_no is not None:
-                    page_texts[page_no].append(txt.get("text", "").strip())
-
-            chunks = []
-            for page in sorted(page_texts):
-                joined = "\n".join(page_texts[page])
-                chunks.append({"page": page, "text": joined})
-
+            slim_doc = extract_relevant(full_doc)
             logger.info(
-                "Created chunks from pages",
+                "Created chunks from document",
                 worker_pid=os.getpid(),
-                chunk_count=len(chunks),
-                page_count=len(page_texts),
+                chunk_count=len(slim_doc["chunks"]),
             )
 
         except Exception as e:
@@ -407,9 +391,9 @@ def process_document_sync(file_path: str):
 
         return {
             "id": file_hash,
-            "filename": origin.get("filename"),
-            "mimetype": origin.get("mimetype"),
-            "chunks": chunks,
+            "filename": slim_doc["filename"],
+            "mimetype": slim_doc["mimetype"],
+            "chunks": slim_doc["chunks"],
             "file_path": file_path,
         }
 
@@ -0,0 +1,237 @@
+"""
+Cache for query embeddings used by search.
+
+Every search embeds the query once per embedding model found in the corpus.
+Identical queries (nudges, the same question asked by many users) are common,
+so embeddings are cached by (model, normalized query text) in a bounded
+in-memory LRU, optionally backed by a SQLite file so the cache survives
+restarts and is shared between workers.
+
+Entries expire after a TTL; both layers are also bounded by entry count.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Prune the disk layer once every N writes instead of on every insert
+_DISK_PRUNE_INTERVAL = 100
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text for cache lookups (unicode form and whitespace only)"""
+    return " ".join(unicodedata.normalize("NFC", query or "").split())
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache of query embeddings with an optional SQLite layer"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        path: Optional[str] = None,
+        disk_max_entries: int = 10000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.disk_max_entries = disk_max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One SQLite connection shared by the worker threads, serialized by _disk_lock
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.path:
+            try:
+                self._init_disk()
+            except Exception as e:
+                logger.warning(
+                    "Query embedding disk cache unavailable, using memory only",
+                    path=self.path,
+                    error=str(e),
+                )
+                self.close()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def _init_disk(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        with self._conn as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    model TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    embedding TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (model, query)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_query_embeddings_created "
+                "ON query_embeddings (created_at)"
+            )
+
+    def get(self, model: str, query: str) -> Optional[List[float]]:
+        """Return a cached embedding from memory, or None"""
+        if not self.enabled:
+            return None
+        key = (model, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, embedding = entry
+            if time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, model: str, query: str, embedding: List[float], created_at: float = None):
+        """Store an embedding in memory, evicting least recently used entries"""
+        if not self.enabled:
+            return
+        key = (model, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (created_at or time.time(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _disk_get(self, model: str, query: str) -> Optional[Tuple[float, List[float]]]:
+        with self._disk_lock:
+            row = self._conn.execute(
+                "SELECT created_at, embedding FROM query_embeddings WHERE model = ? AND query = ?",
+                (model, normalize_query(query)),
+            ).fetchone()
+        if row is None:
+            return None
+        created_at, embedding = row
+        if time.time() - created_at > self.ttl_seconds:
+            return None
+        return created_at, json.loads(embedding)
+
+    def _disk_put(self, model: str, query: str, embedding: List[float]):
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % _DISK_PRUNE_INTERVAL == 0
+        with self._disk_lock, self._conn as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (model, query, embedding, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (model, normalize_query(query), json.dumps(embedding), time.time()),
+            )
+            if prune:
+                self._disk_prune(conn)
+
+    def _disk_prune(self, conn: sqlite3.Connection):
+        conn.execute(
+            "DELETE FROM query_embeddings WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,),
+        )
+        conn.execute(
+            """
+            DELETE FROM query_embeddings WHERE rowid IN (
+                SELECT rowid FROM query_embeddings
+                ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.disk_max_entries,),
+        )
+
+    async def aget(self, model: str, query: str) -> Optional[List[float]]:
+        """Look up an embedding in memory, then on disk (off the event loop)"""
+        embedding = self.get(model, query)
+        if embedding is not None or not self.enabled:
+            return embedding
+
+        if self.path:
+            try:
+                entry = await asyncio.to_thread(self._disk_get, model, query)
+            except Exception as e:
+                logger.warning("Query embedding disk cache read failed", error=str(e))
+                entry = None
+            if entry is not None:
+                created_at, embedding = entry
+                self.put(model, query, embedding, created_at=created_at)
+                with self._lock:
+                    self.disk_hits += 1
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def aput(self, model: str, query: str, embedding: List[float]):
+        """Store an embedding in memory and, if configured, on disk"""
+        if not self.enabled:
+            return
+        self.put(model, query, embedding)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._disk_put, model, query, embedding)
+            except Exception as e:
+                logger.warning("Query embedding disk cache write failed", error=str(e))
+
+    def clear(self):
+        """Drop all in-memory entries (the disk layer expires via TTL)"""
+        with self._lock:
+            self._entries.clear()
+
+    def close(self):
+        """Close the disk layer's connection"""
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self.path = None
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters and sizes for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_path": self.path,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": (
+                    round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+                ),
+            }
@@ -0,0 +1,162 @@
+"""
+Cached inventory of the embedding models present in the documents index.
+
+Search embeds the query once per embedding model found in the corpus. Finding
+those models takes a terms aggregation over every chunk, which on a large
+index costs about as much as the search itself, while the answer only changes
+when documents are ingested or deleted. The inventory is therefore cached and
+refreshed when it goes stale: after ``refresh_interval`` seconds, or on the
+next lookup after a delete invalidates it. Ingest adds the model it used
+without re-aggregating.
+
+The cached inventory is corpus-wide and read with the internal client, so it
+is a superset of what any single user can see; embedding a query with a model
+the user has no documents for only costs an extra (cached) embedding.
+Filter-scoped detection is still available when explicitly requested.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 300
+
+
+def build_embedding_model_agg_query(filter_clauses: Optional[list] = None) -> dict:
+    """Terms aggregation over embedding_model, optionally scoped by filters"""
+    agg_query = {
+        "size": 0,
+        "aggs": {
+            "embedding_models": {
+                "terms": {
+                    "field": "embedding_model",
+                    "size": 10
+                }
+            }
+        }
+    }
+    if filter_clauses:
+        agg_query["query"] = {
+            "bool": {
+                "filter": filter_clauses
+            }
+        }
+    return agg_query
+
+
+async def aggregate_embedding_models(
+    opensearch_client, index_name: str, filter_clauses: Optional[list] = None
+) -> Dict[str, int]:
+    """Run the embedding_model aggregation and return {model: doc_count}"""
+    agg_result = await opensearch_client.search(
+        index=index_name,
+        body=build_embedding_model_agg_query(filter_clauses),
+        params={"terminate_after": 0},
+    )
+    buckets = agg_result.get("aggregations", {}).get("embedding_models", {}).get("buckets", [])
+    return {b["key"]: b["doc_count"] for b in buckets if b["key"]}
+
+
+class EmbeddingModelInventory:
+    """Corpus-wide embedding model list, refreshed on a timer and on delete"""
+
+    def __init__(self, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._model_counts: Optional[Dict[str, int]] = None
+        self._refreshed_at = 0.0
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+        self.hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.scoped_lookups = 0
+
+    def _is_fresh(self) -> bool:
+        return (
+            not self._stale
+            and self._model_counts is not None
+            and time.monotonic() - self._refreshed_at < self.refresh_interval
+        )
+
+    async def get_models(self, opensearch_client, index_name: str) -> List[str]:
+        """Return the cached model list, refreshing it with opensearch_client if stale"""
+        if self._is_fresh():
+            self.hits += 1
+            return list(self._model_counts)
+
+        async with self._lock:
+            # Another search may have refreshed while we waited for the lock
+            if self._is_fresh():
+                self.hits += 1
+                return list(self._model_counts)
+
+            try:
+                model_counts = await aggregate_embedding_models(opensearch_client, index_name)
+            except Exception:
+                self.refresh_failures += 1
+                if self._model_counts is None:
+                    raise
+                logger.warning(
+                    "Failed to refresh embedding model inventory, serving stale list",
+                    exc_info=True,
+                )
+                return list(self._model_counts)
+
+            self._model_counts = model_counts
+            self._refreshed_at = time.monotonic()
+            self._stale = False
+            self.refreshes += 1
+            logger.info(
+                "Refreshed embedding model inventory",
+                model_counts=model_counts,
+            )
+            return list(model_counts)
+
+    async def get_scoped_models(
+        self, opensearch_client, index_name: str, filter_clauses: list
+    ) -> List[str]:
+        """Detect models among documents matching filter_clauses (not cached)"""
+        self.scoped_lookups += 1
+        model_counts = await aggregate_embedding_models(
+            opensearch_client, index_name, filter_clauses
+        )
+        return list(model_counts)
+
+    def note_model(self, model: Optional[str]):
+        """Record that documents were just indexed with model"""
+        if not model or self._model_counts is None or model in self._model_counts:
+            return
+        self._model_counts[model] = self._model_counts.get(model, 0)
+        logger.debug("Added embedding model to inventory", model=model)
+
+    def invalidate(self):
+        """Force a refresh on the next lookup (e.g. after documents were deleted)"""
+        self._stale = True
+
+    def get_stats(self) -> dict:
+        age = time.monotonic() - self._refreshed_at if self._model_counts is not None else None
+        return {
+            "models": list(self._model_counts or {}),
+            "refresh_interval": self.refresh_interval,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": not self._is_fresh(),
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "scoped_lookups": self.scoped_lookups,
+        }
+
+
+def _create_inventory() -> EmbeddingModelInventory:
+    from config.settings import EMBEDDING_MODEL_INVENTORY_REFRESH_INTERVAL
+
+    return EmbeddingModelInventory(refresh_interval=EMBEDDING_MODEL_INVENTORY_REFRESH_INTERVAL)
+
+
+# Global instance shared by search, ingest and delete paths
+embedding_model_inventory = _create_inventory()
@@ -72,5 +72,12 @@ def hash_id(
     Deterministic, URL-safe base64 digest (no prefix).
     """
     b = stream_hash(source, algo=algo, include_filename=include_filename)
-    s = _b64url(b)
+    return digest_id(b, length=length)
+
+
+def digest_id(digest: bytes, *, length: int = 24) -> str:
+    """
+    Format a raw digest the way hash_id does, for hashes computed incrementally.
+    """
+    s = _b64url(digest)
     return s[:length] if length else s
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Helpers for indexing documents through the OpenSearch ``_bulk`` API.
+
+Documents are streamed into batches bounded by both document count and
+serialized payload size. Each batch is sent as a single ``_bulk`` request,
+per-item failures are collected from the response, and items that failed
+with a retryable status (e.g. 429 when the bulk queue is full) are resent
+with exponential backoff.
+"""
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Statuses that indicate transient cluster pressure rather than a bad document
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class BulkIndexError(Exception):
+    """Raised when one or more documents could not be indexed"""
+
+    def __init__(self, message: str, errors: List[dict]):
+        super().__init__(message)
+        self.errors = errors
+
+
+@dataclass
+class BulkIndexResult:
+    indexed: int = 0
+    batches: int = 0
+    retries: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+
+def _action_lines(index_name: str, doc_id: str, doc: dict) -> Tuple[str, str]:
+    action = json.dumps({"index": {"_index": index_name, "_id": doc_id}})
+    source = json.dumps(doc, default=str)
+    return action, source
+
+
+def iter_bulk_batches(
+    index_name: str,
+    documents: Iterable[Tuple[str, dict]],
+    max_docs: int = 500,
+    max_bytes: int = 10 * 1024 * 1024,
+):
+    """
+    Yield batches of ``(doc_id, action_line, source_line)`` tuples.
+
+    A batch is closed as soon as adding the next document would exceed either
+    ``max_docs`` or ``max_bytes``. A single document larger than ``max_bytes``
+    is still sent on its own so that it surfaces a per-item error instead of
+    being silently dropped.
+    """
+    batch = []
+    batch_bytes = 0
+
+    for doc_id, doc in documents:
+        action, source = _action_lines(index_name, doc_id, doc)
+        # +2 for the newlines that terminate each NDJSON line
+        entry_bytes = len(action.encode("utf-8")) + len(source.encode("utf-8")) + 2
+
+        if batch and (len(batch) >= max_docs or batch_bytes + entry_bytes > max_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+
+        batch.append((doc_id, action, source))
+        batch_bytes += entry_bytes
+
+    if batch:
+        yield batch
+
+
+def _parse_bulk_response(response: Dict[str, Any], batch) -> Tuple[list, list]:
+    """Split a bulk response into (retryable entries, permanent errors)"""
+    retryable = []
+    failed = []
+
+    if not response.get("errors"):
+        return retryable, failed
+
+    for entry, item in zip(batch, response.get("items", [])):
+        result = item.get("index") or item.get("create") or {}
+        status = result.get("status", 0)
+        if 200 <= status < 300:
+            continue
+        error = {
+            "id": entry[0],
+            "status": status,
+            "error": result.get("error"),
+        }
+        if status in RETRYABLE_STATUSES:
+            retryable.append((entry, error))
+        else:
+            failed.append(error)
+
+    return retryable, failed
+
+
+async def bulk_index_documents(
+    opensearch_client,
+    index_name: str,
+    documents: Iterable[Tuple[str, dict]],
+    max_docs: int = 500,
+    max_bytes: int = 10 * 1024 * 1024,
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    refresh: bool = False,
+    raise_on_error: bool = True,
+) -> BulkIndexResult:
+    """
+    Index ``(doc_id, doc)`` pairs with the ``_bulk`` API.
+
+    Args:
+        opensearch_client: AsyncOpenSearch client to use
+        index_name: Target index
+        documents: Iterable of (document id, document body) pairs. Explicit
+            IDs keep re-ingestion idempotent.
+        max_docs: Maximum number of documents per bulk request
+        max_bytes: Maximum serialized payload size per bulk request
+        max_retries: Retries for items (or whole requests) that fail transiently
+        base_delay: Initial backoff delay in seconds
+        refresh: Whether to refresh the index after the final batch
+        raise_on_error: Raise BulkIndexError if any item permanently failed
+
+    Returns:
+        BulkIndexResult with counters and per-item errors
+    """
+    result = BulkIndexResult()
+
+    for batch in iter_bulk_batches(index_name, documents, max_docs, max_bytes):
+        result.batches += 1
+        pending = batch
+        attempt = 0
+
+        while pending:
+            body = "".join(f"{action}\n{source}\n" for _, action, source in pending)
+            try:
+                response = await opensearch_client.bulk(body=body)
+            except Exception as e:
+                # Whole-request failure (connection reset, timeout, 429 on the request)
+                if attempt >= max_retries:
+                    logger.error(
+                        "OpenSearch bulk request failed after retries",
+                        batch_size=len(pending),
+                        error=str(e),
+                        attempt=attempt + 1,
+                    )
+                    result.errors.extend(
+                        {"id": doc_id, "status": None, "error": str(e)}
+                        for doc_id, _, _ in pending
+                    )
+                    break
+                delay = base_delay * (2**attempt) + random.uniform(0, base_delay)
+                logger.warning(
+                    "OpenSearch bulk request failed, retrying",
+                    batch_size=len(pending),
+                    error=str(e),
+                    attempt=attempt + 1,
+                    retry_in=round(delay, 2),
+                )
+                attempt += 1
+                result.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            retryable, failed = _parse_bulk_response(response, pending)
+            result.errors.extend(failed)
+            result.indexed += len(pending) - len(retryable) - len(failed)
+
+            if not retryable:
+                break
+
+            if attempt >= max_retries:
+                logger.error(
+                    "OpenSearch bulk items still rejected after retries",
+                    rejected=len(retryable),
+                    attempt=attempt + 1,
+                )
+                result.errors.extend(error for _, error in retryable)
+                break
+
+            delay = base_delay * (2**attempt) + random.uniform(0, base_delay)
+            logger.warning(
+                "OpenSearch bulk items rejected, retrying",
+                rejected=len(retryable),
+                attempt=attempt + 1,
+                retry_in=round(delay, 2),
+            )
+            pending = [entry for entry, _ in retryable]
+            attempt += 1
+            result.retries += 1
+            await asyncio.sleep(delay)
+
+    if refresh and result.indexed:
+        try:
+            await opensearch_client.indices.refresh(index=index_name)
+        except Exception as e:
+            logger.warning("OpenSearch refresh after bulk failed", error=str(e))
+
+    if result.errors:
+        logger.error(
+            "OpenSearch bulk indexing had failures",
+            index_name=index_name,
+            indexed=result.indexed,
+            failed=len(result.errors),
+            first_error=result.errors[0],
+        )
+        if raise_on_error:
+            raise BulkIndexError(
+                f"Failed to index {len(result.errors)} of "
+                f"{result.indexed + len(result.errors)} documents",
+                result.errors,
+            )
+
+    return result
@@ -0,0 +1,177 @@
+"""
+One-time detection of OpenSearch cluster capabilities used by search.
+
+Search used to send ``num_candidates`` in every knn query and retry without
+it whenever the cluster rejected the field, paying a failed round trip on
+every query. Capabilities are now probed once at startup (and learned from
+the first query if the probe could not run, e.g. before the index exists).
+
+Clusters with the neural-search plugin can also run keyword and vector
+queries as a single ``hybrid`` query whose scores are normalized and combined
+by a search pipeline, instead of adding raw BM25 and knn scores with fixed
+boosts.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+HYBRID_SEARCH_PIPELINE_ID = "openrag-hybrid-search"
+
+# Same 70/30 semantic/keyword split as the bool.should query
+HYBRID_SEMANTIC_WEIGHT = 0.7
+HYBRID_KEYWORD_WEIGHT = 0.3
+
+# hybrid query with aggregations requires neural-search 2.13+
+_MIN_HYBRID_VERSION = (2, 13)
+
+
+@dataclass
+class ClusterCapabilities:
+    """What the connected cluster supports; None means not yet known"""
+
+    version: Optional[str] = None
+    distribution: Optional[str] = None
+    supports_num_candidates: Optional[bool] = None
+    supports_hybrid_query: bool = False
+    hybrid_pipeline_ready: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _parse_version(version: Optional[str]) -> tuple:
+    parts = []
+    for part in (version or "").split(".")[:2]:
+        digits = "".join(c for c in part if c.isdigit())
+        parts.append(int(digits) if digits else 0)
+    return tuple(parts)
+
+
+def build_hybrid_pipeline_body(
+    semantic_weight: float = HYBRID_SEMANTIC_WEIGHT,
+    keyword_weight: float = HYBRID_KEYWORD_WEIGHT,
+) -> dict:
+    """Search pipeline normalizing and combining [semantic, keyword] sub-query scores"""
+    return {
+        "description": "OpenRAG hybrid search score normalization",
+        "phase_results_processors": [
+            {
+                "normalization-processor": {
+                    "normalization": {"technique": "min_max"},
+                    "combination": {
+                        "technique": "arithmetic_mean",
+                        "parameters": {"weights": [semantic_weight, keyword_weight]},
+                    },
+                }
+            }
+        ],
+    }
+
+
+async def _find_knn_field(opensearch_client, index_name: str):
+    """Return (field_name, dimension) of a knn_vector field in the index, or None"""
+    mapping = await opensearch_client.indices.get_mapping(index=index_name)
+    for index_data in mapping.values():
+        properties = index_data.get("mappings", {}).get("properties", {})
+        for field_name, field_def in properties.items():
+            if isinstance(field_def, dict) and field_def.get("type") == "knn_vector":
+                return field_name, field_def.get("dimension")
+    return None
+
+
+async def probe_num_candidates(opensearch_client, index_name: str) -> Optional[bool]:
+    """
+    Check whether knn queries accept num_candidates.
+
+    Returns None when the probe cannot run (no index or no vector field yet).
+    """
+    from opensearchpy.exceptions import RequestError
+
+    try:
+        if not await opensearch_client.indices.exists(index=index_name):
+            return None
+        knn_field = await _find_knn_field(opensearch_client, index_name)
+    except Exception as e:
+        logger.debug("Could not inspect index mapping for capability probe", error=str(e))
+        return None
+    if not knn_field or not knn_field[1]:
+        return None
+
+    field_name, dimension = knn_field
+    probe_body = {
+        "size": 0,
+        "query": {
+            "knn": {
+                field_name: {
+                    "vector": [0.0] * dimension,
+                    "k": 1,
+                    "num_candidates": 1,
+                }
+            }
+        },
+    }
+    try:
+        await opensearch_client.search(index=index_name, body=probe_body)
+        return True
+    except RequestError as e:
+        if "num_candidates" in str(e).lower():
+            return False
+        logger.debug("num_candidates probe failed for another reason", error=str(e))
+        return None
+    except Exception as e:
+        logger.debug("num_candidates probe failed", error=str(e))
+        return None
+
+
+async def detect_cluster_capabilities(opensearch_client, index_name: str) -> ClusterCapabilities:
+    """Probe the cluster once for the features search depends on"""
+    capabilities = ClusterCapabilities()
+
+    try:
+        info = await opensearch_client.info()
+        version_info = info.get("version", {})
+        capabilities.version = version_info.get("number")
+        capabilities.distribution = version_info.get("distribution", "elasticsearch")
+    except Exception as e:
+        logger.warning("Failed to read OpenSearch cluster info", error=str(e))
+
+    try:
+        plugins = await opensearch_client.cat.plugins(format="json")
+        has_neural_search = any(
+            p.get("component") == "opensearch-neural-search" for p in plugins or []
+        )
+        capabilities.supports_hybrid_query = (
+            has_neural_search
+            and capabilities.distribution == "opensearch"
+            and _parse_version(capabilities.version) >= _MIN_HYBRID_VERSION
+        )
+    except Exception as e:
+        logger.warning("Failed to list OpenSearch plugins", error=str(e))
+
+    capabilities.supports_num_candidates = await probe_num_candidates(
+        opensearch_client, index_name
+    )
+
+    logger.info("Detected OpenSearch cluster capabilities", **capabilities.to_dict())
+    return capabilities
+
+
+async def ensure_hybrid_search_pipeline(opensearch_client) -> bool:
+    """Create or update the hybrid score normalization pipeline"""
+    try:
+        await opensearch_client.search_pipeline.put(
+            id=HYBRID_SEARCH_PIPELINE_ID, body=build_hybrid_pipeline_body()
+        )
+        logger.info("Hybrid search pipeline ready", pipeline_id=HYBRID_SEARCH_PIPELINE_ID)
+        return True
+    except Exception as e:
+        logger.warning(
+            "Failed to create hybrid search pipeline, using bool query scoring",
+            pipeline_id=HYBRID_SEARCH_PIPELINE_ID,
+            error=str(e),
+        )
+        return False
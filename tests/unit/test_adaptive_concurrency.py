@@ -0,0 +1,107 @@
+"""
+Tests for the AIMD ingestion concurrency limiter
+"""
+import pytest
+from unittest.mock import Mock, patch
+from utils.adaptive_concurrency import (
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    OUTCOME_OVERLOADED,
+    AdaptiveConcurrencyLimiter,
+    classify_exception,
+)
+
+
+def _limiter(**kwargs):
+    options = dict(initial_limit=4, min_limit=1, max_limit=8, window_seconds=10)
+    options.update(kwargs)
+    return AdaptiveConcurrencyLimiter(**options)
+
+
+def _window(limiter, now, observations, in_flight=None):
+    """Feed observations into a window that closes at time now"""
+    limiter._window_started = now - limiter.window_seconds
+    with patch("utils.adaptive_concurrency.time.monotonic", return_value=now - 5):
+        if in_flight is not None:
+            limiter.note_in_flight(in_flight)
+        for stage, seconds, outcome in observations[:-1]:
+            limiter.observe(stage, seconds, outcome)
+    with patch("utils.adaptive_concurrency.time.monotonic", return_value=now):
+        stage, seconds, outcome = observations[-1]
+        limiter.observe(stage, seconds, outcome)
+
+
+def test_throttling_decreases_limit_multiplicatively():
+    limiter = _limiter()
+    listener = Mock()
+    limiter.add_listener(listener)
+
+    _window(limiter, 20, [("embedding", 0.5, OUTCOME_OK), ("embedding", 0.5, OUTCOME_OVERLOADED)])
+
+    assert limiter.limit == 2
+    listener.assert_called_once_with(2)
+    assert "embedding overloaded" in limiter.changes[-1]["reason"]
+
+
+def test_healthy_saturated_window_increases_by_one():
+    limiter = _limiter()
+
+    _window(limiter, 20, [("docling", 1.0, OUTCOME_OK)] * 3, in_flight=4)
+    assert limiter.limit == 5
+
+    # Not saturated: no increase
+    _window(limiter, 40, [("docling", 1.0, OUTCOME_OK)] * 3, in_flight=2)
+    assert limiter.limit == 5
+
+
+def test_latency_inflation_decreases_limit():
+    limiter = _limiter()
+
+    _window(limiter, 20, [("embedding", 1.0, OUTCOME_OK)] * 3)
+    _window(limiter, 40, [("embedding", 3.0, OUTCOME_OK)] * 3)
+
+    assert limiter.limit == 2
+    assert "latency" in limiter.changes[-1]["reason"]
+
+
+def test_large_document_after_small_ones_keeps_limit():
+    limiter = _limiter()
+
+    _window(limiter, 20, [("docling", 0.5, OUTCOME_OK)] * 3)
+    _window(limiter, 40, [("docling", 0.5, OUTCOME_OK)] * 2 + [("docling", 30.0, OUTCOME_OK)])
+
+    assert limiter.limit == 4
+    assert limiter.decreases == 0
+
+
+def test_limit_stays_within_bounds():
+    limiter = _limiter(initial_limit=1, max_limit=2)
+
+    _window(limiter, 20, [("embedding", 0.1, OUTCOME_OVERLOADED)])
+    assert limiter.limit == 1
+
+    for now in (40, 60, 80):
+        _window(limiter, now, [("embedding", 0.1, OUTCOME_OK)] * 3, in_flight=limiter.limit)
+    assert limiter.limit == 2
+
+
+def test_disabled_limiter_only_reports():
+    limiter = _limiter(enabled=False)
+
+    _window(limiter, 20, [("embedding", 0.1, OUTCOME_OVERLOADED)])
+
+    assert limiter.limit == 4
+    assert limiter.get_stats()["last_window"]["embedding"]["overloaded"] == 1
+
+
+def test_classify_exception():
+    class RateLimitError(Exception):
+        status_code = 429
+
+    class BadRequestError(Exception):
+        status_code = 400
+
+    assert classify_exception(RateLimitError("slow down")) == OUTCOME_OVERLOADED
+    assert classify_exception(TimeoutError()) == OUTCOME_OVERLOADED
+    assert classify_exception(BadRequestError("bad input")) == OUTCOME_OK
+    assert classify_exception(ConnectionError("reset")) == OUTCOME_ERROR
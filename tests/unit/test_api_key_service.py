@@ -0,0 +1,119 @@
+"""
+Tests for API key validation caching and batched last_used_at writes
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from services.api_key_service import APIKeyService
+
+API_KEY = "orag_test-key"
+
+
+def _opensearch(revoked=False):
+    client = Mock()
+    hits = [] if revoked else [
+        {
+            "_source": {
+                "key_id": "key-1",
+                "user_id": "alice",
+                "user_email": "alice@example.com",
+                "name": "ci",
+            }
+        }
+    ]
+    client.search = AsyncMock(return_value={"hits": {"hits": hits}})
+    client.get = AsyncMock(return_value={"_source": {"user_id": "alice"}})
+    client.update = AsyncMock(return_value={"result": "updated"})
+    client.delete = AsyncMock(return_value={"result": "deleted"})
+    client.bulk = AsyncMock(return_value={"errors": False, "items": []})
+    return client
+
+
+@pytest.fixture
+def opensearch():
+    client = _opensearch()
+    with patch("config.settings.clients.opensearch", client):
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_validated_key_served_from_cache(opensearch):
+    service = APIKeyService()
+
+    first = await service.validate_key(API_KEY)
+    second = await service.validate_key(API_KEY)
+
+    assert first == second == {
+        "key_id": "key-1",
+        "user_id": "alice",
+        "user_email": "alice@example.com",
+        "name": "ci",
+    }
+    assert opensearch.search.await_count == 1
+    # last_used_at is no longer written on the request path
+    opensearch.update.assert_not_awaited()
+    assert service.get_cache_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_expires(opensearch):
+    service = APIKeyService()
+    with patch("services.api_key_service.time.monotonic", return_value=100.0):
+        await service.validate_key(API_KEY)
+    with patch("services.api_key_service.time.monotonic", return_value=100.0 + 3600):
+        await service.validate_key(API_KEY)
+
+    assert opensearch.search.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_revoke_invalidates_cached_key(opensearch):
+    service = APIKeyService()
+    await service.validate_key(API_KEY)
+
+    await service.revoke_key("alice", "key-1")
+    opensearch.search.return_value = {"hits": {"hits": []}}
+
+    assert await service.validate_key(API_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_lookup_in_flight_during_revoke_not_cached(opensearch):
+    service = APIKeyService()
+    # The search read the key before the revocation was written
+    search_result = opensearch.search.return_value
+
+    async def search_racing_revoke(**kwargs):
+        service.invalidate_key("key-1")
+        return search_result
+
+    opensearch.search.side_effect = search_racing_revoke
+
+    assert await service.validate_key(API_KEY) is None
+    assert service.get_cache_stats()["cached_keys"] == 0
+
+
+@pytest.mark.asyncio
+async def test_last_used_flushed_in_one_bulk_request(opensearch):
+    service = APIKeyService()
+    for _ in range(5):
+        await service.validate_key(API_KEY)
+
+    assert await service.flush_last_used() == 1
+
+    body = opensearch.bulk.await_args.kwargs["body"]
+    action, doc = [json.loads(line) for line in body.strip().split("\n")]
+    assert action == {"update": {"_index": "api_keys", "_id": "key-1"}}
+    assert "last_used_at" in doc["doc"]
+    # Nothing left to write
+    assert await service.flush_last_used() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_pending_timestamps(opensearch):
+    service = APIKeyService()
+    await service.validate_key(API_KEY)
+    opensearch.bulk.side_effect = RuntimeError("cluster unavailable")
+
+    assert await service.flush_last_used() == 0
+    assert service.get_cache_stats()["pending_last_used"] == 1
@@ -0,0 +1,121 @@
+"""
+Tests for spooling connector downloads to disk and the chunk iterator
+"""
+import io
+import os
+import pytest
+from connectors.base import BaseConnector, ConnectorContent, ConnectorDocument, DocumentACL
+from utils.hash_utils import hash_id
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def _document(content_file=None, content=None):
+    return ConnectorDocument(
+        id="f1",
+        filename="report.pdf",
+        mimetype="application/pdf",
+        content=content,
+        source_url="",
+        acl=DocumentACL(),
+        modified_time=None,
+        created_time=None,
+        content_file=content_file,
+    )
+
+
+class _Connector(BaseConnector):
+    def __init__(self, data):
+        super().__init__({})
+        self.data = data
+        self.documents = []
+
+    async def get_file_content(self, file_id):
+        document = _document(content_file=ConnectorContent.from_bytes(self.data))
+        self.documents.append(document)
+        return document
+
+    async def authenticate(self):
+        return True
+
+    async def setup_subscription(self):
+        return ""
+
+    async def list_files(self, page_token=None, max_files=None):
+        return {"files": []}
+
+    async def handle_webhook(self, payload):
+        return []
+
+    async def cleanup_subscription(self, subscription_id):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_spooled_content_hashed_while_written():
+    content = await ConnectorContent.from_chunks(_chunks(b"abc", b"def", b"g"))
+    document = _document(content_file=content)
+
+    assert document.size == 7
+    assert document.content_hash == hash_id(io.BytesIO(b"abcdefg"))
+    assert document.content_hash == _document(content=b"abcdefg").content_hash
+
+    with document.content_path(suffix=".pdf") as path:
+        assert path.endswith(".pdf")
+        with open(path, "rb") as f:
+            assert f.read() == b"abcdefg"
+    assert not os.path.exists(path)
+    assert document.content_file is None
+
+
+@pytest.mark.asyncio
+async def test_failed_download_removes_spool_file(tmp_path, monkeypatch):
+    async def failing():
+        yield b"partial"
+        raise ConnectionError("reset")
+
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    with pytest.raises(ConnectionError):
+        await ConnectorContent.from_chunks(failing())
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_iter_file_content_streams_chunks_and_cleans_up():
+    connector = _Connector(b"x" * 10)
+
+    chunks = [chunk async for chunk in connector.iter_file_content("f1", chunk_size=4)]
+
+    assert chunks == [b"xxxx", b"xxxx", b"xx"]
+    assert connector.documents[0].content_file is None
+
+
+@pytest.mark.asyncio
+async def test_onedrive_cached_download_url_returns_document(monkeypatch):
+    from connectors.onedrive.connector import OneDriveConnector
+
+    connector = OneDriveConnector({})
+
+    async def authenticate():
+        return True
+
+    async def download(url):
+        return ConnectorContent.from_bytes(b"shared file")
+
+    monkeypatch.setattr(connector, "authenticate", authenticate)
+    monkeypatch.setattr(
+        connector, "get_cached_file_info", lambda file_id: {"downloadUrl": "https://dl", "name": "a.pdf"}
+    )
+    monkeypatch.setattr(connector, "_download_file_from_url", download)
+
+    document = await connector.get_file_content("abc!s123")
+
+    assert document.filename == "a.pdf"
+    assert document.acl.owner == ""
+    with open(document.content_file.path, "rb") as f:
+        assert f.read() == b"shared file"
+    document.close()
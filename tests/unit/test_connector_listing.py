@@ -0,0 +1,126 @@
+"""
+Tests for streaming connector listings into open-ended sync tasks
+"""
+import asyncio
+import pytest
+from unittest.mock import Mock
+from connectors.listing import stream_connector_listing
+from models.tasks import TaskStatus
+from services.task_service import TaskService
+
+
+class PagedConnector:
+    """Connector whose pages after the first are held until the test releases them"""
+
+    def __init__(self, pages, fail_at=None):
+        self.pages = pages
+        self.fail_at = fail_at
+        self.release = asyncio.Event()
+
+    async def list_files(self, page_token=None, limit=100):
+        index = int(page_token or 0)
+        if index:
+            await self.release.wait()
+        if index == self.fail_at:
+            raise RuntimeError("listing quota exceeded")
+        next_index = index + 1
+        return {
+            "files": self.pages[index],
+            "next_page_token": str(next_index) if next_index < len(self.pages) else None,
+        }
+
+
+class RecordingProcessor:
+    def __init__(self):
+        self.processed = []
+
+    async def process_item(self, upload_task, item, file_task):
+        self.processed.append(item)
+        file_task.status = TaskStatus.COMPLETED
+        upload_task.successful_files += 1
+
+
+def _task_service():
+    pool = Mock()
+    pool.shutdown = Mock()
+    return TaskService(document_service=Mock(), process_pool=pool, ingestion_timeout=5)
+
+
+def _files(*names):
+    return [{"id": name, "name": f"{name}.pdf", "mimeType": "application/pdf"} for name in names]
+
+
+async def _until(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_files_are_processed_while_listing_continues():
+    service = _task_service()
+    processor = RecordingProcessor()
+    connector = PagedConnector([_files("a", "b"), _files("c"), _files("d")])
+
+    batches = await stream_connector_listing(connector)
+    task_id = await service.create_streaming_task("alice", batches, processor)
+    upload_task = service.task_store["alice"][task_id]
+
+    await _until(lambda: len(processor.processed) == 2)
+    assert upload_task.status == TaskStatus.RUNNING
+    assert upload_task.total_files == 2
+
+    connector.release.set()
+    await _until(lambda: upload_task.status == TaskStatus.COMPLETED)
+    assert processor.processed == ["a", "b", "c", "d"]
+    assert upload_task.total_files == upload_task.successful_files == 4
+    assert upload_task.file_tasks["c"].filename == "c.pdf"
+
+
+@pytest.mark.asyncio
+async def test_listing_failure_fails_task_after_listed_files():
+    service = _task_service()
+    processor = RecordingProcessor()
+    connector = PagedConnector([_files("a"), _files("b"), _files("c")], fail_at=2)
+    connector.release.set()
+
+    batches = await stream_connector_listing(connector)
+    task_id = await service.create_streaming_task("alice", batches, processor)
+    upload_task = service.task_store["alice"][task_id]
+
+    await _until(lambda: upload_task.status == TaskStatus.FAILED)
+    assert processor.processed == ["a", "b"]
+    assert upload_task.total_files == upload_task.successful_files == 2
+    assert not upload_task.listing
+    assert "listing quota exceeded" in upload_task.error
+    assert service.get_task_summary("alice", task_id)["error"] == upload_task.error
+
+
+@pytest.mark.asyncio
+async def test_listing_applies_max_files_and_filename_filter():
+    connector = PagedConnector([_files("a", "b", "c"), _files("d", "e")])
+    connector.release.set()
+
+    batches = await stream_connector_listing(
+        connector, max_files=3, filename_filter={"a.pdf", "c.pdf", "d.pdf", "e.pdf"}
+    )
+
+    assert [ids async for ids, _ in batches] == [["a", "c"], ["d"]]
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_listing():
+    service = _task_service()
+    connector = PagedConnector([_files("a"), _files("b")])
+
+    batches = await stream_connector_listing(connector)
+    task_id = await service.create_streaming_task("alice", batches, RecordingProcessor())
+    upload_task = service.task_store["alice"][task_id]
+    await _until(lambda: upload_task.processed_files == 1)
+
+    assert await service.cancel_task("alice", task_id)
+    await asyncio.sleep(0)
+    assert upload_task.listing_task.done()
+    assert upload_task.total_files == 1
@@ -0,0 +1,134 @@
+"""
+Tests for skipping downloads of connector files indexed at their current version
+"""
+import datetime
+import pytest
+from types import SimpleNamespace
+from connectors.base import ConnectorDocument, ConnectorFileVersion, DocumentACL
+from connectors.sync_state import ConnectorSyncStateStore
+from models.processors import ConnectorFileProcessor
+from models.tasks import FileTask, TaskStatus, UploadTask
+
+
+class FakeConnector:
+    def __init__(self):
+        self.version = "v1"
+        self.acl = DocumentACL(owner="alice@example.com", allowed_users=["bob@example.com"])
+        self.downloads = 0
+
+    async def get_file_version(self, file_id):
+        return ConnectorFileVersion(id=file_id, version=self.version, acl=self.acl)
+
+    async def get_file_content(self, file_id):
+        self.downloads += 1
+        now = datetime.datetime.now()
+        return ConnectorDocument(
+            id=file_id, filename="report.txt", mimetype="text/plain",
+            content=f"content {self.version}".encode(), source_url="", acl=self.acl,
+            modified_time=now, created_time=now, version=self.version,
+        )
+
+
+class FakeOpenSearch:
+    """Serves the indexed chunk's ACL and records ACL updates"""
+
+    def __init__(self):
+        self.acl = None
+        self.updates = []
+
+    async def search(self, index, body):
+        return {"hits": {"hits": [{"_source": vars(self.acl)}]}}
+
+    async def update_by_query(self, index, body):
+        self.updates.append(body["query"]["term"]["document_id"])
+        return {"updated": 3}
+
+
+@pytest.fixture
+def sync_state(tmp_path, monkeypatch):
+    store = ConnectorSyncStateStore(str(tmp_path / "sync_state.db"))
+    monkeypatch.setattr("connectors.sync_state.connector_sync_state", store)
+    return store
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    connector = FakeConnector()
+    opensearch = FakeOpenSearch()
+    connector_service = SimpleNamespace(connection_manager=SimpleNamespace())
+
+    async def get_connector(connection_id):
+        return connector
+
+    async def get_connection(connection_id):
+        return SimpleNamespace(connector_type="google_drive")
+
+    connector_service.get_connector = get_connector
+    connector_service.connection_manager.get_connection = get_connection
+    session_manager = SimpleNamespace(get_user_opensearch_client=lambda user_id, jwt: opensearch)
+    processor = ConnectorFileProcessor(
+        connector_service, "c1", [], "alice",
+        document_service=SimpleNamespace(session_manager=session_manager),
+    )
+
+    async def process_document_standard(file_path, file_hash, acl=None, **kwargs):
+        opensearch.acl = acl
+        return {"status": "indexed", "id": file_hash}
+
+    async def check_document_exists(file_hash, opensearch_client):
+        return True
+
+    monkeypatch.setattr(processor, "process_document_standard", process_document_standard)
+    monkeypatch.setattr(processor, "check_document_exists", check_document_exists)
+    return processor, connector, opensearch
+
+
+async def _process(processor):
+    upload_task = UploadTask(task_id="t1", total_files=1, file_tasks={"f1": FileTask(file_path="f1")})
+    file_task = upload_task.file_tasks["f1"]
+    await processor.process_item(upload_task, "f1", file_task)
+    assert file_task.status == TaskStatus.COMPLETED
+    return file_task.result
+
+
+@pytest.mark.asyncio
+async def test_unchanged_version_skips_download(sync_state, processor):
+    processor, connector, opensearch = processor
+
+    first = await _process(processor)
+    second = await _process(processor)
+
+    assert first["status"] == "indexed"
+    assert second == {"status": "unchanged", "id": first["id"], "document_id": "f1"}
+    assert connector.downloads == 1
+    assert opensearch.updates == []
+    assert sync_state.get_stats()["skipped_downloads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_acl_only_change_updates_acl_without_download(sync_state, processor):
+    processor, connector, opensearch = processor
+    first = await _process(processor)
+
+    connector.acl = DocumentACL(owner="alice@example.com", allowed_users=["carol@example.com"])
+    result = await _process(processor)
+
+    assert result["status"] == "acl_updated"
+    assert opensearch.updates == [first["id"]]
+    assert connector.downloads == 1
+    # The new ACL hash is recorded, so the next sync skips the file entirely
+    opensearch.acl = connector.acl
+    assert (await _process(processor))["status"] == "unchanged"
+
+
+@pytest.mark.asyncio
+async def test_new_remote_version_is_downloaded(sync_state, processor):
+    processor, connector, _ = processor
+    first = await _process(processor)
+
+    connector.version = "v2"
+    second = await _process(processor)
+
+    assert connector.downloads == 2
+    assert second["status"] == "indexed"
+    assert (await sync_state.get("c1", "f1")).content_hash == second["id"] != first["id"]
@@ -0,0 +1,84 @@
+"""
+Tests for the bounded conversation thread cache and spill/reload in agent
+"""
+from datetime import datetime
+import pytest
+from unittest.mock import AsyncMock, patch
+import agent
+from services.conversation_persistence_service import ConversationPersistenceService
+from utils.conversation_cache import ConversationCache
+
+
+def _thread(text="hello"):
+    return {
+        "messages": [{"role": "user", "content": text, "timestamp": datetime(2024, 1, 1)}],
+        "created_at": datetime(2024, 1, 1),
+        "last_activity": datetime(2024, 1, 1),
+    }
+
+
+def test_evicts_least_recently_used_by_entries():
+    cache = ConversationCache(max_entries=2)
+    cache.put("alice", "r1", _thread())
+    cache.put("alice", "r2", _thread())
+    cache.get("alice", "r1")
+    cache.put("bob", "r3", _thread())
+
+    assert set(cache.get_user_threads("alice")) == {"r1"}
+    [(user_id, response_id, _)] = cache.pending_spills()
+    assert (user_id, response_id) == ("alice", "r2")
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_evicts_by_memory_budget():
+    cache = ConversationCache(max_entries=100, max_bytes=600)
+    for i in range(5):
+        cache.put("alice", f"r{i}", _thread("x" * 100))
+
+    stats = cache.get_stats()
+    assert stats["approx_bytes"] <= 600
+    assert stats["entries"] + stats["pending_spill"] == 5
+
+
+@pytest.mark.asyncio
+async def test_spilled_thread_reloaded_transparently(tmp_path):
+    store = ConversationPersistenceService(
+        db_path=str(tmp_path / "conversations.db"), legacy_json_file=""
+    )
+    cache = ConversationCache(max_entries=1)
+    with patch.object(agent, "active_conversations", cache), patch.object(
+        agent, "conversation_persistence", store
+    ):
+        await agent.store_conversation_thread("alice", "r1", _thread("first"))
+        await agent.store_conversation_thread("alice", "r2", _thread("second"))
+        assert cache.get_stats()["spilled"] == 1
+
+        thread = agent.get_conversation_thread("alice", "r1")
+
+    assert thread["messages"][0]["content"] == "first"
+    assert thread["messages"][0]["timestamp"] == datetime(2024, 1, 1)
+    assert cache.get_stats()["reloads"] == 1
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_spill_kept_and_retried(tmp_path):
+    store = ConversationPersistenceService(
+        db_path=str(tmp_path / "conversations.db"), legacy_json_file=""
+    )
+    cache = ConversationCache(max_entries=1)
+    with patch.object(agent, "active_conversations", cache), patch.object(
+        agent, "conversation_persistence", store
+    ):
+        await agent.store_conversation_thread("alice", "r1", _thread("first"))
+        with patch.object(
+            store, "store_thread_state", AsyncMock(side_effect=OSError("disk full"))
+        ):
+            await agent.store_conversation_thread("alice", "r2", _thread("second"))
+        stats = cache.get_stats()
+        assert stats["spill_failures"] == 1 and stats["pending_spill"] == 1
+
+        await agent._spill_evicted_threads()
+        assert cache.get_stats()["pending_spill"] == 0
+        assert store.load_thread_state("alice", "r1")["messages"][0]["content"] == "first"
+    store.close()
@@ -0,0 +1,106 @@
+"""
+Tests for the SQLite conversation store and the legacy JSON migration
+"""
+import json
+import os
+from datetime import datetime
+import pytest
+from services.conversation_persistence_service import ConversationPersistenceService
+
+
+@pytest.fixture
+def store(tmp_path):
+    service = ConversationPersistenceService(
+        db_path=str(tmp_path / "conversations.db"),
+        legacy_json_file=str(tmp_path / "conversations.json"),
+    )
+    yield service
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_store_and_list_per_user(store):
+    await store.store_conversation_thread(
+        "alice", "r1", {"title": "Hi", "last_activity": datetime(2024, 1, 1)}
+    )
+    await store.store_conversation_thread("alice", "r1", {"title": "Hi again"})
+    await store.store_conversation_thread("bob", "r2", {"title": "Other"})
+
+    assert store.get_user_conversations("alice") == {"r1": {"title": "Hi again"}}
+    assert store.get_conversation_thread("bob", "r2") == {"title": "Other"}
+    assert store.get_conversation_thread("bob", "r1") == {}
+    assert store.get_storage_stats()["total_conversations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_and_clear(store):
+    await store.store_conversation_thread("alice", "r1", {"title": "a"})
+    await store.store_conversation_thread("alice", "r2", {"title": "b"})
+
+    assert await store.delete_conversation_thread("alice", "r1") is True
+    assert await store.delete_conversation_thread("alice", "r1") is False
+    await store.clear_user_conversations("alice")
+    assert store.get_user_conversations("alice") == {}
+
+
+@pytest.mark.asyncio
+async def test_user_thread_states_loaded_in_one_read(store):
+    await store.store_thread_state("alice", "r1", {"messages": [{"content": "a"}]})
+    await store.store_thread_state("alice", "r2", {"messages": [{"content": "b"}]})
+    await store.store_thread_state("bob", "r3", {"messages": []})
+
+    states = await store.load_user_thread_states("alice", exclude={"r2"})
+
+    assert states == {"r1": {"messages": [{"content": "a"}]}}
+
+
+def test_legacy_json_migrated_once(tmp_path):
+    legacy = tmp_path / "conversations.json"
+    legacy.write_text(json.dumps({
+        "alice": {"r1": {"title": "old", "last_activity": "2024-01-01T00:00:00"}},
+    }))
+    service = ConversationPersistenceService(
+        db_path=str(tmp_path / "conversations.db"), legacy_json_file=str(legacy)
+    )
+
+    assert service.get_user_conversations("alice")["r1"]["title"] == "old"
+    assert not legacy.exists()
+    assert os.path.exists(str(legacy) + ".migrated")
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_chat_history_includes_spilled_thread_messages(store, monkeypatch):
+    from services.chat_service import ChatService
+    from utils.conversation_cache import ConversationCache
+
+    thread = {
+        "messages": [
+            {"role": "system", "content": "prompt"},
+            {"role": "user", "content": "Hello", "timestamp": datetime(2024, 1, 1, 12)},
+            {"role": "assistant", "content": "Hi", "response_id": "r1"},
+        ],
+        "created_at": datetime(2024, 1, 1, 12),
+        "last_activity": datetime(2024, 1, 1, 12, 5),
+    }
+    # r1 was evicted from the conversation cache and spilled; r2 only has metadata
+    await store.store_conversation_thread("alice", "r1", {"title": "Hello"})
+    await store.store_thread_state("alice", "r1", thread)
+    await store.store_conversation_thread(
+        "alice", "r2", {"title": "Old", "total_messages": 4, "last_activity": "2023-12-31T09:00:00"}
+    )
+    monkeypatch.setattr("agent.active_conversations", ConversationCache())
+    monkeypatch.setattr("agent.get_user_conversations", store.get_user_conversations)
+    monkeypatch.setattr(
+        "services.conversation_persistence_service.conversation_persistence", store
+    )
+
+    history = await ChatService().get_chat_history("alice")
+
+    by_id = {c["response_id"]: c for c in history["conversations"]}
+    assert by_id["r1"]["source"] == "spilled"
+    assert [m["content"] for m in by_id["r1"]["messages"]] == ["Hello", "Hi"]
+    assert by_id["r1"]["messages"][0]["timestamp"] == "2024-01-01T12:00:00"
+    assert by_id["r1"]["last_activity"] == "2024-01-01T12:05:00"
+    assert by_id["r2"]["source"] == "metadata_only"
+    assert by_id["r2"]["messages"] == []
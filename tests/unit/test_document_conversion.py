@@ -0,0 +1,193 @@
+"""
+Tests for docling conversions in the shared process pool
+"""
+import asyncio
+import json
+import pytest
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import Mock
+from api.stats import get_stats
+from services.document_service import DocumentService
+
+
+class FakePool(Executor):
+    """Executor whose futures the test resolves; raises BrokenProcessPool when broken"""
+
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.futures = []
+        self.calls = []
+        self.shutdown_called = False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.calls.append(args)
+        if self.broken:
+            future.set_exception(BrokenProcessPool("worker died"))
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True, **kwargs):
+        self.shutdown_called = True
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    from utils.adaptive_concurrency import ingestion_limiter
+
+    monkeypatch.setattr(ingestion_limiter, "observe", Mock())
+    monkeypatch.setattr(ingestion_limiter, "observe_exception", Mock())
+    monkeypatch.setattr("services.document_service.TelemetryClient.send_event_sync", Mock())
+    return ingestion_limiter
+
+
+def _replacement_pools(monkeypatch, *pools):
+    """Pools handed out, in order, when the broken pool is recreated"""
+    # Build the module-level pool now, or its first import would take a replacement
+    import utils.process_pool  # noqa: F401
+
+    remaining = list(pools)
+    monkeypatch.setattr("concurrent.futures.ProcessPoolExecutor", lambda max_workers: remaining.pop(0))
+
+
+async def _until(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_recreated_and_conversion_retried_once(monkeypatch, limiter):
+    replacement = FakePool()
+    _replacement_pools(monkeypatch, replacement)
+    broken = FakePool(broken=True)
+    service = DocumentService(process_pool=broken)
+
+    conversion = asyncio.create_task(service.convert_document("/tmp/doc.pdf"))
+    await _until(lambda: replacement.futures)
+    replacement.futures[0].set_result({"id": "hash", "chunks": []})
+
+    assert await conversion == {"id": "hash", "chunks": []}
+    assert broken.shutdown_called
+    assert service.process_pool is replacement
+    stats = service.get_conversion_stats()
+    assert stats["conversions_completed"] == 1
+    assert stats["conversions_failed"] == 0
+    assert stats["conversions_in_flight"] == 0
+    limiter.observe.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_known_file_hash_passed_to_worker(limiter):
+    pool = FakePool()
+    service = DocumentService(process_pool=pool)
+
+    conversion = asyncio.create_task(service.convert_document("/tmp/doc.pdf", "abc123"))
+    await _until(lambda: pool.futures)
+    pool.futures[0].set_result({"id": "abc123", "chunks": []})
+
+    await conversion
+    assert pool.calls == [("/tmp/doc.pdf", "abc123")]
+
+
+@pytest.mark.asyncio
+async def test_second_broken_pool_failure_is_raised(monkeypatch, limiter):
+    replacement = FakePool(broken=True)
+    _replacement_pools(monkeypatch, replacement)
+    service = DocumentService(process_pool=FakePool(broken=True))
+
+    with pytest.raises(BrokenProcessPool):
+        await service.convert_document("/tmp/doc.pdf")
+
+    # Retried exactly once on the recreated pool
+    assert len(replacement.futures) == 1
+    stats = service.get_conversion_stats()
+    assert stats["conversions_failed"] == 1
+    assert stats["conversions_completed"] == 0
+    assert stats["conversions_in_flight"] == 0
+    limiter.observe_exception.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_unconvertible_document_counted_without_retry(limiter):
+    pool = FakePool()
+    service = DocumentService(process_pool=pool)
+
+    conversion = asyncio.create_task(service.convert_document("/tmp/doc.pdf"))
+    await _until(lambda: pool.futures)
+    pool.futures[0].set_exception(ValueError("unsupported format"))
+
+    with pytest.raises(ValueError):
+        await conversion
+    assert len(pool.futures) == 1
+    assert service.get_conversion_stats()["conversions_failed"] == 1
+    # Bad input says nothing about pool capacity
+    limiter.observe_exception.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_in_flight_and_queued_counters(monkeypatch, limiter):
+    monkeypatch.setattr("utils.process_pool.MAX_WORKERS", 1)
+    pool = FakePool()
+    service = DocumentService(process_pool=pool)
+
+    conversions = [
+        asyncio.create_task(service.convert_document(f"/tmp/doc{i}.pdf")) for i in range(2)
+    ]
+    await _until(lambda: len(pool.futures) == 2)
+    stats = service.get_conversion_stats()
+    assert stats["conversion_workers"] == 1
+    assert stats["conversions_in_flight"] == 2
+    assert stats["conversions_queued"] == 1
+
+    pool.futures[0].set_result({"id": "a"})
+    pool.futures[1].set_exception(RuntimeError("docling crashed"))
+    results = await asyncio.gather(*conversions, return_exceptions=True)
+
+    assert results[0] == {"id": "a"}
+    assert isinstance(results[1], RuntimeError)
+    assert service.get_conversion_stats() == {
+        "conversion_workers": 1,
+        "conversions_in_flight": 0,
+        "conversions_queued": 0,
+        "conversions_completed": 1,
+        "conversions_failed": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_stats_endpoint_reports_conversion_counters(monkeypatch, limiter):
+    monkeypatch.setattr("utils.process_pool.MAX_WORKERS", 2)
+    pool = FakePool()
+    service = DocumentService(process_pool=pool)
+    conversion = asyncio.create_task(service.convert_document("/tmp/doc.pdf"))
+    await _until(lambda: pool.futures)
+
+    response = await get_stats(
+        Mock(),
+        document_service=service,
+        search_service=Mock(**{
+            "get_embedding_cache_stats.return_value": {},
+            "get_model_inventory_stats.return_value": {},
+            "get_capabilities.return_value": {},
+        }),
+        session_manager=Mock(**{"get_client_pool_stats.return_value": {}}),
+        api_key_service=Mock(**{"get_cache_stats.return_value": {}}),
+        task_service=Mock(**{
+            "get_scheduler_stats.return_value": {},
+            "get_concurrency_stats.return_value": {},
+        }),
+    )
+
+    assert json.loads(response.body)["document_conversion"] == {
+        "conversion_workers": 2,
+        "conversions_in_flight": 1,
+        "conversions_queued": 0,
+        "conversions_completed": 0,
+        "conversions_failed": 0,
+    }
+    pool.futures[0].set_result({"id": "hash"})
+    await conversion
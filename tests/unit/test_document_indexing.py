@@ -0,0 +1,78 @@
+"""
+Tests for cleaning up documents whose indexing fails part-way
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+from models.processors import TaskProcessor
+from utils.opensearch_bulk import BulkIndexError, BulkIndexResult
+
+CHUNKS = [{"page": 1, "text": "first"}, {"page": 2, "text": "second"}]
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """Two embedding batches; the second bulk request fails"""
+    embeddings = Mock()
+    embeddings.create = AsyncMock(
+        side_effect=lambda model, input: SimpleNamespace(
+            data=[SimpleNamespace(embedding=[0.1, 0.2]) for _ in input]
+        )
+    )
+    monkeypatch.setattr(
+        "config.settings.clients", SimpleNamespace(patched_embedding_client=SimpleNamespace(embeddings=embeddings))
+    )
+    monkeypatch.setattr("config.settings.get_embedding_model", lambda: "model")
+    monkeypatch.setattr("config.settings.get_index_name", lambda: "documents")
+    monkeypatch.setattr(
+        "config.settings.get_openrag_config",
+        lambda: SimpleNamespace(knowledge=SimpleNamespace(embedding_provider="openai")),
+    )
+    monkeypatch.setattr("services.document_service.get_embedding_semaphore", lambda provider: asyncio.Semaphore(2))
+    monkeypatch.setattr(
+        "services.document_service.batch_chunks_for_embeddings",
+        lambda texts, max_tokens, model: [[(i, text)] for i, text in enumerate(texts)],
+    )
+    monkeypatch.setattr("utils.embedding_fields.ensure_embedding_field_exists", AsyncMock(return_value="emb"))
+    monkeypatch.setattr(
+        "utils.document_processing.process_text_file",
+        lambda path: {"filename": "doc.txt", "mimetype": "text/plain", "chunks": CHUNKS},
+    )
+    bulk_calls = []
+
+    async def bulk_index_documents(client, index, documents, **kwargs):
+        bulk_calls.append([doc_id for doc_id, _ in documents])
+        if len(bulk_calls) == 2:
+            raise BulkIndexError("rejected", [{"error": "mapper_parsing_exception"}])
+        return BulkIndexResult(indexed=1, batches=1)
+
+    write_manifest = AsyncMock()
+    monkeypatch.setattr("utils.opensearch_bulk.bulk_index_documents", bulk_index_documents)
+    monkeypatch.setattr("utils.document_manifest.write_manifest", write_manifest)
+
+    opensearch = Mock()
+    opensearch.delete_by_query = AsyncMock(return_value={"deleted": 1})
+    session_manager = SimpleNamespace(get_user_opensearch_client=lambda user_id, jwt: opensearch)
+    processor = TaskProcessor(document_service=SimpleNamespace(session_manager=session_manager))
+    monkeypatch.setattr(processor, "check_document_exists", AsyncMock(return_value=False))
+
+    path = tmp_path / "doc.txt"
+    path.write_text("first second")
+    return processor, str(path), opensearch, bulk_calls, write_manifest
+
+
+@pytest.mark.asyncio
+async def test_failed_later_batch_removes_indexed_chunks(pipeline):
+    processor, path, opensearch, bulk_calls, write_manifest = pipeline
+
+    with pytest.raises(BulkIndexError):
+        await processor.process_document_standard(path, "hash", owner_user_id="alice")
+
+    # The first batch was indexed before the second one failed
+    assert len(bulk_calls) == 2
+    opensearch.delete_by_query.assert_awaited_once()
+    kwargs = opensearch.delete_by_query.await_args.kwargs
+    assert kwargs["index"] == "documents"
+    assert kwargs["body"] == {"query": {"term": {"document_id": "hash"}}}
+    write_manifest.assert_not_awaited()
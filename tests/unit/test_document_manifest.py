@@ -0,0 +1,75 @@
+"""
+Tests for the document manifest dedup helpers
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from utils import document_manifest
+
+
+@pytest.fixture(autouse=True)
+def manifest_index_name():
+    with patch.object(document_manifest, "get_manifest_index_name", return_value="documents_manifest"):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_document_exists_uses_manifest_first():
+    client = Mock()
+    client.exists = AsyncMock(return_value=True)
+
+    assert await document_manifest.document_exists(client, "abc") is True
+    client.exists.assert_awaited_once_with(index="documents_manifest", id="abc")
+
+
+@pytest.mark.asyncio
+async def test_document_exists_falls_back_to_first_chunk():
+    client = Mock()
+    client.exists = AsyncMock(return_value=False)
+    client.get = AsyncMock(return_value={"found": True, "_source": {}})
+
+    with patch("config.settings.get_index_name", return_value="documents"):
+        assert await document_manifest.document_exists(client, "abc") is True
+
+    assert client.get.await_args.kwargs["index"] == "documents"
+    assert client.get.await_args.kwargs["id"] == "abc_0"
+
+
+@pytest.mark.asyncio
+async def test_document_exists_ignores_chunks_without_manifest_record():
+    """Chunks written since the manifest exists only count once the manifest does"""
+    client = Mock()
+    client.exists = AsyncMock(return_value=False)
+    client.get = AsyncMock(return_value={"found": True, "_source": {"in_manifest": True}})
+
+    with patch("config.settings.get_index_name", return_value="documents"):
+        assert await document_manifest.document_exists(client, "abc") is False
+
+
+@pytest.mark.asyncio
+async def test_existing_hashes_single_mget():
+    client = Mock()
+    client.mget = AsyncMock(
+        return_value={
+            "docs": [
+                {"_id": "a", "found": True},
+                {"_id": "b", "found": False},
+                {"_id": "c", "found": True},
+            ]
+        }
+    )
+
+    result = await document_manifest.existing_hashes(client, ["a", "b", "c", "a"])
+
+    assert result == {"a", "c"}
+    client.mget.assert_awaited_once()
+    # Duplicate hashes are collapsed before the request
+    assert client.mget.await_args.kwargs["body"] == {"ids": ["a", "b", "c"]}
+
+
+@pytest.mark.asyncio
+async def test_existing_hashes_empty_input_skips_request():
+    client = Mock()
+    client.mget = AsyncMock()
+
+    assert await document_manifest.existing_hashes(client, []) == set()
+    client.mget.assert_not_awaited()
@@ -0,0 +1,31 @@
+"""
+Tests for DocumentService embedding batching helpers
+"""
+from services.document_service import batch_chunks_for_embeddings
+
+MODEL = "text-embedding-3-small"
+
+
+def test_batches_keep_chunk_indices():
+    texts = ["alpha beta", "gamma delta", "epsilon"]
+    batches = batch_chunks_for_embeddings(texts, max_tokens=8000, model=MODEL)
+
+    assert batches == [[(0, "alpha beta"), (1, "gamma delta"), (2, "epsilon")]]
+
+
+def test_batches_split_on_token_budget():
+    texts = ["word " * 30, "word " * 30, "word " * 30]
+    batches = batch_chunks_for_embeddings(texts, max_tokens=70, model=MODEL)
+
+    assert [[i for i, _ in batch] for batch in batches] == [[0, 1], [2]]
+
+
+def test_oversized_text_truncated_to_single_input():
+    texts = ["short", "word " * 500, "tail"]
+    batches = batch_chunks_for_embeddings(texts, max_tokens=100, model=MODEL)
+
+    indices = [[i for i, _ in batch] for batch in batches]
+    assert indices == [[0], [1], [2]]
+    # Every chunk gets exactly one embedding input
+    assert sum(len(batch) for batch in batches) == len(texts)
+    assert len(batches[1][0][1]) < len(texts[1])
@@ -0,0 +1,77 @@
+"""
+Tests for the query embedding cache
+"""
+import pytest
+from unittest.mock import patch
+from utils.embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+def test_normalize_query_collapses_whitespace():
+    assert normalize_query("  what   is\nOpenRAG? ") == "what is OpenRAG?"
+
+
+def test_hit_and_miss_counters():
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    assert cache.get("m", "q") is None
+    cache.put("m", "q", [0.1, 0.2])
+
+    assert cache.get("m", " q ") == [0.1, 0.2]
+    # Keyed by model as well as query
+    assert cache.get("other", "q") is None
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_lru_eviction():
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    cache.get("m", "a")  # "b" is now least recently used
+    cache.put("m", "c", [3.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    with patch("utils.embedding_cache.time.time", return_value=1000.0):
+        cache.put("m", "q", [1.0])
+    with patch("utils.embedding_cache.time.time", return_value=1061.0):
+        assert cache.get("m", "q") is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = QueryEmbeddingCache(max_entries=0, ttl_seconds=60)
+    cache.put("m", "q", [1.0])
+    assert cache.get("m", "q") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_disk_layer_survives_new_instance(tmp_path):
+    path = str(tmp_path / "query_embeddings.db")
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60, path=path)
+    assert await cache.aget("m", "q") is None
+    await cache.aput("m", "q", [0.5, 0.25])
+
+    restarted = QueryEmbeddingCache(max_entries=10, ttl_seconds=60, path=path)
+    assert await restarted.aget("m", "q") == [0.5, 0.25]
+    stats = restarted.get_stats()
+    assert stats["disk_hits"] == 1 and stats["misses"] == 0
+    # Promoted into memory on the disk hit
+    assert restarted.get("m", "q") == [0.5, 0.25]
+
+
+@pytest.mark.asyncio
+async def test_disk_layer_pruned_to_max_entries(tmp_path):
+    path = str(tmp_path / "query_embeddings.db")
+    cache = QueryEmbeddingCache(max_entries=1, ttl_seconds=60, path=path, disk_max_entries=5)
+    with patch("utils.embedding_cache._DISK_PRUNE_INTERVAL", 1):
+        for i in range(8):
+            await cache.aput("m", f"q{i}", [float(i)])
+
+    count = cache._conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0]
+    assert count == 5
+    cache.close()
@@ -0,0 +1,98 @@
+"""
+Tests for the cached embedding model inventory used by search
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from utils.embedding_model_inventory import EmbeddingModelInventory
+
+
+def _client(*models):
+    client = Mock()
+    client.search = AsyncMock(
+        return_value={
+            "aggregations": {
+                "embedding_models": {
+                    "buckets": [{"key": m, "doc_count": 10} for m in models]
+                }
+            }
+        }
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_inventory_cached_between_searches():
+    inventory = EmbeddingModelInventory(refresh_interval=60)
+    client = _client("model-a", "model-b")
+
+    assert await inventory.get_models(client, "documents") == ["model-a", "model-b"]
+    assert await inventory.get_models(client, "documents") == ["model-a", "model-b"]
+
+    assert client.search.await_count == 1
+    body = client.search.await_args.kwargs["body"]
+    assert "query" not in body  # corpus-wide, no filters
+    assert inventory.get_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_inventory_refreshed_after_interval():
+    inventory = EmbeddingModelInventory(refresh_interval=60)
+    client = _client("model-a")
+
+    with patch("utils.embedding_model_inventory.time.monotonic", return_value=100.0):
+        await inventory.get_models(client, "documents")
+    with patch("utils.embedding_model_inventory.time.monotonic", return_value=161.0):
+        await inventory.get_models(client, "documents")
+
+    assert client.search.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_refresh():
+    inventory = EmbeddingModelInventory(refresh_interval=60)
+    client = _client("model-a")
+    await inventory.get_models(client, "documents")
+
+    inventory.invalidate()
+    await inventory.get_models(client, "documents")
+
+    assert client.search.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_note_model_adds_without_refresh():
+    inventory = EmbeddingModelInventory(refresh_interval=60)
+    client = _client("model-a")
+    await inventory.get_models(client, "documents")
+
+    inventory.note_model("model-b")
+
+    assert await inventory.get_models(client, "documents") == ["model-a", "model-b"]
+    assert client.search.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_list_served_when_refresh_fails():
+    inventory = EmbeddingModelInventory(refresh_interval=60)
+    client = _client("model-a")
+    await inventory.get_models(client, "documents")
+
+    inventory.invalidate()
+    client.search.side_effect = RuntimeError("cluster unavailable")
+
+    assert await inventory.get_models(client, "documents") == ["model-a"]
+    assert inventory.get_stats()["refresh_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scoped_lookup_applies_filters_and_is_not_cached():
+    inventory = EmbeddingModelInventory(refresh_interval=60)
+    client = _client("model-a")
+    filters = [{"term": {"filename": "doc.pdf"}}]
+
+    await inventory.get_scoped_models(client, "documents", filters)
+    await inventory.get_scoped_models(client, "documents", filters)
+
+    assert client.search.await_count == 2
+    body = client.search.await_args.kwargs["body"]
+    assert body["query"] == {"bool": {"filter": filters}}
@@ -0,0 +1,78 @@
+"""
+Tests for the Google Drive changes feed used by incremental syncs
+"""
+import pytest
+from connectors.google_drive import connector as gdrive
+
+PAGES = {
+    "t1": {
+        "changes": [
+            {"fileId": "a", "file": {"id": "a", "name": "a.pdf", "mimeType": "application/pdf", "parents": ["sub"]}},
+            {"fileId": "b", "file": {"id": "b", "name": "b.pdf", "trashed": True}},
+            {"fileId": "c", "removed": True},
+            {"fileId": "dir", "file": {"id": "dir", "mimeType": "application/vnd.google-apps.folder"}},
+        ],
+        "nextPageToken": "t2",
+    },
+    "t2": {
+        "changes": [
+            {"fileId": "c", "file": {"id": "c", "name": "c.pdf", "mimeType": "application/pdf", "parents": ["elsewhere"]}},
+            {"fileId": "x", "file": {"id": "x", "name": "x.pdf", "mimeType": "application/pdf", "parents": ["root"]}},
+        ],
+        "newStartPageToken": "t3",
+    },
+}
+
+# sub -> selected -> root
+PARENTS = {"sub": ["selected"], "selected": ["root"], "elsewhere": ["root"], "root": []}
+
+
+def _connector(tmp_path, monkeypatch, **config):
+    connector = gdrive.GoogleDriveConnector({
+        "client_id": "id",
+        "client_secret": "secret",
+        "token_file": str(tmp_path / "token.json"),
+        **config,
+    })
+    parent_lookups = []
+
+    async def authenticate():
+        return True
+
+    def get_parents(file_id):
+        parent_lookups.append(file_id)
+        return PARENTS[file_id]
+
+    monkeypatch.setattr(connector, "authenticate", authenticate)
+    monkeypatch.setattr(connector, "_list_changes_page", PAGES.__getitem__)
+    monkeypatch.setattr(connector, "_get_parents", get_parents)
+    monkeypatch.setattr(connector, "get_start_page_token", lambda: "start")
+    return connector, parent_lookups
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_folds_pages_into_changes_and_deletions(tmp_path, monkeypatch):
+    connector, _ = _connector(tmp_path, monkeypatch, folder_ids=["selected"])
+
+    assert (await connector.get_changes(None)).cursor == "start"
+
+    changes = await connector.get_changes("t1")
+
+    assert changes.cursor == "t3"
+    assert [m["id"] for m in changes.changed] == ["a", "c", "x"]
+    assert changes.deleted == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_scope_follows_parents_of_changed_files_only(tmp_path, monkeypatch):
+    connector, parent_lookups = _connector(tmp_path, monkeypatch, folder_ids=["selected"])
+    changes = await connector.get_changes("t1")
+
+    in_scope = await connector.filter_to_scope(changes.changed)
+
+    assert [m["id"] for m in in_scope] == ["a"]
+    # Each folder on the way up is looked up once, never listed
+    assert sorted(parent_lookups) == ["elsewhere", "root", "sub"]
+
+    connector.cfg.recursive = False
+    assert await connector.filter_to_scope(changes.changed) == []
@@ -0,0 +1,91 @@
+"""
+Tests for Google Drive I/O running off the event loop with concurrent folder expansion
+"""
+import asyncio
+import threading
+import time
+import pytest
+from connectors.google_drive import connector as gdrive
+
+FOLDER = "application/vnd.google-apps.folder"
+
+# root -> a, b, c; a -> a1; b -> a (second parent); every folder holds one file
+TREE = {
+    "root": ["a", "b", "c"],
+    "a": ["a1"],
+    "b": ["a"],
+    "c": [],
+    "a1": [],
+}
+
+
+def _connector(tmp_path, **config):
+    return gdrive.GoogleDriveConnector({
+        "client_id": "id",
+        "client_secret": "secret",
+        "token_file": str(tmp_path / "token.json"),
+        **config,
+    })
+
+
+class _FakeDrive:
+    """Slow, thread-recording stand-in for files().list"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+        self.threads = set()
+
+    def list_children(self, folder_id):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.calls.append(folder_id)
+            self.threads.add(threading.get_ident())
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        children = [{"id": sub, "name": sub, "mimeType": FOLDER} for sub in TREE[folder_id]]
+        children.append({"id": f"{folder_id}-file", "name": "f.pdf", "mimeType": "application/pdf"})
+        return children
+
+
+@pytest.mark.asyncio
+async def test_folder_expansion_is_concurrent_and_off_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(gdrive, "GOOGLE_DRIVE_FOLDER_FANOUT", 3)
+    drive = _FakeDrive()
+    connector = _connector(tmp_path, folder_ids=["root"])
+    monkeypatch.setattr(connector, "_list_children", drive.list_children)
+
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    items = await connector._iter_selected_items()
+    beat.cancel()
+
+    assert sorted(m["id"] for m in items) == sorted(f"{f}-file" for f in TREE)
+    # "a" is reachable from root and b but listed once
+    assert sorted(drive.calls) == sorted(TREE)
+    assert 1 < drive.max_active <= 3
+    assert threading.get_ident() not in drive.threads
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_non_recursive_lists_only_selected_folders(tmp_path, monkeypatch):
+    drive = _FakeDrive()
+    connector = _connector(tmp_path, folder_ids=["root"], recursive=False)
+    monkeypatch.setattr(connector, "_list_children", drive.list_children)
+
+    items = await connector._iter_selected_items()
+
+    assert drive.calls == ["root"]
+    assert [m["id"] for m in items] == ["root-file"]
@@ -0,0 +1,91 @@
+"""
+Tests for coalescing Microsoft Graph lookups into $batch requests
+"""
+import asyncio
+import json
+import httpx
+import pytest
+from connectors.graph_client import GraphClient
+
+BASE = "https://graph.microsoft.com/v1.0"
+AUTH = {"Authorization": "Bearer token"}
+
+
+def _client(answer, **kwargs):
+    """Client whose $batch endpoint answers each sub-request with answer(sub)"""
+    batches = []
+
+    def handler(request):
+        if request.url.path.endswith("/$batch"):
+            payload = json.loads(request.content)
+            batches.append([sub["url"] for sub in payload["requests"]])
+            return httpx.Response(200, json={
+                "responses": [dict(answer(sub), id=sub["id"]) for sub in payload["requests"]],
+            })
+        return httpx.Response(200, json={"direct": request.url.path})
+
+    kwargs.setdefault("batch_linger", 0.01)
+    client = GraphClient(transport=httpx.MockTransport(handler), **kwargs)
+    return client, batches
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_share_batches_and_demultiplex():
+    def answer(sub):
+        if "/missing?" in sub["url"]:
+            return {"status": 404, "body": {"error": {"code": "itemNotFound"}}}
+        return {"status": 200, "body": {"url": sub["url"]}}
+
+    client, batches = _client(answer)
+    urls = [f"{BASE}/me/drive/items/{i}" for i in range(25)] + [f"{BASE}/me/drive/items/missing"]
+
+    responses = await asyncio.gather(*(
+        client.batch_get(url, tenant="t1", headers=AUTH, params={"$select": "id,name"})
+        for url in urls
+    ))
+
+    assert [len(batch) for batch in batches] == [20, 6]
+    assert batches[0][0] == "/me/drive/items/0?$select=id,name"
+    assert responses[3].json() == {"url": "/me/drive/items/3?$select=id,name"}
+    assert responses[-1].status_code == 404
+    with pytest.raises(httpx.HTTPStatusError):
+        responses[-1].raise_for_status()
+    assert client.get_stats()["batching"]["batched_requests"] == 26
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_throttled_items_are_retried_in_next_batch():
+    throttled = set()
+
+    def answer(sub):
+        if sub["url"].endswith("/1") and sub["url"] not in throttled:
+            throttled.add(sub["url"])
+            return {"status": 429, "headers": {"Retry-After": "0"}, "body": {}}
+        return {"status": 200, "body": {"url": sub["url"]}}
+
+    client, batches = _client(answer)
+
+    responses = await asyncio.gather(*(
+        client.batch_get(f"{BASE}/me/drive/items/{i}", tenant="t1", headers=AUTH)
+        for i in range(3)
+    ))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len(batches) == 1  # the lone retry is sent as a plain GET
+    assert responses[1].json() == {"direct": "/v1.0/me/drive/items/1"}
+    assert client.get_stats()["tenants"]["t1"]["throttled"] == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_non_graph_urls_and_single_requests_go_direct():
+    client, batches = _client(lambda sub: {"status": 200, "body": {}})
+
+    direct = await client.batch_get("https://download.test/file", headers=AUTH)
+    single = await client.batch_get(f"{BASE}/me/drive/items/1", headers=AUTH)
+
+    assert direct.json() == {"direct": "/file"}
+    assert single.json() == {"direct": "/v1.0/me/drive/items/1"}
+    assert batches == []
+    await client.close()
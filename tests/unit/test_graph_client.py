@@ -0,0 +1,86 @@
+"""
+Tests for the shared Microsoft Graph client's throttling retries and stats
+"""
+import email.utils
+import time
+import httpx
+import pytest
+from connectors import graph_client as graph_module
+from connectors.graph_client import GraphClient, parse_retry_after
+
+
+def _client(responses, **kwargs):
+    """Client whose transport replays (status, headers) pairs, then 200s"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if responses:
+            status, headers = responses.pop(0)
+            return httpx.Response(status, headers=headers)
+        return httpx.Response(200, json={"ok": True}, headers={"content-type": "application/json"})
+
+    client = GraphClient(transport=httpx.MockTransport(handler), **kwargs)
+    return client, seen
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(graph_module.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+@pytest.mark.asyncio
+async def test_retries_after_server_delay_and_counts_per_tenant(sleeps):
+    client, seen = _client([(503, {"Retry-After": "1"}), (429, {"Retry-After": "7"})])
+
+    response = await client.request("GET", "https://graph.test/me/drive", tenant="t1")
+
+    assert response.status_code == 200
+    assert len(seen) == 3
+    assert [round(d) for d in sleeps] == [1, 7]
+    stats = client.get_stats()["tenants"]["t1"]
+    assert stats["requests"] == 3
+    assert stats["requests_per_minute"] == 3
+    assert (stats["throttled"], stats["unavailable"], stats["retries"]) == (1, 1, 2)
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_throttle_holds_back_other_requests_for_tenant(sleeps):
+    client, _ = _client([(429, {"Retry-After": "30"})], max_retries=0)
+
+    first = await client.request("GET", "https://graph.test/a", tenant="t1")
+    await client.request("GET", "https://graph.test/b", tenant="t1")
+    await client.request("GET", "https://graph.test/c", tenant="t2")
+
+    # Out of retries: the 429 is returned, but the next t1 request still waits
+    assert first.status_code == 429
+    assert len(sleeps) == 1 and 29 < sleeps[0] <= 30
+    assert client.get_stats()["tenants"]["t2"]["throttled"] == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_yielding(sleeps):
+    client, seen = _client([(503, {})])
+
+    async with client.stream("GET", "https://graph.test/content", tenant="t1") as response:
+        body = await response.aread()
+
+    assert response.status_code == 200 and body
+    assert len(seen) == 2 and len(sleeps) == 1
+    await client.close()
+
+
+def test_parse_retry_after_formats():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    future = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 < parse_retry_after(future) <= 60
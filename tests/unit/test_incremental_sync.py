@@ -0,0 +1,202 @@
+"""
+Tests for change-feed driven incremental connector sync
+"""
+import httpx
+import pytest
+from connectors.base import ConnectorChanges
+from connectors.connection_manager import ConnectionConfig, ConnectionManager
+from connectors.incremental_sync import sync_connection_changes
+from connectors.onedrive.connector import OneDriveConnector
+from connectors.sync_state import ConnectorSyncStateStore, FileSyncState
+
+
+@pytest.fixture(autouse=True)
+def sync_state(tmp_path, monkeypatch):
+    store = ConnectorSyncStateStore(str(tmp_path / "sync_state.db"))
+    monkeypatch.setattr("connectors.sync_state.connector_sync_state", store)
+    return store
+
+
+class FakeConnector:
+    def __init__(self, changes):
+        self.changes = changes
+        self.cursors = []
+
+    async def get_changes(self, cursor=None):
+        self.cursors.append(cursor)
+        if cursor is None:
+            return ConnectorChanges(cursor="baseline")
+        return self.changes
+
+    async def filter_to_scope(self, files):
+        return [f for f in files if f["id"] != "out-of-scope"]
+
+
+class FakeOpenSearch:
+    def __init__(self):
+        self.deletes = []
+
+    async def delete_by_query(self, index, body, **kwargs):
+        self.deletes.append((index, body))
+        return {"deleted": 3}
+
+
+class FakeService:
+    def __init__(self, tmp_path, connector, cursor=None):
+        self.connection_manager = ConnectionManager(str(tmp_path / "connections.json"))
+        self.connection_manager.connections["c1"] = ConnectionConfig(
+            connection_id="c1", connector_type="onedrive", name="OneDrive",
+            config={}, sync_cursor=cursor,
+        )
+        self.connector = connector
+        self.opensearch = FakeOpenSearch()
+        self.session_manager = self
+        self.synced = []
+
+    def get_user_opensearch_client(self, user_id, jwt_token):
+        return self.opensearch
+
+    async def get_connector(self, connection_id):
+        return self.connector
+
+    async def sync_specific_files(self, connection_id, user_id, file_ids, jwt_token=None, file_infos=None):
+        self.synced.append(file_ids)
+        return "task-1"
+
+
+@pytest.mark.asyncio
+async def test_first_sync_stores_cursor_and_falls_back_to_full_sync(tmp_path):
+    service = FakeService(tmp_path, FakeConnector(None))
+
+    assert await sync_connection_changes(service, "c1", "alice", ["a"]) is None
+    assert service.connection_manager.connections["c1"].sync_cursor == "baseline"
+
+
+@pytest.mark.asyncio
+async def test_syncs_changed_and_deletes_removed_indexed_files(tmp_path, sync_state):
+    changes = ConnectorChanges(
+        cursor="next",
+        changed=[{"id": "a", "name": "a.pdf"}, {"id": "new", "name": "new.pdf"}],
+        deleted=["b", "never-synced"],
+    )
+    service = FakeService(tmp_path, FakeConnector(changes), cursor="previous")
+    await sync_state.put("c1", "b", FileSyncState(version="v1", content_hash="hash-b", acl_hash=None))
+
+    result = await sync_connection_changes(service, "c1", "alice", ["a", "b", "c"])
+
+    assert result == {"task_id": "task-1", "changed": ["a"], "deleted": ["b"]}
+    assert service.synced == [["a"]]
+    index, body = service.opensearch.deletes[0]
+    # Chunks ingested under the content hash are removed as well
+    assert body == {"query": {"terms": {"document_id": ["b", "hash-b"]}}}
+    assert await sync_state.get("c1", "b") is None
+    assert service.connection_manager.connections["c1"].sync_cursor == "next"
+
+    # The cursor survives a reload of the connections file
+    reloaded = ConnectionManager(str(tmp_path / "connections.json"))
+    await reloaded.load_connections()
+    assert reloaded.connections["c1"].sync_cursor == "next"
+
+
+@pytest.mark.asyncio
+async def test_unindexed_sync_uses_connector_scope_and_filename_filter(tmp_path):
+    changes = ConnectorChanges(
+        cursor="next",
+        changed=[
+            {"id": "a", "name": "a.pdf"},
+            {"id": "out-of-scope", "name": "a.pdf"},
+            {"id": "b", "name": "b.pdf"},
+        ],
+        deleted=["trashed"],
+    )
+    service = FakeService(tmp_path, FakeConnector(changes), cursor="previous")
+
+    result = await sync_connection_changes(service, "c1", "alice", filename_filter={"a.pdf"})
+
+    assert result == {"task_id": "task-1", "changed": ["a"], "deleted": ["trashed"]}
+
+
+@pytest.mark.asyncio
+async def test_expired_cursor_resets_to_full_sync(tmp_path):
+    service = FakeService(
+        tmp_path, FakeConnector(ConnectorChanges(cursor=None, reset=True)), cursor="stale"
+    )
+
+    assert await sync_connection_changes(service, "c1", "alice", ["a"]) is None
+    assert service.connector.cursors == ["stale", None]
+    assert service.connection_manager.connections["c1"].sync_cursor == "baseline"
+
+
+@pytest.mark.asyncio
+async def test_onedrive_delta_pages_fold_into_changes(monkeypatch):
+    connector = OneDriveConnector({})
+    base = "https://graph.microsoft.com/v1.0/me/drive/root/delta"
+    pages = {
+        "delta-1": {
+            "value": [
+                {"id": "a", "name": "a.pdf", "file": {"mimeType": "application/pdf"}, "size": 5},
+                {"id": "b", "deleted": {"state": "deleted"}},
+                {"id": "folder", "folder": {}},
+            ],
+            "@odata.nextLink": f"{base}?token=page-2",
+        },
+        f"{base}?token=page-2": {
+            "value": [
+                {"id": "a", "deleted": {"state": "deleted"}},
+                {"id": "b", "name": "b.txt", "file": {}},
+            ],
+            "@odata.deltaLink": f"{base}?token=delta-2",
+        },
+    }
+
+    async def authenticate():
+        return True
+
+    async def make_graph_request(url, params=None, **kwargs):
+        request = httpx.Request("GET", url)
+        if url == "gone":
+            response = httpx.Response(410, request=request)
+            response.raise_for_status()
+        return httpx.Response(200, json=pages[url], request=request)
+
+    monkeypatch.setattr(connector, "authenticate", authenticate)
+    monkeypatch.setattr(connector, "_make_graph_request", make_graph_request)
+
+    changes = await connector.get_changes("delta-1")
+
+    assert changes.cursor == f"{base}?token=delta-2"
+    assert [f["id"] for f in changes.changed] == ["b"]
+    assert changes.deleted == ["a"]
+    assert (await connector.get_changes("gone")).reset
+
+
+@pytest.mark.asyncio
+async def test_onedrive_changes_filtered_to_selection_and_root(monkeypatch):
+    connector = OneDriveConnector({"folder_ids": ["selected"]})
+    parents = {"sub": "selected", "selected": "root-id", "elsewhere": "root-id", "root-id": None}
+    lookups = []
+
+    async def make_graph_request(url, params=None, **kwargs):
+        item_id = url.rsplit("/", 1)[1]
+        if item_id == "root":
+            item_id = "root-id"
+        lookups.append(item_id)
+        parent = parents[item_id]
+        body = {"id": item_id, "parentReference": {"id": parent} if parent else {}}
+        return httpx.Response(200, json=body, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(connector, "_make_graph_request", make_graph_request)
+    changed = [
+        {"id": "a", "name": "a.pdf", "parent_id": "sub"},
+        {"id": "b", "name": "b.pdf", "parent_id": "elsewhere"},
+        {"id": "c", "name": "c.pdf", "parent_id": "sub"},
+        {"id": "d", "name": "d.pdf", "parent_id": "root-id"},
+    ]
+
+    assert [f["id"] for f in await connector.filter_to_scope(changed)] == ["a", "c"]
+    # Each folder on the way up is looked up once
+    assert sorted(lookups) == ["elsewhere", "root-id", "sub"]
+
+    connector.cfg.folder_ids = []
+    assert [f["id"] for f in await connector.filter_to_scope(changed)] == ["d"]
+    assert lookups[-1] == "root-id"
@@ -0,0 +1,120 @@
+"""
+Tests for the fair ingestion scheduler
+"""
+import asyncio
+import pytest
+from models.tasks import TaskPriority
+from services.ingestion_scheduler import IngestionScheduler
+
+
+async def _run_tasks(scheduler, specs):
+    """Run (user_id, task_id, item_count, priority) tasks and return dispatch order"""
+    order = []
+
+    def runner(task_id):
+        async def run_item(item):
+            order.append(task_id)
+            await asyncio.sleep(0)
+        return run_item
+
+    await asyncio.gather(
+        *[
+            scheduler.run(user_id, task_id, list(range(count)), runner(task_id), priority)
+            for user_id, task_id, count, priority in specs
+        ]
+    )
+    return order
+
+
+@pytest.mark.asyncio
+async def test_small_upload_not_starved_by_large_sync():
+    scheduler = IngestionScheduler(max_in_flight=1)
+    order = await _run_tasks(
+        scheduler,
+        [
+            ("bob", "sync", 200, TaskPriority.CONNECTOR),
+            ("alice", "upload", 1, TaskPriority.INTERACTIVE),
+        ],
+    )
+    assert order.index("upload") <= 1
+    assert len(order) == 201
+
+
+@pytest.mark.asyncio
+async def test_users_share_workers_fairly_within_class():
+    scheduler = IngestionScheduler(max_in_flight=1)
+    order = await _run_tasks(
+        scheduler,
+        [
+            ("bob", "bob-1", 50, TaskPriority.CONNECTOR),
+            ("bob", "bob-2", 50, TaskPriority.CONNECTOR),
+            ("alice", "alice-1", 10, TaskPriority.CONNECTOR),
+        ],
+    )
+    # alice gets every other slot even though bob has two large tasks
+    assert order[:20].count("alice-1") == 10
+
+
+@pytest.mark.asyncio
+async def test_backfill_still_progresses():
+    scheduler = IngestionScheduler(max_in_flight=1)
+    order = await _run_tasks(
+        scheduler,
+        [
+            ("alice", "upload", 100, TaskPriority.INTERACTIVE),
+            ("anonymous", "samples", 5, TaskPriority.BACKFILL),
+        ],
+    )
+    assert "samples" in order[:20]
+
+
+@pytest.mark.asyncio
+async def test_live_coroutines_bounded_and_cancel_drops_queue():
+    scheduler = IngestionScheduler(max_in_flight=2)
+    running = 0
+    peak = 0
+    gate = asyncio.Event()
+
+    async def run_item(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await gate.wait()
+        finally:
+            running -= 1
+
+    task = asyncio.create_task(scheduler.run("alice", "t1", list(range(100)), run_item))
+    await asyncio.sleep(0.01)
+
+    info = scheduler.get_queue_info("t1")
+    assert info["in_flight_files"] == 2 and info["queued_files"] == 98
+    assert scheduler.get_stats()["in_flight"] == 2
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert peak == 2
+    assert scheduler.get_stats()["in_flight"] == 0
+    assert scheduler.get_queue_info("t1") is None
+
+
+@pytest.mark.asyncio
+async def test_queue_position_counts_competing_work():
+    scheduler = IngestionScheduler(max_in_flight=1)
+    gate = asyncio.Event()
+
+    async def run_item(item):
+        await gate.wait()
+
+    tasks = [
+        asyncio.create_task(scheduler.run("bob", "big", list(range(100)), run_item)),
+        asyncio.create_task(scheduler.run("alice", "small", list(range(3)), run_item)),
+    ]
+    await asyncio.sleep(0.01)
+
+    # Fair sharing: bob's files interleave with alice's 3, not all 100 ahead
+    assert scheduler.get_queue_info("small")["queue_position"] <= 4
+
+    gate.set()
+    await asyncio.gather(*tasks)
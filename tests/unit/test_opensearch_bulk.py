@@ -0,0 +1,107 @@
+"""
+Tests for the OpenSearch _bulk indexing helper
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from utils.opensearch_bulk import (
+    BulkIndexError,
+    bulk_index_documents,
+    iter_bulk_batches,
+)
+
+
+def _docs(count, text="chunk"):
+    return [(f"hash_{i}", {"text": f"{text} {i}"}) for i in range(count)]
+
+
+def _ok_response(body):
+    lines = body.strip().split("\n")
+    items = [
+        {"index": {"_id": json.loads(line)["index"]["_id"], "status": 201}}
+        for line in lines[::2]
+    ]
+    return {"errors": False, "items": items}
+
+
+def test_batches_bounded_by_doc_count():
+    batches = list(iter_bulk_batches("idx", _docs(7), max_docs=3))
+    assert [len(b) for b in batches] == [3, 3, 1]
+    # IDs are preserved in order
+    assert [entry[0] for b in batches for entry in b] == [f"hash_{i}" for i in range(7)]
+
+
+def test_batches_bounded_by_bytes():
+    docs = _docs(4, text="x" * 1000)
+    batches = list(iter_bulk_batches("idx", docs, max_docs=100, max_bytes=2500))
+    assert [len(b) for b in batches] == [2, 2]
+
+
+def test_oversized_document_sent_alone():
+    docs = _docs(2, text="x" * 5000)
+    batches = list(iter_bulk_batches("idx", docs, max_docs=100, max_bytes=100))
+    assert [len(b) for b in batches] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_bulk_index_single_request():
+    client = Mock()
+    client.bulk = AsyncMock(side_effect=lambda body: _ok_response(body))
+
+    result = await bulk_index_documents(client, "idx", _docs(5), max_docs=10)
+
+    assert result.indexed == 5
+    assert result.batches == 1
+    assert client.bulk.await_count == 1
+    body = client.bulk.await_args.kwargs["body"]
+    assert '"_id": "hash_0"' in body and '"_id": "hash_4"' in body
+
+
+@pytest.mark.asyncio
+async def test_bulk_index_retries_rejected_items():
+    calls = []
+
+    async def bulk(body):
+        calls.append(body)
+        if len(calls) == 1:
+            return {
+                "errors": True,
+                "items": [
+                    {"index": {"_id": "hash_0", "status": 201}},
+                    {"index": {"_id": "hash_1", "status": 429, "error": {"type": "es_rejected_execution_exception"}}},
+                ],
+            }
+        return _ok_response(body)
+
+    client = Mock()
+    client.bulk = bulk
+
+    result = await bulk_index_documents(client, "idx", _docs(2), base_delay=0)
+
+    assert result.indexed == 2
+    assert result.retries == 1
+    # Only the rejected item is resent
+    assert '"hash_1"' in calls[1] and '"hash_0"' not in calls[1]
+
+
+@pytest.mark.asyncio
+async def test_bulk_index_reports_permanent_failures():
+    client = Mock()
+    client.bulk = AsyncMock(
+        return_value={
+            "errors": True,
+            "items": [
+                {"index": {"_id": "hash_0", "status": 201}},
+                {"index": {"_id": "hash_1", "status": 400, "error": {"type": "mapper_parsing_exception"}}},
+            ],
+        }
+    )
+
+    with pytest.raises(BulkIndexError) as exc_info:
+        await bulk_index_documents(client, "idx", _docs(2), base_delay=0)
+
+    assert exc_info.value.errors == [
+        {"id": "hash_1", "status": 400, "error": {"type": "mapper_parsing_exception"}}
+    ]
+    # Permanent failures are not retried
+    assert client.bulk.await_count == 1
@@ -0,0 +1,157 @@
+"""
+Tests for OpenSearch capability detection and the search modes built on it
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from opensearchpy.exceptions import RequestError
+from utils.embedding_cache import QueryEmbeddingCache
+from utils.opensearch_capabilities import (
+    HYBRID_SEARCH_PIPELINE_ID,
+    ClusterCapabilities,
+    build_hybrid_pipeline_body,
+    detect_cluster_capabilities,
+)
+
+MODEL = "text-embedding-3-small"
+
+
+def _num_candidates_error():
+    reason = "[knn] unknown field [num_candidates]"
+    return RequestError(
+        400,
+        "x_content_parse_exception",
+        {"error": {"root_cause": [{"reason": reason}], "reason": reason}},
+    )
+
+
+def _cluster(version="3.2.0", plugins=("opensearch-neural-search",), probe_error=None):
+    client = Mock()
+    client.info = AsyncMock(
+        return_value={"version": {"number": version, "distribution": "opensearch"}}
+    )
+    client.cat.plugins = AsyncMock(return_value=[{"component": p} for p in plugins])
+    client.indices.exists = AsyncMock(return_value=True)
+    client.indices.get_mapping = AsyncMock(
+        return_value={
+            "documents": {
+                "mappings": {
+                    "properties": {
+                        "text": {"type": "text"},
+                        "chunk_embedding": {"type": "knn_vector", "dimension": 3},
+                    }
+                }
+            }
+        }
+    )
+    client.search = AsyncMock(side_effect=probe_error)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_detects_hybrid_and_num_candidates_support():
+    client = _cluster()
+    capabilities = await detect_cluster_capabilities(client, "documents")
+
+    assert capabilities.supports_hybrid_query is True
+    assert capabilities.supports_num_candidates is True
+    probe = client.search.await_args.kwargs["body"]
+    assert probe["query"]["knn"]["chunk_embedding"]["vector"] == [0.0, 0.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_detects_missing_num_candidates_support():
+    capabilities = await detect_cluster_capabilities(
+        _cluster(probe_error=_num_candidates_error()), "documents"
+    )
+
+    assert capabilities.supports_num_candidates is False
+
+
+@pytest.mark.asyncio
+async def test_hybrid_requires_neural_search_plugin():
+    capabilities = await detect_cluster_capabilities(_cluster(plugins=()), "documents")
+    assert capabilities.supports_hybrid_query is False
+
+    capabilities = await detect_cluster_capabilities(_cluster(version="2.11.0"), "documents")
+    assert capabilities.supports_hybrid_query is False
+
+
+def test_pipeline_weights_semantic_then_keyword():
+    processor = build_hybrid_pipeline_body()["phase_results_processors"][0]
+    weights = processor["normalization-processor"]["combination"]["parameters"]["weights"]
+    assert weights == [0.7, 0.3]
+
+
+def _search_service(capabilities, search_side_effect):
+    from services.search_service import SearchService
+
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    cache.put(MODEL, "what is rag", [0.1, 0.2, 0.3])
+    client = Mock()
+    client.search = AsyncMock(side_effect=search_side_effect)
+    session_manager = Mock()
+    session_manager.get_user_opensearch_client = Mock(return_value=client)
+
+    service = SearchService(session_manager, embedding_cache=cache)
+    service.capabilities = capabilities
+    return service, client
+
+
+def _search_response(scores=()):
+    return {
+        "hits": {
+            "total": {"value": len(scores)},
+            "hits": [{"_score": s, "_source": {"filename": f"doc{i}"}} for i, s in enumerate(scores)],
+        },
+        "aggregations": {},
+    }
+
+
+async def _run_search(service, score_threshold=0):
+    with patch("services.search_service.embedding_model_inventory.get_models", AsyncMock(return_value=[MODEL])):
+        return await service.search(
+            "what is rag", user_id="user", jwt_token="jwt", score_threshold=score_threshold
+        )
+
+
+@pytest.mark.asyncio
+async def test_num_candidates_rejection_remembered():
+    calls = []
+
+    def search(index, body, params):
+        calls.append(body)
+        if len(calls) == 1:
+            raise _num_candidates_error()
+        return _search_response()
+
+    service, _ = _search_service(ClusterCapabilities(), search)
+
+    await _run_search(service)
+    assert len(calls) == 2
+    assert service.capabilities.supports_num_candidates is False
+
+    await _run_search(service)
+    # No failed first attempt on later searches
+    assert len(calls) == 3
+    assert "num_candidates" not in str(calls[2])
+
+
+@pytest.mark.asyncio
+async def test_hybrid_pipeline_mode_uses_single_hybrid_query():
+    capabilities = ClusterCapabilities(
+        supports_num_candidates=False, supports_hybrid_query=True, hybrid_pipeline_ready=True
+    )
+    service, client = _search_service(
+        capabilities, lambda index, body, params: _search_response([0.9, 0.2])
+    )
+
+    result = await _run_search(service, score_threshold=0.5)
+
+    kwargs = client.search.await_args.kwargs
+    assert kwargs["params"]["search_pipeline"] == HYBRID_SEARCH_PIPELINE_ID
+    sub_queries = kwargs["body"]["query"]["hybrid"]["queries"]
+    assert "dis_max" in sub_queries[0]["bool"]["must"][0]
+    assert "multi_match" in sub_queries[1]["bool"]["must"][0]
+    assert "min_score" not in kwargs["body"]
+    # Threshold applied to the normalized scores
+    assert [r["score"] for r in result["results"]] == [0.9]
@@ -0,0 +1,120 @@
+"""
+Tests for the per-user OpenSearch client cache in SessionManager
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from session_manager import SessionManager
+
+
+@pytest.fixture
+def created_clients():
+    return {}
+
+
+@pytest.fixture
+def session_manager(monkeypatch, created_clients):
+    monkeypatch.setenv("JWT_SIGNING_KEY", "unit-test-secret")
+    manager = SessionManager()
+
+    def create_client(jwt_token):
+        client = Mock(jwt=jwt_token, close=AsyncMock(), search=AsyncMock(return_value={}))
+        created_clients[jwt_token] = client
+        return client
+
+    with patch("config.settings.clients.create_user_opensearch_client", side_effect=create_client):
+        yield manager
+
+
+def test_client_reused_for_same_token(session_manager):
+    first = session_manager.get_user_opensearch_client("alice", "token-1")
+    second = session_manager.get_user_opensearch_client("alice", "token-1")
+
+    assert first is second
+    stats = session_manager.get_client_pool_stats()
+    assert stats["created"] == 1 and stats["reused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_replaced_when_token_rotates(session_manager):
+    first = session_manager.get_user_opensearch_client("alice", "token-1")
+    second = session_manager.get_user_opensearch_client("alice", "token-2")
+
+    assert second is not first
+    assert second.jwt == "token-2"
+    assert session_manager.get_client_pool_stats()["rotated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_client_evicted(session_manager):
+    with patch("config.settings.OPENSEARCH_USER_CLIENT_MAX", 2):
+        session_manager.get_user_opensearch_client("alice", "a")
+        session_manager.get_user_opensearch_client("bob", "b")
+        session_manager.get_user_opensearch_client("alice", "a")
+        session_manager.get_user_opensearch_client("carol", "c")
+
+    assert list(session_manager.user_opensearch_clients) == ["alice", "carol"]
+    assert session_manager.get_client_pool_stats()["evicted_lru"] == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_clients_evicted(session_manager):
+    with patch("session_manager.time.monotonic", return_value=100.0):
+        session_manager.get_user_opensearch_client("alice", "a")
+    with patch("session_manager.time.monotonic", return_value=100.0 + 10_000):
+        session_manager.get_user_opensearch_client("bob", "b")
+
+    assert list(session_manager.user_opensearch_clients) == ["bob"]
+    assert session_manager.get_client_pool_stats()["evicted_idle"] == 1
+
+
+@pytest.mark.asyncio
+async def test_close_all_clients(session_manager, created_clients):
+    session_manager.get_user_opensearch_client("alice", "a")
+    session_manager.get_user_opensearch_client("bob", "b")
+
+    await session_manager.close_user_opensearch_clients()
+
+    created_clients["a"].close.assert_awaited_once()
+    created_clients["b"].close.assert_awaited_once()
+    assert session_manager.get_client_pool_stats()["cached_clients"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retired_client_closed_after_last_request(session_manager, created_clients):
+    release = asyncio.Event()
+
+    async def slow_search(**kwargs):
+        await release.wait()
+        return {"hits": {}}
+
+    created = session_manager.get_user_opensearch_client("alice", "token-1")
+    created_clients["token-1"].search = AsyncMock(side_effect=slow_search)
+    request = asyncio.create_task(created.search(index="documents", body={}))
+    await asyncio.sleep(0)
+
+    # Rotating the token retires the old client while its request is running
+    session_manager.get_user_opensearch_client("alice", "token-2")
+    await asyncio.sleep(0)
+    created_clients["token-1"].close.assert_not_awaited()
+    assert session_manager.get_client_pool_stats()["retired_clients_in_use"] == 1
+
+    release.set()
+    assert await request == {"hits": {}}
+    await asyncio.gather(*session_manager._closing_clients)
+    created_clients["token-1"].close.assert_awaited_once()
+    assert session_manager.get_client_pool_stats()["closed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_request_on_stale_handle_closes_reopened_pool(session_manager, created_clients):
+    stale = session_manager.get_user_opensearch_client("alice", "token-1")
+    session_manager.get_user_opensearch_client("alice", "token-2")
+    await asyncio.gather(*session_manager._closing_clients)
+    created_clients["token-1"].indices.exists = AsyncMock(return_value=True)
+
+    assert await stale.indices.exists(index="documents")
+    await asyncio.gather(*session_manager._closing_clients)
+
+    assert created_clients["token-1"].close.await_count == 2
+    assert session_manager.get_client_pool_stats()["closed"] == 1
@@ -0,0 +1,78 @@
+"""
+Tests for the session ownership index and its write-behind persistence
+"""
+import asyncio
+import json
+import pytest
+from services.session_ownership_service import SessionOwnershipService
+
+
+def _service(tmp_path):
+    return SessionOwnershipService(
+        db_path=str(tmp_path / "ownership.db"),
+        legacy_json_file=str(tmp_path / "session_ownership.json"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookups_by_session_and_user(tmp_path):
+    service = _service(tmp_path)
+    service.claim_session("alice", "s1")
+    service.claim_session("alice", "s2")
+    service.claim_session("bob", "s3")
+
+    assert service.get_session_owner("s3") == "bob"
+    assert sorted(service.get_user_sessions("alice")) == ["s1", "s2"]
+    assert service.filter_sessions_for_user(["s1", "s3", "s9"], "alice") == ["s1"]
+    assert service.release_session("bob", "s1") is False
+    assert service.release_session("alice", "s1") is True
+    assert service.get_user_sessions("alice") == ["s2"]
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_access_bumps_batched_until_flush(tmp_path):
+    service = _service(tmp_path)
+    service.claim_session("alice", "s1")
+    await service._pending_flush
+    written = service.get_ownership_stats()["rows_written"]
+
+    for _ in range(5):
+        service.claim_session("alice", "s1")
+    assert service.get_ownership_stats()["rows_written"] == written
+    assert service.get_ownership_stats()["pending_writes"] == 1
+
+    assert await service.flush() == 1
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_claim_during_flush_flushed_right_after(tmp_path):
+    service = _service(tmp_path)
+    service.claim_session("alice", "s1")
+    await asyncio.sleep(0)  # the scheduled flush is now writing s1
+    service.claim_session("alice", "s2")
+
+    await service._pending_flush
+    stats = service.get_ownership_stats()
+    assert stats["pending_writes"] == 0
+    assert stats["rows_written"] == 2
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_state_survives_restart_and_migrates_json(tmp_path):
+    (tmp_path / "session_ownership.json").write_text(json.dumps({
+        "old": {"user_id": "carol", "created_at": "2024-01-01", "last_accessed": "2024-01-02"},
+    }))
+    service = _service(tmp_path)
+    service.claim_session("alice", "s1")
+    service.claim_session("alice", "s2")
+    service.release_session("alice", "s2")
+    await service.shutdown()
+
+    reloaded = _service(tmp_path)
+    assert reloaded.get_session_owner("old") == "carol"
+    assert reloaded.get_user_sessions("alice") == ["s1"]
+    assert not (tmp_path / "session_ownership.json").exists()
+    await reloaded.shutdown()
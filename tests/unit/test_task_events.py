@@ -0,0 +1,105 @@
+"""
+Tests for task progress events and the SSE stream built on them
+"""
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock
+from api.tasks import task_event_stream
+from models.tasks import TaskStatus
+from services.task_service import TaskService
+
+
+class GatedProcessor:
+    """Processor that completes items once the test releases them"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def process_item(self, upload_task, item, file_task):
+        await self.release.wait()
+        file_task.status = TaskStatus.COMPLETED
+        upload_task.successful_files += 1
+
+
+def _task_service():
+    pool = Mock()
+    pool.shutdown = Mock()
+    return TaskService(document_service=Mock(), process_pool=pool, ingestion_timeout=5)
+
+
+def _parse(chunks):
+    return [json.loads(c[len("data: "):]) for c in chunks if c.startswith("data: ")]
+
+
+@pytest.mark.asyncio
+async def test_file_and_task_events_published():
+    service = _task_service()
+    processor = GatedProcessor()
+    task_id = await service.create_custom_task("alice", ["a.pdf"], processor)
+    queue = service.subscribe_task_events("alice", task_id)
+
+    processor.release.set()
+    await asyncio.gather(*service.background_tasks)
+
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    assert [e["type"] for e in events] == ["task", "file", "file", "task"]
+    assert events[1]["file_status"]["status"] == "running"
+    assert events[2]["file_status"]["status"] == "completed"
+    assert events[2]["processed_files"] == 1
+    assert events[-1]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_snapshot_then_deltas_and_closes():
+    service = _task_service()
+    processor = GatedProcessor()
+    task_id = await service.create_custom_task("alice", ["a.pdf", "b.pdf"], processor)
+    stream = task_event_stream(service, "alice", task_id)
+    # Nothing is registered until the stream is iterated
+    assert task_id not in service._task_subscribers
+
+    chunks = [await stream.__anext__()]
+    processor.release.set()
+    chunks += [chunk async for chunk in stream]
+
+    events = _parse(chunks)
+    assert events[0]["type"] == "snapshot"
+    assert set(events[0]["files"]) == {"a.pdf", "b.pdf"}
+    assert all("files" not in e for e in events[1:])
+    assert events[-1]["type"] == "task"
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["successful_files"] == 2
+    assert task_id not in service._task_subscribers
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_resync(monkeypatch):
+    monkeypatch.setattr(TaskService, "TASK_EVENT_QUEUE_SIZE", 2)
+    service = _task_service()
+    processor = GatedProcessor()
+    task_id = await service.create_custom_task("alice", ["a.pdf", "b.pdf", "c.pdf"], processor)
+    stream = task_event_stream(service, "alice", task_id)
+    chunks = [await stream.__anext__()]
+
+    processor.release.set()
+    await asyncio.gather(*service.background_tasks)
+
+    chunks += [chunk async for chunk in stream]
+    events = _parse(chunks)
+    # The overflowed queue is replaced by a fresh snapshot of the finished task
+    assert [e["type"] for e in events] == ["snapshot", "snapshot"]
+    assert events[-1]["status"] == "completed"
+
+
+def test_subscribe_unknown_task():
+    assert _task_service().subscribe_task_events("alice", "missing") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_for_unknown_task_is_empty():
+    service = _task_service()
+    assert [chunk async for chunk in task_event_stream(service, "alice", "missing")] == []
+    assert service._task_subscribers == {}
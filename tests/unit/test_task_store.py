@@ -0,0 +1,155 @@
+"""
+Tests for the persistent task store and resuming tasks after a restart
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+from models.tasks import FileTask, TaskStatus, UploadTask
+from services.task_service import TaskService
+from services.task_store import SQLiteTaskStore
+
+
+class RecordingProcessor:
+    """Processor that completes every item and records what it processed"""
+
+    def __init__(self):
+        self.processed = []
+
+    def resume_spec(self):
+        return {"type": "recording"}
+
+    async def process_item(self, upload_task, item, file_task):
+        self.processed.append(item)
+        file_task.status = TaskStatus.COMPLETED
+        upload_task.successful_files += 1
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteTaskStore(str(tmp_path / "tasks.db"))
+
+
+def _task_service(store):
+    pool = Mock()
+    pool.shutdown = Mock()
+    return TaskService(
+        document_service=Mock(), process_pool=pool, ingestion_timeout=5, persistent_store=store
+    )
+
+
+def _interrupted_task():
+    return UploadTask(
+        task_id="task-1",
+        total_files=3,
+        successful_files=1,
+        processed_files=1,
+        status=TaskStatus.RUNNING,
+        file_tasks={
+            "a.pdf": FileTask(file_path="a.pdf", status=TaskStatus.COMPLETED),
+            "b.pdf": FileTask(file_path="b.pdf", status=TaskStatus.RUNNING),
+            "c.pdf": FileTask(file_path="c.pdf"),
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_file_transitions_written_incrementally(store):
+    task = _interrupted_task()
+    await store.save_task("alice", task, processor_spec={"type": "recording"}, include_files=True)
+
+    task.file_tasks["b.pdf"].status = TaskStatus.FAILED
+    task.file_tasks["b.pdf"].error = "boom"
+    task.failed_files = 1
+    await store.save_file("alice", task, "b.pdf")
+
+    [stored] = await store.load_unfinished_tasks()
+    assert stored.user_id == "alice"
+    assert stored.processor_spec == {"type": "recording"}
+    assert stored.task.failed_files == 1
+    assert stored.task.file_tasks["b.pdf"].status == TaskStatus.FAILED
+    assert stored.task.file_tasks["b.pdf"].error == "boom"
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_completed_files(store):
+    await store.save_task(
+        "alice", _interrupted_task(), processor_spec={"type": "recording"}, include_files=True
+    )
+    service = _task_service(store)
+    processor = RecordingProcessor()
+
+    assert await service.resume_unfinished_tasks(lambda spec: processor) == 1
+    await asyncio.gather(*service.background_tasks)
+
+    assert sorted(processor.processed) == ["b.pdf", "c.pdf"]
+    status = service.get_task_status("alice", "task-1")
+    assert status["status"] == "completed"
+    assert status["successful_files"] == 3
+    assert await store.load_unfinished_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_task_without_processor_marked_failed(store):
+    await store.save_task("alice", _interrupted_task(), include_files=True)
+    service = _task_service(store)
+
+    assert await service.resume_unfinished_tasks(lambda spec: RecordingProcessor()) == 0
+
+    status = service.get_task_status("alice", "task-1")
+    assert status["status"] == "failed"
+    assert status["failed_files"] == 2
+    assert await store.load_unfinished_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_new_tasks_persisted_and_shutdown_keeps_them_resumable(store):
+    service = _task_service(store)
+    started = asyncio.Event()
+
+    class BlockingProcessor(RecordingProcessor):
+        async def process_item(self, upload_task, item, file_task):
+            started.set()
+            await asyncio.sleep(60)
+
+    await service.create_custom_task("alice", ["x.pdf"], BlockingProcessor())
+    await started.wait()
+    service._persistence_enabled = False
+    for task in service.background_tasks:
+        task.cancel()
+    await asyncio.gather(*service.background_tasks, return_exceptions=True)
+
+    [stored] = await store.load_unfinished_tasks()
+    assert stored.task.file_tasks["x.pdf"].status == TaskStatus.RUNNING
+    assert stored.processor_spec == {"type": "recording"}
+
+
+@pytest.mark.asyncio
+async def test_purge_finished(store):
+    finished = UploadTask(task_id="done", total_files=0, status=TaskStatus.COMPLETED)
+    finished.updated_at = time.time() - 7200
+    await store.save_task("alice", finished)
+    await store.save_task("alice", _interrupted_task(), include_files=True)
+
+    assert await store.purge_finished(time.time() - 3600) == 1
+    assert [s.task.task_id for s in await store.load_unfinished_tasks()] == ["task-1"]
+
+
+@pytest.mark.asyncio
+async def test_task_with_interrupted_listing_fails_after_listed_files(store):
+    task = _interrupted_task()
+    task.listing = True
+    await store.save_task("alice", task, processor_spec={"type": "recording"}, include_files=True)
+    service = _task_service(store)
+    processor = RecordingProcessor()
+
+    assert await service.resume_unfinished_tasks(lambda spec: processor) == 1
+    await asyncio.gather(*service.background_tasks)
+
+    # The files listed before the restart are still processed
+    assert sorted(processor.processed) == ["b.pdf", "c.pdf"]
+    status = service.get_task_status("alice", "task-1")
+    assert status["status"] == "failed"
+    assert status["listing"] is False
+    assert "interrupted by a backend restart" in status["error"]
+    assert await store.load_unfinished_tasks() == []
@@ -0,0 +1,108 @@
+"""
+Tests for the compact per-file task state, task summaries and file paging
+"""
+import pytest
+from unittest.mock import Mock
+from models.tasks import FileTask, FileTaskTable, TaskStatus, UploadTask
+from services.task_service import TaskService
+
+
+@pytest.fixture
+def task_service():
+    pool = Mock()
+    pool.shutdown = Mock()
+    return TaskService(document_service=Mock(), process_pool=pool, ingestion_timeout=5)
+
+
+def _add_task(task_service, total_files):
+    task = UploadTask(
+        task_id="big",
+        total_files=total_files,
+        file_tasks={f"f{i}": FileTask(file_path=f"/data/f{i}") for i in range(total_files)},
+        status=TaskStatus.RUNNING,
+    )
+    task_service.task_store["alice"] = {"big": task}
+    return task
+
+
+def test_table_tracks_status_counts_and_recent_failures():
+    table = FileTaskTable({f"f{i}": FileTask(file_path=f"f{i}") for i in range(15)})
+    for i in range(12):
+        table[f"f{i}"].status = TaskStatus.FAILED
+        table[f"f{i}"].error = f"boom {i}"
+    table["f12"].status = TaskStatus.RUNNING
+
+    assert table.count(TaskStatus.FAILED) == 12
+    assert table.count(TaskStatus.RUNNING) == 1
+    assert table.count(TaskStatus.PENDING) == 2
+    failures = table.recent_failures()
+    assert len(failures) == FileTaskTable.RECENT_FAILURES
+    assert failures[0][0] == "f11" and failures[0][1].error == "boom 11"
+
+
+def test_file_task_views_write_through():
+    task = UploadTask(task_id="t", total_files=1, file_tasks={"k": FileTask(file_path="/p", filename="a.pdf")})
+    task.file_tasks["k"].result = {"id": "doc"}
+
+    file_task = task.file_tasks["k"]
+    assert file_task.file_path == "/p"
+    assert file_task.filename == "a.pdf"
+    assert file_task.result == {"id": "doc"}
+    with pytest.raises(AttributeError):
+        file_task.error_message = "not a field"
+
+
+def test_summary_excludes_files(task_service):
+    task = _add_task(task_service, 5)
+    task.file_tasks["f0"].status = TaskStatus.COMPLETED
+    task.file_tasks["f1"].status = TaskStatus.FAILED
+    task.file_tasks["f1"].error = "bad pdf"
+    task.file_tasks["f2"].status = TaskStatus.RUNNING
+    task.processed_files = 2
+    task.successful_files = 1
+    task.failed_files = 1
+    task.updated_at = task.created_at + 4
+
+    summary = task_service.get_task_summary("alice", "big")
+    assert "files" not in summary
+    assert summary["running_files"] == 1
+    assert summary["pending_files"] == 2
+    assert summary["files_per_second"] == 0.5
+    assert summary["eta_seconds"] == 6.0
+    assert summary["recent_errors"][0]["error"] == "bad pdf"
+
+
+def test_file_pages_filtered_by_status(task_service):
+    task = _add_task(task_service, 10)
+    for i in (1, 4, 5, 8):
+        task.file_tasks[f"f{i}"].status = TaskStatus.FAILED
+
+    first = task_service.get_task_files("alice", "big", status=TaskStatus.FAILED, limit=3)
+    assert [f["file"] for f in first["files"]] == ["f1", "f4", "f5"]
+    second = task_service.get_task_files(
+        "alice", "big", status=TaskStatus.FAILED, cursor=first["next_cursor"], limit=3
+    )
+    assert [f["file"] for f in second["files"]] == ["f8"]
+    assert second["next_cursor"] is None
+
+
+def test_inline_files_truncated(task_service, monkeypatch):
+    monkeypatch.setattr(TaskService, "TASK_STATUS_MAX_FILES", 3)
+    _add_task(task_service, 5)
+
+    status = task_service.get_task_status("alice", "big")
+    assert list(status["files"]) == ["f0", "f1", "f2"]
+    assert status["files_truncated"] is True
+    [listed] = task_service.get_all_tasks("alice")
+    assert len(listed["files"]) == 3 and listed["files_truncated"] is True
+
+
+def test_all_tasks_include_completed_files(task_service):
+    task = _add_task(task_service, 3)
+    task.file_tasks["f0"].status = TaskStatus.COMPLETED
+    task.file_tasks["f2"].status = TaskStatus.RUNNING
+
+    [listed] = task_service.get_all_tasks("alice")
+    assert listed["files"]["f0"]["status"] == "completed"
+    assert list(listed["files"]) == ["f2", "f1", "f0"]
+    assert listed["files_truncated"] is False